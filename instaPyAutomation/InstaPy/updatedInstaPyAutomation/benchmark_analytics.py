@@ -0,0 +1,279 @@
+"""
+Analytics Benchmarks
+Times InstagramAnalytics and the daily report on synthetic histories of
+10k, 100k and 1M actions and posts, and compares with saved JSON baselines
+"""
+import os
+import sys
+import gc
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from colorama import Fore, Style, init
+
+# Add project directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.analytics import InstagramAnalytics
+from core.analytics_store import STORE_DIR, AnalyticsStore, migrate_legacy
+from core.clock import SYSTEM_CLOCK
+from core.synthetic_history import write_legacy_history
+from core.log import setup_logging
+from generate_daily_report import generate_html_report, generate_json_report
+
+# Initialize colorama
+init(autoreset=True)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def parse_size(text):
+    """'10k' / '1m' / '2500' -> number of actions"""
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    if text[-1:] in ('k', 'm'):
+        return int(float(text[:-1]) * (1_000 if text[-1] == 'k' else 1_000_000))
+    return int(text)
+
+
+def size_label(size):
+    """10000 -> '10k', 1000000 -> '1m'"""
+    for label, value in SIZES.items():
+        if value == size:
+            return label
+    return str(size)
+
+
+def measure(func, repeat=3, memory=True):
+    """
+    Time a callable and, optionally, its peak memory
+    
+    The timed calls run without tracemalloc (it slows Python down a lot);
+    one more traced call measures the peak allocated on top of what was
+    already allocated, and what its result still holds once it returns.
+    
+    Returns:
+        dict: seconds (fastest call), median_seconds, peak_mb and retained_mb
+              (None without memory)
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    
+    peak_mb = retained_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            result = func()
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            del result
+        finally:
+            tracemalloc.stop()
+        peak_mb = round((peak - base) / 1024 / 1024, 2)
+        retained_mb = round((current - base) / 1024 / 1024, 2)
+    
+    return {
+        'seconds': round(min(times), 6),
+        'median_seconds': round(statistics.median(times), 6),
+        'peak_mb': peak_mb,
+        'retained_mb': retained_mb
+    }
+
+
+def benchmark_size(size, workdir, repeat=3, record_calls=5, memory=True, seed=None):
+    """
+    Run every benchmark on one synthetic history
+    
+    Args:
+        size: Actions (and posts) in the history
+        workdir: Scratch folder for the history and the reports
+        repeat: Timed calls per step (the fastest counts)
+        record_calls: record_action calls timed
+        memory: Measure peak memory with tracemalloc
+        seed: Random seed of the history
+    
+    Returns:
+        dict: Step name -> measure() result, plus the history's size and store size
+    """
+    data_dir = os.path.join(workdir, 'data')
+    logs_dir = os.path.join(workdir, 'logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    
+    start = time.perf_counter()
+    legacy_file = write_legacy_history(data_dir, size, seed=seed)
+    generate_seconds = time.perf_counter() - start
+    gc.collect()
+    
+    steps = {}
+    # Version 1 analytics.json -> store; each run overwrites the same store
+    store = AnalyticsStore(os.path.join(data_dir, STORE_DIR))
+    steps['migrate'] = measure(lambda: migrate_legacy(legacy_file, store), repeat, memory)
+    os.remove(legacy_file)
+    steps['load'] = measure(lambda: InstagramAnalytics(data_dir=data_dir), repeat, memory)
+    analytics = InstagramAnalytics(data_dir=data_dir)
+    
+    steps['get_activity_summary'] = measure(lambda: analytics.get_activity_summary(7), repeat, memory)
+    steps['get_best_hashtags'] = measure(lambda: analytics.get_best_hashtags(min_uses=1, top_n=10), repeat, memory)
+    steps['get_follower_growth'] = measure(lambda: analytics.get_follower_growth(30), repeat, memory)
+    steps['html_report'] = measure(
+        lambda: generate_html_report(analytics, logs_dir, os.path.join(workdir, 'report.html')), repeat, memory)
+    steps['json_report'] = measure(
+        lambda: generate_json_report(analytics, logs_dir, os.path.join(workdir, 'report.json')), repeat, memory)
+    
+    # Last: it grows the history it is measured on
+    steps['record_action'] = measure(
+        lambda: analytics.record_action('like', {'hashtag': 'travel'}), record_calls, memory)
+    
+    return {
+        'actions': size,
+        'posts': size,
+        'file_mb': round(store.size_bytes() / 1024 / 1024, 2),
+        'generate_seconds': round(generate_seconds, 3),
+        'steps': steps
+    }
+
+
+def baseline_path(size, baseline_dir=BASELINE_DIR):
+    """benchmarks/analytics_<size>.json"""
+    return os.path.join(baseline_dir, f'analytics_{size_label(size)}.json')
+
+
+def save_baseline(result, baseline_dir=BASELINE_DIR):
+    """Write a result as the baseline of its size"""
+    os.makedirs(baseline_dir, exist_ok=True)
+    baseline = dict(result, python=platform.python_version(), machine=platform.platform(),
+                    created_at=SYSTEM_CLOCK.utcnow().isoformat())
+    path = baseline_path(result['actions'], baseline_dir)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+    return path
+
+
+def load_baseline(size, baseline_dir=BASELINE_DIR):
+    """Saved baseline of a size, or None"""
+    path = baseline_path(size, baseline_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare(result, baseline, tolerance=0.25):
+    """
+    Compare a result with its baseline
+    
+    Args:
+        result: benchmark_size() result
+        baseline: Saved baseline of the same size
+        tolerance: Allowed slowdown / memory growth (0.25 = 25%)
+    
+    Returns:
+        list: [(step, metric, baseline value, new value, ratio, regressed), ...]
+    """
+    rows = []
+    for step, new in result['steps'].items():
+        old = baseline['steps'].get(step)
+        if not old:
+            continue
+        for metric in ('seconds', 'peak_mb', 'retained_mb'):
+            if old.get(metric) is None or new.get(metric) is None:
+                continue
+            ratio = new[metric] / old[metric] if old[metric] else 1.0
+            rows.append((step, metric, old[metric], new[metric], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_result(result):
+    """Print one size's timings"""
+    print(f"\n{Fore.CYAN}{size_label(result['actions'])}: {result['actions']:,} actions, "
+          f"{result['posts']:,} posts, {result['file_mb']} MB file "
+          f"(generated in {result['generate_seconds']:.1f}s){Style.RESET_ALL}")
+    for step, stats in result['steps'].items():
+        memory = f"{stats['peak_mb']:>9.2f} MB peak" if stats['peak_mb'] is not None else ''
+        if stats.get('retained_mb') is not None:
+            memory += f"  {stats['retained_mb']:>9.2f} MB retained"
+        print(f"  {step:<22} {stats['seconds'] * 1000:>11.2f} ms  {memory}")
+
+
+def print_comparison(rows):
+    """Print the comparison with a baseline, regressions in red"""
+    for step, metric, old, new, ratio, regressed in rows:
+        color = Fore.RED if regressed else (Fore.GREEN if ratio < 1 else '')
+        unit = 's' if metric == 'seconds' else ' MB'
+        print(f"  {color}{step:<22} {metric:<11} {old:>10.4f}{unit} → {new:>10.4f}{unit}  "
+              f"({ratio:.2f}x){Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark analytics and report generation on synthetic histories')
+    parser.add_argument('--sizes', default='10k,100k,1m',
+                        help='History sizes in actions and posts (default: 10k,100k,1m)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed calls per step; the fastest counts (default: 3)')
+    parser.add_argument('--record-calls', type=int, default=5,
+                        help='record_action calls timed per size (default: 5)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc peak memory measurements')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Random seed of the histories (default: 1)')
+    parser.add_argument('--baseline-dir', default=BASELINE_DIR,
+                        help='Folder of the JSON baselines (default: benchmarks/)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store the results as the new baselines')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Slowdown or memory growth reported as a regression (default: 0.25)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if any step regressed')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    
+    args = parser.parse_args()
+    setup_logging('WARNING', console=True)
+    
+    regressions = 0
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(',')]:
+        workdir = tempfile.mkdtemp(prefix='analytics_bench_')
+        try:
+            result = benchmark_size(size, workdir, args.repeat, args.record_calls,
+                                    memory=not args.no_memory, seed=args.seed)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        results.append(result)
+        
+        baseline = load_baseline(size, args.baseline_dir)
+        rows = compare(result, baseline, args.tolerance) if baseline else []
+        regressions += sum(1 for row in rows if row[-1])
+        
+        if not args.json:
+            print_result(result)
+            if baseline:
+                print(f"  {Fore.CYAN}vs baseline from {baseline['created_at'][:10]} "
+                      f"(Python {baseline['python']}):{Style.RESET_ALL}")
+                print_comparison(rows)
+        if args.save_baseline:
+            path = save_baseline(result, args.baseline_dir)
+            if not args.json:
+                print(f"  {Fore.GREEN}✓ Baseline saved: {path}{Style.RESET_ALL}")
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    elif regressions:
+        print(f"\n{Fore.RED}✗ {regressions} regression(s) beyond {args.tolerance:.0%}{Style.RESET_ALL}")
+    
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
@@ -0,0 +1,263 @@
+"""
+Compact Action Log
+Column-stored action history: interned action types and hashtags, epoch
+microsecond timestamps, and lossless conversion to and from the stored
+action entries
+"""
+import itertools
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from .clock import parse_timestamp, to_utc
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+MINUTE_MICROS = 60 * 1000000
+
+NO_HASHTAG = -1
+NO_FLAG = -1
+# Offset column value of timestamps written in UTC with '+00:00'
+UTC_STAMP = -32768
+
+# Detail keys with their own column, in the order record_action() callers write them
+DETAIL_KEYS = ('hashtag', 'ai_generated', 'username')
+ENTRY_KEYS = ('type', 'timestamp', 'details')
+DETAIL_SHAPES = {tuple(key for key, used in zip(DETAIL_KEYS, mask) if used)
+                 for mask in itertools.product((False, True), repeat=len(DETAIL_KEYS))}
+
+
+def to_micros(moment):
+    """Epoch microseconds of an aware datetime"""
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_micros(micros):
+    """Aware UTC datetime of epoch microseconds"""
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _canonical_time(text):
+    """
+    Epoch microseconds of a timestamp that the log writes back character for
+    character, with its offset column value, else None
+    
+    Timestamps written in UTC end in '+00:00' (UTC_STAMP). Ones written before
+    they were stored in UTC have no offset and are audience wall time; they
+    get the minutes that wall time was ahead of UTC, so the exact text can be
+    rebuilt whatever the audience timezone is later.
+    
+    Returns:
+        tuple: (epoch microseconds, offset column value), or None
+    """
+    if not isinstance(text, str) or len(text) not in (19, 25, 26, 32) or text[10] != 'T':
+        return None
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    # isoformat() leaves out a zero fraction
+    if (len(text) in (26, 32)) != bool(moment.microsecond):
+        return None
+    if len(text) in (25, 32):
+        if not text.endswith('+00:00'):
+            return None
+        return to_micros(moment), UTC_STAMP
+    if moment.tzinfo is not None:
+        return None
+    micros = to_micros(to_utc(moment))
+    offset, rest = divmod(to_micros(moment.replace(tzinfo=timezone.utc)) - micros, MINUTE_MICROS)
+    if rest or not -1440 < offset < 1440:
+        return None
+    return micros, offset
+
+
+class Interner:
+    """Small-integer codes for a repeating set of strings"""
+    
+    __slots__ = ('values', 'codes')
+    
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+    
+    def code(self, value):
+        """Code of `value`, assigned on first use"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+    
+    def __len__(self):
+        return len(self.values)
+
+
+class ActionLog:
+    """
+    Action history stored as columns instead of one dict per action
+    
+    Every action costs 17 bytes in the columns (type code, timestamp,
+    timestamp offset, hashtag code, ai_generated flag) instead of two dicts
+    and their strings. Entries with a shape the columns cannot reproduce
+    exactly (other detail keys, unusual key order, ...) are also kept
+    verbatim, so converting back gives the entries that were read. Indexing
+    and iterating build the entry dicts on demand; the summary queries read
+    the columns directly.
+    """
+    
+    __slots__ = ('types', 'hashtags', 'kinds', 'times', 'offsets', 'tags', 'flags',
+                 'usernames', 'irregular', 'ordered')
+    
+    def __init__(self, entries=()):
+        """
+        Args:
+            entries: Action entries as record_action() writes them
+        """
+        self.types = Interner()
+        self.hashtags = Interner()
+        self.kinds = array('H')   # Action type codes
+        self.times = array('q')   # Epoch microseconds (UTC)
+        self.offsets = array('h')  # Minutes offset-less timestamps are ahead of UTC, else UTC_STAMP
+        self.tags = array('i')    # Hashtag codes, NO_HASHTAG without one
+        self.flags = array('b')   # details['ai_generated'], NO_FLAG without one
+        self.usernames = {}       # Index -> details['username']
+        self.irregular = {}       # Index -> entry kept as read
+        self.ordered = True       # Timestamps never go backwards
+        self.extend(entries)
+    
+    def extend(self, entries):
+        """Add action entries in order"""
+        for entry in entries:
+            self.append(entry)
+    
+    def append(self, entry):
+        """Add an action entry ({'type', 'timestamp', 'details'})"""
+        index = len(self.kinds)
+        action_type = entry.get('type')
+        timestamp = entry.get('timestamp')
+        details = entry.get('details')
+        
+        canonical = _canonical_time(timestamp)
+        regular = (canonical is not None and isinstance(action_type, str)
+                   and tuple(entry) == ENTRY_KEYS and self._regular_details(details))
+        if canonical is None:
+            # Kept verbatim; the column still gets the moment for queries
+            micros, offset = to_micros(parse_timestamp(timestamp)), UTC_STAMP
+        else:
+            micros, offset = canonical
+        
+        self.kinds.append(self.types.code(str(action_type)))
+        if self.times and micros < self.times[-1]:
+            self.ordered = False
+        self.times.append(micros)
+        self.offsets.append(offset)
+        
+        if regular:
+            hashtag = details.get('hashtag')
+            self.tags.append(NO_HASHTAG if hashtag is None else self.hashtags.code(hashtag))
+            flag = details.get('ai_generated')
+            self.flags.append(NO_FLAG if flag is None else int(flag))
+            if 'username' in details:
+                self.usernames[index] = details['username']
+        else:
+            self.tags.append(NO_HASHTAG)
+            self.flags.append(NO_FLAG)
+            self.irregular[index] = entry
+    
+    @staticmethod
+    def _regular_details(details):
+        """Whether the columns reproduce `details` exactly, key order included"""
+        if type(details) is not dict or tuple(details) not in DETAIL_SHAPES:
+            return False
+        return (type(details.get('hashtag', '')) is str
+                and type(details.get('ai_generated', False)) is bool
+                and type(details.get('username', '')) is str)
+    
+    def __len__(self):
+        return len(self.kinds)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('action log index out of range')
+        return self.entry(index)
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.entry(index)
+    
+    def entry(self, index):
+        """The action entry at `index`, as it was recorded"""
+        irregular = self.irregular.get(index)
+        if irregular is not None:
+            return irregular
+        details = {}
+        tag = self.tags[index]
+        if tag != NO_HASHTAG:
+            details['hashtag'] = self.hashtags.values[tag]
+        flag = self.flags[index]
+        if flag != NO_FLAG:
+            details['ai_generated'] = bool(flag)
+        if index in self.usernames:
+            details['username'] = self.usernames[index]
+        offset = self.offsets[index]
+        if offset == UTC_STAMP:
+            timestamp = from_micros(self.times[index]).isoformat()
+        else:
+            wall = from_micros(self.times[index] + offset * MINUTE_MICROS)
+            timestamp = wall.replace(tzinfo=None).isoformat()
+        return {
+            'type': self.types.values[self.kinds[index]],
+            'timestamp': timestamp,
+            'details': details
+        }
+    
+    def to_list(self):
+        """All entries, as dicts"""
+        return list(self)
+    
+    def count_by_type(self, since=None):
+        """
+        Actions per type
+        
+        Args:
+            since: Aware datetime; only actions at or after it count
+        
+        Returns:
+            Counter: {action type: count}
+        """
+        if since is None:
+            codes = self.kinds
+        else:
+            cutoff = to_micros(since)
+            if self.ordered:
+                codes = self.kinds[bisect_left(self.times, cutoff):]
+            else:
+                codes = [kind for kind, micros in zip(self.kinds, self.times) if micros >= cutoff]
+        return Counter({self.types.values[code]: count for code, count in Counter(codes).items()})
+
+
+def intern_posts(posts):
+    """
+    Share one string per hashtag and weekday across post entries
+    
+    json.load() gives every occurrence its own string; the same few
+    thousand hashtags repeat across all posts.
+    
+    Returns:
+        list: `posts`, changed in place
+    """
+    intern = sys.intern
+    for post in posts:
+        hashtags = post.get('hashtags')
+        if hashtags:
+            post['hashtags'] = list(map(intern, hashtags))
+        day = post.get('day')
+        if isinstance(day, str):
+            post['day'] = intern(day)
+    return posts
@@ -2,6 +2,7 @@
 Instagram Actions
 Core functionality for liking, commenting, following, etc.
 """
+import logging
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -11,15 +12,36 @@ from .humanize import HumanBehavior
 from .safety import SafetyManager
 from .config import Config
 from .ai_comments import AICommentGenerator
+from .deadline import Deadline, DeadlineExceeded
+from .clock import SYSTEM_CLOCK
+from .timing import Timings, timed
+from .selector_registry import SelectorRegistry
+from .selector_catalog import get_catalog
+from .dom_wait import DomWait, LIKED, TEXTAREA_CLEARED
+from .seen_posts import SeenPostIndex, post_url, shortcode_from_href
+from .block_monitor import ActionBlockMonitor
+
+logger = logging.getLogger(__name__)
 
 
 class InstagramActions:
     """Instagram action handlers"""
     
-    def __init__(self, driver, safety_manager, use_ai_comments=False):
+    def __init__(self, driver, safety_manager, use_ai_comments=False, clock=None, timings=None,
+                 selectors=None, seen_posts=None, blocks=None):
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
-        self.human = HumanBehavior(driver)
+        self.clock = clock or SYSTEM_CLOCK
+        self.timings = timings or Timings(clock=self.clock)
+        # Hit-rate stats per locator strategy - working strategies are tried first
+        self.selectors = selectors or SelectorRegistry(clock=self.clock)
+        # Posts handled in earlier runs - skipped before they are opened
+        self.seen_posts = seen_posts if seen_posts is not None else SeenPostIndex(clock=self.clock)
+        # Watches like/comment confirmations for Instagram action blocks
+        self.blocks = blocks or ActionBlockMonitor(clock=self.clock)
+        self.human = HumanBehavior(driver, clock=self.clock, timings=self.timings)
+        # Verifications wait on DOM changes, not fixed sleeps
+        self.dom = DomWait(driver, clock=self.clock)
         self.safety = safety_manager
         self.use_ai_comments = use_ai_comments
         
@@ -28,89 +50,92 @@ class InstagramActions:
             try:
                 # Use model from config (defaults to 'gemini' which is FREE!)
                 ai_model = Config.AI_MODEL if hasattr(Config, 'AI_MODEL') else 'gemini'
-                self.ai_generator = AICommentGenerator(model=ai_model)
-                print(f"✓ AI comment generation enabled (using {ai_model.upper()})")
+                self.ai_generator = AICommentGenerator(model=ai_model, clock=self.clock, timings=self.timings)
+                logger.info("✓ AI comment generation enabled (using %s)", ai_model.upper())
             except Exception as e:
-                print(f"⚠️  Could not initialize AI comments: {e}")
+                logger.warning("⚠️  Could not initialize AI comments: %s", e)
                 self.use_ai_comments = False
     
+    def attach_driver(self, driver):
+        """Work with a new browser session (after a browser restart)"""
+        self.driver = driver
+        self.wait = WebDriverWait(driver, 10)
+        self.human = HumanBehavior(driver, clock=self.clock, timings=self.timings)
+        self.dom = DomWait(driver, clock=self.clock)
+    
+    @timed('login')
     def login(self, username, password, max_retries=3):
         """Login to Instagram with retry logic"""
         for attempt in range(1, max_retries + 1):
-            print(f"🔐 Logging in as {username}... (Attempt {attempt}/{max_retries})")
+            logger.info("🔐 Logging in as %s... (Attempt %s/%s)", username, attempt, max_retries)
             try:
                 self.driver.get(Config.LOGIN_URL)
-                print("→ Waiting for page to load...")
+                logger.debug("→ Waiting for page to load...")
                 self.human.random_delay(3, 5)
 
                 # Find username field
-                print("→ Finding username field...")
+                logger.debug("→ Finding username field...")
 
                 username_input = self.wait.until(
                     EC.presence_of_element_located((By.NAME, "username"))
                 )
 
                 # Type username with human-like speed
-                print("→ Typing username...")
+                logger.debug("→ Typing username...")
                 username_input.clear()
                 self.human.human_type(username_input, username, 'normal')
                 self.human.random_delay(1, 2)
 
                 # Type password
-                print("→ Typing password...")
+                logger.debug("→ Typing password...")
                 password_input = self.driver.find_element(By.NAME, "password")
                 password_input.clear()
                 self.human.human_type(password_input, password, 'normal')
                 self.human.random_delay(2, 3)
 
                 # Wait for login button to be enabled - try multiple selectors
-                print("→ Waiting for login button...")
+                logger.debug("→ Waiting for login button...")
                 login_button = None
-                button_selectors = [
-                    "//button[@type='submit']",
-                    "//button[contains(text(), 'Log in')]",
-                    "//button[contains(text(), 'Log In')]",
-                    "//*[@id='loginForm']//button",
-                    "//div[contains(@class, 'x9f619')]//button[@type='submit']"
-                ]
-
-                for selector in button_selectors:
+                for selector in self._strategies('login.button'):
+                    started = self.clock.monotonic()
                     try:
-                        login_button = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                        print(f"✓ Found login button with selector: {selector}")
+                        login_button = WebDriverWait(
+                            self.driver, self.selectors.timeout('login.button', selector.key, 10)
+                        ).until(EC.element_to_be_clickable(selector.locator))
+                        self._record_strategy('login.button', selector.key, True, started)
+                        logger.debug("✓ Found login button with selector: %s", selector.value)
                         break
                     except:
+                        self._record_strategy('login.button', selector.key, False, started)
                         continue
 
                 if not login_button:
-                    print("✗ Could not find login button")
+                    logger.warning("✗ Could not find login button")
                     continue
 
                 self.human.random_delay(1, 2)
 
                 # Click login button
-                print("→ Clicking login button...")
+                logger.debug("→ Clicking login button...")
                 try:
                     login_button.click()
                 except:
                     # Fallback: use JavaScript click
-                    print("→ Using JavaScript click...")
+                    logger.debug("→ Using JavaScript click...")
                     self.driver.execute_script("arguments[0].click();", login_button)
 
                 # Wait for login to complete
-                print("→ Waiting for login to complete...")
+                logger.debug("→ Waiting for login to complete...")
                 self.human.random_delay(5, 8)
 
                 # Check if we're logged in
                 current_url = self.driver.current_url
                 if 'login' in current_url.lower():
-                    print("✗ Still on login page - credentials may be incorrect")
+                    logger.warning("✗ Still on login page - credentials may be incorrect")
                     continue
 
                 # Dismiss all dialogs (Save Login, Notifications, etc.)
-                print("→ Handling post-login dialogs...")
+                logger.debug("→ Handling post-login dialogs...")
                 self.human.random_delay(2, 3)
 
                 # Try multiple times to catch all dialogs
@@ -118,34 +143,26 @@ class InstagramActions:
                     self.dismiss_all_dialogs()
                     self.human.random_delay(1, 2)
 
-                print("✓ Login successful")
+                logger.info("✓ Login successful")
                 return True
             except Exception as e:
-                print(f"✗ Login attempt {attempt} failed: {e}")
+                logger.warning("✗ Login attempt %s failed: %s", attempt, e)
                 if attempt < max_retries:
-                    print("↻ Retrying login...")
+                    logger.debug("↻ Retrying login...")
                 self.human.random_delay(2, 4)
                 continue
-        print(f"✗ All login attempts failed after {max_retries} retries.")
+        logger.error("✗ All login attempts failed after %s retries.", max_retries)
         return False
     
     def handle_save_login_prompt(self):
         """Handle 'Save Your Login Info' prompt"""
-        selectors = [
-            "//button[contains(text(), 'Not now')]",
-            "//button[contains(text(), 'Not Now')]",
-            "//button[contains(text(), 'not now')]",
-            "//div[contains(text(), 'Not Now')]",
-            "//*[contains(@class, '_acan')]//button",
-        ]
-        
-        for selector in selectors:
+        for selector in get_catalog().strategies('dialog.save_login'):
             try:
                 not_now_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
+                    EC.element_to_be_clickable(selector.locator)
                 )
                 not_now_button.click()
-                print("✓ Dismissed save login prompt")
+                logger.info("✓ Dismissed save login prompt")
                 self.human.random_delay(1, 2)
                 return True
             except TimeoutException:
@@ -154,21 +171,13 @@ class InstagramActions:
     
     def handle_notifications_prompt(self):
         """Handle 'Turn on Notifications' prompt"""
-        selectors = [
-            "//button[contains(text(), 'Not Now')]",
-            "//button[contains(text(), 'Not now')]",
-            "//button[contains(text(), 'NOT NOW')]",
-            "//button[text()='Not Now']",
-            "//*[contains(@role, 'button')][contains(text(), 'Not Now')]",
-        ]
-        
-        for selector in selectors:
+        for selector in get_catalog().strategies('dialog.notifications'):
             try:
                 not_now_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
+                    EC.element_to_be_clickable(selector.locator)
                 )
                 not_now_button.click()
-                print("✓ Dismissed notifications prompt")
+                logger.info("✓ Dismissed notifications prompt")
                 self.human.random_delay(1, 2)
                 return True
             except TimeoutException:
@@ -177,45 +186,33 @@ class InstagramActions:
     
     def dismiss_all_dialogs(self):
         """Dismiss all common Instagram dialogs/popups"""
-        print("→ Checking for dialogs...")
-        
-        # List of common dialog dismissal buttons
-        dialog_selectors = [
-            "//button[contains(text(), 'Not Now')]",
-            "//button[contains(text(), 'Not now')]",
-            "//button[contains(text(), 'Dismiss')]",
-            "//button[contains(text(), 'Cancel')]",
-            "//button[contains(text(), 'Skip')]",
-            "//button[@aria-label='Close']",
-            "//*[name()='svg'][@aria-label='Close']/..",
-            "//button[contains(@class, 'aOOlW')]",  # Common close button class
-        ]
+        logger.debug("→ Checking for dialogs...")
         
+        # Every dismissal button in one lookup (catalog union of 'dialog.dismiss')
         dismissed_count = 0
-        for selector in dialog_selectors:
+        try:
+            buttons = self.driver.find_elements(By.XPATH, get_catalog().union('dialog.dismiss'))
+        except:
+            buttons = []
+        for button in buttons:
             try:
-                # Short wait for each dialog
-                buttons = self.driver.find_elements(By.XPATH, selector)
-                for button in buttons:
-                    try:
-                        if button.is_displayed():
-                            button.click()
-                            dismissed_count += 1
-                            print(f"✓ Dismissed dialog ({dismissed_count})")
-                            self.human.random_delay(0.5, 1)
-                    except:
-                        continue
+                if button.is_displayed():
+                    button.click()
+                    dismissed_count += 1
+                    logger.debug("✓ Dismissed dialog (%s)", dismissed_count)
+                    self.human.random_delay(0.5, 1)
             except:
                 continue
         
         if dismissed_count > 0:
-            print(f"✓ Dismissed {dismissed_count} dialog(s)")
+            logger.info("✓ Dismissed %s dialog(s)", dismissed_count)
         
         return dismissed_count > 0
     
+    @timed('search_hashtag')
     def search_hashtag(self, hashtag):
         """Navigate to hashtag page"""
-        print(f"🔍 Searching for #{hashtag}...")
+        logger.info("🔍 Searching for #%s...", hashtag)
         
         # Remove # if provided
         hashtag = hashtag.lstrip('#')
@@ -232,21 +229,15 @@ class InstagramActions:
         
         return True
     
+    @timed('get_posts')
     def get_posts_from_page(self, max_posts=9):
         """Get post elements from current page"""
         try:
-            # Try multiple XPath selectors for posts
-            selectors = [
-                "//article//a[contains(@href, '/p/')]",
-                "//a[contains(@href, '/p/')]",
-                "//div[contains(@class, '_aagw')]//a",
-                "//div[@role='button']//a[contains(@href, '/p/')]"
-            ]
-            
+            # Try multiple selectors for posts
             posts = []
-            for selector in selectors:
+            for selector in get_catalog().strategies('posts.grid'):
                 try:
-                    found_posts = self.driver.find_elements(By.XPATH, selector)
+                    found_posts = self.driver.find_elements(*selector.locator)
                     if found_posts:
                         posts = found_posts
                         break
@@ -256,47 +247,132 @@ class InstagramActions:
             # Limit number of posts
             posts = posts[:max_posts]
             
-            print(f"✓ Found {len(posts)} posts")
+            logger.info("✓ Found %s posts", len(posts))
             return posts
             
         except Exception as e:
-            print(f"✗ Failed to get posts: {e}")
+            logger.error("✗ Failed to get posts: %s", e)
             return []
     
-    def like_post(self, post_element=None):
-        """Like a post - Uses both JavaScript and Selenium clicks"""
+    @timed('get_posts')
+    def get_post_queue(self, max_posts=9):
+        """
+        Work queue of post URLs from the current grid, minus posts already handled
+        
+        The grid's hrefs are read in one script call, so the queue holds stable
+        /p/<shortcode>/ URLs instead of WebElements that go stale once a modal
+        opens and closes.
+        
+        Returns:
+            list: Canonical post URLs (at most max_posts), in grid order
+        """
+        xpaths = [s.value for s in get_catalog().strategies('posts.grid') if s.by == By.XPATH]
+        try:
+            hrefs = self.driver.execute_script("""
+                var xpaths = arguments[0];
+                for (var i = 0; i < xpaths.length; i++) {
+                    var links = document.evaluate(xpaths[i], document, null,
+                                                  XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                    var hrefs = [];
+                    for (var j = 0; j < links.snapshotLength; j++) {
+                        var href = links.snapshotItem(j).getAttribute('href');
+                        if (href) hrefs.push(href);
+                    }
+                    if (hrefs.length) return hrefs;
+                }
+                return [];
+            """, xpaths) or []
+        except Exception as e:
+            logger.error("✗ Failed to get posts: %s", e)
+            return []
+        
+        queue = []
+        listed = set()
+        skipped = 0
+        for href in hrefs:
+            shortcode = shortcode_from_href(href)
+            if not shortcode or shortcode in listed:
+                continue
+            listed.add(shortcode)
+            if shortcode in self.seen_posts:
+                skipped += 1
+                continue
+            queue.append(post_url(shortcode))
+            if len(queue) >= max_posts:
+                break
+        
+        logger.info("✓ Found %s new posts (%s already handled)", len(queue), skipped)
+        return queue
+    
+    @timed('open_post')
+    def open_post(self, url):
+        """
+        Open a queued post
+        
+        Clicks the post's grid link when the grid is on screen (looked up
+        fresh by shortcode, so it cannot be stale), otherwise loads the URL.
+        The caller marks the post handled (mark_post_handled) once it is done
+        with it, so a post whose like or comment failed is tried again later.
+        
+        Returns:
+            bool: Whether the post opened
+        """
+        shortcode = shortcode_from_href(url)
+        try:
+            links = self.driver.find_elements(By.XPATH, f"//a[contains(@href, '/p/{shortcode}/')]")
+            if links:
+                self.human.human_click(links[0])
+            else:
+                self.driver.get(url)
+            self.human.random_delay(3, 5)
+        except Exception as e:
+            logger.error("✗ Could not open post %s: %s", shortcode, e)
+            return False
+        return True
+    
+    def mark_post_handled(self, url):
+        """Leave a post out of future queues (get_post_queue)"""
+        shortcode = shortcode_from_href(url)
+        if shortcode:
+            self.seen_posts.add(shortcode)
+    
+    @timed('like')
+    def like_post(self, post_element=None, deadline=None):
+        """
+        Like a post - Uses both JavaScript and Selenium clicks
+        
+        Args:
+            post_element: Post element to click (optional if post already open)
+            deadline: Deadline shared with the other steps on this post
+            
+        Returns:
+            bool: Success status
+        """
         if not self.safety.can_perform_action('like'):
             return False
+        if self.blocks.refuse('like'):
+            logger.warning("🚫 Not liking - actions blocked for %.0f more min", self.blocks.remaining() / 60)
+            return False
         
+        if deadline is None:
+            deadline = Deadline(Config.POST_TIME_BUDGET, label='like', clock=self.clock)
+        
+        clicked = False  # A like click went out but was never confirmed
         try:
             # If post element provided, click it first
             if post_element:
-                print("→ Opening post...")
+                logger.debug("→ Opening post...")
                 self.human.human_click(post_element)
                 self.human.random_delay(4, 6)  # Wait longer for post to fully load
             
-            print("→ Searching for like button...")
+            logger.debug("→ Searching for like button...")
             
             # Strategy 1: JavaScript click (most reliable for Instagram)
             # Like button: Find FIRST span containing SVG with aria-label="Like"
-            js_selectors = [
-                # Best: Find first span with Like SVG (handles duplicates)
-                """(function() {
-                    var section = document.querySelector('article section:first-of-type');
-                    if (!section) return null;
-                    var spans = section.querySelectorAll('span');
-                    for (var i = 0; i < spans.length; i++) {
-                        var svg = spans[i].querySelector('svg[aria-label="Like"]');
-                        if (svg) return spans[i];
-                    }
-                    return null;
-                })()""",
-                # Fallback: First span in section
-                "document.querySelector('article section:first-of-type span:first-child')",
-                "document.querySelector('div[role=\"dialog\"] article section:first-of-type span:first-child')",
-            ]
-            
-            for js_selector in js_selectors:
+            for selector in self._strategies('like.js'):
+                name, js_selector = selector.key, selector.value
+                deadline.check('JavaScript like strategy')
+                started = self.clock.monotonic()
                 try:
                     # Check if element exists and is not already liked
                     js_code = f"""
@@ -315,65 +391,57 @@ class InstagramActions:
                     result = self.driver.execute_script(js_code)
                     
                     if result == 'already_liked':
-                        print("ℹ️  Post already liked, skipping")
+                        self._record_strategy('like.js', name, True, started)
+                        logger.info("ℹ️  Post already liked, skipping")
                         self.close_post_modal()
                         return False
                     
                     if result == 'clicked':
-                        print(f"✓ Like button clicked (JavaScript)")
-                        self.human.random_delay(2, 3)
-                        
-                        # Verify like worked
-                        verify_js = """
-                            var btn = document.querySelector('article button[aria-label="Unlike"]') || 
-                                      document.querySelector('div[role="dialog"] button[aria-label="Unlike"]');
-                            return btn !== null;
-                        """
-                        is_liked = self.driver.execute_script(verify_js)
+                        logger.debug("✓ Like button clicked (JavaScript)")
+                        clicked = True
                         
-                        if is_liked:
-                            print("✓✓✓ LIKE VERIFIED - Button changed to 'Unlike'!")
+                        # Verify like worked (returns as soon as the Unlike button appears)
+                        if self._wait_for_like(deadline):
+                            self._record_strategy('like.js', name, True, started)
+                            logger.debug("✓✓✓ LIKE VERIFIED - Button changed to 'Unlike'!")
+                            self.blocks.record('like', True)
                             self.safety.record_action('like', success=True)
-                            print("❤️  Post liked successfully!")
+                            logger.info("❤️  Post liked successfully!")
                             self.human.random_delay(2, 4)
                             self.close_post_modal()
                             return True
                         else:
-                            print("⚠️  Click executed but verification unclear")
+                            logger.warning("⚠️  Click executed but verification unclear")
                             # Continue to next strategy
                     
+                    self._record_strategy('like.js', name, False, started)
+                    
                 except Exception as e:
+                    self._record_strategy('like.js', name, False, started)
                     continue
             
             # Strategy 2: Selenium click with WebDriverWait (fallback)
-            print("→ Trying Selenium click method...")
+            logger.debug("→ Trying Selenium click method...")
             from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.support import expected_conditions as EC
             
-            selectors = [
-                # User's NEW exact XPath - section[1] span[1] (THIS IS THE ONE!)
-                (By.XPATH, "/html/body/div[7]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/section[1]/span[1]"),
-                # Simplified - section 1, span 1
-                (By.XPATH, "//article//section[1]//span[1]"),
-                (By.XPATH, "//div[@role='dialog']//article//section[1]//span[1]"),
-                (By.XPATH, "//article//section[1]//span[1]//div"),
-                (By.XPATH, "//article//section[1]//span[1]//button"),
-                # CSS versions
-                (By.CSS_SELECTOR, "article section:first-of-type span:first-child"),
-                (By.CSS_SELECTOR, "div[role='dialog'] article section:first-of-type span:first-child"),
-                # Original fallbacks
-                (By.XPATH, "//article//button[@aria-label='Like']"),
-            ]
-            
-            for by, selector in selectors:
+            for strategy in self._strategies('like.selenium'):
+                by, selector = strategy.locator
+                deadline.check('Selenium like strategy')
+                started = self.clock.monotonic()
+                found = False
                 try:
-                    wait = WebDriverWait(self.driver, 5)
+                    wait = WebDriverWait(
+                        self.driver, deadline.timeout(self.selectors.timeout('like.selenium', strategy.key, 5))
+                    )
                     like_button = wait.until(EC.element_to_be_clickable((by, selector)))
+                    found = True
+                    self._record_strategy('like.selenium', strategy.key, True, started)
                     
                     # Check if already liked
                     aria_label = like_button.get_attribute('aria-label')
                     if aria_label and ('Unlike' in aria_label or 'Dislike' in aria_label):
-                        print("ℹ️  Post already liked, skipping")
+                        logger.info("ℹ️  Post already liked, skipping")
                         self.close_post_modal()
                         return False
                     
@@ -383,42 +451,38 @@ class InstagramActions:
                     
                     # Try regular click
                     like_button.click()
-                    print("✓ Like button clicked (Selenium)")
-                    
-                    self.human.random_delay(2, 3)
+                    logger.debug("✓ Like button clicked (Selenium)")
                     
                     # Verify
-                    try:
-                        self.driver.find_element(By.XPATH, "//button[@aria-label='Unlike']")
-                        print("✓✓✓ LIKE VERIFIED!")
+                    if self._wait_for_like(deadline):
+                        logger.debug("✓✓✓ LIKE VERIFIED!")
+                        self.blocks.record('like', True)
                         self.safety.record_action('like', success=True)
-                        print("❤️  Post liked successfully!")
+                        logger.info("❤️  Post liked successfully!")
                         self.human.random_delay(2, 4)
                         self.close_post_modal()
                         return True
-                    except:
-                        # Assume it worked even if we can't verify
-                        self.safety.record_action('like', success=True)
-                        print("❤️  Post liked (assumed)!")
+                    else:
+                        # Not counted: an unconfirmed like is what an action block looks like
+                        logger.warning("⚠️  Like not confirmed - not counted")
+                        self.blocks.record('like', False)
                         self.human.random_delay(2, 4)
                         self.close_post_modal()
-                        return True
+                        return False
                         
                 except Exception as e:
+                    if not found:
+                        self._record_strategy('like.selenium', strategy.key, False, started)
                     continue
             
             # Strategy 3: Double-tap (Instagram native gesture simulation)
-            print("→ Trying double-tap method...")
+            deadline.check('double-tap like')
+            logger.debug("→ Trying double-tap method...")
             try:
                 # Find the post image and double-click it
-                image_selectors = [
-                    "//article//img[@alt]",
-                    "//div[@role='dialog']//img",
-                ]
-                
-                for img_selector in image_selectors:
+                for img_selector in get_catalog().strategies('like.image'):
                     try:
-                        image = self.driver.find_element(By.XPATH, img_selector)
+                        image = self.driver.find_element(*img_selector.locator)
                         # JavaScript double-click
                         self.driver.execute_script("""
                             var img = arguments[0];
@@ -430,19 +494,15 @@ class InstagramActions:
                             img.dispatchEvent(event);
                         """, image)
                         
-                        print("✓ Double-tap executed")
-                        self.human.random_delay(2, 3)
+                        logger.debug("✓ Double-tap executed")
+                        clicked = True
                         
                         # Verify
-                        verify_js = """
-                            return document.querySelector('button[aria-label="Unlike"]') !== null;
-                        """
-                        is_liked = self.driver.execute_script(verify_js)
-                        
-                        if is_liked:
-                            print("✓✓✓ LIKE VERIFIED (double-tap)!")
+                        if self._wait_for_like(deadline):
+                            logger.debug("✓✓✓ LIKE VERIFIED (double-tap)!")
+                            self.blocks.record('like', True)
                             self.safety.record_action('like', success=True)
-                            print("❤️  Post liked successfully!")
+                            logger.info("❤️  Post liked successfully!")
                             self.human.random_delay(2, 4)
                             self.close_post_modal()
                             return True
@@ -453,19 +513,28 @@ class InstagramActions:
             except Exception as e:
                 pass
             
-            print("✗ All like strategies failed")
-            print("   Instagram may have changed their layout or post is already liked")
+            logger.error("✗ All like strategies failed")
+            if clicked:
+                self.blocks.record('like', False)
+            else:
+                logger.error("   Instagram may have changed their layout or post is already liked")
+            self.close_post_modal()
+            return False
+            
+        except DeadlineExceeded as e:
+            logger.warning("⏱️  Giving up on like: %s", e)
             self.close_post_modal()
             return False
             
         except Exception as e:
-            print(f"✗ Failed to like post: {e}")
+            logger.error("✗ Failed to like post: %s", e)
             import traceback
             traceback.print_exc()
             self.close_post_modal()
             return False
     
-    def comment_on_post(self, comment_text=None, post_element=None):
+    @timed('comment')
+    def comment_on_post(self, comment_text=None, post_element=None, deadline=None):
         """
         Comment on a post
         IMPORTANT: Must be called BEFORE like_post() for textarea to remain accessible!
@@ -473,17 +542,25 @@ class InstagramActions:
         Args:
             comment_text: Comment to post (if None and AI enabled, will generate)
             post_element: Post element to click (optional if post already open)
+            deadline: Deadline shared with the other steps on this post
             
         Returns:
             bool: Success status
         """
         if not self.safety.can_perform_action('comment'):
             return False
+        if self.blocks.refuse('comment'):
+            logger.warning("🚫 Not commenting - actions blocked for %.0f more min", self.blocks.remaining() / 60)
+            return False
+        
+        if deadline is None:
+            deadline = Deadline(Config.POST_TIME_BUDGET, label='comment', clock=self.clock)
         
         try:
             # If post element provided, click it first
             max_retries = 3
             for attempt in range(1, max_retries + 1):
+                deadline.check(f'comment attempt {attempt}')
                 try:
                     # If post element provided, click it first
                     if post_element:
@@ -492,12 +569,14 @@ class InstagramActions:
 
                     # Generate AI comment if enabled and no comment provided
                     if comment_text is None and self.use_ai_comments:
-                        print("🤖 Generating AI comment...")
-                        comment_text = self.ai_generator.generate_comment_for_post(self.driver)
+                        logger.info("🤖 Generating AI comment...")
+                        comment_text = self.ai_generator.generate_comment_for_post(
+                            self.driver, deadline=deadline
+                        )
                         if not comment_text:
-                            print("✗ Could not generate comment")
+                            logger.error("✗ Could not generate comment")
                             return False
-                        print(f"✓ Generated: {comment_text}")
+                        logger.info("✓ Generated: %s", comment_text)
                     elif comment_text is None:
                         # Fallback to generic comments (BMP-compatible emojis only)
                         comment_text = random.choice([
@@ -510,121 +589,117 @@ class InstagramActions:
                             "Nice!",
                             "Awesome!",
                         ])
-                        print(f"💬 Using: {comment_text}")
+                        logger.info("💬 Using: %s", comment_text)
 
                     # Wait for page to stabilize
                     self.human.random_delay(3, 5)
 
                     # Find textarea directly - no need to click comment button!
-                    print("→ Finding comment textarea...")
+                    logger.debug("→ Finding comment textarea...")
                     textarea = None
-                    textarea_selectors = [
-                        # Standard post
-                        "//textarea[@aria-label='Add a comment…' and @placeholder='Add a comment…']",
-                        # Sometimes aria-label or placeholder alone
-                        "//textarea[@aria-label='Add a comment…']",
-                        "//textarea[@placeholder='Add a comment…']",
-                        # Reels/Video (Instagram may use different structure)
-                        "//form//textarea",
-                        "//div[contains(@role, 'dialog')]//textarea",
-                        # Fallback: any visible textarea
-                        "//textarea"
-                    ]
-                    for selector in textarea_selectors:
+                    for selector in self._strategies('comment.textarea'):
+                        deadline.check('textarea lookup')
+                        started = self.clock.monotonic()
                         try:
-                            textarea = WebDriverWait(self.driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, selector))
-                            )
+                            textarea = WebDriverWait(
+                                self.driver, deadline.timeout(self.selectors.timeout('comment.textarea', selector.key, 5))
+                            ).until(EC.presence_of_element_located(selector.locator))
                             if textarea.is_displayed():
-                                print(f"✓ Found textarea with selector: {selector}")
+                                self._record_strategy('comment.textarea', selector.key, True, started)
+                                logger.debug("✓ Found textarea with selector: %s", selector.value)
                                 break
+                            self._record_strategy('comment.textarea', selector.key, False, started)
                         except Exception:
+                            self._record_strategy('comment.textarea', selector.key, False, started)
                             continue
                     if not textarea:
-                        print(f"✗ Textarea not found with any selector")
+                        logger.error("✗ Textarea not found with any selector")
                         continue  # Retry
 
-                    # Refind textarea to avoid stale element
-                    print(f"→ Typing comment: '{comment_text}'")
+                    # Refind textarea (with the locator that just matched) to avoid stale element
+                    logger.debug("→ Typing comment: '%s'", comment_text)
                     try:
-                        textarea = WebDriverWait(self.driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, "//textarea[@aria-label='Add a comment…' and @placeholder='Add a comment…']"))
+                        textarea = WebDriverWait(self.driver, deadline.timeout(5)).until(
+                            EC.presence_of_element_located(selector.locator)
                         )
                         textarea.send_keys(comment_text)
                         # Send a space and backspace to trigger Post button enable
                         from selenium.webdriver.common.keys import Keys
                         textarea.send_keys(" " + Keys.BACKSPACE)
                     except Exception as e:
-                        print(f"✗ Could not type: {e}")
+                        logger.warning("✗ Could not type: %s", e)
                         continue  # Retry
 
                     # Verify it typed
+                    placeholder = get_catalog().text('comment.placeholder', 'Add a comment…')
                     verify_result = self.driver.execute_script("""
-                        var textarea = document.querySelector("textarea[aria-label='Add a comment…']");
+                        var textarea = document.querySelector('textarea[aria-label="' + arguments[0] + '"]');
                         return {value: textarea ? textarea.value : ''};
-                    """)
-                    print(f"✓ Typed: '{verify_result.get('value', '')}'")
+                    """, placeholder)
+                    logger.debug("✓ Typed: '%s'", verify_result.get('value', ''))
 
                     # Wait before submitting to ensure Post button is enabled
                     self.human.random_delay(2, 3)
 
                     # Submit by clicking Post button
-                    print(f"→ Submitting comment...")
+                    deadline.check('comment submit')
+                    logger.debug("→ Submitting comment...")
                     self.human.random_delay(1, 2)
 
-                    submit_result = self.driver.execute_script("""
-                        // Find Post button
-                        var buttons = Array.from(document.querySelectorAll('div[role="button"]'));
-                        var postBtn = buttons.find(btn => btn.innerText.trim() === 'Post');
+                    with self.timings.span('comment.submit'):
+                        submit_result = self.driver.execute_script("""
+                            // Find Post button (label from the selector catalog)
+                            var label = arguments[0];
+                            var buttons = Array.from(document.querySelectorAll('div[role="button"]'));
+                            var postBtn = buttons.find(btn => btn.innerText.trim() === label);
 
-                        if (postBtn && !postBtn.disabled) {
-                            postBtn.click();
-                            return {success: true, method: 'Post button (div)'};
-                        }
+                            if (postBtn && !postBtn.disabled) {
+                                postBtn.click();
+                                return {success: true, method: 'Post button (div)'};
+                            }
 
-                        // Try button element
-                        buttons = Array.from(document.querySelectorAll('button'));
-                        postBtn = buttons.find(btn => btn.innerText.trim() === 'Post');
+                            // Try button element
+                            buttons = Array.from(document.querySelectorAll('button'));
+                            postBtn = buttons.find(btn => btn.innerText.trim() === label);
 
-                        if (postBtn && !postBtn.disabled) {
-                            postBtn.click();
-                            return {success: true, method: 'Post button (button)'};
-                        }
+                            if (postBtn && !postBtn.disabled) {
+                                postBtn.click();
+                                return {success: true, method: 'Post button (button)'};
+                            }
 
-                        return {success: false, error: 'Post button not found or disabled'};
-                    """)
+                            return {success: false, error: 'Post button not found or disabled'};
+                        """, get_catalog().text('comment.post_button', 'Post'))
 
                     if not submit_result.get('success'):
-                        print(f"✗ {submit_result.get('error', 'Could not submit')}")
+                        logger.warning("✗ %s", submit_result.get('error', 'Could not submit'))
                         continue  # Retry
 
-                    print(f"✓ Submitted via {submit_result.get('method')}")
+                    logger.debug("✓ Submitted via %s", submit_result.get('method'))
 
-                    # Wait longer and verify comment is posted before closing modal
-                    import time
-                    max_wait = 10  # seconds
-                    interval = 1
-                    comment_posted = False
-                    for _ in range(int(max_wait / interval)):
-                        self.human.random_delay(interval, interval)
-                        verify_submit = self.driver.execute_script("""
-                            var textarea = document.querySelector('textarea[aria-label="Add a comment…"]');
-                            return {isEmpty: textarea ? textarea.value === '' : false};
-                        """)
-                        if verify_submit.get('isEmpty'):
-                            comment_posted = True
-                            break
+                    # Verify the comment posted (textarea cleared) before closing the modal.
+                    # Returns on the DOM change, bounded by what is left of the post's
+                    # budget; it waits on the page, so it is not a deliberate delay.
+                    with self.timings.span('comment.verify'):
+                        comment_posted = self.dom.until(
+                            TEXTAREA_CLEARED, deadline.timeout(Config.DOM_WAIT_TIMEOUT, floor=1), placeholder
+                        )
                     if comment_posted:
-                        print(f"✓ Comment posted successfully!")
+                        logger.info("✓ Comment posted successfully!")
+                        self.blocks.record('comment', True)
                         self.safety.record_action('comment', success=True)
                         return True
                     else:
-                        print(f"⚠️  Comment may not have posted (textarea not cleared after waiting)")
+                        logger.warning("⚠️  Comment may not have posted (textarea not cleared after waiting)")
+                        self.blocks.record('comment', False)
+                        if self.blocks.is_blocked():
+                            return False  # Retrying into a block only burns the post's budget
                         continue  # Retry
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
-                    print(f"✗ Comment failed: {e}")
+                    logger.warning("✗ Comment failed: %s", e)
                     continue  # Retry
-            print(f"✗ All comment attempts failed after {max_retries} retries.")
+            logger.error("✗ All comment attempts failed after %s retries.", max_retries)
             return False
             # Wait longer and verify comment is posted before closing modal
             import time
@@ -641,15 +716,19 @@ class InstagramActions:
                     comment_posted = True
                     break
             if comment_posted:
-                print(f"✓ Comment posted successfully!")
+                logger.info("✓ Comment posted successfully!")
                 self.safety.record_action('comment', success=True)
                 return True
             else:
-                print(f"⚠️  Comment may not have posted (textarea not cleared after waiting)")
+                logger.warning("⚠️  Comment may not have posted (textarea not cleared after waiting)")
                 return False
                 
+        except DeadlineExceeded as e:
+            logger.warning("⏱️  Giving up on comment: %s", e)
+            return False
+                
         except Exception as e:
-            print(f"✗ Comment failed: {e}")
+            logger.error("✗ Comment failed: %s", e)
             return False
     
     def comment_on_post_OLD_BROKEN(self, comment_text=None, post_element=None):
@@ -675,14 +754,14 @@ class InstagramActions:
             
             # Generate AI comment if enabled and no comment provided
             if comment_text is None and self.use_ai_comments:
-                print("🤖 Generating AI comment...")
+                logger.info("🤖 Generating AI comment...")
                 comment_text = self.ai_generator.generate_comment_for_post(self.driver)
                 
                 if not comment_text:
-                    print("✗ Could not generate comment")
+                    logger.error("✗ Could not generate comment")
                     return False
                 
-                print(f"✓ Generated: {comment_text}")
+                logger.info("✓ Generated: %s", comment_text)
             elif comment_text is None:
                 # Fallback to generic comments
                 comment_text = random.choice([
@@ -691,10 +770,10 @@ class InstagramActions:
                     "Beautiful! 😍",
                     "So good! 🔥",
                 ])
-                print(f"💬 Using: {comment_text}")
+                logger.info("💬 Using: %s", comment_text)
             
             # Find and click comment button - use SVG aria-label="Comment"
-            print("→ Finding comment button...")
+            logger.debug("→ Finding comment button...")
             
             comment_button = None
             
@@ -715,18 +794,18 @@ class InstagramActions:
                 """
                 
                 if self.driver.execute_script(comment_button_js):
-                    print(f"✓ Found comment button via SVG Comment label")
+                    logger.debug("✓ Found comment button via SVG Comment label")
                     # We'll click it with JavaScript in the next step
                 else:
-                    print("✗ Could not find comment button with SVG Comment label")
+                    logger.warning("✗ Could not find comment button with SVG Comment label")
                     return False
                     
             except Exception as e:
-                print(f"✗ Error finding comment button: {e}")
+                logger.warning("✗ Error finding comment button: %s", e)
                 return False
             
             # Click the button to open comment field using MULTIPLE strategies
-            print("→ Clicking comment button...")
+            logger.debug("→ Clicking comment button...")
             
             # Strategy 1: JavaScript with MouseEvent
             try:
@@ -759,12 +838,12 @@ class InstagramActions:
                 
                 result = self.driver.execute_script(click_js)
                 if result.get('success'):
-                    print(f"✓ Comment button clicked (method: {result.get('method')})")
+                    logger.debug("✓ Comment button clicked (method: %s)", result.get('method'))
                     self.human.random_delay(2, 3)
                 else:
-                    print(f"⚠️  JS click failed: {result.get('error')}, trying Selenium...")
+                    logger.warning("⚠️  JS click failed: %s, trying Selenium...", result.get('error'))
             except Exception as e:
-                print(f"⚠️  JS click error: {e}, trying Selenium...")
+                logger.warning("⚠️  JS click error: %s, trying Selenium...", e)
             
             # Strategy 2: Selenium click on the SVG's parent using ActionChains
             try:
@@ -779,21 +858,21 @@ class InstagramActions:
                 actions = ActionChains(self.driver)
                 actions.move_to_element(parent).click().perform()
                 
-                print(f"✓ Comment button clicked (ActionChains)")
+                logger.debug("✓ Comment button clicked (ActionChains)")
                 self.human.random_delay(2, 3)
                 
             except Exception as e:
-                print(f"⚠️  ActionChains failed: {e}, trying direct click...")
+                logger.warning("⚠️  ActionChains failed: %s, trying direct click...", e)
                 
                 # Strategy 3: Direct Selenium click on parent
                 try:
                     svg_element = self.driver.find_element(By.CSS_SELECTOR, 'article svg[aria-label="Comment"]')
                     parent = self.driver.execute_script("return arguments[0].parentElement.parentElement;", svg_element)
                     parent.click()
-                    print(f"✓ Comment button clicked (direct parent click)")
+                    logger.debug("✓ Comment button clicked (direct parent click)")
                     self.human.random_delay(2, 3)
                 except Exception as e2:
-                    print(f"✗ All click strategies failed: {e2}")
+                    logger.error("✗ All click strategies failed: %s", e2)
                     return False
             
             # Now find the textarea that appears
@@ -808,13 +887,13 @@ class InstagramActions:
             for selector in textarea_selectors:
                 try:
                     comment_area = self.driver.find_element(By.XPATH, selector)
-                    print(f"✓ Found textarea: {selector[:60]}...")
+                    logger.debug("✓ Found textarea: %s...", selector[:60])
                     break
                 except:
                     continue
             
             if not comment_area:
-                print(f"✗ Textarea did not appear after clicking comment button")
+                logger.error("✗ Textarea did not appear after clicking comment button")
                 return False
             
             # Click textarea to focus
@@ -826,12 +905,12 @@ class InstagramActions:
                 pass
             
             # Re-find textarea right before typing (it might have been re-rendered)
-            print(f"→ Re-finding textarea before typing...")
+            logger.debug("→ Re-finding textarea before typing...")
             try:
                 comment_area = WebDriverWait(self.driver, 5).until(
                     EC.presence_of_element_located((By.XPATH, "//textarea[@placeholder='Add a comment…']"))
                 )
-                print(f"✓ Textarea re-located")
+                logger.debug("✓ Textarea re-located")
             except:
                 # Try other selectors
                 for selector in textarea_selectors:
@@ -842,7 +921,7 @@ class InstagramActions:
                         continue
             
             # Type comment - use comprehensive JavaScript that mimics real typing
-            print(f"→ Typing comment...")
+            logger.debug("→ Typing comment...")
             try:
                 # Method 1: JavaScript with multiple events (best for Instagram)
                 type_js = """
@@ -877,12 +956,12 @@ class InstagramActions:
                 success = self.driver.execute_script(type_js, comment_area, comment_text)
                 
                 if success:
-                    print(f"✓ Comment typed: '{comment_text[:50]}...'")
+                    logger.debug("✓ Comment typed: '%s...'", comment_text[:50])
                 else:
-                    print(f"⚠️  Text set but verification unclear")
+                    logger.warning("⚠️  Text set but verification unclear")
                 
             except Exception as e:
-                print(f"⚠️  JavaScript typing failed: {e}")
+                logger.warning("⚠️  JavaScript typing failed: %s", e)
                 # Fallback: Try send_keys character by character (slow but reliable)
                 try:
                     comment_area.clear()
@@ -897,9 +976,9 @@ class InstagramActions:
                         comment_area.send_keys(char)
                         self.human.random_delay(0.05, 0.1)
                     
-                    print(f"✓ Comment typed (character-by-character fallback)")
+                    logger.debug("✓ Comment typed (character-by-character fallback)")
                 except Exception as e2:
-                    print(f"✗ Failed to type comment: {e2}")
+                    logger.error("✗ Failed to type comment: %s", e2)
                     return False
             
             self.human.random_delay(1, 2)
@@ -908,14 +987,14 @@ class InstagramActions:
             try:
                 current_value = comment_area.get_attribute('value')
                 if current_value and len(current_value) > 0:
-                    print(f"✓ Verified: Textarea contains {len(current_value)} characters")
+                    logger.debug("✓ Verified: Textarea contains %s characters", len(current_value))
                 else:
-                    print(f"⚠️  Warning: Textarea appears empty!")
+                    logger.warning("⚠️  Warning: Textarea appears empty!")
             except:
                 pass
             
             # Post comment - try multiple methods
-            print(f"→ Finding Post button...")
+            logger.debug("→ Finding Post button...")
             
             # Method 1: Try to find Post button near the textarea
             post_button = None
@@ -936,38 +1015,38 @@ class InstagramActions:
                     if buttons:
                         # Get the last one (usually the Post button for comments)
                         post_button = buttons[-1]
-                        print(f"✓ Found Post button: {selector[:50]}...")
+                        logger.debug("✓ Found Post button: %s...", selector[:50])
                         break
                 except:
                     continue
             
             if not post_button:
-                print(f"⚠️  Could not find Post button, trying Enter key instead...")
+                logger.warning("⚠️  Could not find Post button, trying Enter key instead...")
                 # Fallback: Press Enter in textarea
                 try:
                     comment_area.send_keys('\n')
-                    print(f"✓ Pressed Enter to post")
+                    logger.debug("✓ Pressed Enter to post")
                 except:
-                    print(f"✗ Could not post comment")
+                    logger.error("✗ Could not post comment")
                     return False
             else:
                 # Click Post button
-                print(f"→ Clicking Post button...")
+                logger.debug("→ Clicking Post button...")
                 try:
                     # Try JavaScript click first
                     self.driver.execute_script("arguments[0].click();", post_button)
-                    print(f"✓ Post button clicked (JavaScript)")
+                    logger.debug("✓ Post button clicked (JavaScript)")
                 except:
                     try:
                         self.human.human_click(post_button)
-                        print(f"✓ Post button clicked (Selenium)")
+                        logger.debug("✓ Post button clicked (Selenium)")
                     except Exception as e:
-                        print(f"✗ Failed to click Post button: {e}")
+                        logger.error("✗ Failed to click Post button: %s", e)
                         return False
             
             # Record action
             self.safety.record_action('comment', success=True)
-            print(f"💬 Commented: {comment_text}")
+            logger.info("💬 Commented: %s", comment_text)
             
             # Random delay
             self.human.random_delay(3, 6)
@@ -978,12 +1057,28 @@ class InstagramActions:
             return True
             
         except Exception as e:
-            print(f"✗ Failed to comment: {e}")
+            logger.error("✗ Failed to comment: %s", e)
             self.close_post_modal()
             return False
     
+    def _wait_for_like(self, deadline):
+        """Wait for the like button to turn into 'Unlike'"""
+        liked = ', '.join(s.value for s in get_catalog().strategies('like.liked'))
+        with self.timings.span('like.verify'):
+            return self.dom.until(LIKED, deadline.timeout(Config.LIKE_VERIFY_TIMEOUT, floor=1), liked)
+    
+    def _strategies(self, group):
+        """Catalog locators of a group, the ones working lately first"""
+        return self.selectors.order(group, get_catalog().strategies(group), key=lambda s: s.key)
+    
+    def _record_strategy(self, group, key, hit, started):
+        """Report a locator strategy's outcome to the selector registry"""
+        self.selectors.record(group, key, hit, self.clock.monotonic() - started)
+    
     def close_post_modal(self):
         """Close post modal/overlay"""
+        # Done with the post: one stats write for all its lookups
+        self.selectors.flush()
         try:
             # Press ESC key or click close button
             self.driver.find_element(By.TAG_NAME, 'body').send_keys('\ue00c')  # ESC key
@@ -993,31 +1088,36 @@ class InstagramActions:
     
     def like_posts_by_hashtag(self, hashtag, amount=5):
         """Like multiple posts from a hashtag"""
-        print(f"\n🎯 Starting to like {amount} posts from #{hashtag}")
+        logger.info("\n🎯 Starting to like %s posts from #%s", amount, hashtag)
         
         if not self.search_hashtag(hashtag):
             return 0
         
-        posts = self.get_posts_from_page(max_posts=amount * 2)  # Get extra posts
+        queue = self.get_post_queue(max_posts=amount * 2)  # Get extra posts
         
-        if not posts:
-            print("✗ No posts found")
+        if not queue:
+            logger.error("✗ No new posts found")
             return 0
         
         liked_count = 0
         
-        for i, post in enumerate(posts):
+        for i, url in enumerate(queue):
             if liked_count >= amount:
                 break
             
             if not self.safety.can_perform_action('like'):
-                print("⚠️  Safety limits reached, stopping")
+                logger.warning("⚠️  Safety limits reached, stopping")
+                break
+            if self.blocks.is_blocked():
+                logger.warning("🚫 Actions blocked, stopping")
                 break
             
-            print(f"\n📸 Processing post {i+1}/{len(posts)}")
+            logger.info("\n📸 Processing post %s/%s", i + 1, len(queue))
             
-            if self.like_post(post):
+            if self.open_post(url) and self.like_post():
                 liked_count += 1
+                self.mark_post_handled(url)
+            self.selectors.flush()
             
             # Take break if needed
             if self.human.should_take_break(liked_count):
@@ -1025,5 +1125,5 @@ class InstagramActions:
             else:
                 self.human.random_delay()
         
-        print(f"\n✓ Liked {liked_count} posts from #{hashtag}")
+        logger.info("\n✓ Liked %s posts from #%s", liked_count, hashtag)
         return liked_count
@@ -2,7 +2,10 @@
 AI-Powered Comment Generation
 Uses vision AI to analyze images and generate natural, contextual comments
 """
+import logging
 import os
+import re
+import json
 import base64
 import requests
 from io import BytesIO
@@ -10,22 +13,66 @@ from PIL import Image
 import random
 from selenium.webdriver.common.by import By
 from .config import Config
+from .vision_backends import VisionBackendChain
+from .deadline import Deadline, DeadlineExceeded
+from .quota import QuotaTracker
+from .clock import SYSTEM_CLOCK
+from .timing import timed
+from .selector_catalog import get_catalog
+
+logger = logging.getLogger(__name__)
 
 
 class AICommentGenerator:
     """Generate human-like comments based on image content"""
     
-    def __init__(self, model='gemini'):
+    GEMINI_SINGLE_PROMPT = """Analyze this Instagram image and respond in JSON format:
+{
+  "description": "brief 1-sentence description",
+  "mood": "positive/inspiring/peaceful/energetic/etc",
+  "subjects": ["main", "subject", "list"],
+  "category": "travel/nature/food/fitness/fashion/pets/art/lifestyle",
+  "appropriate": true
+}
+
+Only respond with valid JSON, nothing else."""
+    
+    CAROUSEL_PROMPT = """These {count} images are the slides of ONE Instagram carousel post.
+Analyze them together and respond with a single merged analysis in JSON format:
+{{
+  "description": "brief 1-sentence description of the whole set",
+  "mood": "positive/inspiring/peaceful/energetic/etc",
+  "subjects": ["main", "subjects", "across", "all", "slides"],
+  "category": "travel/nature/food/fitness/fashion/pets/art/lifestyle",
+  "appropriate": true
+}}
+
+Pick the one category that fits the set best. Only respond with valid JSON, nothing else."""
+    
+    def __init__(self, model='gemini', clock=None, timings=None):
         """
         Initialize AI comment generator
         
         Args:
-            model: 'gemini' (Google Gemini - FREE!), 'openai' (GPT-4 Vision), or 'local' (BLIP)
+            model: 'gemini' (Google Gemini - FREE!), 'openai' (GPT-4 Vision), or
+                   'local' (offline alt-text classifier). Tried first; the rest of
+                   Config.VISION_BACKENDS follows as fallback.
+            clock: Clock for carousel pauses and deadlines (default: real time)
+            timings: Timings to record analysis spans in (optional)
         """
         self.model = model
+        self.clock = clock or SYSTEM_CLOCK
+        self.timings = timings
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         
+        # Free tier is 1,500 requests/day - count them so we stop asking once it is gone
+        self.gemini_quota = QuotaTracker('gemini', Config.GEMINI_DAILY_QUOTA, clock=self.clock)
+        
+        # Fallback chain: requested model first, then the configured order
+        backend_order = [model] + [name for name in Config.VISION_BACKENDS if name != model]
+        self.vision = VisionBackendChain(self, order=backend_order)
+        
         # Comment templates for different scenarios
         self.comment_styles = [
             'enthusiastic',  # "Wow! This is amazing!"
@@ -47,13 +94,14 @@ class AICommentGenerator:
             'general': ['❤️', '✨', '🔥', '👍', '😍', '🙌', '💯']
         }
     
-    def analyze_image_with_openai(self, image_url):
+    def analyze_image_with_openai(self, image_url, timeout=30):
         """
         Analyze image using OpenAI GPT-4 Vision
         
         Args:
             image_url: URL of the Instagram image
-            
+            timeout: Request timeout in seconds
+        
         Returns:
             dict: {
                 'description': 'what the image shows',
@@ -108,10 +156,10 @@ Format as JSON:
         
         try:
             response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+                f"{Config.OPENAI_API_BASE}/v1/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=timeout
             )
             response.raise_for_status()
             
@@ -119,96 +167,198 @@ Format as JSON:
             content = result['choices'][0]['message']['content']
             
             # Parse JSON response
-            import json
             analysis = json.loads(content)
             return analysis
+        
+        except Exception as e:
+            logger.warning("OpenAI API error: %s", e)
+            return None
+    
+    def analyze_images_with_openai(self, image_urls, timeout=30):
+        """
+        Analyze all frames of a carousel in a single OpenAI request
+        
+        Args:
+            image_urls: List of image URLs (carousel frames)
+            timeout: Request timeout in seconds
+        
+        Returns:
+            dict: Merged analysis results
+        """
+        if not self.openai_api_key:
+            raise ValueError("OPENAI_API_KEY not set in .env file")
+        
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.openai_api_key}"
+        }
+        
+        content = [{
+            "type": "text",
+            "text": self.CAROUSEL_PROMPT.format(count=len(image_urls))
+        }]
+        for image_url in image_urls:
+            content.append({"type": "image_url", "image_url": {"url": image_url}})
+        
+        payload = {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": 300
+        }
+        
+        try:
+            response = requests.post(
+                f"{Config.OPENAI_API_BASE}/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=timeout
+            )
+            response.raise_for_status()
             
+            result = response.json()
+            text = result['choices'][0]['message']['content']
+            return self._merge_carousel_analysis(self._parse_analysis_text(text))
+        
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            logger.warning("OpenAI API error: %s", e)
             return None
     
-    def analyze_image_with_gemini(self, image_url):
+    def analyze_image_with_gemini(self, image_url, timeout=30):
         """
         Analyze image using Google Gemini Vision (FREE tier available!)
         
         Args:
             image_url: URL of the Instagram image
-            
+            timeout: Request timeout in seconds
+        
         Returns:
             dict: Analysis results
         """
+        return self._analyze_with_gemini([image_url], self.GEMINI_SINGLE_PROMPT, timeout)
+    
+    def analyze_images_with_gemini(self, image_urls, timeout=30):
+        """
+        Analyze all frames of a carousel in a single Gemini request
+        
+        Every frame is sent as its own inline_data part so the model sees the
+        whole set at once and returns one merged analysis.
+        
+        Args:
+            image_urls: List of image URLs (carousel frames)
+            timeout: Request timeout in seconds
+        
+        Returns:
+            dict: Merged analysis results
+        """
+        prompt = self.CAROUSEL_PROMPT.format(count=len(image_urls))
+        analysis = self._analyze_with_gemini(image_urls, prompt, timeout)
+        return self._merge_carousel_analysis(analysis)
+    
+    def _analyze_with_gemini(self, image_urls, prompt, timeout=30):
+        """Send one generateContent request with one inline_data part per image"""
         if not self.gemini_api_key:
             raise ValueError("GEMINI_API_KEY not set in .env file")
         
+        if not self.gemini_quota.can_request():
+            logger.warning("⚠️  Gemini quota for today/this run used up, skipping request")
+            return None
+        
         # Gemini 2.5 Flash is fast and free!
         # Using v1beta for vision models
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.gemini_api_key}"
+        url = f"{Config.GEMINI_API_BASE}/v1beta/models/gemini-2.5-flash:generateContent?key={self.gemini_api_key}"
         
         try:
-            # Download and encode image
-            img_response = requests.get(image_url, timeout=10)
-            img_response.raise_for_status()
-            img_data = base64.b64encode(img_response.content).decode('utf-8')
-            
-            # Determine mime type
-            content_type = img_response.headers.get('content-type', 'image/jpeg')
+            parts = [{"text": prompt}]
+            for image_url in image_urls:
+                parts.append(self._download_inline_image(image_url, min(10, timeout)))
             
             payload = {
                 "contents": [{
-                    "parts": [
-                        {
-                            "text": """Analyze this Instagram image and respond in JSON format:
-{
-  "description": "brief 1-sentence description",
-  "mood": "positive/inspiring/peaceful/energetic/etc",
-  "subjects": ["main", "subject", "list"],
-  "category": "travel/nature/food/fitness/fashion/pets/art/lifestyle",
-  "appropriate": true
-}
-
-Only respond with valid JSON, nothing else."""
-                        },
-                        {
-                            "inline_data": {
-                                "mime_type": content_type,
-                                "data": img_data
-                            }
-                        }
-                    ]
+                    "parts": parts
                 }]
             }
             
-            response = requests.post(url, json=payload, timeout=30)
+            try:
+                response = requests.post(url, json=payload, timeout=timeout)
+            finally:
+                # Timeouts and error answers use quota too
+                self.gemini_quota.record_request()
+            if response.status_code == 429:
+                self.gemini_quota.mark_exhausted()
             response.raise_for_status()
             result = response.json()
+            self.gemini_quota.record_tokens(
+                result.get('usageMetadata', {}).get('totalTokenCount', 0)
+            )
             
             # Parse Gemini response
             text = result['candidates'][0]['content']['parts'][0]['text']
-            
-            # Try to parse as JSON
-            import json
-            import re
-            
-            # Extract JSON from response (sometimes has markdown formatting)
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                # Fallback parsing if JSON not found
-                analysis = {
-                    'description': text[:100],
-                    'mood': 'positive',
-                    'subjects': self._extract_keywords(text),
-                    'category': self._detect_category(text),
-                    'appropriate': 'nsfw' not in text.lower() and 'inappropriate' not in text.lower()
-                }
-            
-            return analysis
-            
+            return self._parse_analysis_text(text)
+        
         except Exception as e:
-            print(f"Gemini API error: {e}")
+            logger.warning("Gemini API error: %s", e)
             return None
     
+    def _download_inline_image(self, image_url, timeout=10):
+        """Download an image and wrap it as a Gemini inline_data part"""
+        img_response = requests.get(image_url, timeout=timeout)
+        img_response.raise_for_status()
+        img_data = base64.b64encode(img_response.content).decode('utf-8')
+        
+        # Determine mime type
+        content_type = img_response.headers.get('content-type', 'image/jpeg')
+        
+        return {
+            "inline_data": {
+                "mime_type": content_type,
+                "data": img_data
+            }
+        }
+    
+    def _parse_analysis_text(self, text):
+        """Parse the model's text reply into an analysis dict"""
+        # Extract JSON from response (sometimes has markdown formatting)
+        json_match = re.search(r'\{.*\}', text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        
+        # Fallback parsing if JSON not found
+        return {
+            'description': text[:100],
+            'mood': 'positive',
+            'subjects': self._extract_keywords(text),
+            'category': self._detect_category(text),
+            'appropriate': 'nsfw' not in text.lower() and 'inappropriate' not in text.lower()
+        }
+    
+    def _merge_carousel_analysis(self, analysis):
+        """
+        Normalize a carousel analysis into a single subjects list and category
+        
+        The model is asked for merged output, but it sometimes returns
+        per-frame lists or an unknown category, so clean that up here.
+        """
+        if not analysis:
+            return analysis
+        
+        subjects = []
+        for subject in analysis.get('subjects', []):
+            items = subject if isinstance(subject, list) else [subject]
+            for item in items:
+                item = str(item).strip().lower()
+                if item and item not in subjects:
+                    subjects.append(item)
+        analysis['subjects'] = subjects[:5]
+        
+        category = str(analysis.get('category', '')).strip().lower()
+        if category not in self.emojis and category != 'lifestyle':
+            category = self._detect_category(
+                f"{category} {analysis.get('description', '')} {' '.join(subjects)}"
+            )
+        analysis['category'] = category
+        
+        return analysis
+    
     def _extract_keywords(self, text):
         """Extract potential subjects from text"""
         keywords = []
@@ -246,7 +396,7 @@ Only respond with valid JSON, nothing else."""
         Args:
             analysis: dict from analyze_image_*
             style: Comment style (or random if None)
-            
+        
         Returns:
             str: Generated comment
         """
@@ -387,38 +537,26 @@ Only respond with valid JSON, nothing else."""
             str: 'image', 'video', 'carousel', or 'unknown'
         """
         try:
-            # Check for video/reel indicators
-            video_indicators = [
-                "//video",
-                "//article//div[contains(@class, 'reel')]",
-                "//*[@aria-label='Reel']",
-                "//*[contains(text(), 'Reels')]"
-            ]
+            # One lookup per type: the catalog joins each indicator list into a union XPath
+            catalog = get_catalog()
             
-            for indicator in video_indicators:
-                try:
-                    if driver.find_elements(By.XPATH, indicator):
-                        return 'video'
-                except:
-                    pass
+            # Check for video/reel indicators
+            try:
+                if driver.find_elements(By.XPATH, catalog.union('post.video')):
+                    return 'video'
+            except:
+                pass
             
             # Check for carousel (multiple images)
-            carousel_indicators = [
-                "//button[@aria-label='Next']",
-                "//button[@aria-label='Go to next slide']",
-                "//div[@role='button'][contains(@aria-label, 'page')]"
-            ]
-            
-            for indicator in carousel_indicators:
-                try:
-                    if driver.find_elements(By.XPATH, indicator):
-                        return 'carousel'
-                except:
-                    pass
+            try:
+                if driver.find_elements(By.XPATH, catalog.union('post.carousel')):
+                    return 'carousel'
+            except:
+                pass
             
             # Default to image
             return 'image'
-            
+        
         except:
             return 'unknown'
     
@@ -435,104 +573,147 @@ Only respond with valid JSON, nothing else."""
             for video in video_elements:
                 poster = video.get_attribute('poster')
                 if poster and 'scontent' in poster:
-                    print(f"✓ Found video thumbnail: {poster[:80]}...")
+                    logger.debug("✓ Found video thumbnail: %s...", poster[:80])
                     return poster
             
             # Fallback: Find any image (videos often have thumbnail overlay)
             return self.get_image_url_from_post(driver)
-            
+        
         except Exception as e:
-            print(f"→ Video thumbnail extraction failed, trying image fallback")
+            logger.debug("→ Video thumbnail extraction failed, trying image fallback")
             return self.get_image_url_from_post(driver)
     
     def get_carousel_images(self, driver, max_images=3):
         """
         Extract multiple images from carousel post
         
+        Instagram renders the neighbouring slides of a carousel as <li><img>
+        items up front, so all sources are read in one script call. Clicking
+        through with the Next button is only used when the DOM does not
+        already contain more than one slide.
+        
         Args:
             driver: Selenium WebDriver
             max_images: Maximum number of images to extract
-            
+        
         Returns:
             list: List of image URLs
         """
         images = []
         
         try:
-            # Get first image
-            first_img = self.get_image_url_from_post(driver)
-            if first_img:
-                images.append(first_img)
-                print(f"✓ Carousel image 1: {first_img[:60]}...")
-            
-            # Try to navigate to next images
-            for i in range(max_images - 1):
-                try:
-                    # Find and click next button
-                    next_button = driver.find_element(By.XPATH, "//button[@aria-label='Next']")
-                    next_button.click()
-                    
-                    # Wait for new image to load
-                    import time
-                    time.sleep(1)
-                    
-                    # Get next image
-                    next_img = self.get_image_url_from_post(driver)
-                    if next_img and next_img not in images:
-                        images.append(next_img)
-                        print(f"✓ Carousel image {len(images)}: {next_img[:60]}...")
-                    else:
-                        break  # No more unique images
-                        
-                except:
-                    break  # No more images or button not found
-            
-            # Navigate back to first image
-            try:
-                prev_buttons = driver.find_elements(By.XPATH, "//button[@aria-label='Go back']")
-                for _ in range(len(images) - 1):
-                    if prev_buttons:
-                        prev_buttons[0].click()
-                        import time
-                        time.sleep(0.5)
-            except:
-                pass
-            
-            return images
+            images = self.get_carousel_image_urls_from_dom(driver, max_images)
+            if len(images) > 1:
+                for i, img in enumerate(images, 1):
+                    logger.debug("✓ Carousel image %s: %s...", i, img[:60])
+                return images
             
+            return self._step_through_carousel(driver, max_images)
+        
         except Exception as e:
-            print(f"→ Carousel extraction error: {e}")
+            logger.debug("→ Carousel extraction error: %s", e)
             return images if images else None
     
+    def get_carousel_image_urls_from_dom(self, driver, max_images=3):
+        """
+        Read every slide <img> source already present in the carousel DOM
+        
+        Only the slide list is read: comment avatars are `ul li img` from the
+        same CDN. The list is the `ul` inside div[role=presentation], or else
+        the one next to the carousel's Next button.
+        
+        Args:
+            driver: Selenium WebDriver
+            max_images: Maximum number of images to return
+        
+        Returns:
+            list: Unique content image URLs in slide order
+        """
+        urls = driver.execute_script("""
+            var root = document.querySelector('div[role="dialog"] article') ||
+                       document.querySelector('article');
+            if (!root) return [];
+            var list = root.querySelector('div[role="presentation"] ul');
+            var next = root.querySelector('button[aria-label="Next"]');
+            for (var node = next && next.parentElement; !list && node && node !== root; node = node.parentElement) {
+                list = node.querySelector('ul');
+            }
+            if (!list) return [];
+            var imgs = list.querySelectorAll('li img');
+            var out = [];
+            for (var i = 0; i < imgs.length; i++) {
+                var src = imgs[i].currentSrc || imgs[i].src;
+                if (src) out.push(src);
+            }
+            return out;
+        """) or []
+        
+        images = []
+        for url in urls:
+            if 'scontent' in url and len(url) > 50 and url not in images:
+                images.append(url)
+            if len(images) >= max_images:
+                break
+        return images
+    
+    def _step_through_carousel(self, driver, max_images):
+        """Fallback: click through the carousel one slide at a time"""
+        images = []
+        
+        # Get first image
+        first_img = self.get_image_url_from_post(driver)
+        if first_img:
+            images.append(first_img)
+            logger.debug("✓ Carousel image 1: %s...", first_img[:60])
+        
+        # Try to navigate to next images
+        for i in range(max_images - 1):
+            try:
+                # Find and click next button
+                next_button = driver.find_element(*get_catalog().strategies('carousel.next')[0].locator)
+                next_button.click()
+                
+                # Wait for new image to load
+                self.clock.sleep(1)
+                
+                # Get next image
+                next_img = self.get_image_url_from_post(driver)
+                if next_img and next_img not in images:
+                    images.append(next_img)
+                    logger.debug("✓ Carousel image %s: %s...", len(images), next_img[:60])
+                else:
+                    break  # No more unique images
+            
+            except:
+                break  # No more images or button not found
+        
+        # Navigate back to first image
+        try:
+            prev_buttons = driver.find_elements(*get_catalog().strategies('carousel.back')[0].locator)
+            for _ in range(len(images) - 1):
+                if prev_buttons:
+                    prev_buttons[0].click()
+                    self.clock.sleep(0.5)
+        except:
+            pass
+        
+        return images
+    
     def get_image_url_from_post(self, driver):
         """
         Extract image URL from current Instagram post
         
         Args:
             driver: Selenium WebDriver
-            
+        
         Returns:
             str: Image URL or None
         """
         try:
             # Try multiple strategies to find the image
-            selectors = [
-                # Main post image (most common)
-                "//article//div[@role='button']//img",
-                "//article//img[@alt]",
-                # Dialog/modal image
-                "//div[@role='dialog']//img[@alt]",
-                "//div[@role='dialog']//img[contains(@src, 'scontent')]",
-                # Any Instagram CDN image
-                "//img[contains(@src, 'scontent')]",
-                "//img[contains(@src, 'instagram')]",
-                # Fallback - any article image
-                "//article//img",
-            ]
-            
-            for selector in selectors:
+            for selector in get_catalog().strategies('post.image'):
                 try:
-                    imgs = driver.find_elements(By.XPATH, selector)
+                    imgs = driver.find_elements(*selector.locator)
                     for img_element in imgs:
                         img_url = img_element.get_attribute('src')
                         # Validate it's a real content image (not profile pic)
@@ -566,17 +747,46 @@ Only respond with valid JSON, nothing else."""
                 
                 if largest_img:
                     return largest_img
-                    
+            
             except Exception as e:
                 pass
             
             return None
-            
+        
         except Exception as e:
-            print(f"✗ Error extracting image URL: {e}")
+            logger.error("✗ Error extracting image URL: %s", e)
             return None
     
-    def generate_comment_for_post(self, driver, style=None):
+    def get_post_context(self, driver, post_type=None):
+        """
+        Collect cheap DOM hints about the open post for offline analysis
+        
+        Args:
+            driver: Selenium WebDriver (must be on a post)
+            post_type: Result of detect_post_type (optional)
+        
+        Returns:
+            dict: {'post_type': ..., 'alt_texts': [...]}
+        """
+        try:
+            alt_texts = driver.execute_script("""
+                var root = document.querySelector('div[role="dialog"] article') ||
+                           document.querySelector('article') || document;
+                var out = [];
+                root.querySelectorAll('img[alt]').forEach(function(img) {
+                    if (img.alt && (img.currentSrc || img.src || '').indexOf('scontent') !== -1) {
+                        out.push(img.alt);
+                    }
+                });
+                return out;
+            """) or []
+        except Exception:
+            alt_texts = []
+        
+        return {'post_type': post_type, 'alt_texts': alt_texts}
+    
+    @timed('ai.generate')
+    def generate_comment_for_post(self, driver, style=None, deadline=None):
         """
         Main method: Analyze current post and generate comment
         Handles images, videos/reels, and carousels
@@ -584,92 +794,108 @@ Only respond with valid JSON, nothing else."""
         Args:
             driver: Selenium WebDriver (must be on a post)
             style: Comment style (optional)
-            
+            deadline: Deadline for this post (analysis gets what is left of it)
+        
         Returns:
             str: Generated comment or None
         """
+        if deadline is None:
+            deadline = Deadline(Config.VISION_LATENCY_BUDGET, label='comment generation', clock=self.clock)
+        
         try:
+            deadline.check('post type detection')
+            
             # Detect post type
             post_type = self.detect_post_type(driver)
-            print(f"📋 Post type: {post_type.upper()}")
+            logger.info("📋 Post type: %s", post_type.upper())
             
             img_url = None
             analysis = None
             
             # Handle different post types
             if post_type == 'video':
-                print("🎬 Video/Reel detected - analyzing thumbnail...")
+                logger.info("🎬 Video/Reel detected - analyzing thumbnail...")
                 img_url = self.get_video_thumbnail(driver)
                 
                 if img_url:
                     # Analyze thumbnail
-                    if self.model == 'openai':
-                        analysis = self.analyze_image_with_openai(img_url)
-                    elif self.model == 'gemini':
-                        analysis = self.analyze_image_with_gemini(img_url)
+                    analysis = self._analyze_within(deadline, [img_url], driver, post_type)
                     
                     # Adjust comment style for videos
                     if analysis:
                         analysis['is_video'] = True
-                        print(f"✓ Video analysis: {analysis.get('category', 'general')} - {analysis.get('mood', 'positive')}")
+                        logger.info("✓ Video analysis: %s - %s", analysis.get('category', 'general'), analysis.get('mood', 'positive'))
                 else:
-                    print("⚠️  Could not get video thumbnail, using generic video comments")
+                    logger.warning("⚠️  Could not get video thumbnail, using generic video comments")
                     return self._get_video_fallback_comment()
             
             elif post_type == 'carousel':
-                print("🎠 Carousel detected - analyzing multiple images...")
+                logger.info("🎠 Carousel detected - analyzing multiple images...")
+                deadline.check('carousel frame extraction')
                 images = self.get_carousel_images(driver, max_images=3)
                 
                 if images and len(images) > 0:
-                    # Analyze first image (primary)
-                    print(f"🖼️  Analyzing primary image from {len(images)} total...")
+                    if Config.CAROUSEL_ANALYSIS == 'multi' and len(images) > 1:
+                        # Send every frame in one request and merge the result
+                        logger.info("🖼️  Analyzing all %s images in one request...", len(images))
+                        frames = images
+                    else:
+                        # Analyze first image (primary)
+                        logger.info("🖼️  Analyzing primary image from %s total...", len(images))
+                        frames = images[:1]
                     
-                    if self.model == 'openai':
-                        analysis = self.analyze_image_with_openai(images[0])
-                    elif self.model == 'gemini':
-                        analysis = self.analyze_image_with_gemini(images[0])
+                    analysis = self._analyze_within(deadline, frames, driver, post_type)
                     
                     if analysis:
                         analysis['is_carousel'] = True
                         analysis['image_count'] = len(images)
-                        print(f"✓ Carousel analysis: {analysis.get('category', 'general')} - {len(images)} images")
+                        logger.info("✓ Carousel analysis: %s - %s images", analysis.get('category', 'general'), len(images))
                 else:
-                    print("⚠️  Could not extract carousel images")
+                    logger.warning("⚠️  Could not extract carousel images")
                     return self.get_fallback_comment()
             
             else:  # Single image
-                print("🖼️  Single image - analyzing...")
+                logger.info("🖼️  Single image - analyzing...")
                 img_url = self.get_image_url_from_post(driver)
                 
                 if img_url:
-                    if self.model == 'openai':
-                        analysis = self.analyze_image_with_openai(img_url)
-                    elif self.model == 'gemini':
-                        analysis = self.analyze_image_with_gemini(img_url)
+                    analysis = self._analyze_within(deadline, [img_url], driver, post_type)
                 else:
-                    print("✗ Could not extract image URL")
+                    logger.error("✗ Could not extract image URL")
                     return self.get_fallback_comment()
             
             # Check if we have analysis
             if not analysis:
-                print("✗ Analysis failed, using fallback")
+                logger.warning("✗ Analysis failed, using fallback")
                 return self.get_fallback_comment()
+            logger.info("✓ Analyzed by %s backend", analysis.get('backend', self.model))
             
             # Check if appropriate
             if not analysis.get('appropriate', True):
-                print("⚠️  Content flagged as inappropriate for commenting")
+                logger.warning("⚠️  Content flagged as inappropriate for commenting")
                 return None
             
             # Generate comment based on analysis
             comment = self.generate_comment(analysis, style)
             return comment
-            
+        
+        except DeadlineExceeded as e:
+            logger.warning("⏱️  %s - using fallback comment", e)
+            return self.get_fallback_comment()
+        
         except Exception as e:
-            print(f"✗ Error in AI comment generation: {e}")
+            logger.error("✗ Error in AI comment generation: %s", e)
             import traceback
             traceback.print_exc()
             return self.get_fallback_comment()
     
+    @timed('ai.analyze')
+    def _analyze_within(self, deadline, image_urls, driver, post_type):
+        """Run the vision chain with whatever is left of the post's budget"""
+        deadline.check('image analysis')
+        budget = deadline.timeout(self.vision.budget)
+        return self.vision.analyze(image_urls, self.get_post_context(driver, post_type), budget=budget)
+    
     def _get_video_fallback_comment(self):
         """Fallback comments specifically for videos/reels (BMP-compatible only)"""
         video_comments = [
@@ -711,7 +937,7 @@ Only respond with valid JSON, nothing else."""
         Args:
             base_comment: Original comment
             count: Number of variations
-            
+        
         Returns:
             list: Comment variations
         """
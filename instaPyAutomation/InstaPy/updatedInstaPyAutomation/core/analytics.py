@@ -3,50 +3,104 @@ Instagram Analytics & Insights
 Track engagement patterns, optimal posting times, follower growth
 """
 import json
+import logging
 import os
 from datetime import datetime, timedelta
-from collections import defaultdict
 import statistics
+from .config import Config
+from .action_log import ActionLog, intern_posts
+from .analytics_store import AGGREGATES, HISTORIES, add_post, empty_aggregates, open_store
+from .clock import SYSTEM_CLOCK, parse_timestamp, to_audience, to_utc
+
+logger = logging.getLogger(__name__)
 
 
 class InstagramAnalytics:
     """Track and analyze Instagram account performance"""
     
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', clock=None):
+        """
+        Args:
+            data_dir: Folder of the analytics store (data_dir/analytics/); a
+                      data_dir/analytics.json of older versions is migrated
+            clock: Clock for timestamps (default: real time). Hour and day
+                   buckets follow the audience timezone; timestamps are stored in UTC
+        """
         self.data_dir = data_dir
-        self.analytics_file = os.path.join(data_dir, 'analytics.json')
+        self.clock = clock or SYSTEM_CLOCK
+        self.store = open_store(data_dir, clock=self.clock)
         self.data = self.load_data()
+        self.listeners = []
+    
+    def add_listener(self, listener):
+        """
+        Call `listener(analytics, hour_key, day_key)` after each recorded post,
+        with the heatmap buckets it changed
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
     
     def load_data(self):
-        """Load analytics data from file"""
-        if os.path.exists(self.analytics_file):
-            with open(self.analytics_file, 'r') as f:
-                return json.load(f)
-        return {
-            'posts': [],
-            'engagement_by_time': defaultdict(lambda: {'likes': 0, 'comments': 0, 'count': 0}),
-            'engagement_by_day': defaultdict(lambda: {'likes': 0, 'comments': 0, 'count': 0}),
-            'hashtag_performance': defaultdict(lambda: {'uses': 0, 'total_engagement': 0}),
-            'follower_history': [],
-            'action_history': []
-        }
+        """Load analytics data from the store, one history line at a time"""
+        data = empty_aggregates()
+        data['posts'] = []
+        data['follower_history'] = []
+        data['action_history'] = ActionLog()
+        if self.store.exists():
+            meta = self.store.read_meta()
+            for key in AGGREGATES:
+                data[key].update(meta.get(key, {}))
+            data['posts'] = intern_posts(list(self.store.iter_history('posts')))
+            data['follower_history'] = list(self.store.iter_history('follower_history'))
+            data['action_history'].extend(self.store.iter_history('action_history'))
+        return data
     
-    def save_data(self):
-        """Save analytics data to file"""
-        os.makedirs(self.data_dir, exist_ok=True)
+    @staticmethod
+    def from_json(data):
+        """
+        In-memory form of data in the version 1 analytics.json layout: the
+        action history as a compact ActionLog, post hashtags and weekdays
+        interned, aggregates that take new hours, days and hashtags
+        
+        Returns:
+            dict: The data
+        """
+        aggregates = empty_aggregates()
+        for key in AGGREGATES:
+            aggregates[key].update(data.get(key, {}))
+        return dict(
+            aggregates,
+            posts=intern_posts(data.get('posts', [])),
+            follower_history=data.get('follower_history', []),
+            action_history=ActionLog(data.get('action_history', []))
+        )
+    
+    def to_json(self):
+        """Analytics data in the version 1 analytics.json layout"""
         # Convert defaultdict to regular dict for JSON serialization
-        save_data = {
+        return {
             'posts': self.data['posts'],
             'engagement_by_time': dict(self.data['engagement_by_time']),
             'engagement_by_day': dict(self.data['engagement_by_day']),
             'hashtag_performance': dict(self.data['hashtag_performance']),
+            'hashtag_outcomes': self.data['hashtag_outcomes'],
             'follower_history': self.data['follower_history'],
-            'action_history': self.data['action_history']
+            'action_history': self.data['action_history'].to_list()
         }
-        print(f"[DEBUG] Saving analytics to: {os.path.abspath(self.analytics_file)}")
-        with open(self.analytics_file, 'w') as f:
-            json.dump(save_data, f, indent=2)
-        print(f"[DEBUG] Analytics saved. Actions: {len(self.data['action_history'])}")
+    
+    def save_data(self):
+        """Rewrite the whole store (histories first, meta.json last)"""
+        for key in HISTORIES:
+            self.store.write_history(key, self.data[key])
+        self.store.write_meta(self.data)
+        logger.debug("Analytics saved to %s (%s actions)", self.store.directory, len(self.data['action_history']))
+    
+    def save_history_entry(self, key, entry):
+        """Persist an entry just added to a history: one appended line"""
+        if self.store.exists():
+            self.store.append(key, entry)
+        else:
+            self.save_data()
     
     def record_action(self, action_type, details=None):
         """
@@ -58,12 +112,12 @@ class InstagramAnalytics:
         """
         action = {
             'type': action_type,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.clock.utcnow().isoformat(),
             'details': details or {}
         }
-        print(f"[DEBUG] Recording action: {action}")
+        logger.debug("Recording action: %s", action_type, extra={'action': action})
         self.data['action_history'].append(action)
-        self.save_data()
+        self.save_history_entry('action_history', action)
     
     def record_post_engagement(self, post_url, likes, comments, hashtags=None, posted_at=None):
         """
@@ -74,12 +128,15 @@ class InstagramAnalytics:
             likes: Number of likes
             comments: Number of comments
             hashtags: List of hashtags used
-            posted_at: When post was created (datetime or ISO string)
+            posted_at: When post was created (datetime or ISO string; without
+                       an offset it is audience wall time)
         """
         if posted_at is None:
-            posted_at = datetime.now()
+            posted_at = self.clock.utcnow()
         elif isinstance(posted_at, str):
             posted_at = datetime.fromisoformat(posted_at)
+        # Bucketed by the audience's wall clock, stored in UTC
+        local = to_audience(posted_at)
         
         post_data = {
             'url': post_url,
@@ -87,42 +144,55 @@ class InstagramAnalytics:
             'comments': comments,
             'engagement': likes + comments,
             'hashtags': hashtags or [],
-            'posted_at': posted_at.isoformat(),
-            'hour': posted_at.hour,
-            'day': posted_at.strftime('%A')
+            'posted_at': to_utc(posted_at).isoformat(),
+            'hour': local.hour,
+            'day': local.strftime('%A')
         }
         
         self.data['posts'].append(post_data)
+        hour_key = str(local.hour)
+        day_key = local.strftime('%A')
+        add_post(self.data, post_data)
         
-        # Update time-based analytics
-        hour_key = str(posted_at.hour)
-        self.data['engagement_by_time'][hour_key]['likes'] += likes
-        self.data['engagement_by_time'][hour_key]['comments'] += comments
-        self.data['engagement_by_time'][hour_key]['count'] += 1
-        
-        # Update day-based analytics
-        day_key = posted_at.strftime('%A')
-        self.data['engagement_by_day'][day_key]['likes'] += likes
-        self.data['engagement_by_day'][day_key]['comments'] += comments
-        self.data['engagement_by_day'][day_key]['count'] += 1
-        
-        # Update hashtag performance
-        if hashtags:
-            engagement_per_tag = (likes + comments) / len(hashtags)
-            for tag in hashtags:
-                self.data['hashtag_performance'][tag]['uses'] += 1
-                self.data['hashtag_performance'][tag]['total_engagement'] += engagement_per_tag
-        
-        self.save_data()
+        if self.store.exists():
+            self.store.append('posts', post_data)
+            self.store.write_meta(self.data)
+        else:
+            self.save_data()
+        for listener in self.listeners:
+            listener(self, hour_key, day_key)
+    
+    def record_hashtag_outcome(self, hashtag, outcome, keep=None):
+        """
+        Record how working through a hashtag went, keeping its recent outcomes only
+        
+        Args:
+            hashtag: Hashtag searched
+            outcome: dict of searches, found, attempts, successes, seconds
+            keep: Outcomes kept per hashtag (default Config.HASHTAG_RECENT_RUNS)
+        """
+        keep = Config.HASHTAG_RECENT_RUNS if keep is None else keep
+        entry = dict(outcome, timestamp=self.clock.utcnow().isoformat())
+        outcomes = self.data['hashtag_outcomes'].setdefault(hashtag, [])
+        outcomes.append(entry)
+        del outcomes[:-keep]
+        if self.store.exists():
+            self.store.write_meta(self.data)
+        else:
+            self.save_data()
+    
+    def get_hashtag_outcomes(self, hashtag):
+        """Recent outcomes of a hashtag, oldest first"""
+        return self.data['hashtag_outcomes'].get(hashtag, [])
     
     def record_follower_count(self, count):
         """Record current follower count"""
         entry = {
             'count': count,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self.clock.utcnow().isoformat()
         }
         self.data['follower_history'].append(entry)
-        self.save_data()
+        self.save_history_entry('follower_history', entry)
     
     def get_best_posting_times(self, top_n=5):
         """
@@ -231,10 +301,10 @@ class InstagramAnalytics:
         if len(self.data['follower_history']) < 2:
             return {'growth': 0, 'growth_rate': 0, 'status': 'insufficient_data'}
         
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_date = self.clock.utcnow() - timedelta(days=days)
         recent_entries = [
             entry for entry in self.data['follower_history']
-            if datetime.fromisoformat(entry['timestamp']) >= cutoff_date
+            if parse_timestamp(entry['timestamp']) >= cutoff_date
         ]
         
         if len(recent_entries) < 2:
@@ -264,18 +334,15 @@ class InstagramAnalytics:
         Returns:
             dict: Activity statistics
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_actions = [
-            action for action in self.data['action_history']
-            if datetime.fromisoformat(action['timestamp']) >= cutoff_date
-        ]
+        cutoff_date = self.clock.utcnow() - timedelta(days=days)
+        by_type = self.data['action_history'].count_by_type(since=cutoff_date)
         
         summary = {
-            'total_actions': len(recent_actions),
-            'likes': sum(1 for a in recent_actions if a['type'] == 'like'),
-            'comments': sum(1 for a in recent_actions if a['type'] == 'comment'),
-            'follows': sum(1 for a in recent_actions if a['type'] == 'follow'),
-            'unfollows': sum(1 for a in recent_actions if a['type'] == 'unfollow'),
+            'total_actions': sum(by_type.values()),
+            'likes': by_type['like'],
+            'comments': by_type['comment'],
+            'follows': by_type['follow'],
+            'unfollows': by_type['unfollow'],
             'period_days': days
         }
         
@@ -299,7 +366,7 @@ class InstagramAnalytics:
         report.append("=" * 60)
         report.append("INSTAGRAM ANALYTICS REPORT")
         report.append("=" * 60)
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Generated: {self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}")
         report.append("")
         
         # Account Overview
@@ -417,21 +484,14 @@ class InstagramAnalytics:
         export_path = os.path.join(self.data_dir, filename)
         
         export_data = {
-            'exported_at': datetime.now().isoformat(),
-            'data': {
-                'posts': self.data['posts'],
-                'engagement_by_time': dict(self.data['engagement_by_time']),
-                'engagement_by_day': dict(self.data['engagement_by_day']),
-                'hashtag_performance': dict(self.data['hashtag_performance']),
-                'follower_history': self.data['follower_history'],
-                'action_history': self.data['action_history']
-            }
+            'exported_at': self.clock.utcnow().isoformat(),
+            'data': self.to_json()
         }
         
         with open(export_path, 'w') as f:
             json.dump(export_data, f, indent=2)
         
-        print(f"✓ Analytics exported to {export_path}")
+        logger.info("✓ Analytics exported to %s", export_path)
         return export_path
 
 
@@ -0,0 +1,384 @@
+"""
+Analytics Store
+Versioned on-disk layout of the analytics data, and streaming migrations
+from older layouts
+
+Version 1 was a single data/analytics.json holding everything. Version 2 is
+a data/analytics/ folder: meta.json (schema version and the aggregates) and
+one append-only JSON-lines file per history, so recording an action appends
+a line instead of rewriting every action ever recorded.
+"""
+import itertools
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from json.decoder import WHITESPACE
+from pathlib import Path
+from .clock import SYSTEM_CLOCK, parse_timestamp, to_audience
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+LEGACY_FILE = 'analytics.json'
+LEGACY_BACKUP = 'analytics.v1.json'
+STORE_DIR = 'analytics'
+META_FILE = 'meta.json'
+
+# History key -> JSON-lines file, one entry per line, oldest first
+HISTORIES = {
+    'posts': 'posts.jsonl',
+    'follower_history': 'followers.jsonl',
+    'action_history': 'actions.jsonl',
+}
+AGGREGATES = ('engagement_by_time', 'engagement_by_day', 'hashtag_performance', 'hashtag_outcomes')
+
+READ_CHUNK = 64 * 1024
+BATCH_LINES = 1000
+NUMBER_CHARACTERS = '0123456789+-.eE'
+
+
+class SchemaVersionError(Exception):
+    """The store has a version this code cannot read or upgrade"""
+
+
+class AnalyticsStore:
+    """
+    data/analytics/: meta.json plus one JSON-lines file per history
+    
+    meta.json is written last by every full write and by migrations, so a
+    store without it is incomplete and is rebuilt from its source.
+    """
+    
+    def __init__(self, directory, clock=None):
+        """
+        Args:
+            directory: The store folder (data/analytics)
+            clock: Clock for the updated_at stamp (default: real time)
+        """
+        self.directory = Path(directory)
+        self.clock = clock or SYSTEM_CLOCK
+    
+    def path(self, key):
+        """File of a history key, or of META_FILE"""
+        return self.directory / HISTORIES.get(key, key)
+    
+    def exists(self):
+        return self.path(META_FILE).exists()
+    
+    def read_meta(self):
+        """
+        meta.json contents
+        
+        Raises:
+            SchemaVersionError: Written by a newer version of the bot
+        """
+        with open(self.path(META_FILE), 'r') as f:
+            meta = json.load(f)
+        version = meta.get('schema_version')
+        if not isinstance(version, int) or version > SCHEMA_VERSION:
+            raise SchemaVersionError(
+                f"{self.path(META_FILE)} has schema version {version!r}; this version of the bot "
+                f"reads up to {SCHEMA_VERSION}")
+        return meta
+    
+    def write_meta(self, aggregates, version=SCHEMA_VERSION):
+        """Replace meta.json with these aggregates"""
+        meta = {'schema_version': version, 'updated_at': self.clock.utcnow().isoformat()}
+        meta.update((key, aggregates.get(key, {})) for key in AGGREGATES)
+        with self._replace(META_FILE) as f:
+            json.dump(meta, f, indent=2)
+    
+    def iter_history(self, key):
+        """
+        Entries of a history, read BATCH_LINES lines at a time
+        
+        Each batch is decoded in one call, so its entries share their key
+        strings. A line cut short by a crash mid-append is skipped with a
+        warning.
+        """
+        path = self.path(key)
+        if not path.exists():
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            first = 1
+            for batch in iter(lambda: list(itertools.islice(f, BATCH_LINES)), []):
+                lines = [line for line in batch if line.strip()]
+                try:
+                    yield from json.loads('[' + ','.join(lines) + ']')
+                except json.JSONDecodeError:
+                    for number, line in enumerate(batch, first):
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning("⚠️ Skipping unreadable line %s of %s", number, path)
+                first += len(batch)
+    
+    def append(self, key, entry):
+        """Append one entry to a history"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.path(key), 'ab+') as f:
+            # Start a fresh line after one a crash cut short
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write((json.dumps(entry) + '\n').encode('utf-8'))
+    
+    def write_history(self, key, entries):
+        """Replace a history with `entries` (any iterable, written as it is read)"""
+        dumps = json.dumps
+        with self._replace(key) as f:
+            for entry in entries:
+                f.write(dumps(entry))
+                f.write('\n')
+    
+    def size_bytes(self):
+        """Bytes on disk of meta.json and the histories"""
+        paths = [self.path(META_FILE)] + [self.path(key) for key in HISTORIES]
+        return sum(path.stat().st_size for path in paths if path.exists())
+    
+    def _replace(self, key):
+        """File object whose contents replace `key`'s file when closed without error"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return _AtomicFile(self.path(key))
+
+
+class _AtomicFile:
+    """Write to a temporary file in the same folder, then os.replace() it into place"""
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def __enter__(self):
+        fd, self.temp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix='.tmp')
+        self.file = os.fdopen(fd, 'w', encoding='utf-8')
+        return self.file
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.temp, self.path)
+        else:
+            os.unlink(self.temp)
+        return False
+
+
+class JsonStreamReader:
+    """
+    Read one big JSON object member by member
+    
+    Only one array item (or one non-array member value) is decoded at a
+    time, so a file of any size is read with memory bounded by its largest
+    item rather than by the file.
+    """
+    
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.file = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self):
+        """Read another chunk; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def _peek(self):
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+    
+    def _expect(self, characters):
+        char = self._peek()
+        if char not in characters:
+            raise ValueError(f"Expected one of {characters!r} in JSON stream, got {char!r}")
+        self.pos += 1
+        return char
+    
+    def _value(self):
+        """Decode the next complete value"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value that ends with the buffer, or a number cut short before
+            # its fraction or exponent, may continue in the next chunk
+            cut = end == len(self.buffer) or (
+                isinstance(value, (int, float)) and self.buffer[end] in NUMBER_CHARACTERS)
+            if cut and self._fill():
+                continue
+            self.pos = end
+            return value
+    
+    def _items(self):
+        """Items of the array at the current position"""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+    
+    def members(self):
+        """
+        (key, value) of each top-level member; array values are iterators
+        of their items and must be used up before the next member is read
+        (unused items are skipped)
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if self._peek() == '[':
+                items = self._items()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def empty_aggregates():
+    """Aggregates that create a bucket for every new hour, day or hashtag"""
+    return {
+        'engagement_by_time': defaultdict(lambda: {'likes': 0, 'comments': 0, 'count': 0}),
+        'engagement_by_day': defaultdict(lambda: {'likes': 0, 'comments': 0, 'count': 0}),
+        'hashtag_performance': defaultdict(lambda: {'uses': 0, 'total_engagement': 0}),
+        'hashtag_outcomes': {},
+    }
+
+
+def add_post(aggregates, post):
+    """Count a post entry in the engagement aggregates"""
+    hour, day = post.get('hour'), post.get('day')
+    if hour is None or day is None:
+        local = to_audience(parse_timestamp(post['posted_at']))
+        hour, day = local.hour, local.strftime('%A')
+    likes, comments = post.get('likes', 0), post.get('comments', 0)
+    for buckets, key in ((aggregates['engagement_by_time'], str(hour)), (aggregates['engagement_by_day'], day)):
+        bucket = buckets[key]
+        bucket['likes'] += likes
+        bucket['comments'] += comments
+        bucket['count'] += 1
+    hashtags = post.get('hashtags') or []
+    if hashtags:
+        per_tag = (likes + comments) / len(hashtags)
+        for tag in hashtags:
+            stats = aggregates['hashtag_performance'][tag]
+            stats['uses'] += 1
+            stats['total_engagement'] += per_tag
+
+
+def migrate_legacy(legacy_file, store):
+    """
+    Convert a version 1 analytics.json into a version 2 store, streaming
+    
+    Histories are copied one entry at a time. The engagement aggregates are
+    rebuilt from the posts as they pass: posts saved after a failed
+    aggregate update (the version 1 KeyError on new hours, days and
+    hashtags) are counted again, and a mismatch with the file's aggregates
+    is logged. meta.json is written last, so an interrupted migration is
+    simply run again.
+    
+    Args:
+        legacy_file: Path of the version 1 analytics.json
+        store: AnalyticsStore to (over)write
+    
+    Returns:
+        dict: Entries copied per history
+    """
+    rebuilt = empty_aggregates()
+    stored = {}
+    counts = {key: 0 for key in HISTORIES}
+    
+    def counted(key, items):
+        for item in items:
+            counts[key] += 1
+            if key == 'posts':
+                add_post(rebuilt, item)
+            yield item
+    
+    with open(legacy_file, 'r', encoding='utf-8') as f:
+        for key, value in JsonStreamReader(f).members():
+            if key in HISTORIES:
+                store.write_history(key, counted(key, value))
+            elif key in AGGREGATES:
+                stored[key] = value
+            else:
+                logger.warning("⚠️ Dropping unknown analytics key %r while migrating %s", key, legacy_file)
+    
+    for key in ('engagement_by_time', 'engagement_by_day'):
+        posts_in_file = sum(bucket.get('count', 0) for bucket in stored.get(key, {}).values())
+        if posts_in_file != counts['posts']:
+            logger.warning("⚠️ %s counted %s posts but %s are stored; rebuilt from the posts",
+                           key, posts_in_file, counts['posts'])
+    for key in HISTORIES:
+        if counts[key] == 0 and not store.path(key).exists():
+            store.write_history(key, [])
+    rebuilt['hashtag_outcomes'] = stored.get('hashtag_outcomes', {})
+    store.write_meta(rebuilt)
+    
+    logger.info("✓ Migrated %s to schema %s: %s actions, %s posts, %s follower counts",
+                legacy_file, SCHEMA_VERSION, counts['action_history'], counts['posts'], counts['follower_history'])
+    return counts
+
+
+# Schema version -> function upgrading a store of that version to the next
+# one in place, reading each history as a stream (see migrate_legacy)
+STORE_MIGRATIONS = {}
+
+
+def open_store(data_dir, clock=None):
+    """
+    The analytics store of `data_dir`, migrated to the current schema
+    
+    A version 1 data_dir/analytics.json is migrated first and then kept as
+    analytics.v1.json.
+    
+    Raises:
+        SchemaVersionError: The store is newer than this code, or no
+                            migration exists from its version
+    """
+    data_dir = Path(data_dir)
+    store = AnalyticsStore(data_dir / STORE_DIR, clock=clock)
+    legacy = data_dir / LEGACY_FILE
+    if not store.exists() and legacy.exists():
+        migrate_legacy(legacy, store)
+        os.replace(legacy, data_dir / LEGACY_BACKUP)
+    
+    if store.exists():
+        version = store.read_meta()['schema_version']
+        while version < SCHEMA_VERSION:
+            if version not in STORE_MIGRATIONS:
+                raise SchemaVersionError(f"No migration from analytics schema version {version}")
+            STORE_MIGRATIONS[version](store)
+            version = store.read_meta()['schema_version']
+    return store
@@ -0,0 +1,201 @@
+"""
+Action Block Monitor
+Spots Instagram's temporary action blocks from like/comment verification
+outcomes and backs off until they are likely lifted
+"""
+import json
+import logging
+import os
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from .config import Config
+from .clock import SYSTEM_CLOCK, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class ActionBlocked(Exception):
+    """Instagram is blocking actions for longer than a run may pause"""
+
+
+class ActionBlockMonitor:
+    """
+    Streaming detector over per-action verification outcomes
+    
+    Every like or comment that was clicked reports whether the page confirmed
+    it. A block shows up as confirmations that stop coming: the monitor keeps
+    an EWMA of the failure rate and the failures in a row, and opens a block
+    episode when either crosses its threshold (BLOCK_CONSECUTIVE_FAILURES in
+    a row, or an EWMA of BLOCK_FAILURE_RATE after BLOCK_MIN_ACTIONS outcomes).
+    
+    Each episode backs off for BLOCK_BACKOFF_MINUTES, doubling for every
+    further episode until the failure rate has recovered, capped at
+    BLOCK_BACKOFF_MAX_HOURS. The state is persisted, so the next scheduled
+    run knows about a block the previous one ran into.
+    """
+    
+    EPISODES_KEPT = 100
+    
+    def __init__(self, state_file=None, clock=None):
+        """
+        Args:
+            state_file: JSON state file (default data/block_state.json)
+            clock: Clock for backoff timing (default: real time)
+        """
+        self.state_file = Path(state_file or Config.DATA_DIR / 'block_state.json')
+        self.clock = clock or SYSTEM_CLOCK
+        self.state = self.load_state()
+        # This process's (action type, result) counts, for metrics
+        self.outcomes = Counter()
+    
+    def load_state(self):
+        """Load the monitor state from file"""
+        state = {
+            'failure_rate': 0.0,
+            'outcomes': 0,
+            'failures_in_row': 0,
+            'level': 0,
+            'blocked_until': None,
+            'episodes': [],
+        }
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r') as f:
+                    state.update(json.load(f))
+            except Exception as e:
+                logger.error("✗ Failed to load action block state: %s", e)
+        return state
+    
+    def save_state(self):
+        """Save the monitor state atomically (a crash mid-write keeps an active block)"""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.state_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.error("✗ Failed to save action block state: %s", e)
+    
+    @property
+    def episodes(self):
+        return self.state['episodes']
+    
+    def remaining(self):
+        """Seconds left of the current backoff (0 when not blocked)"""
+        until = self.state['blocked_until']
+        if not until:
+            return 0.0
+        return max(0.0, (parse_timestamp(until) - self.clock.utcnow()).total_seconds())
+    
+    def is_blocked(self):
+        """Whether actions should wait for a backoff to end"""
+        return self.remaining() > 0
+    
+    def refuse(self, action_type):
+        """
+        Whether an action has to be skipped for the current backoff
+        
+        Args:
+            action_type: 'like' or 'comment'
+        
+        Returns:
+            bool: True (and counted as 'blocked') while blocked
+        """
+        if not self.is_blocked():
+            return False
+        self.outcomes[(action_type, 'blocked')] += 1
+        return True
+    
+    def record(self, action_type, verified):
+        """
+        Report one verification outcome
+        
+        Args:
+            action_type: 'like' or 'comment'
+            verified: Whether the page confirmed the action
+        
+        Returns:
+            bool: True if this outcome started a block episode
+        """
+        state = self.state
+        self.outcomes[(action_type, 'confirmed' if verified else 'unconfirmed')] += 1
+        alpha = Config.BLOCK_EWMA_ALPHA
+        state['failure_rate'] = round((1 - alpha) * state['failure_rate'] + alpha * (0.0 if verified else 1.0), 4)
+        state['outcomes'] += 1
+        
+        if verified:
+            state['failures_in_row'] = 0
+            if self.episodes and not self.episodes[-1].get('recovered_at'):
+                self.episodes[-1]['recovered_at'] = self.clock.utcnow().isoformat()
+                logger.info("✓ Actions confirmed again after the block")
+            if state['failure_rate'] < Config.BLOCK_FAILURE_RATE / 2:
+                state['level'] = 0
+            self.save_state()
+            return False
+        
+        state['failures_in_row'] += 1
+        reason = None
+        if state['failures_in_row'] >= Config.BLOCK_CONSECUTIVE_FAILURES:
+            reason = 'consecutive'
+        elif state['outcomes'] >= Config.BLOCK_MIN_ACTIONS and state['failure_rate'] >= Config.BLOCK_FAILURE_RATE:
+            reason = 'failure_rate'
+        
+        if reason and not self.is_blocked():
+            self.start_episode(action_type, reason)
+            return True
+        self.save_state()
+        return False
+    
+    def start_episode(self, action_type, reason):
+        """Open a block episode and back off"""
+        state = self.state
+        minutes = min(Config.BLOCK_BACKOFF_MINUTES * 2 ** state['level'], Config.BLOCK_BACKOFF_MAX_HOURS * 60)
+        now = self.clock.utcnow()
+        until = now + timedelta(minutes=minutes)
+        self.episodes.append({
+            'started_at': now.isoformat(),
+            'action': action_type,
+            'reason': reason,
+            'failure_rate': state['failure_rate'],
+            'failures_in_row': state['failures_in_row'],
+            'backoff_minutes': minutes,
+            'blocked_until': until.isoformat(),
+            'recovered_at': None,
+        })
+        del self.episodes[:-self.EPISODES_KEPT]
+        state['blocked_until'] = until.isoformat()
+        state['level'] += 1
+        state['failures_in_row'] = 0
+        self.save_state()
+        logger.warning("🚫 Action block suspected (%s not confirmed, %.0f%% recent failure rate) - backing off %.0f min",
+                       action_type, state['failure_rate'] * 100, minutes)
+    
+    def pause(self, max_seconds=None):
+        """
+        Sit out the current backoff if it is short enough
+        
+        Args:
+            max_seconds: Longest pause a run may take (default Config.BLOCK_MAX_PAUSE_MINUTES)
+        
+        Returns:
+            float: Seconds paused
+        
+        Raises:
+            ActionBlocked: When the backoff is longer than that - stop the run
+        """
+        max_seconds = Config.BLOCK_MAX_PAUSE_MINUTES * 60 if max_seconds is None else max_seconds
+        remaining = self.remaining()
+        if remaining <= 0:
+            return 0.0
+        if remaining > max_seconds:
+            raise ActionBlocked(f"Actions blocked for another {remaining / 60:.0f} min")
+        logger.info("⏸️  Pausing %.1f min for the action block to lift", remaining / 60)
+        self.clock.sleep(remaining)
+        return remaining
+    
+    def recent_episodes(self, days=7):
+        """Episodes started within the last `days` days, oldest first"""
+        cutoff = self.clock.utcnow() - timedelta(days=days)
+        return [e for e in self.episodes if parse_timestamp(e['started_at']) >= cutoff]
@@ -2,6 +2,7 @@
 Browser Setup with Undetected ChromeDriver
 Configures Chrome to avoid detection as automation
 """
+import logging
 import undetected_chromedriver as uc
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -10,19 +11,25 @@ from selenium.webdriver.support import expected_conditions as EC
 import json
 from pathlib import Path
 from .config import Config
+from .timing import timed
+from .resource_governor import memory_profile_flags
+
+logger = logging.getLogger(__name__)
 
 
 class BrowserManager:
     """Manages browser instance with stealth features"""
     
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, timings=None):
         self.driver = None
         self.headless = headless
         self.wait = None
+        self.timings = timings
         
+    @timed('browser.setup')
     def setup_browser(self):
         """Initialize Chrome with undetected-chromedriver"""
-        print("🌐 Setting up Chrome browser...")
+        logger.info("🌐 Setting up Chrome browser...")
         
         options = uc.ChromeOptions()
         
@@ -32,6 +39,10 @@ class BrowserManager:
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-gpu')
         
+        # Memory-saving flags for small VMs (BROWSER_MEMORY_PROFILE)
+        for flag in memory_profile_flags():
+            options.add_argument(flag)
+        
         # Window size and position (looks more human-like and fully visible)
         width, height = Config.WINDOW_SIZE.split(',')
         options.add_argument(f'--window-size={width},{height}')
@@ -66,11 +77,11 @@ class BrowserManager:
             # Execute stealth scripts
             self.apply_stealth()
 
-            print("✓ Browser initialized successfully")
+            logger.info("✓ Browser initialized successfully")
             return self.driver
             
         except Exception as e:
-            print(f"✗ Failed to initialize browser: {e}")
+            logger.error("✗ Failed to initialize browser: %s", e)
             raise
     
     def apply_stealth(self):
@@ -108,10 +119,11 @@ class BrowserManager:
             cookies = self.driver.get_cookies()
             with open(Config.COOKIES_FILE, 'w') as f:
                 json.dump(cookies, f, indent=2)
-            print("✓ Cookies saved")
+            logger.info("✓ Cookies saved")
         except Exception as e:
-            print(f"✗ Failed to save cookies: {e}")
+            logger.error("✗ Failed to save cookies: %s", e)
     
+    @timed('browser.load_cookies')
     def load_cookies(self):
         """Load cookies from file"""
         if not self.driver:
@@ -131,10 +143,10 @@ class BrowserManager:
             for cookie in cookies:
                 self.driver.add_cookie(cookie)
             
-            print("✓ Cookies loaded")
+            logger.info("✓ Cookies loaded")
             return True
         except Exception as e:
-            print(f"✗ Failed to load cookies: {e}")
+            logger.error("✗ Failed to load cookies: %s", e)
             return False
     
     def close(self):
@@ -143,6 +155,6 @@ class BrowserManager:
             try:
                 self.save_cookies()
                 self.driver.quit()
-                print("✓ Browser closed")
+                logger.info("✓ Browser closed")
             except Exception as e:
-                print(f"✗ Error closing browser: {e}")
+                logger.error("✗ Error closing browser: %s", e)
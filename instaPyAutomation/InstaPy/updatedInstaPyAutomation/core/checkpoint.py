@@ -0,0 +1,170 @@
+"""
+Run Checkpoint
+Progress of a scheduled run (categories, post queue, finished steps), saved
+after every step so an interrupted run resumes instead of starting over
+"""
+import json
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+from .config import Config
+from .categories import get_primary_hashtag
+from .clock import SYSTEM_CLOCK, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpoint:
+    """
+    Persisted state of one scheduled run
+    
+    A run works through `categories` in order, searching one hashtag each.
+    For the current category it keeps the post queue and, per unfinished
+    post, its steps so far ('comment' once attempted, 'commented' once
+    posted), so after a browser restart or a crashed process the run picks
+    up at the first unfinished step.
+    """
+    
+    def __init__(self, checkpoint_file=None, clock=None):
+        """
+        Args:
+            checkpoint_file: JSON file (default data/run_checkpoint.json)
+            clock: Clock for run timestamps (default: real time)
+        """
+        self.checkpoint_file = Path(checkpoint_file or Config.DATA_DIR / 'run_checkpoint.json')
+        self.clock = clock or SYSTEM_CLOCK
+        self.state = None
+    
+    def resume(self, max_age_hours=None):
+        """
+        Load an unfinished run started within the last `max_age_hours`
+        
+        Returns:
+            bool: Whether there is a run to resume
+        """
+        max_age_hours = Config.CHECKPOINT_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        if not self.checkpoint_file.exists():
+            return False
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.warning("✗ Ignoring unreadable run checkpoint: %s", e)
+            return False
+        started = parse_timestamp(state['started_at'])
+        if state.get('finished') or self.clock.utcnow() - started > timedelta(hours=max_age_hours):
+            return False
+        self.state = state
+        return True
+    
+    def start(self, categories, posts_per_category, hashtags=None):
+        """
+        Begin a new run
+        
+        Args:
+            categories: Category names, worked through in order
+            posts_per_category: Posts to queue per category
+            hashtags: Hashtag searched for each category (default: its primary hashtag)
+        """
+        self.state = {
+            'started_at': self.clock.utcnow().isoformat(),
+            'categories': list(categories),
+            'hashtags': list(hashtags) if hashtags else [get_primary_hashtag(c) for c in categories],
+            'posts_per_category': posts_per_category,
+            'category_index': 0,
+            'queue': None,
+            'steps': {},
+            'completed': [],
+            'totals': {'processed': 0, 'commented': 0, 'liked': 0, 'engaged': 0},
+            'restarts': 0,
+            'finished': False,
+        }
+        self.save()
+    
+    def save(self):
+        """Write the checkpoint atomically (a crash mid-write keeps the old one)"""
+        try:
+            self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.checkpoint_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(temp_file, self.checkpoint_file)
+        except Exception as e:
+            logger.error("✗ Failed to save run checkpoint: %s", e)
+    
+    @property
+    def categories(self):
+        return self.state['categories']
+    
+    @property
+    def hashtags(self):
+        """Hashtag per category (checkpoints of older versions searched the primary one)"""
+        return self.state.get('hashtags') or [get_primary_hashtag(c) for c in self.categories]
+    
+    @property
+    def totals(self):
+        return self.state['totals']
+    
+    def current_category(self):
+        """Category being worked on, or None when all are done"""
+        index = self.state['category_index']
+        return self.categories[index] if index < len(self.categories) else None
+    
+    def current_hashtag(self):
+        """Hashtag searched for the current category"""
+        index = self.state['category_index']
+        return self.hashtags[index] if index < len(self.categories) else None
+    
+    def queue(self):
+        """Post queue of the current category (None until it has been built)"""
+        return self.state['queue']
+    
+    def set_queue(self, urls):
+        self.state['queue'] = list(urls)
+        self.save()
+    
+    def pending_posts(self):
+        """Queued posts of the current category not completed yet"""
+        completed = set(self.state['completed'])
+        return [url for url in self.state['queue'] or [] if url not in completed]
+    
+    def steps_done(self, url):
+        return self.state['steps'].get(url, [])
+    
+    def mark_step(self, url, step):
+        """Record that a step of a post was attempted"""
+        steps = self.state['steps'].setdefault(url, [])
+        if step not in steps:
+            steps.append(step)
+        self.save()
+    
+    def complete_post(self, url, commented=False, liked=False):
+        """Record a finished post and its outcome"""
+        self.state['completed'].append(url)
+        self.state['steps'].pop(url, None)
+        totals = self.state['totals']
+        totals['processed'] += 1
+        totals['commented'] += int(commented)
+        totals['liked'] += int(liked)
+        # Posts that got a comment or a like (checkpoints of older versions lack it)
+        totals['engaged'] = totals.get('engaged', 0) + int(commented or liked)
+        self.save()
+    
+    def next_category(self):
+        """Move on to the next category"""
+        self.state['category_index'] += 1
+        self.state['queue'] = None
+        self.state['completed'] = []
+        self.state['steps'] = {}
+        self.save()
+    
+    def record_restart(self):
+        self.state['restarts'] += 1
+        self.save()
+    
+    def finish(self):
+        """Mark the run done so the next scheduled run starts fresh"""
+        self.state['finished'] = True
+        self.state['finished_at'] = self.clock.utcnow().isoformat()
+        self.save()
@@ -0,0 +1,136 @@
+"""
+Clocks
+Wall time, monotonic time and sleeping behind one injectable object
+
+Wall time is the audience's (AUDIENCE_TIMEZONE): `now()` is a naive datetime
+in that zone, used for peak slots, daily limits and analytics buckets.
+Anything stored uses `utcnow()`, an aware UTC datetime.
+"""
+import functools
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from .config import Config
+
+
+@functools.lru_cache(maxsize=None)
+def _zone(name):
+    return ZoneInfo(name)
+
+
+def audience_timezone():
+    """ZoneInfo of Config.AUDIENCE_TIMEZONE, or None for the machine's own zone"""
+    return _zone(Config.AUDIENCE_TIMEZONE) if Config.AUDIENCE_TIMEZONE else None
+
+
+def to_audience(moment):
+    """
+    Audience wall time of a datetime, as a naive datetime
+
+    Aware datetimes are converted (keeping `fold` for the repeated hour when
+    clocks go back); naive ones are already audience wall time.
+    """
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(audience_timezone()).replace(tzinfo=None)
+
+
+def to_utc(moment):
+    """Aware UTC datetime of a datetime (naive = audience wall time)"""
+    if moment.tzinfo is None:
+        zone = audience_timezone()
+        moment = moment.replace(tzinfo=zone) if zone else moment.astimezone()
+    return moment.astimezone(timezone.utc)
+
+
+def parse_timestamp(text):
+    """
+    Stored ISO timestamp as an aware UTC datetime
+
+    Timestamps written before they were stored in UTC have no offset and are
+    read as audience wall time.
+    """
+    return to_utc(datetime.fromisoformat(text))
+
+
+class SystemClock:
+    """Real time - what the bot uses in production"""
+
+    def now(self):
+        """Current audience wall time (naive)"""
+        return to_audience(self.utcnow())
+
+    def utcnow(self):
+        """Current time as an aware UTC datetime, for storing"""
+        return datetime.now(timezone.utc)
+
+    def monotonic(self):
+        """Seconds from an arbitrary start, for measuring durations"""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """Block for `seconds`"""
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated time for tests and simulations
+
+    `sleep()` returns immediately and moves the clock forward instead, so a
+    session that would take an hour of pauses runs in milliseconds while the
+    code under test sees exactly the same timestamps and durations. Random
+    delays are still drawn from `random`, so seeding it reproduces a run.
+    """
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start: Initial datetime, naive = audience wall time (default: Monday 2025-01-06 09:00)
+        """
+        self.origin = to_utc(start or datetime(2025, 1, 6, 9, 0))
+        self.elapsed = 0.0
+        self.sleep_count = 0
+        self.total_slept = 0.0
+        # Derived from `elapsed` when first asked for: simulations sleep far
+        # more often than they read the time
+        self.utc = self.origin
+        self.current = None
+
+    def now(self):
+        if self.current is None:
+            self.current = to_audience(self.utcnow())
+        return self.current
+
+    def utcnow(self):
+        if self.utc is None:
+            self.utc = self.origin + timedelta(seconds=self.elapsed)
+        return self.utc
+
+    def monotonic(self):
+        return self.elapsed
+
+    def sleep(self, seconds):
+        """Advance instead of blocking"""
+        if seconds > 0:
+            self.sleep_count += 1
+            self.total_slept += seconds
+            self.advance(seconds)
+
+    def advance(self, seconds):
+        """Move time forward without counting it as a sleep"""
+        if seconds < 0:
+            raise ValueError("VirtualClock cannot go backwards")
+        self.elapsed += seconds
+        # Counted in UTC, so crossing a DST change moves the wall time correctly
+        self.utc = None
+        self.current = None
+
+    def set(self, when):
+        """Jump forward to a datetime (e.g. just before midnight)"""
+        self.advance((to_utc(when) - self.utcnow()).total_seconds())
+
+
+# Shared default so callers that don't care about time need not pass one
+SYSTEM_CLOCK = SystemClock()
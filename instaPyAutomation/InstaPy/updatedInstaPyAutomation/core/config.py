@@ -12,10 +12,14 @@ This module:
 
 IMPORTANT: Copy .env.example to .env and fill in your credentials before running!
 """
+import logging
 import os
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 
 # Load environment variables from .env file
 # The .env file is in the updatedInstaPyAutomation directory (one level up)
@@ -24,8 +28,8 @@ load_dotenv(env_path, override=True)
 
 # Debug: Warn if .env file not found
 if not env_path.exists():
-    print(f"Warning: .env file not found at {env_path}")
-    print("Please copy .env.example to .env and add your Instagram credentials")
+    logger.warning(".env file not found at %s", env_path)
+    logger.warning("Please copy .env.example to .env and add your Instagram credentials")
 
 
 class Config:
@@ -50,6 +54,23 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
     USE_AI_COMMENTS = os.getenv('USE_AI_COMMENTS', 'False').lower() == 'true'
     AI_MODEL = os.getenv('AI_MODEL', 'gemini')  # 'gemini' (free) or 'openai' (paid)
+    # Carousel posts: 'multi' sends every collected frame in one request,
+    # 'primary' analyzes only the first frame
+    CAROUSEL_ANALYSIS = os.getenv('CAROUSEL_ANALYSIS', 'multi').lower()
+    
+    # Vision backend fallback chain, tried in order (comma separated).
+    # 'local' is an offline classifier and is always appended last.
+    VISION_BACKENDS = [
+        name.strip() for name in os.getenv('VISION_BACKENDS', f'{AI_MODEL},local').split(',')
+        if name.strip()
+    ]
+    # Seconds one post may spend on image analysis before degrading to 'local'
+    VISION_LATENCY_BUDGET = float(os.getenv('VISION_LATENCY_BUDGET', 15))
+    # Gemini free tier request quota per day
+    GEMINI_DAILY_QUOTA = int(os.getenv('GEMINI_DAILY_QUOTA', 1500))
+    # API endpoints - override to point at a local stand-in server for tests
+    GEMINI_API_BASE = os.getenv('GEMINI_API_BASE', 'https://generativelanguage.googleapis.com').rstrip('/')
+    OPENAI_API_BASE = os.getenv('OPENAI_API_BASE', 'https://api.openai.com').rstrip('/')
     
     # ==================== SAFETY LIMITS ====================
     # These limits prevent Instagram from detecting automated behavior
@@ -76,21 +97,93 @@ class Config:
     MIN_SESSION_BREAK = int(os.getenv('MIN_SESSION_BREAK', 300))  # 5 minutes
     MAX_SESSION_BREAK = int(os.getenv('MAX_SESSION_BREAK', 600))  # 10 minutes
     
+    # Total time one post may take (open, analyze, comment, like, verify).
+    # Every step sizes its own timeout from what is left of this budget.
+    POST_TIME_BUDGET = float(os.getenv('POST_TIME_BUDGET', 90))
+    
+    # Longest waits for the page to confirm a posted comment / a like. Each wait
+    # ends as soon as the DOM changes; neither is a human-like pause.
+    DOM_WAIT_TIMEOUT = float(os.getenv('DOM_WAIT_TIMEOUT', 10))
+    LIKE_VERIFY_TIMEOUT = float(os.getenv('LIKE_VERIFY_TIMEOUT', 3))  # Like button flips instantly
+    
+    # Engagement schedule: peak slots come from the analytics heatmap once enough
+    # posts are recorded per hour (PEAK_MIN_SAMPLES); until then the built-in table
+    PEAK_SLOTS_PER_DAY = int(os.getenv('PEAK_SLOTS_PER_DAY', 2))
+    PEAK_MIN_SAMPLES = int(os.getenv('PEAK_MIN_SAMPLES', 5))
+    
+    # Hashtag selection: scored on each hashtag's last HASHTAG_RECENT_RUNS outcomes;
+    # HASHTAG_EXPLORATION weights the bonus of rarely tried hashtags (0 = pure exploit)
+    HASHTAG_RECENT_RUNS = int(os.getenv('HASHTAG_RECENT_RUNS', 10))
+    HASHTAG_EXPLORATION = float(os.getenv('HASHTAG_EXPLORATION', 1.0))
+    
+    # Action blocks: a block is assumed after BLOCK_CONSECUTIVE_FAILURES unconfirmed
+    # likes/comments in a row, or a failure-rate EWMA of BLOCK_FAILURE_RATE after
+    # BLOCK_MIN_ACTIONS outcomes. Backoff doubles per episode up to the max; a run
+    # pauses through backoffs up to BLOCK_MAX_PAUSE_MINUTES and stops on longer ones
+    BLOCK_EWMA_ALPHA = float(os.getenv('BLOCK_EWMA_ALPHA', 0.3))
+    BLOCK_FAILURE_RATE = float(os.getenv('BLOCK_FAILURE_RATE', 0.6))
+    BLOCK_MIN_ACTIONS = int(os.getenv('BLOCK_MIN_ACTIONS', 4))
+    BLOCK_CONSECUTIVE_FAILURES = int(os.getenv('BLOCK_CONSECUTIVE_FAILURES', 3))
+    BLOCK_BACKOFF_MINUTES = float(os.getenv('BLOCK_BACKOFF_MINUTES', 10))
+    BLOCK_BACKOFF_MAX_HOURS = float(os.getenv('BLOCK_BACKOFF_MAX_HOURS', 24))
+    BLOCK_MAX_PAUSE_MINUTES = float(os.getenv('BLOCK_MAX_PAUSE_MINUTES', 30))
+    
     # ==================== BROWSER SETTINGS ====================
     # Configure Chrome browser behavior
     HEADLESS = os.getenv('HEADLESS', 'False').lower() == 'true'  # Run without visible browser window (GCP/cloud deployment)
     WINDOW_SIZE = os.getenv('WINDOW_SIZE', '1920,1080')  # Browser window dimensions
+    # Chrome memory: flag profile ('standard' or 'small-vm'), browser RSS limit that
+    # triggers a browser recycle and page JS heap limit that triggers a tab recycle
+    BROWSER_MEMORY_PROFILE = os.getenv('BROWSER_MEMORY_PROFILE', 'standard')
+    BROWSER_MEMORY_LIMIT_MB = float(os.getenv('BROWSER_MEMORY_LIMIT_MB', 1400))
+    TAB_MEMORY_LIMIT_MB = float(os.getenv('TAB_MEMORY_LIMIT_MB', 350))
+    # Times a scheduled run may restart a crashed browser before giving up
+    MAX_BROWSER_RESTARTS = int(os.getenv('MAX_BROWSER_RESTARTS', 3))
+    # An interrupted scheduled run is resumed by the next run started within this many hours
+    CHECKPOINT_MAX_AGE_HOURS = float(os.getenv('CHECKPOINT_MAX_AGE_HOURS', 12))
     
     # ==================== INSTAGRAM URLS ====================
     # Instagram endpoints used by the bot
-    BASE_URL = 'https://www.instagram.com'
+    # INSTAGRAM_BASE_URL points the bot at the offline fixture server (tests/fake_instagram_server.py)
+    BASE_URL = os.getenv('INSTAGRAM_BASE_URL', 'https://www.instagram.com').rstrip('/')
     LOGIN_URL = f'{BASE_URL}/accounts/login/'  # Login page
     EXPLORE_TAGS_URL = f'{BASE_URL}/explore/tags/'  # Hashtag exploration
     
+    # ==================== TIMEZONE ====================
+    # IANA zone of the audience (e.g. 'America/New_York'). Peak slots, daily and
+    # hourly limits and analytics buckets follow its wall clock; stored timestamps
+    # are UTC. Empty = the machine's own timezone
+    AUDIENCE_TIMEZONE = os.getenv('AUDIENCE_TIMEZONE', '').strip()
+    
+    # ==================== SELECTORS ====================
+    # Versioned locator catalog shared by all modules (see core/selector_catalog.json)
+    SELECTOR_CATALOG = Path(os.getenv('SELECTOR_CATALOG', Path(__file__).parent / 'selector_catalog.json'))
+    # Pick up catalog edits in a running session, without restarting the browser
+    SELECTOR_HOT_RELOAD = os.getenv('SELECTOR_HOT_RELOAD', 'True').lower() == 'true'
+    
     # ==================== LOGGING ====================
-    # Control console output and log files
+    # Control console output and log files (see core/log.py)
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # DEBUG, INFO, WARNING, ERROR
-    LOG_FILE = 'instagram_bot.log'  # Log file name
+    # JSON-lines log, rotated at LOG_MAX_BYTES keeping LOG_BACKUP_COUNT old files
+    LOG_FILE = Path(os.getenv('LOG_FILE', Path(__file__).parent.parent / 'data' / 'logs' / 'instagram_bot.jsonl'))
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    
+    # ==================== METRICS ====================
+    # Prometheus metrics of each run, written atomically when the run ends to
+    # METRICS_TEXTFILE_DIR (point it at node-exporter's --collector.textfile.directory).
+    # serve_metrics.py serves the latest file on METRICS_HOST:METRICS_PORT
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_TEXTFILE_DIR = Path(os.getenv('METRICS_TEXTFILE_DIR', Path(__file__).parent.parent / 'data' / 'metrics'))
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 9464))
+    
+    # ==================== PROFILING ====================
+    # Opt-in cProfile + tracemalloc per timing span (same as --profile). Slows runs
+    # down noticeably; results go to data/timings/profile_<run>.json and .prof
+    PROFILE = os.getenv('PROFILE', 'False').lower() == 'true'
+    PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', 15))  # Functions / allocation sites kept per step
+    PROFILE_TRACE_FRAMES = int(os.getenv('PROFILE_TRACE_FRAMES', 1))  # Stack depth tracemalloc keeps
     
     # ==================== DATA STORAGE ====================
     # Directories for persistent data (cookies, statistics, analytics)
@@ -98,6 +191,13 @@ class Config:
     COOKIES_FILE = DATA_DIR / 'cookies.json'  # Saved login session
     STATS_FILE = DATA_DIR / 'statistics.json'  # Action history
     
+    @classmethod
+    def use_base_url(cls, base_url):
+        """Point every Instagram URL at another host (e.g. the fixture server)"""
+        cls.BASE_URL = base_url.rstrip('/')
+        cls.LOGIN_URL = f'{cls.BASE_URL}/accounts/login/'
+        cls.EXPLORE_TAGS_URL = f'{cls.BASE_URL}/explore/tags/'
+    
     @classmethod
     def validate(cls):
         """Validate configuration"""
@@ -107,6 +207,15 @@ class Config:
                 "Please copy .env.example to .env and add your credentials."
             )
         
+        if cls.AUDIENCE_TIMEZONE:
+            try:
+                ZoneInfo(cls.AUDIENCE_TIMEZONE)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(
+                    f"Unknown AUDIENCE_TIMEZONE '{cls.AUDIENCE_TIMEZONE}' - use an IANA name like 'Europe/Berlin' "
+                    "(on Windows also: pip install tzdata)"
+                )
+        
         # Create data directory if it doesn't exist
         cls.DATA_DIR.mkdir(exist_ok=True)
         
@@ -0,0 +1,70 @@
+"""
+Per-Post Deadlines
+One time budget per post, shared by every step that works on it
+"""
+from .clock import SYSTEM_CLOCK
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a step starts after the post's budget is used up"""
+
+
+class Deadline:
+    """
+    Time budget for one post
+    
+    Created once per post and passed down through InstagramActions and
+    AICommentGenerator. Each step sizes its own wait from what is left
+    (`timeout(cap)`) and calls `check()` before starting, so a slow step
+    eats into later ones instead of stacking its full timeout on top.
+    """
+    
+    def __init__(self, budget, label='post', clock=None):
+        """
+        Args:
+            budget: Seconds allowed for the whole post
+            label: Name used in messages
+            clock: Clock to measure against (default: real time)
+        """
+        self.budget = budget
+        self.label = label
+        self.clock = clock or SYSTEM_CLOCK
+        self.started_at = self.clock.monotonic()
+        self.expires_at = self.started_at + budget
+    
+    def remaining(self):
+        """Seconds left (never negative)"""
+        return max(0.0, self.expires_at - self.clock.monotonic())
+    
+    def elapsed(self):
+        """Seconds spent so far"""
+        return self.clock.monotonic() - self.started_at
+    
+    def expired(self):
+        """Whether the budget is used up"""
+        return self.remaining() <= 0
+    
+    def timeout(self, cap, floor=0.0):
+        """
+        Timeout for one sub-step
+        
+        Args:
+            cap: The step's normal timeout in seconds
+            floor: Minimum to return even when almost out of time
+        
+        Returns:
+            float: min(cap, remaining), but at least `floor`
+        """
+        return max(floor, min(cap, self.remaining()))
+    
+    def check(self, step):
+        """
+        Give up cleanly if there is no time left for `step`
+        
+        Raises:
+            DeadlineExceeded: budget exhausted
+        """
+        if self.expired():
+            raise DeadlineExceeded(
+                f"{self.label} budget of {self.budget:.0f}s exhausted before {step}"
+            )
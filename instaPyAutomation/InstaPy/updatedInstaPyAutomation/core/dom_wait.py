@@ -0,0 +1,129 @@
+"""
+DOM Waits
+Wait for a page condition with a MutationObserver inside the browser, so a
+verification returns as soon as the DOM changes instead of after a fixed sleep
+"""
+import logging
+from selenium.common.exceptions import TimeoutException
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+
+# Resolves the async script's callback once CONDITION holds, re-checking on every
+# DOM mutation. Value changes made from JS (e.g. clearing a textarea) do not
+# produce mutations, so a slow interval re-check backs the observer up.
+OBSERVER_SCRIPT = """
+var callback = arguments[arguments.length - 1];
+var timeoutMs = arguments[0];
+var pollMs = arguments[1];
+var args = Array.prototype.slice.call(arguments, 2, arguments.length - 1);
+var started = Date.now();
+function check() {
+    try { return Boolean(%s); } catch (e) { return false; }
+}
+if (check()) { callback({met: true, elapsed: 0}); return; }
+var finished = false;
+var observer, timer, poller;
+function finish(met) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(poller);
+    callback({met: met, elapsed: Date.now() - started});
+}
+observer = new MutationObserver(function () { if (check()) finish(true); });
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+poller = setInterval(function () { if (check()) finish(true); }, pollMs);
+timer = setTimeout(function () { finish(check()); }, timeoutMs);
+"""
+
+# Conditions are JS expressions over `args` (the extra arguments of until())
+LIKED = "document.querySelector(args[0]) !== null"
+TEXTAREA_CLEARED = (
+    "(function () {"
+    " var t = document.querySelector('textarea[aria-label=\"' + args[0] + '\"]');"
+    " return t ? t.value === '' : false; })()"
+)
+
+
+class DomWait:
+    """
+    Event-driven waits on the page
+    
+    `until()` runs one execute_async_script call that resolves when the
+    condition becomes true (or at the timeout). Drivers that cannot run async
+    scripts fall back to polling with execute_script. These waits are page
+    time, not human pacing: keep deliberate pauses in HumanBehavior.
+    """
+    
+    POLL_INTERVAL = 0.25  # Seconds between re-checks (in-page backup / fallback polling)
+    SCRIPT_MARGIN = 2     # Extra seconds Selenium allows the async script
+    
+    def __init__(self, driver, clock=None):
+        """
+        Args:
+            driver: Selenium WebDriver
+            clock: Clock for fallback polling (default: real time)
+        """
+        self.driver = driver
+        self.clock = clock or SYSTEM_CLOCK
+        self.script_timeout = None
+        self.async_supported = True
+    
+    def until(self, condition, timeout=None, *args):
+        """
+        Wait until a JS condition holds
+        
+        Args:
+            condition: JS expression; `args[i]` are the extra arguments
+            timeout: Seconds to wait (default Config.DOM_WAIT_TIMEOUT)
+            *args: Values passed through to the condition
+        
+        Returns:
+            bool: Whether the condition held before the timeout
+        """
+        timeout = Config.DOM_WAIT_TIMEOUT if timeout is None else timeout
+        started = self.clock.monotonic()
+        if self.async_supported:
+            try:
+                return self._observe(condition, timeout, args)
+            except TimeoutException:
+                # Script timeout: the observer already spent the whole timeout
+                return False
+            except (AttributeError, NotImplementedError):
+                # Driver cannot run async scripts at all
+                self.async_supported = False
+            except Exception as e:
+                logger.debug("→ DOM observer failed (%s), polling instead", type(e).__name__)
+        # Poll only what is left, so a failed observer cannot double the wait
+        remaining = max(0.0, timeout - (self.clock.monotonic() - started))
+        return self._poll(condition, remaining, args)
+    
+    def _observe(self, condition, timeout, args):
+        script_timeout = timeout + self.SCRIPT_MARGIN
+        if self.script_timeout != script_timeout:
+            self.driver.set_script_timeout(script_timeout)
+            self.script_timeout = script_timeout
+        result = self.driver.execute_async_script(
+            OBSERVER_SCRIPT % condition, int(timeout * 1000), int(self.POLL_INTERVAL * 1000), *args
+        )
+        return bool(result and result.get('met'))
+    
+    def _poll(self, condition, timeout, args):
+        script = f"var args = arguments; return Boolean({condition});"
+        waited = 0.0
+        while True:
+            try:
+                if self.driver.execute_script(script, *args):
+                    return True
+            except Exception:
+                pass
+            if waited >= timeout:
+                return False
+            self.clock.sleep(self.POLL_INTERVAL)
+            waited += self.POLL_INTERVAL
@@ -2,8 +2,162 @@
 Instagram Peak Engagement Time Analyzer
 Analyzes best posting/engagement times for each day of the week
 """
-from datetime import datetime, time as dt_time
+import bisect
+from datetime import datetime, timedelta, time as dt_time
 from collections import defaultdict
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+WEEK_SECONDS = 7 * 24 * 3600
+
+# A derived slot is 'very_high' when its score beats the average hour by this much
+VERY_HIGH_RATIO = 1.25
+
+
+def week_offset(moment):
+    """Seconds from Monday 00:00 of the moment's week to the moment (whole minutes)"""
+    return moment.weekday() * 86400 + moment.hour * 3600 + moment.minute * 60
+
+
+class WeeklyTimeline:
+    """
+    A week of peak slots compiled to sorted offsets from Monday 00:00
+    
+    Next-slot and is-peak queries are a bisect over the offsets instead of
+    rebuilding datetimes day by day. The week wraps: after Sunday's last slot
+    comes Monday's first.
+    """
+    
+    def __init__(self, peak_times):
+        """
+        Args:
+            peak_times: {day name: [peak slot dicts]} (e.g. EngagementScheduler.PEAK_TIMES)
+        """
+        entries = sorted(
+            (
+                (DAYS.index(day) * 86400 + peak['hour'] * 3600 + peak['minute'] * 60, day, peak)
+                for day, peaks in peak_times.items()
+                for peak in peaks
+            ),
+            key=lambda entry: entry[0]
+        )
+        self.offsets = [offset for offset, _, _ in entries]
+        self.slots = [(day, peak) for _, day, peak in entries]
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def next_slot(self, now):
+        """
+        First slot strictly after `now`
+        
+        Returns:
+            tuple: (day_name, peak_info, datetime), or (None, None, None) if empty
+        """
+        if not self.offsets:
+            return (None, None, None)
+        offset = week_offset(now) + now.second + now.microsecond / 1e6
+        index = bisect.bisect_right(self.offsets, offset)
+        week_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=now.weekday())
+        if index == len(self.offsets):
+            index = 0
+            week_start += timedelta(days=7)
+        day, peak = self.slots[index]
+        return (day, peak, week_start + timedelta(seconds=self.offsets[index]))
+    
+    def nearest_slot(self, now, tolerance_minutes):
+        """
+        Slot within `tolerance_minutes` of `now` (closest one), or None
+        
+        Only the two slots around `now` can be closest, so this looks at just those.
+        """
+        if not self.offsets:
+            return None
+        offset = week_offset(now)
+        index = bisect.bisect_left(self.offsets, offset)
+        best = None
+        for candidate in (index - 1, index):
+            candidate %= len(self.offsets)
+            distance = abs(self.offsets[candidate] - offset)
+            distance = min(distance, WEEK_SECONDS - distance)
+            if distance <= tolerance_minutes * 60 and (best is None or distance < best[0]):
+                best = (distance, self.slots[candidate])
+        return best[1] if best else None
+
+
+class HeatmapPeaks:
+    """
+    Peak slots derived from InstagramAnalytics' engagement heatmap
+    
+    Average engagement per hour (`engagement_by_time`) picks the top hours; a
+    day's average (`engagement_by_day`) against the overall one decides how
+    strong that day's slots are. Bucket averages are cached and re-read one
+    bucket at a time as analytics record posts.
+    """
+    
+    def __init__(self, analytics, slots_per_day=None, min_samples=None):
+        """
+        Args:
+            analytics: InstagramAnalytics whose heatmap to read
+            slots_per_day: Peak slots per day (default Config.PEAK_SLOTS_PER_DAY)
+            min_samples: Posts an hour or day needs before it counts (default Config.PEAK_MIN_SAMPLES)
+        """
+        self.analytics = analytics
+        self.slots_per_day = slots_per_day or Config.PEAK_SLOTS_PER_DAY
+        self.min_samples = min_samples or Config.PEAK_MIN_SAMPLES
+        self.hours = {}  # hour -> (total engagement, posts)
+        self.days = {}   # day name -> (total engagement, posts)
+        for hour_key in list(analytics.data['engagement_by_time']):
+            self.update(hour_key=hour_key)
+        for day_key in list(analytics.data['engagement_by_day']):
+            self.update(day_key=day_key)
+    
+    def update(self, hour_key=None, day_key=None):
+        """Re-read the heatmap buckets that changed"""
+        if hour_key is not None:
+            bucket = self.analytics.data['engagement_by_time'].get(hour_key)
+            if bucket:
+                self.hours[int(hour_key)] = (bucket['likes'] + bucket['comments'], bucket['count'])
+        if day_key is not None:
+            bucket = self.analytics.data['engagement_by_day'].get(day_key)
+            if bucket:
+                self.days[day_key] = (bucket['likes'] + bucket['comments'], bucket['count'])
+    
+    def peak_times(self):
+        """
+        Returns:
+            dict: {day name: [peak slot dicts, best first]} like PEAK_TIMES, or
+                  None while fewer than `slots_per_day` hours have enough posts
+        """
+        averages = {
+            hour: total / count
+            for hour, (total, count) in self.hours.items()
+            if count >= self.min_samples
+        }
+        if len(averages) < self.slots_per_day:
+            return None
+        top_hours = sorted(averages, key=lambda hour: (-averages[hour], hour))[:self.slots_per_day]
+        
+        total = sum(total for total, _ in self.hours.values())
+        count = sum(count for _, count in self.hours.values())
+        overall = total / count
+        
+        peak_times = {}
+        for day in DAYS:
+            day_total, day_count = self.days.get(day, (0, 0))
+            day_factor = day_total / day_count / overall if day_count >= self.min_samples and overall else 1.0
+            peak_times[day] = [
+                {
+                    'hour': hour,
+                    'minute': 0,
+                    'engagement_level': 'very_high' if averages[hour] * day_factor >= VERY_HIGH_RATIO * overall else 'high',
+                    'reason': f"Your #{rank} engagement hour",
+                }
+                for rank, hour in enumerate(top_hours, 1)
+            ]
+        return peak_times
 
 
 class EngagementScheduler:
@@ -17,7 +171,8 @@ class EngagementScheduler:
     - Saturday-Sunday: 9 AM - 11 AM (morning browsing)
     """
     
-    # Peak engagement times for each day (24-hour format)
+    # Peak engagement times for each day (24-hour format) - used until
+    # use_analytics() has enough of the account's own history
     PEAK_TIMES = {
         'Monday': [
             {'hour': 11, 'minute': 0, 'engagement_level': 'high', 'reason': 'Late morning break'},
@@ -49,6 +204,59 @@ class EngagementScheduler:
         ]
     }
     
+    _heatmap = None    # HeatmapPeaks while analytics are attached
+    _derived = None    # Peak table derived from the heatmap (None = not enough data)
+    _timeline = None   # WeeklyTimeline of the active table, compiled on first use
+    
+    @classmethod
+    def use_analytics(cls, analytics, slots_per_day=None, min_samples=None):
+        """
+        Derive peak slots from an InstagramAnalytics heatmap
+        
+        The schedule follows the analytics as they record posts. Until enough
+        posts are recorded the built-in PEAK_TIMES stay in use.
+        
+        Args:
+            analytics: InstagramAnalytics, or None to go back to PEAK_TIMES
+            slots_per_day: Peak slots per day (default Config.PEAK_SLOTS_PER_DAY)
+            min_samples: Posts an hour needs before it counts (default Config.PEAK_MIN_SAMPLES)
+        """
+        if analytics is None:
+            cls._heatmap = cls._derived = None
+        else:
+            cls._heatmap = HeatmapPeaks(analytics, slots_per_day, min_samples)
+            cls._derived = cls._heatmap.peak_times()
+            analytics.add_listener(cls._on_engagement)
+        cls._timeline = None
+    
+    @classmethod
+    def _on_engagement(cls, analytics, hour_key, day_key):
+        """Analytics listener: refresh the changed buckets, recompile only if the peaks moved"""
+        if cls._heatmap is None or cls._heatmap.analytics is not analytics:
+            return
+        cls._heatmap.update(hour_key, day_key)
+        derived = cls._heatmap.peak_times()
+        if derived != cls._derived:
+            cls._derived = derived
+            cls._timeline = None
+    
+    @classmethod
+    def weekly_peaks(cls):
+        """Peak table in use: derived from analytics, else PEAK_TIMES"""
+        return cls._derived or cls.PEAK_TIMES
+    
+    @classmethod
+    def peak_source(cls):
+        """'analytics' or 'default' - where weekly_peaks() comes from"""
+        return 'analytics' if cls._derived else 'default'
+    
+    @classmethod
+    def timeline(cls):
+        """WeeklyTimeline of weekly_peaks()"""
+        if cls._timeline is None:
+            cls._timeline = WeeklyTimeline(cls.weekly_peaks())
+        return cls._timeline
+    
     @classmethod
     def get_peak_times(cls, day_name):
         """
@@ -60,7 +268,7 @@ class EngagementScheduler:
         Returns:
             list: Peak time slots for the day
         """
-        return cls.PEAK_TIMES.get(day_name, [])
+        return cls.weekly_peaks().get(day_name, [])
     
     @classmethod
     def get_primary_peak_time(cls, day_name):
@@ -87,7 +295,7 @@ class EngagementScheduler:
         Returns:
             dict: Complete schedule for all 7 days
         """
-        return cls.PEAK_TIMES
+        return cls.weekly_peaks()
     
     @classmethod
     def format_time_12h(cls, hour, minute=0):
@@ -108,72 +316,37 @@ class EngagementScheduler:
         return f"{display_hour}:{minute:02d} {period}"
     
     @classmethod
-    def is_peak_time_now(cls, tolerance_minutes=30):
+    def is_peak_time_now(cls, tolerance_minutes=30, clock=None):
         """
         Check if current time is within peak engagement window
         
         Args:
             tolerance_minutes: Minutes before/after peak time to consider as peak
+            clock: Clock to read the current time from (default: real time)
             
         Returns:
             tuple: (is_peak, day_name, peak_info)
         """
-        now = datetime.now()
+        now = (clock or SYSTEM_CLOCK).now()
         day_name = now.strftime('%A')
-        current_hour = now.hour
-        current_minute = now.minute
-        
-        peaks = cls.get_peak_times(day_name)
-        for peak in peaks:
-            peak_hour = peak['hour']
-            peak_minute = peak['minute']
-            
-            # Calculate difference in minutes
-            time_diff = abs((current_hour * 60 + current_minute) - (peak_hour * 60 + peak_minute))
-            
-            if time_diff <= tolerance_minutes:
-                return (True, day_name, peak)
-        
+        slot = cls.timeline().nearest_slot(now, tolerance_minutes)
+        if slot:
+            return (True, day_name, slot[1])
         return (False, day_name, None)
     
     @classmethod
-    def get_next_peak_time(cls):
+    def get_next_peak_time(cls, clock=None):
         """
         Get the next upcoming peak time
         
+        Args:
+            clock: Clock to read the current time from (default: real time)
+        
         Returns:
-            tuple: (day_name, peak_info, datetime_object)
+            tuple: (day_name, peak_info, datetime_object) - audience wall time
         """
-        now = datetime.now()
-        current_day = now.strftime('%A')
-        
-        # Days of week in order
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        current_day_idx = days.index(current_day)
-        
-        # Check remaining peaks today
-        today_peaks = cls.get_peak_times(current_day)
-        for peak in today_peaks:
-            peak_time = now.replace(hour=peak['hour'], minute=peak['minute'], second=0, microsecond=0)
-            if peak_time > now:
-                return (current_day, peak, peak_time)
-        
-        # Check next 7 days
-        for i in range(1, 8):
-            next_day_idx = (current_day_idx + i) % 7
-            next_day = days[next_day_idx]
-            peaks = cls.get_peak_times(next_day)
-            if peaks:
-                # Return first peak of that day
-                peak = peaks[0]
-                # Calculate datetime for next occurrence
-                days_ahead = i
-                next_date = now.replace(hour=peak['hour'], minute=peak['minute'], second=0, microsecond=0)
-                from datetime import timedelta
-                next_date = next_date + timedelta(days=days_ahead)
-                return (next_day, peak, next_date)
-        
-        return (None, None, None)
+        now = (clock or SYSTEM_CLOCK).now()
+        return cls.timeline().next_slot(now)
     
     @classmethod
     def print_weekly_schedule(cls):
@@ -181,9 +354,11 @@ class EngagementScheduler:
         print("=" * 80)
         print("INSTAGRAM PEAK ENGAGEMENT TIMES - WEEKLY SCHEDULE")
         print("=" * 80)
+        if cls.peak_source() == 'analytics':
+            print("Derived from your engagement analytics")
         print()
         
-        for day, peaks in cls.PEAK_TIMES.items():
+        for day, peaks in cls.weekly_peaks().items():
             print(f"📅 {day.upper()}")
             print("-" * 80)
             for i, peak in enumerate(peaks, 1):
@@ -212,7 +387,7 @@ class EngagementScheduler:
         """
         schedule = {}
         
-        for day, peaks in cls.PEAK_TIMES.items():
+        for day, peaks in cls.weekly_peaks().items():
             # Use primary peak time for the day
             primary_peak = peaks[0]
             
@@ -274,7 +449,7 @@ if __name__ == "__main__":
     is_peak, day, peak_info = scheduler.is_peak_time_now(tolerance_minutes=60)
     print(f"\n📊 Current Status:")
     print(f"   Day: {day}")
-    print(f"   Time: {datetime.now().strftime('%I:%M %p')}")
+    print(f"   Time: {SYSTEM_CLOCK.now().strftime('%I:%M %p')}")
     print(f"   Is Peak Time: {'Yes 🔥' if is_peak else 'No'}")
     if is_peak:
         print(f"   Peak: {peak_info['reason']}")
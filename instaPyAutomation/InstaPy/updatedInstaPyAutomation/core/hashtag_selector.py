@@ -0,0 +1,180 @@
+"""
+Hashtag Selector
+Picks the hashtags of a scheduled run from every hashtag in core/categories.py,
+favouring the ones that recently produced usable posts fastest
+"""
+import bisect
+import logging
+import math
+import random
+from .categories import POPULAR_CATEGORIES
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# An untried hashtag is assumed to yield one successful action per minute,
+# optimistic enough that every hashtag gets tried early on
+PRIOR_SUCCESSES = 1.0
+PRIOR_MINUTES = 1.0
+
+# Redraws from the table before falling back to rebuilding it without used categories
+MAX_DRAWS = 50
+
+
+def all_hashtags():
+    """
+    Every hashtag with its category, each listed once (under its first category)
+    
+    Returns:
+        list: [(hashtag, category), ...] in catalog order
+    """
+    seen = set()
+    pairs = []
+    for category, info in POPULAR_CATEGORIES.items():
+        for tag in info['hashtags']:
+            if tag not in seen:
+                seen.add(tag)
+                pairs.append((tag, category))
+    return pairs
+
+
+class HashtagSelector:
+    """
+    Multi-armed bandit over hashtags
+    
+    Each hashtag is scored by successful actions (liked or commented posts) per
+    minute over its last HASHTAG_RECENT_RUNS outcomes. That one rate folds in
+    posts found per search, action success rate and time per successful action.
+    Hashtags seen in few runs get a UCB-style exploration bonus, so a hashtag
+    that had one bad run is still retried now and then.
+    
+    The weights are turned into a cumulative table once per selection; each
+    draw is a bisect into it.
+    """
+    
+    def __init__(self, analytics, exploration=None, rng=None):
+        """
+        Args:
+            analytics: InstagramAnalytics holding the hashtag outcomes
+            exploration: Weight of the exploration bonus (default Config.HASHTAG_EXPLORATION)
+            rng: random.Random used for sampling (default: the random module)
+        """
+        self.analytics = analytics
+        self.exploration = Config.HASHTAG_EXPLORATION if exploration is None else exploration
+        self.rng = rng or random
+        self.entries = []
+        self.cumulative = []
+    
+    def stats(self, hashtag):
+        """
+        Recent outcomes of a hashtag, summed
+        
+        An outcome without a search is the rest of an interrupted run's
+        queue: its posts and time count, but not as another run.
+        
+        Returns:
+            dict: runs, searches, found, attempts, successes and seconds
+        """
+        totals = {'runs': 0, 'searches': 0, 'found': 0, 'attempts': 0, 'successes': 0, 'seconds': 0.0}
+        for outcome in self.analytics.get_hashtag_outcomes(hashtag):
+            if outcome.get('searches', 1):
+                totals['runs'] += 1
+            for key in ('searches', 'found', 'attempts', 'successes', 'seconds'):
+                totals[key] += outcome.get(key, 0)
+        return totals
+    
+    def score(self, stats):
+        """Successful actions per minute, smoothed towards the prior"""
+        return (stats['successes'] + PRIOR_SUCCESSES) / (stats['seconds'] / 60 + PRIOR_MINUTES)
+    
+    def weights(self):
+        """
+        Sampling weight of every hashtag
+        
+        Returns:
+            list: [(hashtag, category, weight), ...] in catalog order
+        """
+        pairs = all_hashtags()
+        stats = {tag: self.stats(tag) for tag, _ in pairs}
+        total_runs = sum(s['runs'] for s in stats.values())
+        weighted = []
+        for tag, category in pairs:
+            bonus = self.exploration * math.sqrt(math.log(total_runs + 1) / (stats[tag]['runs'] + 1))
+            weighted.append((tag, category, self.score(stats[tag]) * (1 + bonus)))
+        return weighted
+    
+    def build_table(self, exclude_categories=()):
+        """Precompute the cumulative-weight table sampled by select()"""
+        self.entries = []
+        self.cumulative = []
+        running = 0.0
+        for tag, category, weight in self.weights():
+            if category in exclude_categories or weight <= 0:
+                continue
+            running += weight
+            self.entries.append((tag, category))
+            self.cumulative.append(running)
+    
+    def draw(self):
+        """One weighted draw from the table"""
+        point = self.rng.random() * self.cumulative[-1]
+        index = bisect.bisect_right(self.cumulative, point)
+        return self.entries[min(index, len(self.entries) - 1)]
+    
+    def select(self, count):
+        """
+        Pick hashtags for a run, at most one per category
+        
+        Args:
+            count: Number of hashtags (categories) wanted
+        
+        Returns:
+            list: [(category, hashtag), ...] in draw order
+        """
+        self.build_table()
+        picked = []
+        used = set()
+        count = min(count, len(POPULAR_CATEGORIES))
+        draws = 0
+        while len(picked) < count and self.entries:
+            tag, category = self.draw()
+            draws += 1
+            if category not in used:
+                picked.append((category, tag))
+                used.add(category)
+            elif draws >= MAX_DRAWS:
+                # The favourites keep landing on used categories: drop those from the table
+                self.build_table(exclude_categories=used)
+                draws = 0
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("→ Selected hashtags: %s", ', '.join(f"#{tag}" for _, tag in picked))
+        return picked
+    
+    def record(self, hashtag, searches=0, found=0, attempts=0, successes=0, seconds=0.0):
+        """
+        Store the outcome of working through a hashtag
+        
+        Args:
+            hashtag: Hashtag searched
+            searches: Hashtag searches made (0 when resuming a saved queue)
+            found: Posts the search queued
+            attempts: Posts processed
+            successes: Posts liked or commented
+            seconds: Time spent on the hashtag, search included
+        """
+        self.analytics.record_hashtag_outcome(hashtag, {
+            'searches': searches,
+            'found': found,
+            'attempts': attempts,
+            'successes': successes,
+            'seconds': round(seconds, 1),
+        })
+    
+    def describe(self, hashtag):
+        """Short summary of a hashtag's recent performance"""
+        stats = self.stats(hashtag)
+        if not stats['runs']:
+            return "untried"
+        rate = stats['successes'] / max(stats['seconds'] / 60, 1e-9)
+        return (f"{rate:.1f} successful actions/min, "
+                f"{stats['successes']}/{stats['attempts']} posts engaged over {stats['runs']} runs")
@@ -2,18 +2,35 @@
 Human-like Behavior Simulation
 Adds randomness and natural patterns to actions
 """
+import logging
 import random
-import time
 from selenium.webdriver.common.action_chains import ActionChains
 from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
 
 
 class HumanBehavior:
     """Simulates human-like behavior in browser"""
     
-    def __init__(self, driver):
+    def __init__(self, driver, clock=None, timings=None):
+        """
+        Args:
+            driver: Selenium WebDriver
+            clock: Clock used for every pause (default: real time)
+            timings: Timings that deliberate pauses are reported to (optional)
+        """
         self.driver = driver
         self.actions = ActionChains(driver)
+        self.clock = clock or SYSTEM_CLOCK
+        self.timings = timings
+    
+    def _pause(self, seconds):
+        """Deliberate pause - kept apart from page/network time in the timings"""
+        if self.timings:
+            self.timings.record_delay(seconds)
+        self.clock.sleep(seconds)
     
     def random_delay(self, min_seconds=None, max_seconds=None):
         """Random delay between actions"""
@@ -21,8 +38,8 @@ class HumanBehavior:
         max_sec = max_seconds or Config.MAX_ACTION_DELAY
         
         delay = random.uniform(min_sec, max_sec)
-        print(f"⏳ Waiting {delay:.1f} seconds...")
-        time.sleep(delay)
+        logger.debug("⏳ Waiting %.1f seconds...", delay)
+        self._pause(delay)
     
     def human_type(self, element, text, typing_speed='normal'):
         """Type text with human-like speed variations"""
@@ -36,11 +53,11 @@ class HumanBehavior:
         
         for char in text:
             element.send_keys(char)
-            time.sleep(random.uniform(min_delay, max_delay))
+            self._pause(random.uniform(min_delay, max_delay))
     
     def human_scroll(self, scroll_pause_time=0.5, scrolls=3):
         """Scroll page with human-like patterns"""
-        print("📜 Scrolling page...")
+        logger.debug("📜 Scrolling page...")
         
         for i in range(scrolls):
             # Random scroll amount
@@ -50,13 +67,13 @@ class HumanBehavior:
             self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
             
             # Random pause
-            time.sleep(random.uniform(scroll_pause_time, scroll_pause_time * 2))
+            self._pause(random.uniform(scroll_pause_time, scroll_pause_time * 2))
             
             # Sometimes scroll back up a bit (human-like)
             if random.random() < 0.3:  # 30% chance
                 scroll_back = random.randint(50, 150)
                 self.driver.execute_script(f"window.scrollBy(0, -{scroll_back});")
-                time.sleep(random.uniform(0.2, 0.5))
+                self._pause(random.uniform(0.2, 0.5))
     
     def mouse_move_to_element(self, element):
         """Move mouse to element before clicking"""
@@ -70,9 +87,9 @@ class HumanBehavior:
             ).perform()
             
             # Small pause after movement
-            time.sleep(random.uniform(0.1, 0.3))
+            self._pause(random.uniform(0.1, 0.3))
         except Exception as e:
-            print(f"✗ Mouse movement failed: {e}")
+            logger.warning("✗ Mouse movement failed: %s", e)
     
     def human_click(self, element):
         """Click element with human-like behavior"""
@@ -81,16 +98,16 @@ class HumanBehavior:
             self.mouse_move_to_element(element)
             
             # Small delay before click
-            time.sleep(random.uniform(0.1, 0.3))
+            self._pause(random.uniform(0.1, 0.3))
             
             # Click
             element.click()
             
             # Small delay after click
-            time.sleep(random.uniform(0.2, 0.5))
+            self._pause(random.uniform(0.2, 0.5))
             
         except Exception as e:
-            print(f"✗ Click failed: {e}")
+            logger.warning("✗ Click failed: %s", e)
             raise
     
     def random_page_interaction(self):
@@ -100,11 +117,11 @@ class HumanBehavior:
         if interaction_type == 'scroll':
             self.human_scroll(scrolls=random.randint(1, 2))
         elif interaction_type == 'pause':
-            time.sleep(random.uniform(1, 3))
+            self._pause(random.uniform(1, 3))
         elif interaction_type == 'small_scroll':
             scroll_amount = random.randint(100, 300)
             self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-            time.sleep(random.uniform(0.5, 1.5))
+            self._pause(random.uniform(0.5, 1.5))
     
     def session_break(self):
         """Take a longer break to simulate human session patterns"""
@@ -114,8 +131,8 @@ class HumanBehavior:
         )
         
         minutes = break_time / 60
-        print(f"☕ Taking a {minutes:.1f} minute break (human-like behavior)...")
-        time.sleep(break_time)
+        logger.info("☕ Taking a %.1f minute break (human-like behavior)...", minutes)
+        self._pause(break_time)
     
     def should_take_break(self, actions_count):
         """Determine if bot should take a break"""
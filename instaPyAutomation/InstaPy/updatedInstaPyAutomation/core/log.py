@@ -0,0 +1,146 @@
+"""
+Logging
+Every module logs through its own `logging.getLogger(__name__)`. Records are
+printed to the console as the usual emoji lines (in order with the scripts'
+own output) and put on a queue, from which a background listener writes them
+as JSON lines to a rotating file, so the bot thread never waits on disk
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from .config import Config
+
+
+# Chatty libraries that stay at WARNING even when the bot logs DEBUG
+QUIET_LOGGERS = ('selenium', 'urllib3', 'undetected_chromedriver', 'httpx', 'httpcore')
+
+# LogRecord attributes; anything else on a record came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_console_handler = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Renders the message and traceback in the caller, keeping `extra=` fields"""
+    
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record, `extra=` fields as top-level keys"""
+    
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    The bot's console lines: messages as written, debug lines tagged with their
+    module, and warnings/errors without an emoji marker prefixed with the level
+    """
+    
+    def format(self, record):
+        message = record.getMessage()
+        if record.levelno <= logging.DEBUG:
+            message = f"   [{record.name.rsplit('.', 1)[-1]}] {message.strip()}"
+        elif record.levelno >= logging.WARNING and message.lstrip()[:1].isascii():
+            message = f"{record.levelname}: {message}"
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        return message
+
+
+def parse_level(level):
+    """Level name ('debug', 'INFO', ...) or number as a logging level number"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def setup_logging(level=None, log_file=None, console=True):
+    """
+    Send all logging to the console and, through a queue, to the JSONL log file
+    
+    Calling it again replaces the previous setup.
+    
+    Args:
+        level: Minimum level, name or number (default Config.LOG_LEVEL)
+        log_file: JSON-lines file, rotated at Config.LOG_MAX_BYTES (default Config.LOG_FILE)
+        console: Also write human-readable lines to stdout
+    
+    Returns:
+        QueueListener: The running listener
+    """
+    global _listener, _console_handler
+    stop_logging()
+    level = parse_level(level or Config.LOG_LEVEL)
+    
+    log_file = Path(log_file or Config.LOG_FILE)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT,
+        encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(JsonLineFormatter())
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(_QueueHandler(log_queue))
+    if console:
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setFormatter(ConsoleFormatter())
+        root.addHandler(_console_handler)
+    # Disabled levels stop at the logger's level check, before any formatting
+    root.setLevel(level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(level, logging.WARNING))
+    
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and close the log file"""
+    global _listener, _console_handler
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _QueueHandler) or handler is _console_handler:
+            root.removeHandler(handler)
+    _console_handler = None
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,380 @@
+"""
+Run Metrics
+Prometheus metrics of a run (actions, step latency, vision API, selectors,
+limits, browser health), built at the end of the run from what the run's
+objects already track, written for node-exporter's textfile collector
+"""
+import logging
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from .config import Config
+from .clock import SYSTEM_CLOCK
+from .timing import BUCKET_BOUNDS
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'instagram_bot'
+TEXTFILE_NAME = 'instagram_bot.prom'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Daily limits as (SafetyManager daily key, Config attribute)
+DAILY_LIMITS = {
+    'like': ('likes', 'MAX_LIKES_PER_DAY'),
+    'comment': ('comments', 'MAX_COMMENTS_PER_DAY'),
+    'follow': ('follows', 'MAX_FOLLOWS_PER_DAY'),
+    'unfollow': ('unfollows', 'MAX_UNFOLLOWS_PER_DAY'),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricFamily:
+    """One metric name with its type, help text and samples"""
+    
+    def __init__(self, name, kind, help_text):
+        """
+        Args:
+            name: Metric name without prefix (and without _total for counters)
+            kind: 'counter', 'gauge' or 'histogram'
+            help_text: # HELP line
+        """
+        self.name = f"{PREFIX}_{name}"
+        self.kind = kind
+        self.help_text = help_text
+        self.samples = []
+    
+    @property
+    def exposed_name(self):
+        """Name on the # HELP / # TYPE lines of the Prometheus text format"""
+        return f"{self.name}_total" if self.kind == 'counter' else self.name
+    
+    def add(self, value, **labels):
+        """Add a counter or gauge sample"""
+        suffix = '_total' if self.kind == 'counter' else ''
+        self.samples.append((suffix, labels, value))
+    
+    def add_histogram(self, histogram, **labels):
+        """Add a timing.Histogram as cumulative buckets, sum and count"""
+        cumulative = 0
+        for bound, count in zip(list(BUCKET_BOUNDS) + [float('inf')], histogram.counts):
+            cumulative += count
+            self.samples.append(('_bucket', dict(labels, le=_format_value(float(bound))), cumulative))
+        self.samples.append(('_sum', labels, round(histogram.total, 6)))
+        self.samples.append(('_count', labels, histogram.count))
+    
+    def render(self):
+        """Lines of this family in the Prometheus text format"""
+        lines = [
+            f"# HELP {self.exposed_name} {self.help_text}",
+            f"# TYPE {self.exposed_name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples:
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            label_text = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{self.name}{suffix}{label_text} {_format_value(value)}")
+        return lines
+
+
+def to_openmetrics(text):
+    """
+    Convert Prometheus text exposition to OpenMetrics
+    
+    Counter families drop the _total suffix on their # HELP / # TYPE lines
+    (samples keep it) and the exposition ends with # EOF.
+    """
+    lines = text.rstrip('\n').split('\n') if text.strip() else []
+    counters = set()
+    for line in lines:
+        parts = line.split()
+        if line.startswith('# TYPE ') and len(parts) == 4 and parts[3] == 'counter':
+            counters.add(parts[2])
+    converted = []
+    for line in lines:
+        parts = line.split(' ', 3)
+        if line.startswith(('# HELP ', '# TYPE ')) and parts[2] in counters and parts[2].endswith('_total'):
+            parts[2] = parts[2][:-len('_total')]
+            line = ' '.join(parts)
+        converted.append(line)
+    converted.append('# EOF')
+    return '\n'.join(converted) + '\n'
+
+
+class RunMetrics:
+    """
+    Metric families of one run
+    
+    Everything is read from state the run keeps anyway (Timings histograms,
+    SafetyManager counters, the block monitor's outcome counts, the vision
+    backends, the selector registry, the watchdog and the resource governor),
+    once, when the run ends - nothing is added to the per-action path.
+    """
+    
+    def __init__(self):
+        self.families = {}
+    
+    def family(self, name, kind, help_text):
+        """The family `name`, created on first use"""
+        if name not in self.families:
+            self.families[name] = MetricFamily(name, kind, help_text)
+        return self.families[name]
+    
+    def collect(self, script='run', timings=None, actions=None, safety=None, watchdog=None, governor=None):
+        """
+        Read a finished (or running) run's objects
+        
+        Args:
+            script: Name of the script that ran (label of the run info metric)
+            timings: The run's Timings
+            actions: InstagramActions (block monitor, selectors, vision backends, API quota)
+            safety: SafetyManager (default: the one of `actions`)
+            watchdog: BrowserWatchdog (browser restarts)
+            governor: ResourceGovernor (browser memory and recycles)
+        
+        Returns:
+            RunMetrics: self
+        """
+        self.family('last_run_info', 'gauge', 'Script of the last run').add(1, script=script)
+        self.family('last_run_timestamp_seconds', 'gauge', 'When the metrics of the last run were written').add(
+            round(SYSTEM_CLOCK.utcnow().timestamp(), 3))
+        
+        if timings is not None:
+            self.collect_timings(timings)
+        if actions is not None:
+            self.collect_actions(actions)
+            safety = safety or getattr(actions, 'safety', None)
+        if safety is not None:
+            self.collect_limits(safety)
+        if watchdog is not None:
+            self.family('browser_restarts', 'counter', 'Unplanned browser restarts in the run').add(
+                watchdog.restarts)
+        if governor is not None:
+            self.collect_governor(governor)
+        return self
+    
+    def collect_timings(self, timings):
+        self.family('last_run_start_timestamp_seconds', 'gauge', 'When the last run started').add(
+            round(timings.started_at.timestamp(), 3))
+        steps = self.family('step_seconds', 'histogram', 'Active time per step (page, browser, network)')
+        delays = self.family('delay_seconds', 'histogram', 'Deliberate human-like pauses per step')
+        with timings.lock:
+            for name, histogram in sorted(timings.spans.items()):
+                steps.add_histogram(histogram, step=name)
+            for name, histogram in sorted(timings.delays.items()):
+                delays.add_histogram(histogram, step=name)
+    
+    def collect_actions(self, actions):
+        blocks = getattr(actions, 'blocks', None)
+        if blocks is not None:
+            outcomes = self.family('actions', 'counter', 'Likes and comments by result (confirmed, unconfirmed, blocked)')
+            for (action_type, result), count in sorted(blocks.outcomes.items()):
+                outcomes.add(count, type=action_type, result=result)
+            self.family('action_block_remaining_seconds', 'gauge', 'Seconds left of an action-block backoff').add(
+                round(blocks.remaining(), 1))
+            self.family('action_block_failure_rate', 'gauge', 'EWMA of unconfirmed likes and comments').add(
+                blocks.state['failure_rate'])
+        
+        generator = getattr(actions, 'ai_generator', None)
+        if generator is not None:
+            latency = self.family('vision_request_seconds', 'histogram', 'Vision API request latency')
+            requests = self.family('vision_requests', 'counter', 'Vision API requests')
+            errors = self.family('vision_errors', 'counter', 'Vision API timeouts, errors and empty answers')
+            for backend in generator.vision.backends:
+                if not backend.requires_network:
+                    continue
+                latency.add_histogram(backend.latency, backend=backend.name)
+                requests.add(backend.latency.count, backend=backend.name)
+                errors.add(backend.failures, backend=backend.name)
+            quota = generator.gemini_quota
+            self.family('api_quota_remaining', 'gauge', 'API requests left today').add(
+                quota.remaining(), api=quota.service)
+        
+        selectors = getattr(actions, 'selectors', None)
+        if selectors is not None:
+            self.collect_selectors(selectors)
+    
+    def collect_selectors(self, selectors):
+        lookups = self.family('selector_lookups', 'counter', 'Locator strategy attempts by group and result')
+        miss_ratio = self.family('selector_miss_ratio', 'gauge', 'Share of locator attempts that missed, per group')
+        for group in sorted(selectors.groups):
+            hits = sum(stats['hits'] for stats in selectors.groups[group].values())
+            misses = sum(stats['misses'] for stats in selectors.groups[group].values())
+            lookups.add(hits, group=group, result='hit')
+            lookups.add(misses, group=group, result='miss')
+            if hits + misses:
+                miss_ratio.add(round(misses / (hits + misses), 4), group=group)
+    
+    def collect_limits(self, safety):
+        limit = self.family('limit', 'gauge', 'Configured safety limit')
+        used = self.family('limit_used', 'gauge', 'Actions counted against the safety limit')
+        headroom = self.family('limit_headroom', 'gauge', 'Actions left before the safety limit')
+        daily = safety.stats['daily']
+        for action_type, (key, setting) in DAILY_LIMITS.items():
+            maximum = getattr(Config, setting)
+            count = daily.get(key, 0)
+            limit.add(maximum, limit=f"{action_type}_daily")
+            used.add(count, limit=f"{action_type}_daily")
+            headroom.add(max(0, maximum - count), limit=f"{action_type}_daily")
+        hourly = safety.stats['hourly'].get('actions', 0)
+        limit.add(Config.MAX_ACTIONS_PER_HOUR, limit='actions_hourly')
+        used.add(hourly, limit='actions_hourly')
+        headroom.add(max(0, Config.MAX_ACTIONS_PER_HOUR - hourly), limit='actions_hourly')
+    
+    def collect_governor(self, governor):
+        peak = self.family('browser_memory_peak_bytes', 'gauge', 'Peak browser memory seen in the run')
+        mean = self.family('browser_memory_mean_bytes', 'gauge', 'Mean browser memory over the run')
+        for kind, stats in (('rss', governor.rss), ('js_heap', governor.js_heap)):
+            if stats.count:
+                peak.add(int(stats.peak * 1024 * 1024), kind=kind)
+                mean.add(int(stats.mean * 1024 * 1024), kind=kind)
+        recycles = self.family('browser_recycles', 'counter', 'Memory-triggered tab and browser recycles')
+        recycles.add(governor.tab_recycles, kind='tab')
+        recycles.add(governor.browser_recycles, kind='browser')
+    
+    def render(self, openmetrics=False):
+        """
+        Returns:
+            str: All families in the Prometheus text format (or OpenMetrics)
+        """
+        lines = []
+        for family in self.families.values():
+            lines.extend(family.render())
+        text = '\n'.join(lines) + '\n' if lines else ''
+        return to_openmetrics(text) if openmetrics else text
+
+
+def write_textfile(text, directory=None, filename=TEXTFILE_NAME):
+    """
+    Atomically replace `directory`/`filename` with `text`
+    
+    The file is written under a temporary name in the same directory and
+    renamed over the old one, so node-exporter never reads half a file.
+    
+    Returns:
+        Path: The written file, or None on failure
+    """
+    directory = Path(directory or Config.METRICS_TEXTFILE_DIR)
+    path = directory / filename
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+    except Exception as e:
+        logger.error("✗ Failed to write metrics: %s", e)
+        return None
+
+
+def write_run_metrics(script, directory=None, **sources):
+    """
+    Collect a run's metrics and write them to the textfile directory
+    
+    Args:
+        script: Name of the script that ran
+        directory: Textfile directory (default Config.METRICS_TEXTFILE_DIR)
+        **sources: timings, actions, safety, watchdog, governor (see RunMetrics.collect)
+    
+    Returns:
+        Path: The written file, or None when disabled or on failure
+    """
+    if not Config.METRICS_ENABLED:
+        return None
+    try:
+        text = RunMetrics().collect(script, **sources).render()
+    except Exception as e:
+        logger.error("✗ Failed to collect metrics: %s", e)
+        return None
+    path = write_textfile(text, directory)
+    if path:
+        logger.info("📈 Metrics written to %s", path)
+    return path
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving /metrics from a callable
+    
+    Answers in OpenMetrics when the scraper asks for it (Accept header),
+    otherwise in the Prometheus text format.
+    """
+    
+    def __init__(self, source, host=None, port=None):
+        """
+        Args:
+            source: Callable returning the current Prometheus text
+            host: Interface to bind (default Config.METRICS_HOST)
+            port: Port (default Config.METRICS_PORT, 0 = any free port)
+        """
+        self.source = source
+        self.host = host or Config.METRICS_HOST
+        self.port = Config.METRICS_PORT if port is None else port
+        self.httpd = None
+        self.thread = None
+    
+    def handler(self):
+        source = self.source
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                try:
+                    text = source()
+                except Exception as e:
+                    logger.error("✗ Failed to read metrics: %s", e)
+                    self.send_error(500)
+                    return
+                if 'application/openmetrics-text' in self.headers.get('Accept', ''):
+                    body, content_type = to_openmetrics(text), OPENMETRICS_CONTENT_TYPE
+                else:
+                    body, content_type = text, PROMETHEUS_CONTENT_TYPE
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug("metrics %s - %s", self.address_string(), format % args)
+        
+        return Handler
+    
+    def start(self):
+        """Serve in a background thread; returns the bound port"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.handler())
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+        self.thread.start()
+        logger.info("📈 Serving metrics on http://%s:%s/metrics", self.host, self.port)
+        return self.port
+    
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
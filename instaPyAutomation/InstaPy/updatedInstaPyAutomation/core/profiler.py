@@ -0,0 +1,262 @@
+"""
+Run Profiler
+Opt-in cProfile and tracemalloc per timing span (--profile / PROFILE=True),
+for finding out afterwards why a run was slow or memory-hungry
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Time spent while no span is open is profiled under this name
+OUTSIDE_SPANS = 'outside spans'
+
+
+def short_location(key):
+    """pstats key (file, line, function) -> 'dir/file.py:12(function)'"""
+    filename, line, function = key
+    if filename == '~':
+        return function
+    parts = Path(filename).parts
+    return f"{'/'.join(parts[-2:])}:{line}({function})"
+
+
+def start_profiler(enabled=False):
+    """
+    Started RunProfiler when `enabled` (--profile) or Config.PROFILE is set
+    
+    Returns:
+        RunProfiler or None
+    """
+    if not (enabled or Config.PROFILE):
+        return None
+    profiler = RunProfiler()
+    profiler.start()
+    return profiler
+
+
+class RunProfiler:
+    """
+    cProfile and tracemalloc, split by Timings span
+    
+    Attached to a Timings, every span gets its own cProfile.Profile; only the
+    innermost open span is profiled at any time, so a function's time counts
+    against the step that was really running. Each span also records its net
+    and peak allocated memory and, from tracemalloc snapshots taken when it
+    opens and closes, the source lines that allocated the most.
+    
+    While a span is open the thread is renamed '<thread> [<span>]', which
+    `py-spy dump` shows next to the stack of a live process.
+    
+    Only spans of the thread that created the profiler are profiled. Timings
+    of a profiled run include the profiler's own overhead.
+    """
+    
+    def __init__(self, top_n=None, trace_frames=None):
+        """
+        Args:
+            top_n: Functions / allocation sites kept per span (default Config.PROFILE_TOP_N)
+            trace_frames: Stack frames tracemalloc keeps per allocation (default Config.PROFILE_TRACE_FRAMES)
+        """
+        self.top_n = top_n or Config.PROFILE_TOP_N
+        self.trace_frames = trace_frames or Config.PROFILE_TRACE_FRAMES
+        self.thread = threading.current_thread()
+        self.thread_name = self.thread.name
+        self.profiles = {}
+        self.memory = {}
+        self.stack = []
+        self.running = False
+        self.owns_tracemalloc = False
+    
+    def _profile(self, name):
+        if name not in self.profiles:
+            self.profiles[name] = cProfile.Profile()
+        return self.profiles[name]
+    
+    def _active(self):
+        return self.stack[-1]['name'] if self.stack else OUTSIDE_SPANS
+    
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+    
+    def start(self):
+        """Start profiling (outside any span until one opens)"""
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.owns_tracemalloc = True
+        self.running = True
+        self._profile(OUTSIDE_SPANS).enable()
+        logger.info("🔬 Profiling enabled (cProfile + tracemalloc per step)")
+    
+    def stop(self):
+        """Stop profiling; the collected stats stay available"""
+        if not self.running:
+            return
+        self._profile(self._active()).disable()
+        self.running = False
+        self.thread.name = self.thread_name
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+            self.owns_tracemalloc = False
+    
+    def enter(self, name):
+        """Span `name` opened (called by Timings.span)"""
+        if not self.running or threading.current_thread() is not self.thread:
+            return
+        self._profile(self._active()).disable()
+        
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        self.stack.append({'name': name, 'start': current, 'peak': current, 'snapshot': self._snapshot()})
+        
+        self.thread.name = f"{self.thread_name} [{name}]"
+        self._profile(name).enable()
+    
+    def exit(self, name):
+        """Span `name` closed (called by Timings.span)"""
+        if not self.running or threading.current_thread() is not self.thread:
+            return
+        if not self.stack or self.stack[-1]['name'] != name:
+            return
+        self._profile(name).disable()
+        
+        frame = self.stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        frame['peak'] = max(frame['peak'], peak)
+        stats = self.memory.setdefault(name, {'count': 0, 'net_bytes': 0, 'peak_bytes': 0, 'sites': Counter()})
+        stats['count'] += 1
+        stats['net_bytes'] += current - frame['start']
+        stats['peak_bytes'] = max(stats['peak_bytes'], frame['peak'] - frame['start'])
+        for diff in self._snapshot().compare_to(frame['snapshot'], 'lineno')[:self.top_n]:
+            if diff.size_diff > 0:
+                site = diff.traceback[0]
+                stats['sites'][f"{'/'.join(Path(site.filename).parts[-2:])}:{site.lineno}"] += diff.size_diff
+        if self.stack:
+            self.stack[-1]['peak'] = max(self.stack[-1]['peak'], frame['peak'])
+        tracemalloc.reset_peak()
+        
+        self.thread.name = f"{self.thread_name} [{self._active()}]" if self.stack else self.thread_name
+        self._profile(self._active()).enable()
+    
+    def span_stats(self):
+        """
+        Per-span stats; stops profiling first
+        
+        Returns:
+            dict: Span name -> pstats.Stats, for spans that recorded anything
+        """
+        self.stop()
+        result = {}
+        for name, profile in self.profiles.items():
+            profile.create_stats()
+            if profile.stats:
+                result[name] = pstats.Stats(profile)
+        return result
+    
+    def top_functions(self, stats, limit=None):
+        """
+        Hottest functions of a pstats.Stats by own time
+        
+        Returns:
+            list: [{'function', 'calls', 'own_seconds', 'cumulative_seconds'}, ...]
+        """
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                'function': short_location(key),
+                'calls': calls,
+                'own_seconds': round(own, 6),
+                'cumulative_seconds': round(cumulative, 6),
+            }
+            for key, (_, calls, own, cumulative, _) in rows[:limit or self.top_n]
+        ]
+    
+    def to_dict(self):
+        spans = {}
+        for name, stats in self.span_stats().items():
+            spans[name] = {'own_seconds': round(stats.total_tt, 6), 'top_functions': self.top_functions(stats)}
+        for name, memory in self.memory.items():
+            spans.setdefault(name, {})['memory'] = {
+                'count': memory['count'],
+                'net_kb': round(memory['net_bytes'] / 1024, 1),
+                'peak_kb': round(memory['peak_bytes'] / 1024, 1),
+                'top_allocations': [
+                    {'line': line, 'kb': round(size / 1024, 1)}
+                    for line, size in memory['sites'].most_common(self.top_n)
+                ],
+            }
+        return {'top_n': self.top_n, 'spans': spans}
+    
+    def save(self, directory, stem):
+        """
+        Write `stem`.json (per-span summary) and `stem`.prof (all spans merged,
+        for pstats / snakeviz) into `directory`
+        
+        Returns:
+            Path: The JSON summary, or None on failure
+        """
+        directory = Path(directory)
+        path = directory / f"{stem}.json"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            merged = None
+            for stats in self.span_stats().values():
+                if merged is None:
+                    merged = stats
+                else:
+                    merged.add(stats)
+            if merged is not None:
+                merged.dump_stats(os.fspath(directory / f"{stem}.prof"))
+            logger.info("🔬 Profile saved: %s", path)
+            return path
+        except Exception as e:
+            logger.error("✗ Failed to save profile: %s", e)
+            return None
+    
+    def print_summary(self, limit=10):
+        """Print the hottest functions and allocation sites of the run"""
+        span_stats = self.span_stats()
+        if not span_stats:
+            return
+        merged = Counter()
+        calls = Counter()
+        for stats in span_stats.values():
+            for key, (_, ncalls, own, _, _) in stats.stats.items():
+                merged[key] += own
+                calls[key] += ncalls
+        
+        print("\n🔬 Hot paths (own time, all steps)")
+        for key, own in merged.most_common(limit):
+            print(f"   {own:8.3f}s  {calls[key]:>8} calls  {short_location(key)}")
+        
+        print("\n🔬 Slowest steps by profiled time")
+        slowest = sorted(span_stats.items(), key=lambda item: item[1].total_tt, reverse=True)
+        for name, stats in slowest[:5]:
+            hottest = self.top_functions(stats, 1)
+            where = f" - mostly {hottest[0]['function']}" if hottest else ''
+            print(f"   {name:<22} {stats.total_tt:8.3f}s{where}")
+        
+        sites = Counter()
+        for memory in self.memory.values():
+            sites.update(memory['sites'])
+        if sites:
+            print("\n🔬 Top allocation sites (KB allocated during steps)")
+            for line, size in sites.most_common(5):
+                print(f"   {size / 1024:10.1f} KB  {line}")
@@ -0,0 +1,184 @@
+"""
+API Quota Tracker
+Counts vision API requests and tokens per day and plans usage across runs
+"""
+import json
+import os
+import threading
+from datetime import timedelta
+import logging
+from .config import Config
+from .clock import SYSTEM_CLOCK
+from .engagement_scheduler import EngagementScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaTracker:
+    """
+    Persisted per-day request/token counter for one API
+    
+    Once the daily quota is used up (or the API answers 429) every further
+    call is refused locally, so posts fall straight through to the next
+    vision backend instead of paying a failed round trip each time.
+    
+    Vision worker threads share one tracker, so counters change and the
+    file is written under a lock.
+    """
+    
+    def __init__(self, service='gemini', daily_limit=None, quota_file=None, clock=None):
+        """
+        Args:
+            service: API name used as key in the quota file
+            daily_limit: Requests per day (default Config.GEMINI_DAILY_QUOTA)
+            quota_file: Path of the JSON state file (default data/api_quota.json)
+            clock: Clock deciding the day rollover (default: real time)
+        """
+        self.service = service
+        self.clock = clock or SYSTEM_CLOCK
+        self.daily_limit = daily_limit if daily_limit is not None else Config.GEMINI_DAILY_QUOTA
+        self.quota_file = quota_file or Config.DATA_DIR / 'api_quota.json'
+        self.slot_budget = None  # Requests allowed for the current run, if planned
+        self.slot_used = 0
+        # Reentrant: record_request() and friends save while holding it
+        self.lock = threading.RLock()
+        self.state = self.load_state()
+        self.reset_if_new_day()
+    
+    def load_state(self):
+        """Load counters from file"""
+        if self.quota_file.exists():
+            try:
+                with open(self.quota_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error("✗ Failed to load API quota state: %s", e)
+        
+        return {'date': self.clock.now().strftime('%Y-%m-%d'), 'services': {}}
+    
+    def save_state(self):
+        """Save counters to file atomically (a crash mid-write keeps the old counters)"""
+        with self.lock:
+            try:
+                self.quota_file.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.quota_file.with_suffix('.tmp')
+                with open(temp_file, 'w') as f:
+                    json.dump(self.state, f, indent=2)
+                os.replace(temp_file, self.quota_file)
+            except Exception as e:
+                logger.error("✗ Failed to save API quota state: %s", e)
+    
+    def reset_if_new_day(self):
+        """Start fresh counters when the date changes"""
+        today = self.clock.now().strftime('%Y-%m-%d')
+        with self.lock:
+            if self.state.get('date') != today:
+                self.state = {'date': today, 'services': {}}
+                self.save_state()
+    
+    @property
+    def usage(self):
+        """Today's counters for this service"""
+        return self.state['services'].setdefault(
+            self.service, {'requests': 0, 'tokens': 0, 'exhausted': False}
+        )
+    
+    def remaining(self):
+        """Requests left today"""
+        self.reset_if_new_day()
+        if self.usage['exhausted']:
+            return 0
+        return max(0, self.daily_limit - self.usage['requests'])
+    
+    def can_request(self):
+        """Check whether a request fits today's quota and this run's share"""
+        if self.remaining() <= 0:
+            return False
+        if self.slot_budget is not None and self.slot_used >= self.slot_budget:
+            return False
+        return True
+    
+    def record_request(self, tokens=0):
+        """
+        Count one request (successful or not - both use quota)
+        
+        Args:
+            tokens: Total tokens reported by the API (usageMetadata)
+        """
+        with self.lock:
+            self.reset_if_new_day()
+            self.usage['requests'] += 1
+            self.usage['tokens'] += tokens or 0
+            self.slot_used += 1
+            self.save_state()
+    
+    def record_tokens(self, tokens):
+        """Add the tokens a request already counted by record_request() reported"""
+        if not tokens:
+            return
+        with self.lock:
+            self.reset_if_new_day()
+            self.usage['tokens'] += tokens
+            self.save_state()
+    
+    def mark_exhausted(self):
+        """API said the quota is gone (HTTP 429) - stop asking until tomorrow"""
+        with self.lock:
+            self.reset_if_new_day()
+            if not self.usage['exhausted']:
+                logger.warning("⚠️  %s daily quota exhausted - using fallback until tomorrow", self.service)
+            self.usage['exhausted'] = True
+            self.save_state()
+    
+    def remaining_slots_today(self, now=None, tolerance_minutes=60):
+        """
+        Scheduled engagement slots that have not finished yet today
+        
+        Args:
+            now: Current time (default: the tracker's clock)
+            tolerance_minutes: A slot still counts while this long after its start
+        
+        Returns:
+            list: Peak slot dicts from EngagementScheduler, in time order
+        """
+        now = now or self.clock.now()
+        day_name = now.strftime('%A')
+        slots = sorted(
+            EngagementScheduler.get_peak_times(day_name),
+            key=lambda p: (p['hour'], p['minute'])
+        )
+        remaining = []
+        for slot in slots:
+            slot_time = now.replace(hour=slot['hour'], minute=slot['minute'], second=0, microsecond=0)
+            if slot_time + timedelta(minutes=tolerance_minutes) >= now:
+                remaining.append(slot)
+        return remaining
+    
+    def plan_day(self, now=None):
+        """
+        Spread the remaining quota evenly over today's remaining slots
+        
+        Returns:
+            list: [(slot, allowance), ...] - allowances sum to remaining()
+        """
+        slots = self.remaining_slots_today(now)
+        if not slots:
+            return []
+        left = self.remaining()
+        share, extra = divmod(left, len(slots))
+        # Earlier slots get the rounding remainder
+        return [(slot, share + (1 if i < extra else 0)) for i, slot in enumerate(slots)]
+    
+    def allocate_current_slot(self, now=None):
+        """
+        Reserve this run's share of the remaining quota
+        
+        Off-schedule runs (no slots left today) may use everything that is left.
+        
+        Returns:
+            int: Requests this run may make
+        """
+        plan = self.plan_day(now)
+        self.slot_budget = plan[0][1] if plan else self.remaining()
+        self.slot_used = 0
+        return self.slot_budget
@@ -0,0 +1,218 @@
+"""
+Resource Governor
+Keeps Chrome's memory in check on small VMs: samples the browser's RSS and
+the page's JS heap between posts and recycles the tab or the whole browser
+before the OOM killer does
+"""
+import json
+import logging
+from pathlib import Path
+import psutil
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+
+MB = 1024 * 1024
+
+# Extra Chrome flags per BROWSER_MEMORY_PROFILE
+MEMORY_PROFILES = {
+    'standard': [],
+    'small-vm': [
+        '--renderer-process-limit=2',
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-component-update',
+        '--disable-default-apps',
+        '--disable-sync',
+        '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication',
+        '--js-flags=--max-old-space-size=256',
+        '--disk-cache-size=52428800',
+    ],
+}
+
+
+def memory_profile_flags(profile=None):
+    """Chrome flags of a memory profile (unknown profiles add none)"""
+    profile = profile or Config.BROWSER_MEMORY_PROFILE
+    if profile not in MEMORY_PROFILES:
+        logger.warning("⚠️  Unknown browser memory profile '%s', using 'standard'", profile)
+    return MEMORY_PROFILES.get(profile, [])
+
+
+class MemoryStats:
+    """Running peak/average of one measurement"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.peak = 0.0
+    
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.peak = max(self.peak, value)
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+    
+    def to_dict(self):
+        return {'samples': self.count, 'peak_mb': round(self.peak, 1), 'avg_mb': round(self.mean, 1)}
+
+
+class ResourceGovernor:
+    """
+    Memory sampling and recycling at safe points
+    
+    Call `check()` between posts. Browser RSS (Chrome and all its child
+    processes, via psutil) above BROWSER_MEMORY_LIMIT_MB restarts the browser
+    through the watchdog; a JS heap (`performance.memory`) above
+    TAB_MEMORY_LIMIT_MB only swaps the tab for a fresh one.
+    """
+    
+    def __init__(self, browser_manager, watchdog=None, clock=None,
+                 browser_limit_mb=None, tab_limit_mb=None):
+        """
+        Args:
+            browser_manager: BrowserManager that owns the driver
+            watchdog: BrowserWatchdog used for browser recycles (without one,
+                      an over-limit browser only gets a fresh tab)
+            clock: Clock for run timestamps (default: real time)
+            browser_limit_mb: RSS limit of the whole browser (default from Config)
+            tab_limit_mb: JS heap limit of the page (default from Config)
+        """
+        self.browser_manager = browser_manager
+        self.watchdog = watchdog
+        self.clock = clock or SYSTEM_CLOCK
+        self.browser_limit_mb = browser_limit_mb or Config.BROWSER_MEMORY_LIMIT_MB
+        self.tab_limit_mb = tab_limit_mb or Config.TAB_MEMORY_LIMIT_MB
+        self.rss = MemoryStats()
+        self.js_heap = MemoryStats()
+        self.tab_recycles = 0
+        self.browser_recycles = 0
+        self.started_at = self.clock.utcnow()
+    
+    def browser_processes(self):
+        """Chrome's root process and all its children"""
+        driver = self.browser_manager.driver
+        pid = getattr(driver, 'browser_pid', None)
+        if pid is None:
+            # Plain Selenium: chromedriver is the parent of Chrome
+            service = getattr(driver, 'service', None)
+            process = getattr(service, 'process', None)
+            pid = getattr(process, 'pid', None)
+        if pid is None:
+            return []
+        try:
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+    
+    def browser_rss_mb(self):
+        """Resident memory of the browser's process tree in MB (None if unknown)"""
+        processes = self.browser_processes()
+        if not processes:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue  # Exited between listing and reading
+        return total / MB
+    
+    def js_heap_mb(self):
+        """Used JS heap of the current page in MB (None where unsupported)"""
+        try:
+            used = self.browser_manager.driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;"
+            )
+        except Exception:
+            return None
+        return used / MB if used else None
+    
+    def sample(self):
+        """
+        Measure once
+        
+        Returns:
+            tuple: (browser RSS MB, JS heap MB), either None if unavailable
+        """
+        rss = self.browser_rss_mb()
+        heap = self.js_heap_mb()
+        if rss is not None:
+            self.rss.observe(rss)
+        if heap is not None:
+            self.js_heap.observe(heap)
+        return rss, heap
+    
+    def check(self):
+        """
+        Sample and recycle if a limit is crossed - only call between posts
+        
+        Returns:
+            str: 'browser', 'tab' or None (what was recycled)
+        """
+        rss, heap = self.sample()
+        if rss is not None and rss > self.browser_limit_mb:
+            logger.info("🧠 Browser using %.0f MB (limit %.0f MB)", rss, self.browser_limit_mb)
+            if self.watchdog:
+                self.watchdog.restart(planned=True)
+                self.browser_recycles += 1
+                return 'browser'
+            return self.recycle_tab()
+        if heap is not None and heap > self.tab_limit_mb:
+            logger.info("🧠 Page JS heap at %.0f MB (limit %.0f MB)", heap, self.tab_limit_mb)
+            return self.recycle_tab()
+        return None
+    
+    def recycle_tab(self):
+        """Replace every open tab with one fresh tab (cookies and login survive)"""
+        driver = self.browser_manager.driver
+        try:
+            old_handles = list(driver.window_handles)
+            driver.switch_to.new_window('tab')
+            fresh = driver.current_window_handle
+            for handle in old_handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            driver.get(Config.BASE_URL)
+        except Exception as e:
+            logger.error("✗ Tab recycle failed: %s", e)
+            return None
+        self.tab_recycles += 1
+        logger.info("♻️  Recycled the browser tab")
+        return 'tab'
+    
+    def summary(self):
+        return {
+            'started_at': self.started_at.isoformat(),
+            'ended_at': self.clock.utcnow().isoformat(),
+            'profile': Config.BROWSER_MEMORY_PROFILE,
+            'browser_rss': self.rss.to_dict(),
+            'js_heap': self.js_heap.to_dict(),
+            'tab_recycles': self.tab_recycles,
+            'browser_recycles': self.browser_recycles,
+        }
+    
+    def print_summary(self):
+        """Print this run's memory use"""
+        if not self.rss.count and not self.js_heap.count:
+            return
+        print(f"\n🧠 Memory: browser peak {self.rss.peak:.0f} MB / avg {self.rss.mean:.0f} MB, "
+              f"JS heap peak {self.js_heap.peak:.0f} MB / avg {self.js_heap.mean:.0f} MB, "
+              f"recycled {self.tab_recycles} tab(s) and {self.browser_recycles} browser(s)")
+    
+    def save(self, log_file=None):
+        """Append this run's summary to data/resource_usage.jsonl"""
+        log_file = Path(log_file or Config.DATA_DIR / 'resource_usage.jsonl')
+        try:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(log_file, 'a') as f:
+                f.write(json.dumps(self.summary()) + '\n')
+        except Exception as e:
+            logger.error("✗ Failed to save resource usage: %s", e)
@@ -2,18 +2,38 @@
 Safety Manager
 Tracks actions and enforces rate limits
 """
+import functools
 import json
 from datetime import datetime, timedelta
+import logging
 from pathlib import Path
 from .config import Config
+from .clock import SYSTEM_CLOCK, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_day(text):
+    """Stored 'YYYY-MM-DD' as a date (checked before every action, parsed once)"""
+    return datetime.strptime(text, '%Y-%m-%d').date()
 
 
 class SafetyManager:
     """Manages action counts and enforces safety limits"""
     
-    def __init__(self):
-        self.stats_file = Config.STATS_FILE
-        self.stats = self.load_stats()
+    def __init__(self, stats_file=None, clock=None, persist=True):
+        """
+        Args:
+            stats_file: Path of the JSON statistics file (default Config.STATS_FILE)
+            clock: Clock deciding day/hour rollovers (default: real time)
+            persist: False keeps the counters in memory only, starting from zero
+                     (simulations)
+        """
+        self.stats_file = stats_file or Config.STATS_FILE
+        self.clock = clock or SYSTEM_CLOCK
+        self.persist = persist
+        self.stats = self.load_stats() if persist else self.get_default_stats()
         self.reset_daily_stats_if_needed()
     
     def load_stats(self):
@@ -23,14 +43,14 @@ class SafetyManager:
                 with open(self.stats_file, 'r') as f:
                     return json.load(f)
             except Exception as e:
-                print(f"✗ Failed to load stats: {e}")
+                logger.error("✗ Failed to load stats: %s", e)
         
         return self.get_default_stats()
     
     def get_default_stats(self):
         """Get default statistics structure"""
         return {
-            'last_reset': datetime.now().strftime('%Y-%m-%d'),
+            'last_reset': self.clock.now().strftime('%Y-%m-%d'),
             'daily': {
                 'likes': 0,
                 'follows': 0,
@@ -39,7 +59,7 @@ class SafetyManager:
                 'total_actions': 0
             },
             'hourly': {
-                'last_hour': datetime.now().strftime('%Y-%m-%d %H:00:00'),
+                'last_hour': self.current_hour().isoformat(),
                 'actions': 0
             },
             'session': {
@@ -50,19 +70,21 @@ class SafetyManager:
     
     def save_stats(self):
         """Save statistics to file"""
+        if not self.persist:
+            return
         try:
             with open(self.stats_file, 'w') as f:
                 json.dump(self.stats, f, indent=2)
         except Exception as e:
-            print(f"✗ Failed to save stats: {e}")
+            logger.error("✗ Failed to save stats: %s", e)
     
     def reset_daily_stats_if_needed(self):
         """Reset daily stats if it's a new day"""
-        last_reset = datetime.strptime(self.stats['last_reset'], '%Y-%m-%d').date()
-        today = datetime.now().date()
+        last_reset = _parse_day(self.stats['last_reset'])
+        today = self.clock.now().date()
         
         if today > last_reset:
-            print("🔄 Resetting daily statistics for new day")
+            logger.info("🔄 Resetting daily statistics for new day")
             self.stats['daily'] = {
                 'likes': 0,
                 'follows': 0,
@@ -73,25 +95,32 @@ class SafetyManager:
             self.stats['last_reset'] = today.strftime('%Y-%m-%d')
             self.save_stats()
     
+    def current_hour(self):
+        """
+        Start of the current hourly window, in UTC
+        
+        Counted in UTC so the repeated hour when clocks go back is a window of
+        its own, instead of merging with the first one.
+        """
+        return self.clock.utcnow().replace(minute=0, second=0, microsecond=0)
+    
     def reset_hourly_stats_if_needed(self):
         """Reset hourly stats if it's a new hour"""
-        current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        current_hour = self.current_hour()
         
         # Initialize if missing
         if 'last_hour' not in self.stats['hourly']:
-            self.stats['hourly']['last_hour'] = current_hour.strftime('%Y-%m-%d %H:00:00')
+            self.stats['hourly']['last_hour'] = current_hour.isoformat()
             self.stats['hourly']['actions'] = 0
             self.save_stats()
             return
         
-        last_hour = datetime.strptime(
-            self.stats['hourly']['last_hour'],
-            '%Y-%m-%d %H:00:00'
-        )
+        # Older stats files hold the hour as local wall time
+        last_hour = parse_timestamp(self.stats['hourly']['last_hour'])
         
         if current_hour > last_hour:
             self.stats['hourly'] = {
-                'last_hour': current_hour.strftime('%Y-%m-%d %H:00:00'),
+                'last_hour': current_hour.isoformat(),
                 'actions': 0
             }
             self.save_stats()
@@ -122,12 +151,12 @@ class SafetyManager:
             limit = daily_limits[action_type]
             
             if current_count >= limit:
-                print(f"⚠️  Daily limit reached for {action_type} ({current_count}/{limit})")
+                logger.warning("⚠️  Daily limit reached for %s (%s/%s)", action_type, current_count, limit)
                 return False
         
         # Check hourly limits
         if self.stats['hourly']['actions'] >= Config.MAX_ACTIONS_PER_HOUR:
-            print(f"⚠️  Hourly action limit reached ({Config.MAX_ACTIONS_PER_HOUR})")
+            logger.warning("⚠️  Hourly action limit reached (%s)", Config.MAX_ACTIONS_PER_HOUR)
             return False
         
         return True
@@ -157,7 +186,7 @@ class SafetyManager:
     def start_session(self):
         """Mark session start"""
         self.stats['session'] = {
-            'start_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'start_time': self.clock.utcnow().isoformat(timespec='seconds'),
             'actions': 0
         }
         self.save_stats()
@@ -0,0 +1,173 @@
+"""
+Seen-Post Index
+Remembers which posts the bot already handled, across runs and in bounded
+space, so known posts are skipped before the browser opens them
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+
+# /p/<shortcode>/ and /reel/<shortcode>/ links, absolute or relative
+SHORTCODE_PATTERN = re.compile(r'/(?:p|reel|tv)/([A-Za-z0-9_-]+)')
+
+
+def shortcode_from_href(href):
+    """Post shortcode of a post link, or None for any other link"""
+    match = SHORTCODE_PATTERN.search(href or '')
+    return match.group(1) if match else None
+
+
+def post_url(shortcode):
+    """Canonical URL of a post"""
+    return f"{Config.BASE_URL}/p/{shortcode}/"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+    
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        """
+        Args:
+            capacity: Items it holds at the target error rate
+            error_rate: False-positive rate at capacity
+            bits: Saved bit array (default: empty)
+            count: Items already added to the saved bits
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+    
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], 'little')
+        b = int.from_bytes(digest[8:], 'little') | 1
+        return [(a + i * b) % self.size for i in range(self.hashes)]
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SeenPostIndex:
+    """
+    Persistent "already handled" set of post shortcodes
+    
+    Recent posts are kept exactly (RECENT_SIZE, oldest evicted first); all
+    posts also go into a Bloom filter. When the filter holds `capacity`
+    posts it becomes the previous generation and a fresh one starts, so the
+    index covers the last one to two generations of posts in constant space,
+    wrongly reporting a new post as seen at most about 2 x `error_rate`.
+    """
+    
+    RECENT_SIZE = 2000
+    
+    def __init__(self, index_file=None, capacity=20000, error_rate=0.001, clock=None):
+        """
+        Args:
+            index_file: JSON file (default data/seen_posts.json)
+            capacity: Posts per Bloom filter generation
+            error_rate: False-positive rate of a full generation
+            clock: Clock for the saved timestamp (default: real time)
+        """
+        self.index_file = Path(index_file or Config.DATA_DIR / 'seen_posts.json')
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clock = clock or SYSTEM_CLOCK
+        self.recent = OrderedDict()
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+        self.load()
+    
+    def load(self):
+        """Load the index from file"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            self.recent = OrderedDict.fromkeys(data.get('recent', []))
+            if (data.get('capacity'), data.get('error_rate')) == (self.capacity, self.error_rate):
+                generations = [
+                    BloomFilter(self.capacity, self.error_rate, base64.b64decode(g['bits']), g['count'])
+                    for g in data.get('generations', [])
+                ]
+                if generations:
+                    self.current = generations[0]
+                    self.previous = generations[1] if len(generations) > 1 else None
+            else:
+                # Sizing changed: rebuild from the exact set, older posts are forgotten
+                for shortcode in self.recent:
+                    self.current.add(shortcode)
+        except Exception as e:
+            logger.error("✗ Failed to load seen-post index: %s", e)
+    
+    def save(self):
+        """Save the index to file atomically (a crash mid-write keeps the old index)"""
+        generations = [g for g in (self.current, self.previous) if g is not None]
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.index_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump({
+                    'updated_at': self.clock.utcnow().isoformat(),
+                    'capacity': self.capacity,
+                    'error_rate': self.error_rate,
+                    'generations': [
+                        {'count': g.count, 'bits': base64.b64encode(bytes(g.bits)).decode('ascii')}
+                        for g in generations
+                    ],
+                    'recent': list(self.recent),
+                }, f)
+            os.replace(temp_file, self.index_file)
+        except Exception as e:
+            logger.error("✗ Failed to save seen-post index: %s", e)
+    
+    def __contains__(self, shortcode):
+        return (
+            shortcode in self.recent
+            or shortcode in self.current
+            or (self.previous is not None and shortcode in self.previous)
+        )
+    
+    def __len__(self):
+        """Posts remembered (approximate once generations have rotated)"""
+        return self.current.count + (self.previous.count if self.previous else 0)
+    
+    def add(self, shortcode, save=True):
+        """
+        Mark a post as handled
+        
+        Args:
+            shortcode: Post shortcode
+            save: Write the index to disk right away
+        """
+        if shortcode in self.recent:
+            self.recent.move_to_end(shortcode)
+        else:
+            self.recent[shortcode] = None
+            if len(self.recent) > self.RECENT_SIZE:
+                self.recent.popitem(last=False)
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        if shortcode not in self.current:
+            self.current.add(shortcode)
+        if save:
+            self.save()
@@ -0,0 +1,199 @@
+"""
+Selector Catalog
+Every locator the bot uses, loaded from core/selector_catalog.json so layout
+fixes ship as a data change (and reach a running session without a restart)
+"""
+import json
+import logging
+from pathlib import Path
+from selenium.webdriver.common.by import By
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+
+# Catalog "by" names -> Selenium locator strategies ('js' entries are scripts)
+BY_NAMES = {
+    'xpath': By.XPATH,
+    'css': By.CSS_SELECTOR,
+    'name': By.NAME,
+    'tag': By.TAG_NAME,
+    'js': 'js',
+}
+
+
+class Locator:
+    """One compiled catalog entry"""
+    
+    __slots__ = ('key', 'by', 'value')
+    
+    def __init__(self, key, by, value):
+        self.key = key        # Name used for selector registry stats
+        self.by = by          # Selenium By constant, or 'js'
+        self.value = value    # XPath / CSS / name, or a JS expression
+    
+    @property
+    def locator(self):
+        """(by, value) tuple for find_element / expected_conditions"""
+        return (self.by, self.value)
+    
+    def __repr__(self):
+        return f"Locator({self.key!r})"
+
+
+class SelectorCatalog:
+    """
+    Versioned, precompiled locator lists
+    
+    Each group ('login.button', 'like.selenium', 'post.video', ...) lists its
+    strategies in default order; the selector registry reorders them by hit
+    rate. Lookups return lists built at load time, and XPath groups that are
+    only probed for "anything matches" also get one union expression so a
+    probe costs a single find_elements round trip.
+    """
+    
+    CHECK_INTERVAL = 5  # Seconds between file mtime checks when hot-reloading
+    
+    def __init__(self, path=None, clock=None):
+        """
+        Args:
+            path: Catalog JSON file (default Config.SELECTOR_CATALOG)
+            clock: Clock that throttles mtime checks (default: real time)
+        """
+        self.path = Path(path or Config.SELECTOR_CATALOG)
+        self.clock = clock or SYSTEM_CLOCK
+        self.version = None
+        self.groups = {}
+        self.unions = {}
+        self.texts = {}
+        self.mtime = None
+        self.last_check = None
+        self.load()
+    
+    @staticmethod
+    def compile(data):
+        """
+        Build lookup tables from catalog JSON
+        
+        Returns:
+            tuple: (groups, unions, texts)
+        
+        Raises:
+            ValueError: On a malformed catalog
+        """
+        if not isinstance(data.get('version'), int):
+            raise ValueError("catalog needs an integer 'version'")
+        
+        groups = {}
+        unions = {}
+        for group, entries in data.get('groups', {}).items():
+            locators = []
+            for entry in entries:
+                by = BY_NAMES.get(entry.get('by'))
+                if by is None:
+                    raise ValueError(f"{group}: unknown locator type {entry.get('by')!r}")
+                value = entry.get('value')
+                if isinstance(value, list):
+                    value = '\n'.join(value)
+                if not value:
+                    raise ValueError(f"{group}: entry without a value")
+                locators.append(Locator(entry.get('name') or value, by, value))
+            if not locators:
+                raise ValueError(f"{group}: no locators")
+            groups[group] = locators
+            if all(locator.by == By.XPATH for locator in locators):
+                unions[group] = ' | '.join(f'({locator.value})' for locator in locators)
+        
+        return groups, unions, dict(data.get('texts', {}))
+    
+    def load(self):
+        """
+        (Re)load the catalog file
+        
+        A file that fails to parse keeps the catalog already in memory, so a
+        half-saved edit cannot take down a running bot.
+        
+        Returns:
+            bool: Whether a new catalog was loaded
+        """
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.groups, self.unions, self.texts = self.compile(data)
+        except Exception as e:
+            if not self.groups:
+                raise
+            logger.warning("✗ Keeping selector catalog v%s, reload failed: %s", self.version, e)
+            return False
+        finally:
+            self.last_check = self.clock.monotonic()
+        
+        previous = self.version
+        self.version = data['version']
+        self.mtime = mtime
+        if previous is not None:
+            logger.info("✓ Selector catalog reloaded (v%s → v%s)", previous, self.version)
+        return True
+    
+    def reload_if_changed(self, force=False):
+        """
+        Reload when the file changed on disk (checked at most every CHECK_INTERVAL seconds)
+        
+        Returns:
+            bool: Whether a new catalog was loaded
+        """
+        now = self.clock.monotonic()
+        if not force and self.last_check is not None and now - self.last_check < self.CHECK_INTERVAL:
+            return False
+        self.last_check = now
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+        return self.load()
+    
+    def strategies(self, group):
+        """
+        Returns:
+            list: Locator objects of a group, in default order
+        
+        Raises:
+            KeyError: If the catalog has no such group
+        """
+        return self.groups[group]
+    
+    def union(self, group):
+        """Single XPath matching any locator of an all-XPath group"""
+        return self.unions[group]
+    
+    def text(self, name, default=None):
+        """UI text the bot matches on (e.g. the 'Post' button label)"""
+        return self.texts.get(name, default)
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Shared catalog, loaded on first use
+    
+    With Config.SELECTOR_HOT_RELOAD every call also picks up edits to the
+    catalog file (rate-limited by SelectorCatalog.CHECK_INTERVAL).
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = SelectorCatalog()
+    elif Config.SELECTOR_HOT_RELOAD:
+        _catalog.reload_if_changed()
+    return _catalog
+
+
+def set_catalog(catalog):
+    """Replace the shared catalog (e.g. with one loaded from another file)"""
+    global _catalog
+    _catalog = catalog
@@ -0,0 +1,170 @@
+"""
+Selector Registry
+Hit/miss/latency stats per locator strategy, used to try the strategies that
+currently work first and to spot Instagram layout drift
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from .config import Config
+from .clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorRegistry:
+    """
+    Persisted hit-rate stats for locator strategies
+    
+    Strategies are grouped by what they look for ('like.js', 'comment.textarea',
+    ...). `order()` sorts a group by recent success so a working strategy is
+    tried before ones that would only time out. A strategy that misses
+    STALE_MISSES times in a row is demoted: it is tried last and gets a short
+    wait, until it hits again.
+    
+    Attempts are recorded in memory; flush() writes them out, once per post
+    and at the end of a run.
+    """
+    
+    SCORE_ALPHA = 0.3      # Weight of the newest result in the success score
+    PRIOR_SCORE = 0.5      # Score of a strategy with no history
+    STALE_MISSES = 5       # Misses in a row before a strategy is demoted
+    STALE_TIMEOUT = 1      # Seconds a demoted strategy may wait
+    
+    def __init__(self, stats_file=None, clock=None):
+        """
+        Args:
+            stats_file: Path of the JSON stats file (default data/selector_stats.json)
+            clock: Clock for last-hit/miss timestamps (default: real time)
+        """
+        self.stats_file = Path(stats_file or Config.DATA_DIR / 'selector_stats.json')
+        self.clock = clock or SYSTEM_CLOCK
+        self.groups = self.load_stats()
+        self.dirty = False
+    
+    def load_stats(self):
+        """Load stats from file"""
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, 'r') as f:
+                    return json.load(f).get('groups', {})
+            except Exception as e:
+                logger.error("✗ Failed to load selector stats: %s", e)
+        return {}
+    
+    def save_stats(self):
+        """Save stats to file atomically (a crash mid-write keeps the old stats)"""
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.stats_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump({
+                    'updated_at': self.clock.utcnow().isoformat(),
+                    'groups': self.groups
+                }, f, indent=2)
+            os.replace(temp_file, self.stats_file)
+            self.dirty = False
+        except Exception as e:
+            logger.error("✗ Failed to save selector stats: %s", e)
+    
+    def flush(self):
+        """Save stats recorded since the last save, if any"""
+        if self.dirty:
+            self.save_stats()
+    
+    def get(self, group, key):
+        """Stats for one strategy (None if never tried)"""
+        return self.groups.get(group, {}).get(key)
+    
+    def is_stale(self, group, key):
+        """Whether the strategy has been missing long enough to be demoted"""
+        stats = self.get(group, key)
+        return bool(stats) and stats['misses_in_row'] >= self.STALE_MISSES
+    
+    def order(self, group, strategies, key=None):
+        """
+        Sort strategies so the ones working lately come first
+        
+        Args:
+            group: Strategy group name
+            strategies: Strategies in their default order
+            key: Function giving a strategy's name (default: the strategy itself)
+        
+        Returns:
+            list: Active strategies by success score (ties keep the default
+                  order), then demoted ones
+        """
+        key = key or (lambda strategy: strategy)
+        
+        def rank(indexed):
+            index, strategy = indexed
+            name = key(strategy)
+            stats = self.get(group, name)
+            score = stats['score'] if stats else self.PRIOR_SCORE
+            return (self.is_stale(group, name), -score, index)
+        
+        return [strategy for _, strategy in sorted(enumerate(strategies), key=rank)]
+    
+    def timeout(self, group, key, default):
+        """Wait allowed for a strategy - short once it is demoted"""
+        return min(default, self.STALE_TIMEOUT) if self.is_stale(group, key) else default
+    
+    def record(self, group, key, hit, latency=0.0):
+        """
+        Record one attempt
+        
+        Args:
+            group: Strategy group name
+            key: Strategy name
+            hit: Whether the strategy found (and worked on) its element
+            latency: Seconds the attempt took
+        """
+        stats = self.groups.setdefault(group, {}).setdefault(key, {
+            'hits': 0,
+            'misses': 0,
+            'misses_in_row': 0,
+            'score': self.PRIOR_SCORE,
+            'avg_latency': 0.0,
+            'last_hit': None,
+            'last_miss': None,
+        })
+        if hit:
+            stats['hits'] += 1
+            stats['misses_in_row'] = 0
+            stats['last_hit'] = self.clock.utcnow().isoformat()
+        else:
+            stats['misses'] += 1
+            stats['misses_in_row'] += 1
+            stats['last_miss'] = self.clock.utcnow().isoformat()
+        stats['score'] = round(
+            (1 - self.SCORE_ALPHA) * stats['score'] + self.SCORE_ALPHA * (1.0 if hit else 0.0), 4
+        )
+        attempts = stats['hits'] + stats['misses']
+        stats['avg_latency'] = round(stats['avg_latency'] + (latency - stats['avg_latency']) / attempts, 4)
+        self.dirty = True
+    
+    def summary(self):
+        """
+        Returns:
+            list: One dict per strategy (group, key, hits, misses, hit_rate,
+                  avg_latency, score, status), grouped and best first
+        """
+        rows = []
+        for group in sorted(self.groups):
+            strategies = self.order(group, list(self.groups[group]))
+            for key in strategies:
+                stats = self.groups[group][key]
+                attempts = stats['hits'] + stats['misses']
+                rows.append({
+                    'group': group,
+                    'key': key,
+                    'hits': stats['hits'],
+                    'misses': stats['misses'],
+                    'hit_rate': stats['hits'] / attempts if attempts else 0.0,
+                    'avg_latency': stats['avg_latency'],
+                    'score': stats['score'],
+                    'last_hit': stats['last_hit'],
+                    'status': 'demoted' if self.is_stale(group, key) else 'active',
+                })
+        return rows
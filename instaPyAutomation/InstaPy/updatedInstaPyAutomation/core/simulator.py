@@ -0,0 +1,353 @@
+"""
+Session Simulator
+Runs SafetyManager, the HumanBehavior timing model and the engagement schedule
+under a virtual clock against a synthetic page model, to see what a set of
+limits, delays and peak slots does before trying it on the live account
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from .config import Config
+from .clock import VirtualClock, to_utc
+from .engagement_scheduler import EngagementScheduler
+from .humanize import HumanBehavior
+from .safety import SafetyManager
+
+logger = logging.getLogger(__name__)
+
+# Modules that log per action or per day - silenced while simulating
+NOISY_LOGGERS = ('core.safety', 'core.humanize')
+
+
+@contextmanager
+def override_config(**values):
+    """
+    Temporarily set Config attributes (e.g. MAX_ACTIONS_PER_HOUR=20)
+    
+    Values are converted to the type of the current setting, so strings from
+    the command line work.
+    """
+    saved = {}
+    try:
+        for key, value in values.items():
+            if not hasattr(Config, key):
+                raise ValueError(f"Unknown setting: {key}")
+            current = getattr(Config, key)
+            saved[key] = current
+            if isinstance(current, bool) and isinstance(value, str):
+                value = value.strip().lower() in ('1', 'true', 'yes', 'on')
+            elif current is not None and not isinstance(value, type(current)):
+                value = type(current)(value)
+            setattr(Config, key, value)
+        yield
+    finally:
+        for key, value in saved.items():
+            setattr(Config, key, value)
+
+
+@contextmanager
+def quiet_loggers(names=NOISY_LOGGERS, level=logging.ERROR):
+    """Raise the level of chatty loggers for the duration of a simulation"""
+    loggers = [logging.getLogger(name) for name in names]
+    levels = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(level)
+    try:
+        yield
+    finally:
+        for lg, saved in zip(loggers, levels):
+            lg.setLevel(saved)
+
+
+class SimulatedDriver:
+    """Stands in for the WebDriver: scrolling and scripts do nothing"""
+    
+    def execute_script(self, script, *args):
+        return None
+
+
+class PageModel:
+    """
+    Synthetic Instagram: how long page work takes and how often it fails
+    
+    Ranges are (min, max) seconds drawn uniformly. Deliberate pauses are not
+    part of it - those come from HumanBehavior, as in a real run.
+    """
+    
+    def __init__(self, browser_setup=(8, 15), login=(6, 12), page_load=(1.5, 4),
+                 ai_comment=(3, 8), comment_verify=(0.5, 3), like_verify=(0.2, 1.5),
+                 posts_found=(3, 9), open_failure=0.02, comment_failure=0.05, like_failure=0.02):
+        """
+        Args:
+            browser_setup: Chrome start-up
+            login: Page work of a login (its pauses come from HumanBehavior)
+            page_load: Loading a hashtag page or a post
+            ai_comment: Image analysis and comment generation
+            comment_verify: Until a posted comment shows up
+            like_verify: Until the Unlike button shows up
+            posts_found: New posts a hashtag search yields (min, max count)
+            open_failure: Chance a post does not open
+            comment_failure: Chance a comment attempt fails
+            like_failure: Chance a like attempt fails
+        """
+        self.browser_setup = browser_setup
+        self.login = login
+        self.page_load = page_load
+        self.ai_comment = ai_comment
+        self.comment_verify = comment_verify
+        self.like_verify = like_verify
+        self.posts_found = posts_found
+        self.open_failure = open_failure
+        self.comment_failure = comment_failure
+        self.like_failure = like_failure
+    
+    def seconds(self, step):
+        """Draw the duration of a page step"""
+        low, high = getattr(self, step)
+        return random.uniform(low, high)
+    
+    def fails(self, step):
+        """Draw whether a step fails"""
+        return random.random() < getattr(self, f'{step}_failure')
+    
+    def queue_size(self, wanted):
+        return min(wanted, random.randint(*self.posts_found))
+
+
+class SessionSimulator:
+    """
+    Replays scheduled runs day after day on a VirtualClock
+    
+    Each peak slot of EngagementScheduler starts one run shaped like
+    scheduled_automation.py: start the browser, log in, then per category
+    search a hashtag and comment on and like each queued post. Page work comes
+    from the PageModel, pauses from HumanBehavior and every like and comment
+    goes through SafetyManager (in memory), so limit checks, daily resets and
+    hourly windows behave as they would live. A run that is still going when
+    the next slot comes delays that run.
+    """
+    
+    def __init__(self, categories=2, posts_per_category=5, page_model=None,
+                 session_breaks=False, start=None, seed=None):
+        """
+        Args:
+            categories: Categories per run
+            posts_per_category: Posts queued per category
+            page_model: PageModel (default: PageModel())
+            session_breaks: Take HumanBehavior session breaks between posts, as
+                            main.py does (scheduled runs do not)
+            start: First simulated day (default: Monday 2025-01-06)
+            seed: Seed for `random`, for reproducible results
+        """
+        self.categories = categories
+        self.posts_per_category = posts_per_category
+        self.page = page_model or PageModel()
+        self.session_breaks = session_breaks
+        self.start = (start or datetime(2025, 1, 6)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.seed = seed
+    
+    def run(self, days, **overrides):
+        """
+        Simulate `days` days
+        
+        Args:
+            days: Number of days
+            **overrides: Config settings to try (see override_config)
+        
+        Returns:
+            SimulationReport
+        """
+        if self.seed is not None:
+            random.seed(self.seed)
+        clock = VirtualClock(self.start)
+        report = SimulationReport(days, dict(overrides))
+        started = time.perf_counter()
+        with override_config(**overrides), quiet_loggers():
+            safety = SafetyManager(clock=clock, persist=False)
+            human = HumanBehavior(SimulatedDriver(), clock=clock)
+            for day in range(days):
+                date = self.start + timedelta(days=day)
+                slots = sorted(EngagementScheduler.get_peak_times(date.strftime('%A')),
+                               key=lambda p: (p['hour'], p['minute']))
+                for slot in slots:
+                    slot_time = date.replace(hour=slot['hour'], minute=slot['minute'])
+                    late = to_utc(slot_time) < clock.utcnow()
+                    if not late:
+                        clock.set(slot_time)
+                    record = self.simulate_run(clock, safety, human)
+                    record.update(day=day, slot=f"{date:%A} {slot['hour']:02d}:{slot['minute']:02d}", late=late)
+                    report.add_run(record)
+        report.elapsed = time.perf_counter() - started
+        return report
+    
+    def simulate_run(self, clock, safety, human):
+        """
+        One scheduled run
+        
+        Returns:
+            dict: likes, comments, posts, seconds and blocked actions of the run
+        """
+        page = self.page
+        started = clock.monotonic()
+        record = {'likes': 0, 'comments': 0, 'posts': 0, 'blocked': {}}
+        safety.start_session()
+        
+        clock.sleep(page.seconds('browser_setup'))
+        # Deliberate pauses of InstagramActions.login, around the page work
+        for low, high in ((3, 5), (1, 2), (2, 3), (1, 2), (5, 8)):
+            human.random_delay(low, high)
+        clock.sleep(page.seconds('login'))
+        
+        for _ in range(self.categories):
+            # search_hashtag
+            clock.sleep(page.seconds('page_load'))
+            human.random_delay(3, 5)
+            human.human_scroll(scrolls=2)
+            
+            for _ in range(page.queue_size(self.posts_per_category)):
+                record['posts'] += 1
+                self.simulate_post(clock, safety, human, record)
+                if self.session_breaks and human.should_take_break(record['likes']):
+                    human.session_break()
+        
+        record['seconds'] = clock.monotonic() - started
+        return record
+    
+    def simulate_post(self, clock, safety, human, record):
+        """One post of process_post(): open, comment, like, close"""
+        page = self.page
+        
+        # open_post (grid click: the three pauses of human_click, then the page)
+        human.random_delay(0.4, 1.1)
+        clock.sleep(page.seconds('page_load'))
+        human.random_delay(3, 5)
+        if page.fails('open'):
+            return
+        
+        if self.allowed(safety, 'comment', record):
+            clock.sleep(page.seconds('ai_comment'))
+            human.random_delay(3, 5)
+            human.random_delay(2, 3)
+            human.random_delay(1, 2)
+            clock.sleep(page.seconds('comment_verify'))
+            if not page.fails('comment'):
+                safety.record_action('comment', success=True)
+                record['comments'] += 1
+        
+        if self.allowed(safety, 'like', record):
+            clock.sleep(page.seconds('like_verify'))
+            if not page.fails('like'):
+                safety.record_action('like', success=True)
+                record['likes'] += 1
+                human.random_delay(2, 4)
+                human.random_delay(0.5, 1)  # close_post_modal inside like_post
+        
+        human.random_delay(0.5, 1)  # close_post_modal
+    
+    def allowed(self, safety, action_type, record):
+        """SafetyManager check, counting refusals by the limit that caused them"""
+        if safety.can_perform_action(action_type):
+            return True
+        hourly = safety.stats['hourly']['actions'] >= Config.MAX_ACTIONS_PER_HOUR
+        reason = 'hourly' if hourly else f'daily_{action_type}'
+        record['blocked'][reason] = record['blocked'].get(reason, 0) + 1
+        return False
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of a list (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class SimulationReport:
+    """Runs of a simulation and what they add up to"""
+    
+    def __init__(self, days, overrides=None):
+        self.days = days
+        self.overrides = overrides or {}
+        self.runs = []
+        self.elapsed = 0.0
+    
+    def add_run(self, record):
+        self.runs.append(record)
+    
+    def summary(self):
+        """
+        Predictions for the simulated configuration
+        
+        Returns:
+            dict: actions per run and per slot, run wall time, limit hits and
+                  idle time between runs
+        """
+        actions = [r['likes'] + r['comments'] for r in self.runs]
+        seconds = [r['seconds'] for r in self.runs]
+        blocked = {}
+        for r in self.runs:
+            for reason, n in r['blocked'].items():
+                blocked[reason] = blocked.get(reason, 0) + n
+        limited_days = {r['day'] for r in self.runs if r['blocked']}
+        
+        per_slot = {}
+        for r, n in zip(self.runs, actions):
+            per_slot.setdefault(r['slot'], []).append(n)
+        
+        busy = sum(seconds)
+        return {
+            'days': self.days,
+            'runs': len(self.runs),
+            'settings': self.overrides,
+            'actions_per_run': {
+                'mean': sum(actions) / len(actions) if actions else 0.0,
+                'p5': _percentile(actions, 5),
+                'p50': _percentile(actions, 50),
+                'p95': _percentile(actions, 95),
+            },
+            'actions_per_slot': {
+                slot: round(sum(values) / len(values), 1) for slot, values in per_slot.items()
+            },
+            'actions_per_day': sum(actions) / self.days if self.days else 0.0,
+            'run_minutes': {
+                'mean': busy / len(seconds) / 60 if seconds else 0.0,
+                'p50': _percentile(seconds, 50) / 60,
+                'p95': _percentile(seconds, 95) / 60,
+                'max': max(seconds) / 60 if seconds else 0.0,
+            },
+            'limit_hits': {
+                'runs': sum(1 for r in self.runs if r['blocked']),
+                'days': len(limited_days),
+                'day_share': len(limited_days) / self.days if self.days else 0.0,
+                'blocked_actions': blocked,
+            },
+            'late_starts': sum(1 for r in self.runs if r['late']),
+            'idle_hours_per_day': (self.days * 86400 - busy) / 3600 / self.days if self.days else 0.0,
+            'simulated_days_per_second': self.days / self.elapsed if self.elapsed else 0.0,
+        }
+    
+    def print_summary(self):
+        """Print the predictions"""
+        s = self.summary()
+        print(f"\n🧪 Simulated {s['days']} days, {s['runs']} runs "
+              f"({s['simulated_days_per_second']:.0f} days/s)")
+        if s['settings']:
+            print("   Settings: " + ", ".join(f"{k}={v}" for k, v in s['settings'].items()))
+        a = s['actions_per_run']
+        print(f"   Actions per run: mean {a['mean']:.1f}, p5 {a['p5']}, p50 {a['p50']}, p95 {a['p95']} "
+              f"({s['actions_per_day']:.1f} per day)")
+        m = s['run_minutes']
+        print(f"   Run wall time: mean {m['mean']:.1f} min, p50 {m['p50']:.1f}, p95 {m['p95']:.1f}, max {m['max']:.1f}")
+        hits = s['limit_hits']
+        print(f"   Limit hits: {hits['days']} days ({hits['day_share'] * 100:.0f}%), {hits['runs']} runs")
+        for reason, n in sorted(hits['blocked_actions'].items()):
+            print(f"      {reason:<16} {n} actions refused")
+        if s['late_starts']:
+            print(f"   Late starts (previous run still going): {s['late_starts']}")
+        print(f"   Idle: {s['idle_hours_per_day']:.1f} h per day")
+        print("   Actions per slot:")
+        for slot, mean in s['actions_per_slot'].items():
+            print(f"      {slot:<18} {mean}")
@@ -0,0 +1,241 @@
+"""
+Synthetic Analytics History
+Builds analytics histories of any size with realistic hashtag and time
+distributions, for benchmarking analytics and report generation
+"""
+import itertools
+import json
+import logging
+import math
+import random
+import string
+from datetime import timedelta
+from pathlib import Path
+from .analytics import InstagramAnalytics
+from .analytics_store import LEGACY_FILE
+from .clock import SYSTEM_CLOCK, to_audience, to_utc
+from .engagement_scheduler import DAYS, EngagementScheduler
+from .hashtag_selector import all_hashtags
+
+logger = logging.getLogger(__name__)
+
+# Relative activity per audience hour, before the peak slots are added
+DIURNAL = [
+    0.3, 0.2, 0.1, 0.1, 0.1, 0.2, 0.5, 0.9, 1.2, 1.4, 1.6, 1.7,
+    1.8, 1.7, 1.6, 1.5, 1.5, 1.6, 1.8, 2.0, 1.9, 1.6, 1.1, 0.6,
+]
+PEAK_BOOST = {'very_high': 3.0, 'high': 2.0}
+
+# Made-up niche hashtags behind the catalog ones: real accounts use a long tail
+TAIL_HASHTAGS = 500
+ZIPF_EXPONENT = 1.1
+
+ACTION_MIX = [('like', 0.70), ('comment', 0.20), ('follow', 0.07), ('unfollow', 0.03)]
+
+
+def hour_weights():
+    """
+    Activity weight of every hour of every weekday
+    
+    Returns:
+        dict: {day name: [24 weights]} - DIURNAL raised around the PEAK_TIMES slots
+    """
+    weights = {}
+    for day in DAYS:
+        hours = list(DIURNAL)
+        for peak in EngagementScheduler.PEAK_TIMES[day]:
+            boost = PEAK_BOOST.get(peak['engagement_level'], 1.5)
+            hours[peak['hour']] *= boost
+            for neighbour in (peak['hour'] - 1, peak['hour'] + 1):
+                hours[neighbour % 24] *= (1 + boost) / 2
+        weights[day] = hours
+    return weights
+
+
+def hashtag_pool():
+    """
+    Hashtags with Zipf popularity weights, catalog hashtags first
+    
+    Returns:
+        list: [(hashtag, weight), ...] most popular first
+    """
+    tags = [tag for tag, _ in all_hashtags()]
+    tags += [f"{tags[i % len(tags)]}{i}" for i in range(TAIL_HASHTAGS)]
+    return [(tag, 1 / (rank + 1) ** ZIPF_EXPONENT) for rank, tag in enumerate(tags)]
+
+
+class SyntheticHistory:
+    """
+    Generator of analytics data in the InstagramAnalytics file format
+    
+    Actions and posts spread over the `days` full days before `end`, busier
+    on the hours around each day's peak slots. Posts carry 5-15 hashtags drawn
+    from a Zipf distribution, so a few hashtags are used constantly and most
+    rarely; engagement is log-normal and higher in busy hours. Followers grow
+    by a noisy daily step. Seeded generators are reproducible for the same
+    `end`.
+    """
+    
+    def __init__(self, days=90, end=None, seed=None):
+        """
+        Args:
+            days: Days of history
+            end: Aware datetime the history leads up to (default: now)
+            seed: Random seed
+        """
+        self.days = days
+        self.end = end or SYSTEM_CLOCK.utcnow()
+        self.rng = random.Random(seed)
+        self.weights = hour_weights()
+        pool = hashtag_pool()
+        self.hashtags = [tag for tag, _ in pool]
+        self.hashtag_cum = list(itertools.accumulate(weight for _, weight in pool))
+    
+    def timestamps(self, count):
+        """
+        `count` moments of the history, oldest first
+        
+        Returns:
+            list: [(UTC ISO timestamp, audience hour, weekday name), ...]
+        """
+        rng = self.rng
+        first_day = to_audience(self.end).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=self.days)
+        per_day = [0] * self.days
+        for day in rng.choices(range(self.days), k=count):
+            per_day[day] += 1
+        
+        moments = []
+        for day, n in enumerate(per_day):
+            midnight = first_day + timedelta(days=day)
+            weekday = DAYS[midnight.weekday()]
+            cum = list(itertools.accumulate(self.weights[weekday]))
+            seconds = sorted(hour * 3600 + rng.random() * 3600
+                             for hour in rng.choices(range(24), cum_weights=cum, k=n))
+            for second in seconds:
+                local = midnight + timedelta(seconds=second)
+                moments.append((to_utc(local).isoformat(), local.hour, weekday))
+        return moments
+    
+    def draw_hashtags(self):
+        """5-15 distinct hashtags for one post"""
+        picked = self.rng.choices(self.hashtags, cum_weights=self.hashtag_cum, k=self.rng.randint(5, 15))
+        return list(dict.fromkeys(picked))
+    
+    def actions(self, count):
+        """Action history entries as record_action() writes them"""
+        rng = self.rng
+        types = [kind for kind, _ in ACTION_MIX]
+        type_weights = [share for _, share in ACTION_MIX]
+        history = []
+        for timestamp, _, _ in self.timestamps(count):
+            kind = rng.choices(types, weights=type_weights)[0]
+            details = {'hashtag': rng.choices(self.hashtags, cum_weights=self.hashtag_cum)[0]}
+            if kind == 'comment':
+                details['ai_generated'] = rng.random() < 0.8
+            elif kind in ('follow', 'unfollow'):
+                details = {'username': ''.join(rng.choices(string.ascii_lowercase, k=10))}
+            history.append({'type': kind, 'timestamp': timestamp, 'details': details})
+        return history
+    
+    def posts(self, count):
+        """Post entries as record_post_engagement() writes them"""
+        rng = self.rng
+        posts = []
+        for timestamp, hour, weekday in self.timestamps(count):
+            busy = self.weights[weekday][hour] / max(DIURNAL)
+            likes = int(rng.lognormvariate(4.0 + 0.5 * math.log(busy + 0.1), 1.0))
+            comments = int(likes * rng.uniform(0.01, 0.08))
+            shortcode = ''.join(rng.choices(string.ascii_letters + string.digits, k=11))
+            posts.append({
+                'url': f"https://www.instagram.com/p/{shortcode}/",
+                'likes': likes,
+                'comments': comments,
+                'engagement': likes + comments,
+                'hashtags': self.draw_hashtags(),
+                'posted_at': timestamp,
+                'hour': hour,
+                'day': weekday
+            })
+        return posts
+    
+    def followers(self, start=1000):
+        """One follower count per day"""
+        rng = self.rng
+        count = start
+        history = []
+        for day in range(self.days, 0, -1):
+            count = max(0, count + int(rng.gauss(count * 0.004, count * 0.01 + 3)))
+            history.append({'count': count, 'timestamp': (self.end - timedelta(days=day)).isoformat()})
+        return history
+    
+    def build(self, actions, posts=None):
+        """
+        Complete analytics data
+        
+        Args:
+            actions: Number of action history entries
+            posts: Number of posts (default: same as actions)
+        
+        Returns:
+            dict: Data in the version 1 analytics.json layout, aggregates included
+        """
+        posts = self.posts(actions if posts is None else posts)
+        by_time = {}
+        by_day = {}
+        performance = {}
+        for post in posts:
+            for buckets, key in ((by_time, str(post['hour'])), (by_day, post['day'])):
+                bucket = buckets.setdefault(key, {'likes': 0, 'comments': 0, 'count': 0})
+                bucket['likes'] += post['likes']
+                bucket['comments'] += post['comments']
+                bucket['count'] += 1
+            if post['hashtags']:
+                per_tag = post['engagement'] / len(post['hashtags'])
+                for tag in post['hashtags']:
+                    stats = performance.setdefault(tag, {'uses': 0, 'total_engagement': 0})
+                    stats['uses'] += 1
+                    stats['total_engagement'] += per_tag
+        
+        return {
+            'posts': posts,
+            'engagement_by_time': by_time,
+            'engagement_by_day': by_day,
+            'hashtag_performance': performance,
+            'hashtag_outcomes': {},
+            'follower_history': self.followers(),
+            'action_history': self.actions(actions)
+        }
+
+
+def write_history(data_dir, actions, posts=None, days=90, end=None, seed=None):
+    """
+    Generate a history and save it as the analytics store of `data_dir`
+    
+    Returns:
+        InstagramAnalytics: The analytics holding the generated data
+    """
+    data = SyntheticHistory(days=days, end=end, seed=seed).build(actions, posts)
+    analytics = InstagramAnalytics(data_dir=str(data_dir))
+    analytics.data = analytics.from_json(data)
+    analytics.save_data()
+    logger.info("✓ Wrote synthetic history: %s actions, %s posts to %s",
+                len(data['action_history']), len(data['posts']), analytics.store.directory)
+    return analytics
+
+
+def write_legacy_history(data_dir, actions, posts=None, days=90, end=None, seed=None):
+    """
+    Generate a history and save it as a version 1 `data_dir`/analytics.json,
+    for migration tests and benchmarks
+    
+    Returns:
+        Path: The analytics.json written
+    """
+    data = SyntheticHistory(days=days, end=end, seed=seed).build(actions, posts)
+    path = Path(data_dir) / LEGACY_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    logger.info("✓ Wrote version 1 synthetic history: %s actions, %s posts to %s",
+                len(data['action_history']), len(data['posts']), path)
+    return path
@@ -0,0 +1,256 @@
+"""
+Timing Spans
+Where a run's wall time goes: per-step latency histograms, with deliberate
+pauses (random_delay, session breaks) kept apart from page/network waits
+"""
+import bisect
+import functools
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from .config import Config
+from .clock import SYSTEM_CLOCK, parse_timestamp, to_utc
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bucket bounds in seconds; the last bucket is everything above
+BUCKET_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 60, 120, 300)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cheap to record, merge and store)"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def observe(self, seconds):
+        """Record one duration"""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+    
+    def merge(self, other):
+        """Add another histogram's observations to this one"""
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def percentile(self, q):
+        """
+        Approximate percentile
+        
+        Args:
+            q: 0-100
+        
+        Returns:
+            float: Upper bound of the bucket holding the q-th observation
+                   (capped at the largest value seen), or 0.0 when empty
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+    
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total': round(self.total, 6),
+            'min': self.min,
+            'max': self.max,
+            'buckets': list(BUCKET_BOUNDS),
+            'counts': self.counts,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = list(data['counts'])
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
+
+
+class Timings:
+    """
+    Span recorder for one run
+    
+    `span(name)` measures a step. Deliberate pauses reported through
+    `record_delay()` while spans are open are subtracted from those spans
+    and kept in `delays` under the innermost span's name, so a span's
+    histogram shows only time spent on the page, the browser or the network.
+    
+    With a RunProfiler attached (--profile), every span is also profiled.
+    """
+    
+    def __init__(self, clock=None, profiler=None):
+        """
+        Args:
+            clock: Clock to measure with (default: real time)
+            profiler: RunProfiler told about every span (default: none)
+        """
+        self.clock = clock or SYSTEM_CLOCK
+        self.profiler = profiler
+        self.spans = {}
+        self.delays = {}
+        self.started_at = self.clock.utcnow()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+    
+    def _observe(self, table, name, seconds):
+        with self.lock:
+            table.setdefault(name, Histogram()).observe(seconds)
+    
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as step `name`"""
+        stack = self._stack()
+        frame = {'name': name, 'delay': 0.0}
+        stack.append(frame)
+        if self.profiler:
+            self.profiler.enter(name)
+        started = self.clock.monotonic()
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = self.clock.monotonic() - started
+            if self.profiler:
+                self.profiler.exit(name)
+            self._observe(self.spans, name, max(0.0, elapsed - frame['delay']))
+    
+    def record_delay(self, seconds):
+        """Count a deliberate pause against the open spans"""
+        stack = self._stack()
+        for frame in stack:
+            frame['delay'] += seconds
+        self._observe(self.delays, stack[-1]['name'] if stack else 'between steps', seconds)
+    
+    def summary(self):
+        """
+        Returns:
+            list: (name, kind, histogram) rows, slowest total first;
+                  kind is 'active' for spans and 'delay' for deliberate pauses
+        """
+        rows = [(name, 'active', h) for name, h in self.spans.items()]
+        rows += [(name, 'delay', h) for name, h in self.delays.items()]
+        return sorted(rows, key=lambda row: row[2].total, reverse=True)
+    
+    def to_dict(self):
+        with self.lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'ended_at': self.clock.utcnow().isoformat(),
+                'spans': {name: h.to_dict() for name, h in self.spans.items()},
+                'delays': {name: h.to_dict() for name, h in self.delays.items()},
+            }
+    
+    def merge_dict(self, data):
+        """Add a saved run's histograms to this one"""
+        with self.lock:
+            for table, key in ((self.spans, 'spans'), (self.delays, 'delays')):
+                for name, saved in data.get(key, {}).items():
+                    table.setdefault(name, Histogram()).merge(Histogram.from_dict(saved))
+    
+    def save(self, timings_dir=None):
+        """
+        Persist this run's histograms (and the profile, if one was attached)
+        
+        Returns:
+            Path: data/timings/run_<started>.json, or None on failure
+        """
+        timings_dir = Path(timings_dir or Config.DATA_DIR / 'timings')
+        stamp = self.started_at.strftime('%Y%m%d_%H%M%S')
+        path = timings_dir / f"run_{stamp}.json"
+        if self.profiler:
+            self.profiler.save(timings_dir, f"profile_{stamp}")
+        try:
+            timings_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            return path
+        except Exception as e:
+            logger.error("✗ Failed to save timings: %s", e)
+            return None
+    
+    def print_summary(self):
+        """Print where this run's time went"""
+        rows = self.summary()
+        if not rows:
+            return
+        print("\n⏱️  Time breakdown (active = page/network/CPU, delay = deliberate pauses)")
+        for name, kind, h in rows:
+            print(f"   {name:<22} {kind:<6} n={h.count:<4} total={h.total:7.1f}s  "
+                  f"p50={h.percentile(50):6.2f}s  p95={h.percentile(95):6.2f}s")
+
+
+def load_recent_timings(days=7, timings_dir=None, now=None):
+    """
+    Merge the saved runs of the last `days` days
+    
+    Returns:
+        tuple: (Timings with merged histograms, number of runs)
+    """
+    timings_dir = Path(timings_dir or Config.DATA_DIR / 'timings')
+    cutoff = (to_utc(now) if now else SYSTEM_CLOCK.utcnow()) - timedelta(days=days)
+    merged = Timings()
+    runs = 0
+    for path in sorted(timings_dir.glob('run_*.json')):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if parse_timestamp(data['started_at']) < cutoff:
+                continue
+            merged.merge_dict(data)
+            runs += 1
+        except Exception as e:
+            logger.warning("✗ Skipping unreadable timings file %s: %s", path.name, e)
+    return merged, runs
+
+
+def timed(name):
+    """
+    Method decorator: run the method inside `self.timings.span(name)`
+    
+    Objects without a `timings` attribute run untimed.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            timings = getattr(self, 'timings', None)
+            if timings is None:
+                return method(self, *args, **kwargs)
+            with timings.span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
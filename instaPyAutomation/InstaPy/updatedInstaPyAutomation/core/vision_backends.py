@@ -0,0 +1,259 @@
+"""
+Vision Backends
+Pluggable image-analysis backends with a latency-budgeted fallback chain
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from .config import Config
+from .clock import SYSTEM_CLOCK
+from .timing import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+# Registry of backend classes by name ('gemini', 'openai', 'local', ...)
+VISION_BACKENDS = {}
+
+# Remote calls run here so the chain can stop waiting at its deadline.
+# A call that overruns keeps running in the background until its own
+# request timeout, but the post no longer waits for it.
+_remote_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='vision')
+
+
+def register_backend(cls):
+    """Class decorator: make a backend available under cls.name"""
+    VISION_BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_backend_names():
+    """Get list of all registered backend names"""
+    return list(VISION_BACKENDS.keys())
+
+
+class VisionBackend:
+    """
+    Base class for image-analysis backends
+    
+    Subclasses set `name`, `requires_network` and `expected_latency` and
+    implement `analyze()`. Latency is tracked as an EWMA of observed calls
+    so the chain can skip backends that will not fit the remaining budget.
+    """
+    
+    name = None
+    requires_network = True
+    expected_latency = 5.0  # seconds, prior until real calls are observed
+    
+    def __init__(self, generator):
+        self.generator = generator
+        self.latency_ewma = self.expected_latency
+        self.latency = Histogram()  # Every remote call, timeouts included (metrics)
+        self.failures = 0
+    
+    def is_available(self):
+        """Whether the backend is configured (API keys etc.)"""
+        return True
+    
+    def analyze(self, image_urls, context=None, timeout=30):
+        """
+        Analyze one post
+        
+        Args:
+            image_urls: List of image URLs (one for image/video, several for carousels)
+            context: dict with DOM hints ('alt_texts', 'post_type')
+            timeout: Seconds the backend may spend
+        
+        Returns:
+            dict: Analysis (same shape as analyze_image_with_gemini) or None
+        """
+        raise NotImplementedError
+    
+    def record_latency(self, seconds, alpha=0.3):
+        """Fold an observed call duration into the latency estimate"""
+        self.latency_ewma = (1 - alpha) * self.latency_ewma + alpha * seconds
+
+
+@register_backend
+class GeminiBackend(VisionBackend):
+    """Google Gemini vision (free tier)"""
+    
+    name = 'gemini'
+    expected_latency = 4.0
+    
+    def is_available(self):
+        return bool(self.generator.gemini_api_key) and self.generator.gemini_quota.can_request()
+    
+    def analyze(self, image_urls, context=None, timeout=30):
+        if len(image_urls) > 1:
+            return self.generator.analyze_images_with_gemini(image_urls, timeout=timeout)
+        return self.generator.analyze_image_with_gemini(image_urls[0], timeout=timeout)
+
+
+@register_backend
+class OpenAIBackend(VisionBackend):
+    """OpenAI GPT-4o-mini vision (paid)"""
+    
+    name = 'openai'
+    expected_latency = 5.0
+    
+    def is_available(self):
+        return bool(self.generator.openai_api_key)
+    
+    def analyze(self, image_urls, context=None, timeout=30):
+        if len(image_urls) > 1:
+            return self.generator.analyze_images_with_openai(image_urls, timeout=timeout)
+        return self.generator.analyze_image_with_openai(image_urls[0], timeout=timeout)
+
+
+@register_backend
+class LocalBackend(VisionBackend):
+    """
+    Offline CPU classifier
+    
+    Instagram fills the post image alt attribute with an automatic caption
+    ("May be an image of dog, beach and ocean"). This backend classifies
+    that text with the generator's keyword tables, so it needs no network,
+    no model download and answers in well under a millisecond.
+    """
+    
+    name = 'local'
+    requires_network = False
+    expected_latency = 0.001
+    
+    ALT_PREFIX = re.compile(r'^.*?(may be an? )?(image|photo|video) of ', re.IGNORECASE)
+    
+    def analyze(self, image_urls, context=None, timeout=30):
+        context = context or {}
+        text = ' '.join(context.get('alt_texts', []))
+        
+        subjects = []
+        for alt in context.get('alt_texts', []):
+            described = self.ALT_PREFIX.sub('', alt)
+            if described == alt:
+                continue
+            for subject in re.split(r',| and ', described.rstrip('. ')):
+                subject = subject.strip().lower()
+                if subject and subject != 'text' and subject not in subjects:
+                    subjects.append(subject)
+        if not subjects:
+            subjects = self.generator._extract_keywords(text)
+        
+        lowered = text.lower()
+        return {
+            'description': text[:100] or 'Instagram post',
+            'mood': 'positive',
+            'subjects': subjects[:3],
+            'category': self.generator._detect_category(text),
+            'appropriate': 'nsfw' not in lowered and 'inappropriate' not in lowered,
+            'backend': self.name
+        }
+
+
+class VisionBackendChain:
+    """
+    Ordered fallback chain over registered backends
+    
+    Remote backends are tried in configured order, skipping any whose
+    expected latency does not fit what is left of the per-post budget.
+    Offline backends always run last, so a slow or failing remote degrades
+    to a local answer inside the budget instead of a 30-second timeout.
+    Calls are timed with the generator's clock.
+    """
+    
+    def __init__(self, generator, order=None, budget=None):
+        """
+        Args:
+            generator: AICommentGenerator (owns API keys and request code)
+            order: Backend names in preference order (default from Config)
+            budget: Seconds allowed per post (default Config.VISION_LATENCY_BUDGET)
+        """
+        order = order or Config.VISION_BACKENDS
+        self.clock = getattr(generator, 'clock', None) or SYSTEM_CLOCK
+        self.budget = budget if budget is not None else Config.VISION_LATENCY_BUDGET
+        self.backends = []
+        for name in order:
+            backend_cls = VISION_BACKENDS.get(name)
+            if backend_cls is None:
+                logger.warning("⚠️  Unknown vision backend '%s', skipping", name)
+                continue
+            self.backends.append(backend_cls(generator))
+        
+        # Make sure there is always an offline answer at the end
+        if not any(not b.requires_network for b in self.backends):
+            self.backends.append(LocalBackend(generator))
+    
+    def plan(self, remaining):
+        """
+        Backends to try for the given remaining budget, in order
+        
+        Args:
+            remaining: Seconds left for this post
+        
+        Returns:
+            list: Backends that are configured and fit the budget
+        """
+        remote = []
+        for b in self.backends:
+            if not b.requires_network or not b.is_available():
+                continue
+            if b.latency_ewma <= remaining:
+                remote.append(b)
+            else:
+                # Let a skipped backend drift back toward its prior so it
+                # gets probed again after a few posts instead of never
+                b.record_latency(b.expected_latency)
+        offline = [b for b in self.backends if not b.requires_network]
+        return remote + offline
+    
+    def analyze(self, image_urls, context=None, budget=None):
+        """
+        Run the chain until a backend returns an analysis
+        
+        Args:
+            image_urls: List of image URLs
+            context: DOM hints passed to every backend
+            budget: Override the per-post budget in seconds
+        
+        Returns:
+            dict: Analysis with a 'backend' key naming who answered, or None
+        """
+        budget = self.budget if budget is None else budget
+        started = self.clock.monotonic()
+        
+        for backend in self.plan(budget):
+            remaining = budget - (self.clock.monotonic() - started)
+            
+            if not backend.requires_network:
+                analysis = backend.analyze(image_urls, context)
+                if analysis:
+                    return analysis
+                continue
+            
+            if remaining <= 0:
+                continue
+            
+            call_started = self.clock.monotonic()
+            future = _remote_executor.submit(backend.analyze, image_urls, context, remaining)
+            try:
+                analysis = future.result(timeout=remaining)
+            except FuturesTimeout:
+                logger.warning("⏱️  %s exceeded %.1fs budget, falling back", backend.name, remaining)
+                backend.record_latency(remaining * 2)
+                backend.latency.observe(remaining)
+                backend.failures += 1
+                continue
+            except Exception as e:
+                logger.warning("✗ %s backend error: %s", backend.name, e)
+                backend.latency.observe(self.clock.monotonic() - call_started)
+                backend.failures += 1
+                continue
+            
+            backend.record_latency(self.clock.monotonic() - call_started)
+            backend.latency.observe(self.clock.monotonic() - call_started)
+            if analysis:
+                analysis.setdefault('backend', backend.name)
+                return analysis
+            backend.failures += 1
+        
+        return None
@@ -0,0 +1,132 @@
+"""
+Browser Watchdog
+Detects a dead Chrome session and replaces it with a fresh browser that
+reuses the saved login cookies
+"""
+import logging
+from selenium.webdriver.common.by import By
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# WebDriver error text that means the session or its renderer is gone
+DEAD_SESSION_MARKERS = (
+    'invalid session id',
+    'session deleted',
+    'no such window',
+    'tab crashed',
+    'chrome not reachable',
+    'disconnected',
+    'target window already closed',
+    'connection refused',
+    'max retries exceeded',
+)
+
+
+class BrowserDied(Exception):
+    """The browser could not be brought back within the restart limit"""
+    pass
+
+
+def is_dead_session_error(error):
+    """Whether an exception means the browser session is gone"""
+    message = str(error).lower()
+    return any(marker in message for marker in DEAD_SESSION_MARKERS)
+
+
+class BrowserWatchdog:
+    """
+    Heartbeat and restart for the browser behind an InstagramActions
+    
+    `ensure_alive()` runs a trivial script in the page; if that fails the
+    browser is restarted, the saved cookies are loaded (logging in again only
+    when they no longer work) and the actions are pointed at the new driver.
+    """
+    
+    def __init__(self, browser_manager, actions, username, password, max_restarts=None):
+        """
+        Args:
+            browser_manager: BrowserManager that owns the driver
+            actions: InstagramActions to re-attach after a restart
+            username, password: Credentials for when the cookies have expired
+            max_restarts: Restarts allowed per run (default Config.MAX_BROWSER_RESTARTS)
+        """
+        self.browser_manager = browser_manager
+        self.actions = actions
+        self.username = username
+        self.password = password
+        self.max_restarts = Config.MAX_BROWSER_RESTARTS if max_restarts is None else max_restarts
+        self.restarts = 0
+    
+    def heartbeat(self):
+        """
+        Returns:
+            bool: Whether the browser answers and the page renderer is alive
+        """
+        driver = self.browser_manager.driver
+        if driver is None:
+            return False
+        try:
+            return driver.execute_script("return document.readyState") is not None
+        except Exception as e:
+            logger.warning("💔 Browser heartbeat failed: %s", str(e).splitlines()[0] if str(e) else type(e).__name__)
+            return False
+    
+    def ensure_alive(self):
+        """
+        Restart the browser if it stopped answering
+        
+        Returns:
+            bool: True if a restart happened (the current page is lost)
+        
+        Raises:
+            BrowserDied: If the restart limit is used up or a restart fails
+        """
+        if self.heartbeat():
+            return False
+        self.restart()
+        return True
+    
+    def restart(self, planned=False):
+        """
+        Replace the browser and restore the logged-in session
+        
+        Args:
+            planned: A deliberate recycle (e.g. memory), not counted as a crash
+        """
+        if planned:
+            logger.info("♻️  Recycling browser...")
+        else:
+            self.restarts += 1
+            if self.restarts > self.max_restarts:
+                raise BrowserDied(f"browser died {self.restarts} times, giving up")
+            logger.info("♻️  Restarting browser (%s/%s)...", self.restarts, self.max_restarts)
+        
+        try:
+            self.browser_manager.driver.quit()
+        except Exception:
+            pass  # Usually already gone
+        self.browser_manager.driver = None
+        
+        try:
+            driver = self.browser_manager.setup_browser()
+            self.actions.attach_driver(driver)
+            session_restored = self.browser_manager.load_cookies()
+            if session_restored:
+                driver.get(Config.BASE_URL)
+                self.actions.human.random_delay(3, 5)
+                # Expired cookies land on the login form
+                session_restored = (
+                    'accounts/login' not in driver.current_url
+                    and not driver.find_elements(By.NAME, 'username')
+                )
+            if not session_restored:
+                if not self.actions.login(self.username, self.password):
+                    raise BrowserDied("could not log in after restarting the browser")
+                self.browser_manager.save_cookies()
+        except BrowserDied:
+            raise
+        except Exception as e:
+            raise BrowserDied(f"browser restart failed: {e}") from e
+        logger.info("✓ Browser restarted with the saved session")
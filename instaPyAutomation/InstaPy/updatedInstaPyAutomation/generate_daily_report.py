@@ -5,6 +5,7 @@ Generates comprehensive performance reports and saves them as HTML and JSON
 import os
 import sys
 from datetime import datetime, timedelta
+from html import escape as html_escape
 from colorama import Fore, Style, init
 
 # Add parent directory to path for imports
@@ -12,6 +13,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.analytics import InstagramAnalytics
 from core.config import Config
+from core.timing import Timings, load_recent_timings
+from core.profiler import start_profiler
+from core.selector_registry import SelectorRegistry
+from core.block_monitor import ActionBlockMonitor
+from core.log import setup_logging
+from core.clock import SYSTEM_CLOCK, parse_timestamp, to_audience
 
 # Initialize colorama
 init(autoreset=True)
@@ -84,12 +91,15 @@ def generate_html_report(analytics, logs_dir, output_path):
     activity = analytics.get_activity_summary(7)
     growth = analytics.get_follower_growth(30)
     recent_logs = get_recent_log_summary(logs_dir, 7)
+    timings, timed_runs = load_recent_timings(7, os.path.join(analytics.data_dir, 'timings'))
+    selector_health = SelectorRegistry(os.path.join(analytics.data_dir, 'selector_stats.json')).summary()
+    block_episodes = ActionBlockMonitor(os.path.join(analytics.data_dir, 'block_state.json')).recent_episodes(7)
     
     # Calculate engagement rate (assuming we track follower count)
     engagement_rate = analytics.get_engagement_rate()
     
     # Current time
-    now = datetime.now()
+    now = SYSTEM_CLOCK.now()
     report_time = now.strftime('%B %d, %Y at %I:%M %p')
     
     html = f"""<!DOCTYPE html>
@@ -547,6 +557,144 @@ def generate_html_report(analytics, logs_dir, output_path):
                         </tr>
 """
     
+    html += f"""
+                    </tbody>
+                </table>
+            </div>
+            
+            <!-- Step Timings -->
+            <div class="section">
+                <h2 class="section-title">⏱️ Where the Time Goes ({timed_runs} runs, last 7 days)</h2>
+                <table class="table">
+                    <thead>
+                        <tr>
+                            <th>Step</th>
+                            <th>Kind</th>
+                            <th>Count</th>
+                            <th>Total</th>
+                            <th>p50</th>
+                            <th>p95</th>
+                            <th>Max</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+    
+    timing_rows = timings.summary()
+    if timing_rows:
+        for name, kind, histogram in timing_rows:
+            badge = 'badge-info' if kind == 'active' else 'badge-success'
+            html += f"""
+                        <tr>
+                            <td>{name}</td>
+                            <td><span class="badge {badge}">{kind}</span></td>
+                            <td>{histogram.count}</td>
+                            <td>{histogram.total:.1f}s</td>
+                            <td>{histogram.percentile(50):.2f}s</td>
+                            <td>{histogram.percentile(95):.2f}s</td>
+                            <td>{histogram.max:.2f}s</td>
+                        </tr>
+"""
+    else:
+        html += """
+                        <tr>
+                            <td colspan="7" style="text-align: center; color: #999;">No timing data yet - it is recorded on every run</td>
+                        </tr>
+"""
+    
+    html += """
+                    </tbody>
+                </table>
+            </div>
+            
+            <!-- Selector Health -->
+            <div class="section">
+                <h2 class="section-title">🧭 Selector Health (Layout Drift)</h2>
+                <table class="table">
+                    <thead>
+                        <tr>
+                            <th>Group</th>
+                            <th>Strategy</th>
+                            <th>Hits</th>
+                            <th>Misses</th>
+                            <th>Hit Rate</th>
+                            <th>Avg Latency</th>
+                            <th>Status</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+    
+    if selector_health:
+        for row in selector_health:
+            badge = 'badge-success' if row['status'] == 'active' else 'badge-warning'
+            strategy = row['key'] if len(row['key']) <= 70 else row['key'][:67] + '...'
+            html += f"""
+                        <tr>
+                            <td>{row['group']}</td>
+                            <td><code>{html_escape(strategy)}</code></td>
+                            <td>{row['hits']}</td>
+                            <td>{row['misses']}</td>
+                            <td>{row['hit_rate'] * 100:.0f}%</td>
+                            <td>{row['avg_latency']:.2f}s</td>
+                            <td><span class="badge {badge}">{row['status']}</span></td>
+                        </tr>
+"""
+    else:
+        html += """
+                        <tr>
+                            <td colspan="7" style="text-align: center; color: #999;">No selector data yet</td>
+                        </tr>
+"""
+    
+    html += """
+                    </tbody>
+                </table>
+            </div>
+            
+            <!-- Action Blocks -->
+            <div class="section">
+                <h2 class="section-title">🚫 Action Blocks (Last 7 Days)</h2>
+                <table class="table">
+                    <thead>
+                        <tr>
+                            <th>Started</th>
+                            <th>Action</th>
+                            <th>Trigger</th>
+                            <th>Failure Rate</th>
+                            <th>Backoff</th>
+                            <th>Status</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+    
+    if block_episodes:
+        for episode in reversed(block_episodes):
+            started = to_audience(parse_timestamp(episode['started_at']))
+            trigger = 'failures in a row' if episode['reason'] == 'consecutive' else 'failure rate'
+            if episode['recovered_at']:
+                recovered = to_audience(parse_timestamp(episode['recovered_at']))
+                status = f'<span class="badge badge-success">recovered {recovered:%b %d %H:%M}</span>'
+            else:
+                status = '<span class="badge badge-warning">not confirmed yet</span>'
+            html += f"""
+                        <tr>
+                            <td>{started:%b %d %H:%M}</td>
+                            <td>{episode['action']}</td>
+                            <td>{trigger}</td>
+                            <td>{episode['failure_rate'] * 100:.0f}%</td>
+                            <td>{episode['backoff_minutes']:.0f} min</td>
+                            <td>{status}</td>
+                        </tr>
+"""
+    else:
+        html += """
+                        <tr>
+                            <td colspan="6" style="text-align: center; color: #999;">No action blocks detected</td>
+                        </tr>
+"""
+    
     html += """
                     </tbody>
                 </table>
@@ -646,10 +794,13 @@ def generate_json_report(analytics, logs_dir, output_path):
     activity = analytics.get_activity_summary(7)
     growth = analytics.get_follower_growth(30)
     recent_logs = get_recent_log_summary(logs_dir, 7)
+    timings, timed_runs = load_recent_timings(7, os.path.join(analytics.data_dir, 'timings'))
+    selector_health = SelectorRegistry(os.path.join(analytics.data_dir, 'selector_stats.json')).summary()
+    block_episodes = ActionBlockMonitor(os.path.join(analytics.data_dir, 'block_state.json')).recent_episodes(7)
     
     report_data = {
-        'generated_at': datetime.now().isoformat(),
-        'report_date': datetime.now().strftime('%Y-%m-%d'),
+        'generated_at': SYSTEM_CLOCK.utcnow().isoformat(),
+        'report_date': SYSTEM_CLOCK.now().strftime('%Y-%m-%d'),
         'engagement_rate': analytics.get_engagement_rate(),
         'activity_last_7_days': activity,
         'growth_last_30_days': growth,
@@ -665,7 +816,24 @@ def generate_json_report(analytics, logs_dir, output_path):
             {'hashtag': tag, 'stats': stats}
             for tag, stats in top_hashtags
         ],
-        'recent_executions': recent_logs
+        'recent_executions': recent_logs,
+        'step_timings': {
+            'runs': timed_runs,
+            'steps': [
+                {
+                    'step': name,
+                    'kind': kind,
+                    'count': histogram.count,
+                    'total_seconds': round(histogram.total, 3),
+                    'p50_seconds': histogram.percentile(50),
+                    'p95_seconds': histogram.percentile(95),
+                    'max_seconds': histogram.max,
+                }
+                for name, kind, histogram in timings.summary()
+            ]
+        },
+        'selector_health': selector_health,
+        'action_blocks': block_episodes
     }
     
     import json
@@ -675,13 +843,21 @@ def generate_json_report(analytics, logs_dir, output_path):
     return output_path
 
 
-def main():
-    """Generate daily report"""
+def main(profile=False):
+    """
+    Generate daily report
+    
+    Args:
+        profile: Profile loading and each report (also on with PROFILE=True in .env)
+    """
+    setup_logging()
+    profiler = start_profiler(profile)
+    timings = Timings(profiler=profiler)
     print(f"\n{Fore.CYAN}{'=' * 80}")
     print("DAILY REPORT GENERATOR")
     print(f"{'=' * 80}{Style.RESET_ALL}")
-    print(f"📅 Date: {datetime.now().strftime('%B %d, %Y')}")
-    print(f"⏰ Time: {datetime.now().strftime('%I:%M %p')}")
+    print(f"📅 Date: {SYSTEM_CLOCK.now().strftime('%B %d, %Y')}")
+    print(f"⏰ Time: {SYSTEM_CLOCK.now().strftime('%I:%M %p')}")
     print()
     
     # Paths
@@ -694,22 +870,25 @@ def main():
     
     # Initialize analytics
     print(f"{Fore.YELLOW}→ Loading analytics data...{Style.RESET_ALL}")
-    analytics = InstagramAnalytics(data_dir=os.path.join(base_dir, 'data'))
+    with timings.span('report.load'):
+        analytics = InstagramAnalytics(data_dir=os.path.join(base_dir, 'data'))
     print(f"{Fore.GREEN}✓ Analytics loaded{Style.RESET_ALL}")
     
     # Generate timestamp for files
-    timestamp = datetime.now().strftime('%Y-%m-%d')
+    timestamp = SYSTEM_CLOCK.now().strftime('%Y-%m-%d')
     
     # Generate HTML report
     print(f"\n{Fore.YELLOW}→ Generating HTML report...{Style.RESET_ALL}")
     html_path = os.path.join(reports_dir, f'daily_report_{timestamp}.html')
-    generate_html_report(analytics, logs_dir, html_path)
+    with timings.span('report.html'):
+        generate_html_report(analytics, logs_dir, html_path)
     print(f"{Fore.GREEN}✓ HTML report saved: {html_path}{Style.RESET_ALL}")
     
     # Generate JSON report
     print(f"\n{Fore.YELLOW}→ Generating JSON report...{Style.RESET_ALL}")
     json_path = os.path.join(reports_dir, f'daily_report_{timestamp}.json')
-    generate_json_report(analytics, logs_dir, json_path)
+    with timings.span('report.json'):
+        generate_json_report(analytics, logs_dir, json_path)
     print(f"{Fore.GREEN}✓ JSON report saved: {json_path}{Style.RESET_ALL}")
     
     # Create symlinks to latest reports
@@ -738,7 +917,8 @@ def main():
     print(f"\n{Fore.CYAN}{'=' * 80}")
     print("REPORT SUMMARY")
     print(f"{'=' * 80}{Style.RESET_ALL}")
-    print(analytics.generate_report())
+    with timings.span('report.summary'):
+        print(analytics.generate_report())
     
     print(f"\n{Fore.GREEN}{'=' * 80}")
     print("✓ Daily report generation completed!")
@@ -749,11 +929,25 @@ def main():
     print(f"\n💡 Latest report always available at:")
     print(f"   {latest_html}")
     print()
+    
+    if profiler:
+        profiler.print_summary()
+        stamp = timings.started_at.strftime('%Y%m%d_%H%M%S')
+        profile_path = profiler.save(os.path.join(base_dir, 'data', 'timings'), f"profile_report_{stamp}")
+        if profile_path:
+            print(f"\n🔬 Profile saved: {profile_path} (+ .prof for pstats/snakeviz)\n")
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate the daily HTML and JSON report')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile report generation with cProfile and tracemalloc (default: PROFILE from .env)')
+    
+    args = parser.parse_args()
     try:
-        main()
+        main(profile=args.profile)
     except Exception as e:
         print(f"\n{Fore.RED}✗ Error generating report: {e}{Style.RESET_ALL}")
         import traceback
@@ -9,6 +9,12 @@ from core.config import Config
 from core.browser_setup import BrowserManager
 from core.actions import InstagramActions
 from core.safety import SafetyManager
+from core.deadline import Deadline
+from core.timing import Timings
+from core.profiler import start_profiler
+from core.metrics import write_run_metrics
+from core.resource_governor import ResourceGovernor
+from core.log import setup_logging
 
 # Initialize colorama for colored output
 init(autoreset=True)
@@ -38,12 +44,12 @@ RISKS:
   • Account suspension or permanent ban
   • Temporary action blocks
   • Shadowban (reduced visibility)
-  
+
 RECOMMENDATIONS:
   • Use a test account first
   • Start with very low limits (5-10 actions/day)
   • Never use on important accounts
-  
+
 Built-in Safety Features:
   ✓ Rate limiting (max 40 likes/day by default)
   ✓ Human-like delays and patterns
@@ -60,8 +66,14 @@ USE AT YOUR OWN RISK!
     return True
 
 
-def main():
-    """Main function"""
+def main(profile=False):
+    """
+    Main function
+    
+    Args:
+        profile: Profile every step (also on with PROFILE=True in .env)
+    """
+    setup_logging()
     print_banner()
     
     try:
@@ -84,10 +96,14 @@ def main():
     
     # Initialize components
     browser_manager = None
+    actions = None
+    governor = None
+    profiler = start_profiler(profile)
+    timings = Timings(profiler=profiler)  # Per-step latency histograms for this run
     
     try:
         # Setup browser
-        browser_manager = BrowserManager(headless=Config.HEADLESS)
+        browser_manager = BrowserManager(headless=Config.HEADLESS, timings=timings)
         driver = browser_manager.setup_browser()
         
         # Initialize safety manager
@@ -96,7 +112,9 @@ def main():
         
         # Initialize actions with AI comments (set to False if you don't want AI)
         use_ai = Config.USE_AI_COMMENTS if hasattr(Config, 'USE_AI_COMMENTS') else False
-        actions = InstagramActions(driver, safety, use_ai_comments=use_ai)
+        actions = InstagramActions(driver, safety, use_ai_comments=use_ai, timings=timings)
+        # Samples Chrome's memory between posts and recycles the tab when it grows too big
+        governor = ResourceGovernor(browser_manager)
         
         # Always perform fresh login for now (cookies disabled for testing)
         print(f"\n{Fore.CYAN}{'='*60}")
@@ -145,14 +163,14 @@ def main():
                 print(f"{Fore.YELLOW}⚠️  Could not search hashtag, skipping{Style.RESET_ALL}")
                 continue
             
-            # Get posts
-            posts = actions.get_posts_from_page(max_posts=posts_per_hashtag * 2)
-            if not posts:
-                print(f"{Fore.YELLOW}⚠️  No posts found, moving to next hashtag{Style.RESET_ALL}")
+            # Queue post URLs, skipping posts handled in earlier runs
+            queue = actions.get_post_queue(max_posts=posts_per_hashtag * 2)
+            if not queue:
+                print(f"{Fore.YELLOW}⚠️  No new posts found, moving to next hashtag{Style.RESET_ALL}")
                 continue
             
             processed = 0
-            for i, post in enumerate(posts):
+            for i, post_url in enumerate(queue):
                 if processed >= posts_per_hashtag:
                     break
                 
@@ -161,11 +179,12 @@ def main():
                     break
                 
                 print(f"\n  📸 Post {processed + 1}/{posts_per_hashtag}")
+                deadline = Deadline(Config.POST_TIME_BUDGET)
                 
                 # Open post first (don't pass to like_post, we'll handle it)
-                print(f"  → Opening post...")
-                actions.human.human_click(post)
-                actions.human.random_delay(3, 5)
+                print(f"  → Opening post {post_url}")
+                if not actions.open_post(post_url):
+                    continue
                 
                 # Decide if we should comment (do this BEFORE liking)
                 should_comment = random.randint(0, 100) <= comment_percentage
@@ -174,7 +193,7 @@ def main():
                     print(f"  💬 Commenting on this post...")
                     # Post is already open, AI will analyze and comment
                     # comment_text=None means use AI if enabled
-                    if actions.comment_on_post(comment_text=None, post_element=None):
+                    if actions.comment_on_post(comment_text=None, post_element=None, deadline=deadline):
                         analytics.record_action('comment', {
                             'hashtag': hashtag,
                             'ai_generated': use_ai
@@ -182,9 +201,12 @@ def main():
                         commented = True
                     else:
                         print(f"  {Fore.YELLOW}⚠️  Comment skipped{Style.RESET_ALL}")
-
+                
                 # Like the post (already open, so pass None)
-                if actions.like_post(post_element=None):
+                liked = actions.like_post(post_element=None, deadline=deadline)
+                if liked or commented:
+                    actions.mark_post_handled(post_url)
+                if liked:
                     processed += 1
                     analytics.record_action('like', {'hashtag': hashtag})
                     # Close post modal
@@ -195,6 +217,9 @@ def main():
                     # Failed to like, close and continue
                     actions.close_post_modal()
                     actions.human.random_delay(2, 4)
+                
+                # Safe point to recycle the tab if Chrome's memory has grown
+                governor.check()
             
             print(f"\n{Fore.GREEN}✓ Completed #{hashtag}: {processed} posts processed{Style.RESET_ALL}")
             
@@ -210,7 +235,7 @@ def main():
         safety.print_stats()
         
         input(f"\n{Fore.CYAN}Press ENTER to close browser...{Style.RESET_ALL}")
-        
+    
     except KeyboardInterrupt:
         print(f"\n\n{Fore.YELLOW}⚠️  Bot stopped by user (Ctrl+C){Style.RESET_ALL}")
     
@@ -223,9 +248,27 @@ def main():
         # Cleanup
         if browser_manager:
             browser_manager.close()
+        if actions:
+            actions.selectors.flush()
+        
+        timings.print_summary()
+        if profiler:
+            profiler.print_summary()
+        timings.save()
+        if governor:
+            governor.print_summary()
+            governor.save()
+        write_run_metrics('main', timings=timings, actions=actions, governor=governor)
         
         print(f"\n{Fore.GREEN}✓ Session ended. Goodbye!{Style.RESET_ALL}\n")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Run the Instagram automation bot')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every step with cProfile and tracemalloc (default: PROFILE from .env)')
+    
+    args = parser.parse_args()
+    main(profile=args.profile)
@@ -4,49 +4,47 @@ Runs at peak engagement times with 2 categories and 5 posts each
 """
 import sys
 import os
-import random
-from datetime import datetime
 from colorama import Fore, Style, init
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add project directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.browser_setup import BrowserManager
 from core.actions import InstagramActions
 from core.safety import SafetyManager
 from core.config import Config
-from core.categories import POPULAR_CATEGORIES, get_primary_hashtag
+from core.categories import POPULAR_CATEGORIES
 from core.engagement_scheduler import EngagementScheduler
+from core.analytics import InstagramAnalytics
+from core.hashtag_selector import HashtagSelector
+from core.timing import Timings
+from core.profiler import start_profiler
+from core.metrics import write_run_metrics
+from core.deadline import Deadline
+from core.checkpoint import RunCheckpoint
+from core.watchdog import BrowserWatchdog, BrowserDied, is_dead_session_error
+from core.resource_governor import ResourceGovernor
+from core.block_monitor import ActionBlockMonitor, ActionBlocked
+from core.log import setup_logging
+from core.clock import SYSTEM_CLOCK, parse_timestamp, to_audience
 
 # Initialize colorama
 init(autoreset=True)
 
 
-def select_random_categories(count=2):
-    """
-    Select random categories from popular categories
-    
-    Args:
-        count: Number of categories to select
-        
-    Returns:
-        list: Selected category names
-    """
-    all_categories = list(POPULAR_CATEGORIES.keys())
-    return random.sample(all_categories, min(count, len(all_categories)))
-
-
-def run_scheduled_automation(categories_count=2, posts_per_category=5):
+def run_scheduled_automation(categories_count=2, posts_per_category=5, analytics=None, profile=False):
     """
     Run scheduled automation with selected categories
     
     Args:
         categories_count: Number of categories to process
         posts_per_category: Number of posts to process per category
+        analytics: InstagramAnalytics holding the hashtag outcomes (default: the one in data/)
+        profile: Profile every step (also on with PROFILE=True in .env)
     """
     
-    # Get current time info
-    now = datetime.now()
+    # Get current time info (audience timezone)
+    now = SYSTEM_CLOCK.now()
     day_name = now.strftime('%A')
     current_time = now.strftime('%I:%M %p')
     is_peak, _, peak_info = EngagementScheduler.is_peak_time_now(tolerance_minutes=60)
@@ -55,7 +53,7 @@ def run_scheduled_automation(categories_count=2, posts_per_category=5):
     print(f"SCHEDULED INSTAGRAM AUTOMATION")
     print(f"{'=' * 80}{Style.RESET_ALL}")
     print(f"📅 Day: {day_name}")
-    print(f"⏰ Time: {current_time}")
+    print(f"⏰ Time: {current_time}{' (' + Config.AUDIENCE_TIMEZONE + ')' if Config.AUDIENCE_TIMEZONE else ''}")
     if is_peak:
         print(f"🔥 Peak Time: {peak_info['reason']} ({peak_info['engagement_level'].replace('_', ' ').title()})")
     else:
@@ -66,126 +64,123 @@ def run_scheduled_automation(categories_count=2, posts_per_category=5):
     print(f"   Total posts: {categories_count * posts_per_category}")
     print(f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}\n")
     
-    # Select random categories
-    selected_categories = select_random_categories(categories_count)
-    print(f"{Fore.YELLOW}🎲 Randomly selected categories:{Style.RESET_ALL}")
-    for i, cat in enumerate(selected_categories, 1):
+    # Resume an interrupted run, or pick the hashtags that recently paid off best
+    selector = HashtagSelector(analytics or InstagramAnalytics(data_dir=str(Config.DATA_DIR)))
+    checkpoint = RunCheckpoint()
+    if checkpoint.resume():
+        posts_per_category = checkpoint.state['posts_per_category']
+        print(f"{Fore.YELLOW}↻ Resuming the run started {to_audience(parse_timestamp(checkpoint.state['started_at'])):%Y-%m-%d %H:%M} "
+              f"({checkpoint.totals['processed']} posts already done){Style.RESET_ALL}")
+    else:
+        selected = selector.select(categories_count)
+        checkpoint.start([cat for cat, _ in selected], posts_per_category, hashtags=[tag for _, tag in selected])
+    selected_categories = checkpoint.categories
+    categories_count = len(selected_categories)
+    print(f"{Fore.YELLOW}🎯 Selected hashtags (best recent performers, some exploration):{Style.RESET_ALL}")
+    for i, (cat, tag) in enumerate(zip(selected_categories, checkpoint.hashtags), 1):
         cat_info = POPULAR_CATEGORIES[cat]
         print(f"   {i}. {cat.title()} - {cat_info['description']}")
-        print(f"      Hashtag: #{get_primary_hashtag(cat)}")
+        print(f"      Hashtag: #{tag} ({selector.describe(tag)})")
         print(f"      Engagement: {cat_info['engagement_rate']}")
     print()
     
+    # A block the previous run ran into may still be on
+    blocks = ActionBlockMonitor()
+    if blocks.remaining() > Config.BLOCK_MAX_PAUSE_MINUTES * 60:
+        until = to_audience(parse_timestamp(blocks.state['blocked_until']))
+        print(f"{Fore.RED}🚫 Actions blocked until {until:%Y-%m-%d %H:%M} - skipping this run "
+              f"(progress kept, the next run resumes){Style.RESET_ALL}\n")
+        return
+    
     browser_manager = None
-    driver = None
+    actions = None
+    watchdog = None
+    governor = None
+    profiler = start_profiler(profile)
+    timings = Timings(profiler=profiler)  # Per-step latency histograms, shown in the daily report
     
     try:
         # Setup browser
         print(f"{Fore.YELLOW}🌐 Setting up Chrome browser...{Style.RESET_ALL}")
-        browser_manager = BrowserManager()
+        browser_manager = BrowserManager(timings=timings)
         driver = browser_manager.setup_browser()
         print(f"{Fore.GREEN}✓ Browser initialized successfully{Style.RESET_ALL}")
         
         # Initialize safety and actions
         safety = SafetyManager()
-        actions = InstagramActions(driver, safety, use_ai_comments=True)
+        actions = InstagramActions(driver, safety, use_ai_comments=True, timings=timings, blocks=blocks)
         print(f"{Fore.GREEN}✓ AI comment generation enabled (using GEMINI){Style.RESET_ALL}")
         
+        # Give this run its share of today's remaining Gemini quota
+        if actions.use_ai_comments:
+            quota = actions.ai_generator.gemini_quota
+            allowance = quota.allocate_current_slot()
+            print(f"📊 Gemini quota: {quota.remaining()} left today, {allowance} reserved for this run")
+        
         # Login
         print(f"\n{Fore.YELLOW}🔐 Logging in...{Style.RESET_ALL}")
         if not actions.login(Config.INSTAGRAM_USERNAME, Config.INSTAGRAM_PASSWORD):
             print(f"{Fore.RED}✗ Login failed{Style.RESET_ALL}")
             return
         print(f"{Fore.GREEN}✓ Login successful{Style.RESET_ALL}\n")
+        # Saved now so a restarted browser can reuse the session
+        browser_manager.save_cookies()
         
-        # Statistics
-        total_processed = 0
-        total_commented = 0
-        total_liked = 0
+        watchdog = BrowserWatchdog(browser_manager, actions,
+                                   Config.INSTAGRAM_USERNAME, Config.INSTAGRAM_PASSWORD)
+        # Recycles the tab or browser between posts when Chrome's memory grows
+        governor = ResourceGovernor(browser_manager, watchdog)
         
-        # Process each selected category
-        for i, category in enumerate(selected_categories, 1):
-            primary_hashtag = get_primary_hashtag(category)
+        # Process each selected category, continuing from the checkpoint
+        while checkpoint.current_category():
+            category = checkpoint.current_category()
+            i = checkpoint.state['category_index'] + 1
+            hashtag = checkpoint.current_hashtag()
             category_info = POPULAR_CATEGORIES[category]
             
             print(f"\n{Fore.CYAN}{'=' * 80}")
             print(f"CATEGORY {i}/{len(selected_categories)}: {category.upper()}")
             print(f"Description: {category_info['description']}")
-            print(f"Primary Hashtag: #{primary_hashtag}")
+            print(f"Hashtag: #{hashtag}")
             print(f"Target: {posts_per_category} posts")
             print(f"{'=' * 80}{Style.RESET_ALL}\n")
             
-            # Search hashtag
-            print(f"{Fore.YELLOW}→ Searching #{primary_hashtag}...{Style.RESET_ALL}")
-            actions.search_hashtag(primary_hashtag)
-            
-            # Get posts
-            print(f"{Fore.YELLOW}→ Getting posts...{Style.RESET_ALL}")
-            posts = actions.get_posts(limit=posts_per_category)
-            
-            if not posts:
-                print(f"{Fore.RED}✗ No posts found for #{primary_hashtag}{Style.RESET_ALL}")
+            try:
+                process_category(actions, watchdog, checkpoint, category, posts_per_category, governor, selector)
+            except (BrowserDied, ActionBlocked):
+                raise
+            except Exception as e:
+                if not is_dead_session_error(e) and watchdog.heartbeat():
+                    raise
+                # Browser died mid-category: restart and continue from the checkpoint
+                watchdog.restart()
+                checkpoint.record_restart()
                 continue
-            
-            print(f"{Fore.GREEN}✓ Found {len(posts)} posts{Style.RESET_ALL}\n")
-            
-            # Process posts in this category
-            for j, post in enumerate(posts, 1):
-                total_processed += 1
-                print(f"{Fore.CYAN}─────────────────────────────────────────────{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Post {j}/{len(posts)} in {category} (Overall: {total_processed}/{categories_count * posts_per_category}){Style.RESET_ALL}")
-                print(f"{Fore.CYAN}─────────────────────────────────────────────{Style.RESET_ALL}")
-                
-                # Open post
-                print(f"{Fore.YELLOW}→ Opening post...{Style.RESET_ALL}")
-                if not actions.open_post(post):
-                    print(f"{Fore.RED}✗ Failed to open post{Style.RESET_ALL}")
-                    continue
-                
-                # COMMENT FIRST (required for Instagram's comment system)
-                print(f"\n{Fore.YELLOW}💬 Step A: Adding AI-generated comment...{Style.RESET_ALL}")
-                comment_success = actions.comment_on_post(
-                    f"Great {category} content!",
-                    use_ai=True
-                )
-                
-                if comment_success:
-                    total_commented += 1
-                    print(f"{Fore.GREEN}✓ Comment posted ({total_commented} total){Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.RED}✗ Comment failed{Style.RESET_ALL}")
-                
-                # THEN LIKE
-                print(f"\n{Fore.YELLOW}❤️  Step B: Liking post...{Style.RESET_ALL}")
-                like_success = actions.like_post()
-                
-                if like_success:
-                    total_liked += 1
-                    print(f"{Fore.GREEN}✓ Post liked ({total_liked} total){Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.RED}✗ Like failed{Style.RESET_ALL}")
-                
-                # Close post
-                actions.close_post()
-                print(f"{Fore.GREEN}✓ Post closed{Style.RESET_ALL}\n")
+            checkpoint.next_category()
             
             # Progress update
+            totals = checkpoint.totals
             print(f"\n{Fore.CYAN}{'─' * 80}")
             print(f"Progress: {i}/{len(selected_categories)} categories completed")
-            print(f"Posts: {total_processed}/{categories_count * posts_per_category} | Comments: {total_commented} | Likes: {total_liked}")
+            print(f"Posts: {totals['processed']}/{categories_count * posts_per_category} | Comments: {totals['commented']} | Likes: {totals['liked']}")
             print(f"{'─' * 80}{Style.RESET_ALL}\n")
         
+        checkpoint.finish()
+        totals = checkpoint.totals
+        
         # Final summary
         print(f"\n{Fore.GREEN}{'=' * 80}")
         print(f"FINAL RESULTS")
         print(f"{'=' * 80}")
         print(f"Day: {day_name} at {current_time}")
         print(f"Categories processed: {len(selected_categories)}/{categories_count}")
-        print(f"Total posts processed: {total_processed}/{categories_count * posts_per_category}")
-        print(f"Comments posted: {total_commented}")
-        print(f"Posts liked: {total_liked}")
-        if total_processed > 0:
-            print(f"Success rate: {(total_commented/total_processed*100):.1f}%")
+        print(f"Total posts processed: {totals['processed']}/{categories_count * posts_per_category}")
+        print(f"Comments posted: {totals['commented']}")
+        print(f"Posts liked: {totals['liked']}")
+        if checkpoint.state['restarts']:
+            print(f"Browser restarts: {checkpoint.state['restarts']}")
+        if totals['processed'] > 0:
+            print(f"Success rate: {(totals['commented'] / totals['processed'] * 100):.1f}%")
         print(f"{'=' * 80}{Style.RESET_ALL}\n")
         
         # Next peak time info
@@ -195,9 +190,15 @@ def run_scheduled_automation(categories_count=2, posts_per_category=5):
             print(f"   {next_day} at {EngagementScheduler.format_time_12h(next_peak['hour'], next_peak['minute'])}")
             print(f"   {next_peak['reason']}")
             print()
-        
+    
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}⚠️  Automation interrupted by user{Style.RESET_ALL}")
+        print(f"\n{Fore.YELLOW}⚠️  Automation interrupted by user (progress saved, the next run resumes){Style.RESET_ALL}")
+    
+    except BrowserDied as e:
+        print(f"\n{Fore.RED}✗ {e} - progress saved, the next run resumes here{Style.RESET_ALL}")
+    
+    except ActionBlocked as e:
+        print(f"\n{Fore.RED}🚫 {e} - stopping; progress saved, the next run resumes here{Style.RESET_ALL}")
     
     except Exception as e:
         print(f"\n{Fore.RED}✗ Error: {e}{Style.RESET_ALL}")
@@ -206,14 +207,151 @@ def run_scheduled_automation(categories_count=2, posts_per_category=5):
     
     finally:
         # Cleanup
-        if browser_manager and driver:
+        if browser_manager and browser_manager.driver:
             print(f"\n{Fore.YELLOW}Cleaning up...{Style.RESET_ALL}")
-            browser_manager.close_browser()
-            print(f"{Fore.GREEN}✓ Browser closed{Style.RESET_ALL}")
+            browser_manager.close()
+        if actions:
+            actions.selectors.flush()
+        
+        timings.print_summary()
+        if profiler:
+            profiler.print_summary()
+        timings.save()
+        if governor:
+            governor.print_summary()
+            governor.save()
+        write_run_metrics('scheduled_automation', timings=timings, actions=actions,
+                          watchdog=watchdog, governor=governor)
         
         print(f"{Fore.GREEN}✓ Done!{Style.RESET_ALL}\n")
 
 
+def process_category(actions, watchdog, checkpoint, category, posts_per_category, governor=None, selector=None):
+    """
+    Work through one category's post queue, resuming where the checkpoint left off
+    
+    The time spent and posts engaged are recorded as an outcome of the
+    category's hashtag however the queue ends: done, failed, or stopped by
+    BrowserDied/ActionBlocked. A resumed run records the rest of the queue
+    with searches=0, as a continuation of the same run.
+    
+    Args:
+        actions: InstagramActions
+        watchdog: BrowserWatchdog restarting a dead browser between posts
+        checkpoint: RunCheckpoint of this run
+        category: Category name
+        posts_per_category: Posts to queue for the category
+        governor: ResourceGovernor checked after every post (optional)
+        selector: HashtagSelector the outcome is recorded with (optional)
+    """
+    hashtag = checkpoint.current_hashtag()
+    started = SYSTEM_CLOCK.monotonic()
+    before = dict(checkpoint.totals)
+    searches = found = 0
+    paused = 0.0  # Action-block backoff, not the hashtag's fault
+    
+    try:
+        if checkpoint.queue() is None:
+            print(f"{Fore.YELLOW}→ Searching #{hashtag}...{Style.RESET_ALL}")
+            searches = 1
+            actions.search_hashtag(hashtag)
+            
+            print(f"{Fore.YELLOW}→ Getting posts...{Style.RESET_ALL}")
+            checkpoint.set_queue(actions.get_post_queue(max_posts=posts_per_category))
+            found = len(checkpoint.queue())
+            
+            if not checkpoint.queue():
+                print(f"{Fore.RED}✗ No new posts found for #{hashtag}{Style.RESET_ALL}")
+                return
+            print(f"{Fore.GREEN}✓ Found {len(checkpoint.queue())} posts{Style.RESET_ALL}\n")
+        
+        queue = checkpoint.queue()
+        while checkpoint.pending_posts():
+            url = checkpoint.pending_posts()[0]
+            # Sits out a short action-block backoff, raises ActionBlocked on a long one
+            paused += actions.blocks.pause()
+            if watchdog.ensure_alive():
+                checkpoint.record_restart()
+            
+            j = queue.index(url) + 1
+            print(f"{Fore.CYAN}─────────────────────────────────────────────{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}Post {j}/{len(queue)} in {category} (Overall: {checkpoint.totals['processed'] + 1}){Style.RESET_ALL}")
+            print(f"{Fore.CYAN}─────────────────────────────────────────────{Style.RESET_ALL}")
+            
+            if not process_post(actions, watchdog, checkpoint, url):
+                # Browser died during the post: its unfinished steps run again after the restart
+                watchdog.restart()
+                checkpoint.record_restart()
+            elif governor:
+                # Between posts is a safe point to recycle a bloated tab or browser
+                governor.check()
+    finally:
+        attempts = checkpoint.totals['processed'] - before['processed']
+        if selector and (searches or attempts):
+            selector.record(
+                hashtag,
+                searches=searches,
+                found=found,
+                attempts=attempts,
+                successes=checkpoint.totals.get('engaged', 0) - before.get('engaged', 0),
+                seconds=SYSTEM_CLOCK.monotonic() - started - paused,
+            )
+
+
+def process_post(actions, watchdog, checkpoint, url):
+    """
+    Comment on and like one post, checkpointing each step
+    
+    A comment that was in flight when the browser died is not retried (a
+    duplicate comment is worse than a missing one); a like is, since
+    like_post() skips posts that are already liked.
+    
+    Returns:
+        bool: False if the browser died before the post was finished
+    """
+    deadline = Deadline(Config.POST_TIME_BUDGET)
+    
+    # Open post
+    print(f"{Fore.YELLOW}→ Opening post {url}{Style.RESET_ALL}")
+    if not actions.open_post(url):
+        if not watchdog.heartbeat():
+            return False
+        print(f"{Fore.RED}✗ Failed to open post{Style.RESET_ALL}")
+        checkpoint.complete_post(url)
+        return True
+    
+    # COMMENT FIRST (required for Instagram's comment system)
+    if 'comment' not in checkpoint.steps_done(url):
+        print(f"\n{Fore.YELLOW}💬 Step A: Adding AI-generated comment...{Style.RESET_ALL}")
+        checkpoint.mark_step(url, 'comment')
+        if actions.comment_on_post(comment_text=None, deadline=deadline):
+            checkpoint.mark_step(url, 'commented')
+            print(f"{Fore.GREEN}✓ Comment posted ({checkpoint.totals['commented'] + 1} total){Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}✗ Comment failed{Style.RESET_ALL}")
+    
+    # THEN LIKE
+    print(f"\n{Fore.YELLOW}❤️  Step B: Liking post...{Style.RESET_ALL}")
+    like_success = actions.like_post(deadline=deadline)
+    if not like_success and not watchdog.heartbeat():
+        return False
+    
+    if like_success:
+        print(f"{Fore.GREEN}✓ Post liked ({checkpoint.totals['liked'] + 1} total){Style.RESET_ALL}")
+    else:
+        print(f"{Fore.RED}✗ Like failed{Style.RESET_ALL}")
+    
+    commented = 'commented' in checkpoint.steps_done(url)
+    checkpoint.complete_post(url, commented=commented, liked=like_success)
+    if commented or like_success:
+        actions.mark_post_handled(url)
+    
+    # Close post
+    actions.close_post_modal()
+    print(f"{Fore.GREEN}✓ Post closed{Style.RESET_ALL}\n")
+    return True
+
+
 if __name__ == "__main__":
     import argparse
     
@@ -224,9 +362,17 @@ if __name__ == "__main__":
                        help='Number of posts per category (default: 5)')
     parser.add_argument('--show-schedule', action='store_true',
                        help='Show weekly schedule and exit')
+    parser.add_argument('--log-level', default=None,
+                       help='DEBUG, INFO, WARNING or ERROR (default: LOG_LEVEL from .env)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile every step with cProfile and tracemalloc (default: PROFILE from .env)')
     
     args = parser.parse_args()
     
+    # Peak times from this account's engagement history, once there is enough of it
+    analytics = InstagramAnalytics(data_dir=str(Config.DATA_DIR))
+    EngagementScheduler.use_analytics(analytics)
+    
     if args.show_schedule:
         # Just show the schedule
         EngagementScheduler.print_weekly_schedule()
@@ -235,7 +381,10 @@ if __name__ == "__main__":
         print("To set posts: python scheduled_automation.py --posts 10")
     else:
         # Run the automation
+        setup_logging(args.log_level)
         run_scheduled_automation(
             categories_count=args.categories,
-            posts_per_category=args.posts
+            posts_per_category=args.posts,
+            analytics=analytics,
+            profile=args.profile
         )
@@ -0,0 +1,64 @@
+"""
+Metrics Endpoint
+Serves the metrics the last run wrote to METRICS_TEXTFILE_DIR over HTTP,
+for a Prometheus that scrapes the bot directly instead of via node-exporter
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from colorama import Fore, Style, init
+
+# Add project directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.config import Config
+from core.metrics import TEXTFILE_NAME, MetricsServer
+from core.log import setup_logging
+
+# Initialize colorama
+init(autoreset=True)
+
+
+def textfile_source(directory):
+    """
+    Callable reading the latest metrics file on every scrape
+    
+    Returns:
+        function: () -> Prometheus text ('' until a run has written metrics)
+    """
+    path = Path(directory) / TEXTFILE_NAME
+    
+    def read():
+        try:
+            return path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return ''
+    return read
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Serve the bot metrics on a local HTTP endpoint')
+    parser.add_argument('--host', default=Config.METRICS_HOST,
+                        help=f'Interface to bind (default: {Config.METRICS_HOST})')
+    parser.add_argument('--port', type=int, default=Config.METRICS_PORT,
+                        help=f'Port (default: {Config.METRICS_PORT})')
+    parser.add_argument('--dir', default=str(Config.METRICS_TEXTFILE_DIR),
+                        help='Folder the runs write metrics to (default: METRICS_TEXTFILE_DIR)')
+    
+    args = parser.parse_args()
+    setup_logging()
+    
+    server = MetricsServer(textfile_source(args.dir), host=args.host, port=args.port)
+    port = server.start()
+    print(f"{Fore.GREEN}📈 Serving {Path(args.dir) / TEXTFILE_NAME} on "
+          f"http://{args.host}:{port}/metrics (Ctrl+C to stop){Style.RESET_ALL}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Stopping metrics endpoint{Style.RESET_ALL}")
+    finally:
+        server.stop()
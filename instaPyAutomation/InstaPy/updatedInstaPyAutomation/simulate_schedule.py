@@ -0,0 +1,85 @@
+"""
+Schedule Simulator
+Predicts what safety limits, delays and peak slots do over many days, without
+a browser: actions per slot, wall time per run, limit hits and idle time
+"""
+import os
+import sys
+import json
+from colorama import Fore, Style, init
+
+# Add project directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.config import Config
+from core.analytics import InstagramAnalytics
+from core.engagement_scheduler import EngagementScheduler
+from core.simulator import SessionSimulator
+from core.log import setup_logging
+
+# Initialize colorama
+init(autoreset=True)
+
+
+def parse_settings(pairs):
+    """
+    Turn ['MAX_ACTIONS_PER_HOUR=20', ...] into Config overrides
+    
+    Returns:
+        dict: Setting name -> value (converted by override_config)
+    """
+    settings = {}
+    for pair in pairs:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got '{pair}'")
+        settings[key.strip().upper()] = value.strip()
+    return settings
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Simulate scheduled runs under a virtual clock')
+    parser.add_argument('--days', type=int, default=365,
+                        help='Days to simulate (default: 365)')
+    parser.add_argument('--categories', type=int, default=2,
+                        help='Categories per run (default: 2)')
+    parser.add_argument('--posts', type=int, default=5,
+                        help='Posts per category (default: 5)')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='Try a setting, e.g. --set MAX_ACTIONS_PER_HOUR=20 (repeatable)')
+    parser.add_argument('--session-breaks', action='store_true',
+                        help='Take session breaks between posts, as main.py does')
+    parser.add_argument('--analytics', action='store_true',
+                        help='Use peak slots from the recorded analytics instead of the built-in table')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for reproducible results')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the summary as JSON')
+    
+    args = parser.parse_args()
+    setup_logging('WARNING', console=True)
+    
+    if args.analytics:
+        EngagementScheduler.use_analytics(InstagramAnalytics(data_dir=str(Config.DATA_DIR)))
+    
+    try:
+        settings = parse_settings(args.set)
+        simulator = SessionSimulator(
+            categories=args.categories,
+            posts_per_category=args.posts,
+            session_breaks=args.session_breaks,
+            seed=args.seed
+        )
+        report = simulator.run(args.days, **settings)
+    except ValueError as e:
+        print(f"{Fore.RED}✗ {e}{Style.RESET_ALL}")
+        sys.exit(2)
+    
+    if args.json:
+        print(json.dumps(report.summary(), indent=2))
+    else:
+        print(f"{Fore.CYAN}Peak slots: {EngagementScheduler.peak_source()} | "
+              f"{args.categories} categories x {args.posts} posts per run{Style.RESET_ALL}")
+        report.print_summary()
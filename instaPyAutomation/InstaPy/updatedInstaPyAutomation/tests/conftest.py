@@ -0,0 +1,174 @@
+"""
+Shared pytest fixtures for offline tests
+
+The older test_*.py scripts drive a real browser against live Instagram and
+Gemini. They are only collected when RUN_LIVE_TESTS=1 so that a plain
+`pytest tests/` run stays offline and CI-friendly.
+
+Browser tests use plain headless Chrome (not undetected-chromedriver, which
+patches and downloads drivers) against the fake Instagram server, and are
+skipped when no Chrome binary is installed.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.clock import VirtualClock
+from core.config import Config
+from core.quota import QuotaTracker
+from fake_instagram_server import FakeInstagramServer
+from fake_vision_server import FakeVisionServer
+
+
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+LIVE_TESTS = [
+    'test_5_posts.py',
+    'test_ai_comments.py',
+    'test_gemini_api.py',
+    'test_popular_categories.py',
+]
+
+if os.getenv('RUN_LIVE_TESTS', 'False').lower() != 'true':
+    collect_ignore = LIVE_TESTS
+
+
+class FakeElement:
+    """Minimal WebElement stand-in"""
+    
+    def __init__(self, **attributes):
+        self.attributes = attributes
+    
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+
+
+class FakePostDriver:
+    """
+    WebDriver stand-in positioned on an open single-image post
+    
+    Enough of the driver API for AICommentGenerator.generate_comment_for_post:
+    post-type detection finds no video/carousel markers, image lookup finds
+    one content image, and the alt-text script returns an automatic caption.
+    """
+    
+    def __init__(self, image_url, alt_text='May be an image of beach, ocean and palm trees'):
+        self.image = FakeElement(src=image_url, alt=alt_text)
+        self.alt_text = alt_text
+    
+    def find_elements(self, by, selector):
+        if 'img' in selector:
+            return [self.image]
+        return []
+    
+    def execute_script(self, script, *args):
+        if 'img[alt]' in script:
+            return [self.alt_text]
+        return []
+
+
+@pytest.fixture(scope='session')
+def vision_server():
+    """Stand-in Gemini/OpenAI server shared by the session (reset per test)"""
+    with FakeVisionServer(seed=1234) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_vision(vision_server, monkeypatch):
+    """Point the AI pipeline at the stand-in server with default behaviour"""
+    vision_server.latency = 0.0
+    vision_server.error_rate = 0.0
+    vision_server.error_status = 500
+    vision_server.malformed_rate = 0.0
+    monkeypatch.setattr(Config, 'GEMINI_API_BASE', vision_server.url)
+    monkeypatch.setattr(Config, 'OPENAI_API_BASE', vision_server.url)
+    monkeypatch.setenv('GEMINI_API_KEY', 'fake-gemini-key')
+    monkeypatch.setenv('OPENAI_API_KEY', 'fake-openai-key')
+    return vision_server
+
+
+@pytest.fixture
+def ai_generator(fake_vision, tmp_path):
+    """AICommentGenerator wired to the stand-in server with a throwaway quota file"""
+    from core.ai_comments import AICommentGenerator
+    
+    generator = AICommentGenerator(model='gemini')
+    generator.gemini_quota = QuotaTracker('gemini', daily_limit=10 ** 9,
+                                          quota_file=tmp_path / 'api_quota.json')
+    return generator
+
+
+@pytest.fixture
+def post_driver(fake_vision):
+    """Fake driver on a single-image post whose image is served by the stand-in"""
+    return FakePostDriver(fake_vision.image_url('beach'))
+
+
+@pytest.fixture(scope='session')
+def instagram_server():
+    """Fake Instagram shared by the session (reset per test)"""
+    with FakeInstagramServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake_instagram(instagram_server, monkeypatch):
+    """Point Config's Instagram URLs at the fake server"""
+    instagram_server.reset()
+    for name in ('BASE_URL', 'LOGIN_URL', 'EXPLORE_TAGS_URL'):
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+    Config.use_base_url(instagram_server.url)
+    return instagram_server
+
+
+@pytest.fixture(scope='session')
+def chrome_driver():
+    """Headless Chrome, or skip when Chrome is not installed"""
+    webdriver = pytest.importorskip('selenium.webdriver')
+    binary = os.getenv('CHROME_BINARY') or next(
+        (path for path in map(shutil.which, CHROME_BINARIES) if path), None
+    )
+    if not binary:
+        pytest.skip('Chrome is not installed (set CHROME_BINARY to use a custom build)')
+    
+    options = webdriver.ChromeOptions()
+    options.binary_location = binary
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'--window-size={Config.WINDOW_SIZE}')
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        pytest.skip(f"Headless Chrome could not start: {e}")
+    
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def virtual_clock():
+    """Simulated time starting Monday 2025-01-06 09:00"""
+    return VirtualClock()
+
+
+@pytest.fixture
+def offline_actions(fake_instagram, chrome_driver, virtual_clock, tmp_path):
+    """InstagramActions driving headless Chrome against the fake server, pacing in virtual time"""
+    from core.actions import InstagramActions
+    from core.safety import SafetyManager
+    from core.seen_posts import SeenPostIndex
+    from core.selector_registry import SelectorRegistry
+    
+    safety = SafetyManager(stats_file=tmp_path / 'statistics.json', clock=virtual_clock)
+    selectors = SelectorRegistry(tmp_path / 'selector_stats.json', clock=virtual_clock)
+    seen_posts = SeenPostIndex(tmp_path / 'seen_posts.json', clock=virtual_clock)
+    return InstagramActions(chrome_driver, safety, use_ai_comments=False, clock=virtual_clock,
+                            selectors=selectors, seen_posts=seen_posts)
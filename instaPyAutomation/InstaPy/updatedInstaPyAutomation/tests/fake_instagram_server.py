@@ -0,0 +1,282 @@
+"""
+Local Fake Instagram Server
+Serves the login page, a hashtag grid and post modals from HTML fixtures
+
+Usage:
+    with FakeInstagramServer() as server:
+        Config.use_base_url(server.url)
+        actions.login('fixture_user', 'fixture-password')
+        actions.search_hashtag('travel')
+        assert server.likes == [...]
+
+Pages are rendered from tests/fixtures/instagram/. Pass `fixture_dir` to
+replay pages recorded from the real site instead - files use the same names
+and {{placeholders}} as the static fixtures.
+"""
+import io
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from PIL import Image
+
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'instagram'
+
+# (shortcode, variant, owner, alt text) - variants cycle so every grid has all three
+DEFAULT_POSTS = [
+    ('C0ffee00001', 'image', 'sunny.days', 'May be an image of beach, ocean and palm trees'),
+    ('C4rouse0001', 'carousel', 'wander.more', 'May be an image of mountain, lake and sky'),
+    ('V1de0000001', 'video', 'reel.maker', 'May be an image of 1 person and dancing'),
+    ('C0ffee00002', 'image', 'plate.stories', 'May be an image of food, pasta and table'),
+    ('C4rouse0002', 'carousel', 'city.lights', 'May be an image of city, street and night'),
+    ('V1de0000002', 'video', 'fit.daily', 'May be an image of 1 person and gym'),
+    ('C0ffee00003', 'image', 'paws.club', 'May be an image of dog and grass'),
+    ('C4rouse0003', 'carousel', 'style.notes', 'May be an image of 1 person, dress and street'),
+    ('V1de0000003', 'video', 'ocean.vibes', 'May be an image of ocean and sunset'),
+]
+
+CAROUSEL_FRAMES = 3
+
+
+def _make_jpeg(color=(225, 48, 108), size=(64, 64)):
+    """Tiny JPEG served as every post image"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class FakeInstagramServer:
+    """
+    Threaded HTTP server that looks enough like Instagram for InstagramActions
+    
+    Routes:
+        /                        Home feed with the post-login prompts
+        /accounts/login/         Login form (POSTs to /accounts/login/ajax/)
+        /explore/tags/<tag>/     Hashtag grid; posts open as in-page modals
+        /p/<code>/               Post page with the modal already open
+        /scontent/...            JPEG for every image URL
+    
+    State recorded from the pages (read these in tests):
+        logins: usernames that submitted the login form
+        likes: shortcodes liked
+        comments: (shortcode, text) pairs posted
+    """
+    
+    def __init__(self, posts=None, password=None, fixture_dir=None):
+        """
+        Args:
+            posts: [(shortcode, variant, owner, alt), ...] (default DEFAULT_POSTS)
+            password: Only this password logs in (default: any password)
+            fixture_dir: Directory of HTML templates (default tests/fixtures/instagram)
+        """
+        self.posts = list(posts or DEFAULT_POSTS)
+        self.password = password
+        self.fixture_dir = Path(fixture_dir or FIXTURE_DIR)
+        self.lock = threading.Lock()
+        self.logins = []
+        self.likes = []
+        self.comments = []
+        self.requests = {'page': 0, 'image': 0, 'api': 0}
+        self.jpeg = _make_jpeg()
+        self.httpd = None
+        self.thread = None
+    
+    # ------------------------------------------------------------------ lifecycle
+    
+    def start(self):
+        """Start serving on a free localhost port"""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle_get(self)
+            
+            def do_POST(self):
+                server._handle_post(self)
+            
+            def log_message(self, format, *args):
+                pass  # keep test output clean
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def reset(self):
+        """Forget recorded logins, likes and comments"""
+        with self.lock:
+            self.logins.clear()
+            self.likes.clear()
+            self.comments.clear()
+    
+    @property
+    def url(self):
+        """Base URL, e.g. http://127.0.0.1:54321"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def post_url(self, variant='image'):
+        """URL of the first post page of the given variant"""
+        return f"{self.url}/p/{self.find_post(variant)[0]}/"
+    
+    def find_post(self, variant):
+        """First post tuple with the given variant"""
+        for post in self.posts:
+            if post[1] == variant:
+                return post
+        raise KeyError(variant)
+    
+    # ------------------------------------------------------------------ rendering
+    
+    def render(self, name, **values):
+        """Fill a fixture template's {{placeholders}}"""
+        template = (self.fixture_dir / name).read_text(encoding='utf-8')
+        return re.sub(r'\{\{(\w+)\}\}', lambda m: str(values.get(m.group(1), '')), template)
+    
+    def image_path(self, code, frame=1):
+        """CDN-style image path (long enough to pass the 'scontent' URL checks)"""
+        return (f"/scontent/v/t51.2885-15/{code}_{frame}_n.jpg"
+                f"?stp=dst-jpg_e35_p1080x1080&_nc_ht=scontent.cdninstagram.com")
+    
+    def render_modal(self, post):
+        code, variant, owner, alt = post
+        images = {f'image_{i}': self.image_path(code, i) for i in range(1, CAROUSEL_FRAMES + 1)}
+        # Commenter avatars come from the same CDN as the post images
+        return self.render(f'post_{variant}.html', code=code, owner=owner, alt=alt,
+                           avatar=self.image_path(f'{code}_avatar'), **images)
+    
+    def render_hashtag(self, tag):
+        grid = ''.join(
+            self.render('grid_item.html', code=code, owner=owner,
+                        thumbnail=self.image_path(code, 0))
+            for code, _, owner, _ in self.posts
+        )
+        modals = ''.join(
+            self.render('modal_template.html', code=post[0], modal=self.render_modal(post))
+            for post in self.posts
+        )
+        return self.render('hashtag.html', tag=tag, grid=grid, modals=modals)
+    
+    def render_post(self, code):
+        for post in self.posts:
+            if post[0] == code:
+                return self.render('post_page.html', owner=post[2], modal=self.render_modal(post))
+        return None
+    
+    # ------------------------------------------------------------------ handlers
+    
+    def _send(self, handler, status, body, content_type='text/html; charset=utf-8', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+    
+    def _redirect(self, handler, location):
+        self._send(handler, 302, '', headers={'Location': location})
+    
+    def _handle_get(self, handler):
+        parsed = urlparse(handler.path)
+        path = parsed.path
+        
+        if path.startswith('/scontent/'):
+            with self.lock:
+                self.requests['image'] += 1
+            self._send(handler, 200, self.jpeg, 'image/jpeg')
+            return
+        
+        with self.lock:
+            self.requests['page'] += 1
+        
+        if path == '/':
+            self._send(handler, 200, self.render('home.html'))
+        elif path == '/accounts/login/':
+            error = 'Sorry, your password was incorrect.' if 'error' in parse_qs(parsed.query) else ''
+            self._send(handler, 200, self.render('login.html', error=error))
+        elif path == '/static/post.js':
+            self._send(handler, 200, self.render('post.js'), 'application/javascript')
+        elif path.startswith('/explore/tags/'):
+            tag = path[len('/explore/tags/'):].strip('/')
+            self._send(handler, 200, self.render_hashtag(tag))
+        elif path.startswith('/p/'):
+            page = self.render_post(path.strip('/').split('/')[-1])
+            if page is None:
+                self._send(handler, 404, "<html><body><h2>Sorry, this page isn't available.</h2></body></html>")
+            else:
+                self._send(handler, 200, page)
+        else:
+            self._send(handler, 404, "<html><body><h2>Sorry, this page isn't available.</h2></body></html>")
+    
+    def _handle_post(self, handler):
+        length = int(handler.headers.get('Content-Length', 0))
+        raw = handler.rfile.read(length).decode('utf-8')
+        path = urlparse(handler.path).path
+        
+        if path == '/accounts/login/ajax/':
+            form = {key: values[0] for key, values in parse_qs(raw).items()}
+            if self.password is not None and form.get('password') != self.password:
+                self._redirect(handler, '/accounts/login/?error=1')
+                return
+            with self.lock:
+                self.logins.append(form.get('username'))
+            self._redirect(handler, '/')
+            return
+        
+        match = re.match(r'^/api/(like|comment)/(\w+)/$', path)
+        if not match:
+            self._send(handler, 404, {'status': 'fail'}, 'application/json')
+            return
+        
+        action, code = match.groups()
+        body = json.loads(raw or '{}')
+        with self.lock:
+            self.requests['api'] += 1
+            if action == 'like':
+                self.likes.append(code)
+            else:
+                self.comments.append((code, body.get('text', '')))
+        self._send(handler, 200, {'status': 'ok'}, 'application/json')
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Run the fake Instagram fixture server')
+    parser.add_argument('--password', default=None, help='Only accept this login password')
+    args = parser.parse_args()
+    
+    with FakeInstagramServer(password=args.password) as fake:
+        print(f"Fake Instagram listening on {fake.url}")
+        print(f"  INSTAGRAM_BASE_URL={fake.url}")
+        print(f"  hashtag grid: {fake.url}/explore/tags/travel/")
+        for variant in ('image', 'carousel', 'video'):
+            print(f"  {variant} post: {fake.post_url(variant)}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
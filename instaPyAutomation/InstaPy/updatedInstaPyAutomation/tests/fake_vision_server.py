@@ -0,0 +1,228 @@
+"""
+Local Stand-in Vision API Server
+Mimics the Gemini generateContent and OpenAI chat-completions responses offline
+
+Usage:
+    with FakeVisionServer(latency=0.05, error_rate=0.1) as server:
+        Config.GEMINI_API_BASE = server.url
+        Config.OPENAI_API_BASE = server.url
+        image_url = server.image_url('beach')
+"""
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+
+
+DEFAULT_ANALYSIS = {
+    'description': 'A sunny beach with palm trees and turquoise water',
+    'mood': 'peaceful',
+    'subjects': ['beach', 'palm trees', 'ocean'],
+    'category': 'travel',
+    'appropriate': True
+}
+
+
+def _make_jpeg(color=(30, 144, 255), size=(64, 64)):
+    """Tiny JPEG served as every image"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class FakeVisionServer:
+    """
+    Threaded HTTP server answering like the real vision APIs
+    
+    Behaviour knobs (can be changed while running):
+        latency: Seconds per response, or (min, max) for a uniform range
+        error_rate: Fraction of API calls answered with `error_status`
+        error_status: HTTP status for injected errors (429 simulates quota)
+        malformed_rate: Fraction of API calls with a broken body
+        malformed_mode: 'body' (not JSON at all) or 'text' (model text without JSON)
+        analysis: dict returned as the model's JSON answer
+    """
+    
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=500,
+                 malformed_rate=0.0, malformed_mode='body', analysis=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.malformed_rate = malformed_rate
+        self.malformed_mode = malformed_mode
+        self.analysis = analysis or dict(DEFAULT_ANALYSIS)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {'gemini': 0, 'openai': 0, 'image': 0}
+        self.last_payload = None
+        self.jpeg = _make_jpeg()
+        self.httpd = None
+        self.thread = None
+    
+    # ------------------------------------------------------------------ lifecycle
+    
+    def start(self):
+        """Start serving on a free localhost port"""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle_get(self)
+            
+            def do_POST(self):
+                server._handle_post(self)
+            
+            def log_message(self, format, *args):
+                pass  # keep test output clean
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    @property
+    def url(self):
+        """Base URL, e.g. http://127.0.0.1:54321"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def image_url(self, name='post'):
+        """Image URL that passes the 'scontent' checks in ai_comments"""
+        return f"{self.url}/scontent/{name}_{'x' * 40}.jpg"
+    
+    # ------------------------------------------------------------------ handlers
+    
+    def _sleep(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            with self.lock:
+                latency = self.random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+    
+    def _roll(self, rate):
+        if not rate:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+    
+    def _send(self, handler, status, body, content_type='application/json'):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+    
+    def _handle_get(self, handler):
+        if '/scontent/' in handler.path:
+            with self.lock:
+                self.requests['image'] += 1
+            self._send(handler, 200, self.jpeg, 'image/jpeg')
+        else:
+            self._send(handler, 404, {'error': 'not found'})
+    
+    def _handle_post(self, handler):
+        length = int(handler.headers.get('Content-Length', 0))
+        raw = handler.rfile.read(length)
+        try:
+            payload = json.loads(raw or b'{}')
+        except ValueError:
+            payload = None
+        
+        if ':generateContent' in handler.path:
+            api = 'gemini'
+        elif handler.path.startswith('/v1/chat/completions'):
+            api = 'openai'
+        else:
+            self._send(handler, 404, {'error': 'not found'})
+            return
+        
+        with self.lock:
+            self.requests[api] += 1
+            self.last_payload = payload
+        
+        self._sleep()
+        
+        if self._roll(self.error_rate):
+            self._send(handler, self.error_status, {
+                'error': {'code': self.error_status, 'message': 'Injected error', 'status': 'UNAVAILABLE'}
+            })
+            return
+        
+        text = json.dumps(self.analysis)
+        if self._roll(self.malformed_rate):
+            if self.malformed_mode == 'body':
+                self._send(handler, 200, '{"candidates": [', 'application/json')
+                return
+            text = 'Sorry, I can only describe this as a lovely travel photo.'
+        
+        if api == 'gemini':
+            image_parts = len([p for p in payload['contents'][0]['parts'] if 'inline_data' in p])
+            self._send(handler, 200, {
+                'candidates': [{
+                    'content': {'parts': [{'text': f"```json\n{text}\n```"}], 'role': 'model'},
+                    'finishReason': 'STOP',
+                    'index': 0
+                }],
+                'usageMetadata': {
+                    'promptTokenCount': 50 + 258 * image_parts,
+                    'candidatesTokenCount': 60,
+                    'totalTokenCount': 110 + 258 * image_parts
+                },
+                'modelVersion': 'gemini-2.5-flash'
+            })
+        else:
+            self._send(handler, 200, {
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': payload.get('model', 'gpt-4o-mini'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': text},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 300, 'completion_tokens': 60, 'total_tokens': 360}
+            })
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Run the stand-in vision API server')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    
+    with FakeVisionServer(args.latency, args.error_rate, malformed_rate=args.malformed_rate) as fake:
+        print(f"Fake vision API listening on {fake.url}")
+        print(f"  GEMINI_API_BASE={fake.url}")
+        print(f"  OPENAI_API_BASE={fake.url}")
+        print(f"  sample image: {fake.image_url()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
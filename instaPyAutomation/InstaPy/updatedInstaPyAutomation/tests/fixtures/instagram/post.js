@@ -0,0 +1,101 @@
+/*
+ * Behaviour for the fixture pages: opening posts from the grid, like,
+ * comment, carousel paging and closing the modal with Escape.
+ * Likes and comments are reported to the fixture server with synchronous
+ * requests so tests can assert on them as soon as the click returns.
+ */
+var fakeInstagram = (function () {
+    function report(action, code, body) {
+        var xhr = new XMLHttpRequest();
+        xhr.open('POST', '/api/' + action + '/' + code + '/', false);
+        xhr.setRequestHeader('Content-Type', 'application/json');
+        xhr.send(JSON.stringify(body || {}));
+    }
+
+    function closeModal() {
+        var modal = document.querySelector('div[role="dialog"][data-code]');
+        if (modal && modal.parentNode.hasAttribute('data-modal-host')) {
+            modal.parentNode.remove();
+            history.pushState({}, '', window.gridUrl || '/');
+        }
+    }
+
+    function initPost(modal) {
+        var code = modal.getAttribute('data-code');
+
+        // Like: the span holding the Like icon becomes an Unlike button
+        var likeIcon = modal.querySelector('section svg[aria-label="Like"]');
+        var likeSpan = likeIcon.closest('span');
+        function like() {
+            if (!likeSpan.querySelector('svg[aria-label="Like"]')) return;
+            likeSpan.innerHTML = '<button type="button" aria-label="Unlike">' +
+                '<svg aria-label="Unlike" height="24" width="24" viewBox="0 0 24 24"><title>Unlike</title></svg></button>';
+            report('like', code);
+        }
+        likeSpan.addEventListener('click', like);
+        modal.querySelectorAll('.media img').forEach(function (img) {
+            img.addEventListener('dblclick', like);
+        });
+
+        // Comment: Post submits, appends the comment and clears the textarea
+        var textarea = modal.querySelector('textarea');
+        var postButton = modal.querySelector('form div[role="button"]');
+        textarea.addEventListener('input', function () {
+            postButton.setAttribute('aria-disabled', textarea.value.trim() ? 'false' : 'true');
+        });
+        postButton.addEventListener('click', function () {
+            var text = textarea.value.trim();
+            if (!text) return;
+            report('comment', code, {text: text});
+            var item = document.createElement('li');
+            item.textContent = text;
+            modal.querySelector('ul.comments').appendChild(item);
+            textarea.value = '';
+            postButton.setAttribute('aria-disabled', 'true');
+        });
+
+        // Carousel: one slide visible at a time
+        var slides = modal.querySelectorAll('.media ul li');
+        var next = modal.querySelector('button[aria-label="Next"]');
+        var back = modal.querySelector('button[aria-label="Go back"]');
+        var current = 0;
+        function show(index) {
+            current = index;
+            slides.forEach(function (slide, i) {
+                slide.style.display = i === index ? '' : 'none';
+            });
+            next.style.display = index < slides.length - 1 ? '' : 'none';
+            back.style.display = index > 0 ? '' : 'none';
+        }
+        if (next) {
+            next.addEventListener('click', function () { show(Math.min(current + 1, slides.length - 1)); });
+            back.addEventListener('click', function () { show(Math.max(current - 1, 0)); });
+        }
+
+        var close = modal.querySelector('button[aria-label="Close"]');
+        close.addEventListener('click', closeModal);
+    }
+
+    function initGrid(root) {
+        window.gridUrl = location.pathname;
+        root.querySelectorAll('article a[href*="/p/"]').forEach(function (link) {
+            link.addEventListener('click', function (event) {
+                event.preventDefault();
+                var code = link.getAttribute('href').split('/')[2];
+                var template = document.querySelector('template[data-code="' + code + '"]');
+                closeModal();
+                var host = document.createElement('div');
+                host.setAttribute('data-modal-host', '');
+                host.appendChild(template.content.cloneNode(true));
+                document.body.appendChild(host);
+                history.pushState({}, '', link.getAttribute('href'));
+                initPost(host.querySelector('div[role="dialog"]'));
+            });
+        });
+        document.addEventListener('keydown', function (event) {
+            if (event.key === 'Escape') closeModal();
+        });
+    }
+
+    return {initGrid: initGrid, initPost: initPost};
+})();
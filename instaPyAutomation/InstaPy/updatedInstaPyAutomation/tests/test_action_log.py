@@ -0,0 +1,124 @@
+"""
+Compact action log: lossless round trip, irregular entries, column queries
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.action_log import ActionLog, intern_posts
+from core.analytics import InstagramAnalytics
+from core.clock import VirtualClock, parse_timestamp
+from core.config import Config
+from core.synthetic_history import SyntheticHistory
+
+END = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_synthetic_history_round_trips():
+    entries = SyntheticHistory(days=30, end=END, seed=4).build(3000)['action_history']
+    
+    log = ActionLog(json.loads(json.dumps(entries)))
+    
+    assert log.to_list() == entries
+    assert json.dumps(log.to_list(), indent=2) == json.dumps(entries, indent=2)
+    assert not log.irregular
+    assert len(log.types) == 4
+
+
+def test_irregular_entries_are_kept_verbatim():
+    entries = [
+        {'type': 'like', 'timestamp': '2025-02-01T10:00:00+00:00', 'details': {'hashtag': 'travel'}},
+        {'type': 'like', 'timestamp': '2025-02-01T11:00:00.250+00:00', 'details': {'hashtag': 'travel'}},
+        {'type': 'comment', 'timestamp': '2025-02-01T12:00:00.000000+00:00', 'details': {}},
+        {'type': 'comment', 'timestamp': '2025-02-01T13:00:00+00:00',
+         'details': {'ai_generated': True, 'hashtag': 'food'}},
+        {'type': 'like', 'timestamp': '2025-02-01T14:00:00+00:00',
+         'details': {'hashtag': 'food', 'post_url': 'https://www.instagram.com/p/abc/'}},
+        {'type': 'follow', 'timestamp': '2025-02-01T15:00:00+00:00', 'details': {'username': 'someone'}},
+    ]
+    
+    log = ActionLog(entries)
+    
+    assert log.to_list() == entries
+    assert [list(entry['details']) for entry in log] == [list(entry['details']) for entry in entries]
+    assert sorted(log.irregular) == [1, 2, 3, 4]
+    assert log[-1] == entries[-1] and log[1:3] == entries[1:3]
+    with pytest.raises(IndexError):
+        log[len(entries)]
+
+
+def test_offset_less_history_is_stored_in_columns(monkeypatch):
+    monkeypatch.setattr(Config, 'AUDIENCE_TIMEZONE', 'Europe/Berlin')
+    # Written as audience wall time before timestamps were stored in UTC, across the clocks going forward
+    start = datetime(2025, 3, 29, 12, 0)
+    entries = [
+        {'type': 'like', 'timestamp': (start + timedelta(hours=5 * i, seconds=i % 2 * 0.25)).isoformat(),
+         'details': {'hashtag': 'travel'}}
+        for i in range(20)
+    ]
+    
+    log = ActionLog(json.loads(json.dumps(entries)))
+    
+    assert not log.irregular
+    assert log.count_by_type(since=parse_timestamp(entries[10]['timestamp'])) == {'like': 10}
+    monkeypatch.setattr(Config, 'AUDIENCE_TIMEZONE', 'America/New_York')
+    assert log.to_list() == entries
+
+
+def test_count_by_type_since_cutoff():
+    start = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    entries = [
+        {'type': kind, 'timestamp': (start + timedelta(hours=hour)).isoformat(), 'details': {}}
+        for hour, kind in enumerate(['like', 'comment', 'like', 'follow', 'like'])
+    ]
+    
+    ordered = ActionLog(entries)
+    shuffled = ActionLog(entries[::-1])
+    
+    cutoff = start + timedelta(hours=2)
+    assert ordered.count_by_type(since=cutoff) == {'like': 2, 'follow': 1}
+    assert not shuffled.ordered
+    assert shuffled.count_by_type(since=cutoff) == ordered.count_by_type(since=cutoff)
+    assert ordered.count_by_type() == {'like': 3, 'comment': 1, 'follow': 1}
+
+
+def test_stored_actions_keep_their_layout(tmp_path):
+    clock = VirtualClock()
+    analytics = InstagramAnalytics(data_dir=str(tmp_path), clock=clock)
+    analytics.record_action('like', {'hashtag': 'travel'})
+    first = clock.utcnow().isoformat()
+    clock.sleep(90)
+    analytics.record_action('comment', {'hashtag': 'travel', 'ai_generated': False})
+    
+    lines = (tmp_path / 'analytics' / 'actions.jsonl').read_text().splitlines()
+    saved = [json.loads(line) for line in lines]
+    reloaded = InstagramAnalytics(data_dir=str(tmp_path), clock=clock)
+    
+    assert saved == [
+        {'type': 'like', 'timestamp': first, 'details': {'hashtag': 'travel'}},
+        {'type': 'comment', 'timestamp': clock.utcnow().isoformat(),
+         'details': {'hashtag': 'travel', 'ai_generated': False}},
+    ]
+    assert isinstance(reloaded.data['action_history'], ActionLog)
+    assert reloaded.to_json()['action_history'] == saved
+    assert reloaded.get_activity_summary(7)['comments'] == 1
+
+
+def test_post_strings_are_shared():
+    posts = json.loads(json.dumps([{'hashtags': ['travel', 'food'], 'day': 'Monday'},
+                                   {'hashtags': ['travel'], 'day': 'Monday'}]))
+    
+    intern_posts(posts)
+    
+    assert posts[0]['hashtags'][0] is posts[1]['hashtags'][0]
+    assert posts[0]['day'] is posts[1]['day']
+
+
+def test_empty_history_saves_and_loads(tmp_path):
+    InstagramAnalytics(data_dir=str(tmp_path)).save_data()
+    
+    reloaded = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert len(reloaded.data['action_history']) == 0
+    assert (tmp_path / 'analytics' / 'actions.jsonl').read_text() == ''
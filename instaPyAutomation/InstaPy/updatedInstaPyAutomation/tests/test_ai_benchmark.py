@@ -0,0 +1,113 @@
+"""
+Offline benchmarks and regression checks for the AI comment pipeline
+Runs against the stand-in vision server - no API keys or network needed
+
+    pytest tests/test_ai_benchmark.py --benchmark-only
+    pytest tests/test_ai_benchmark.py --benchmark-json=benchmark.json
+"""
+import statistics
+
+import pytest
+
+from core.deadline import Deadline
+
+pytest.importorskip('pytest_benchmark')
+
+
+def _percentiles(benchmark):
+    """p50/p99 (ms) and throughput (calls/s) from the raw round timings"""
+    if benchmark.disabled or benchmark.stats is None:
+        return  # --benchmark-disable: no timings collected
+    data = sorted(benchmark.stats.stats.data)
+    p99_index = min(len(data) - 1, int(round(0.99 * (len(data) - 1))))
+    benchmark.extra_info['p50_ms'] = round(statistics.median(data) * 1000, 3)
+    benchmark.extra_info['p99_ms'] = round(data[p99_index] * 1000, 3)
+    benchmark.extra_info['throughput_per_s'] = round(len(data) / sum(data), 1)
+
+
+def test_analyze_image_with_gemini_latency(benchmark, ai_generator, fake_vision):
+    image_url = fake_vision.image_url('beach')
+    
+    analysis = benchmark.pedantic(
+        ai_generator.analyze_image_with_gemini, args=(image_url,),
+        rounds=100, iterations=1, warmup_rounds=5
+    )
+    _percentiles(benchmark)
+    
+    assert analysis['category'] == 'travel'
+    assert 'beach' in analysis['subjects']
+
+
+def test_analyze_carousel_single_request_latency(benchmark, ai_generator, fake_vision):
+    frames = [fake_vision.image_url(f'slide{i}') for i in range(3)]
+    
+    analysis = benchmark.pedantic(
+        ai_generator.analyze_images_with_gemini, args=(frames,),
+        rounds=50, iterations=1, warmup_rounds=2
+    )
+    _percentiles(benchmark)
+    
+    # One generateContent call per carousel, carrying all three frames
+    parts = fake_vision.last_payload['contents'][0]['parts']
+    assert len([p for p in parts if 'inline_data' in p]) == 3
+    assert analysis['category'] == 'travel'
+
+
+def test_generate_comment_for_post_latency(benchmark, ai_generator, post_driver):
+    comment = benchmark.pedantic(
+        ai_generator.generate_comment_for_post, args=(post_driver,),
+        rounds=100, iterations=1, warmup_rounds=5
+    )
+    _percentiles(benchmark)
+    
+    assert comment.endswith('Please check my instagram page')
+
+
+def test_slow_remote_degrades_to_local_within_budget(ai_generator, post_driver, fake_vision):
+    fake_vision.latency = 2.0
+    ai_generator.vision.budget = 0.5
+    
+    analysis = ai_generator._analyze_within(
+        Deadline(0.5), [fake_vision.image_url('beach')], post_driver, 'image'
+    )
+    
+    assert analysis['backend'] == 'local'
+    assert 'beach' in analysis['subjects']
+
+
+def test_server_error_returns_none(ai_generator, fake_vision):
+    fake_vision.error_rate = 1.0
+    
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url()) is None
+
+
+def test_quota_exhausted_on_429_short_circuits(ai_generator, fake_vision):
+    fake_vision.error_rate = 1.0
+    fake_vision.error_status = 429
+    
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url()) is None
+    calls = fake_vision.requests['gemini']
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url()) is None
+    assert fake_vision.requests['gemini'] == calls
+
+
+def test_malformed_body_returns_none(ai_generator, fake_vision):
+    fake_vision.malformed_rate = 1.0
+    fake_vision.malformed_mode = 'body'
+    
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url()) is None
+
+
+def test_malformed_text_uses_keyword_fallback(ai_generator, fake_vision):
+    fake_vision.malformed_rate = 1.0
+    fake_vision.malformed_mode = 'text'
+    
+    analysis = ai_generator.analyze_image_with_gemini(fake_vision.image_url())
+    
+    assert analysis['category'] == 'travel'
+
+
+def test_openai_response_shape(ai_generator, fake_vision):
+    analysis = ai_generator.analyze_image_with_openai(fake_vision.image_url())
+    
+    assert analysis['category'] == 'travel'
@@ -0,0 +1,158 @@
+"""
+Versioned analytics store: streaming migration from analytics.json, schema checks, appends
+"""
+import io
+import json
+import logging
+import tracemalloc
+from datetime import datetime, timezone
+
+import pytest
+
+import core.analytics_store as analytics_store
+from core.analytics import InstagramAnalytics
+from core.analytics_store import (AnalyticsStore, JsonStreamReader, SchemaVersionError, migrate_legacy,
+                                  open_store)
+from core.clock import VirtualClock
+from core.synthetic_history import SyntheticHistory, write_legacy_history
+
+END = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_new_hours_days_and_hashtags_after_reload(tmp_path):
+    clock = VirtualClock()
+    InstagramAnalytics(data_dir=str(tmp_path), clock=clock).record_post_engagement(
+        'https://www.instagram.com/p/a/', 10, 2, ['travel'], posted_at='2025-02-03T09:00:00+00:00')
+    
+    reloaded = InstagramAnalytics(data_dir=str(tmp_path), clock=clock)
+    reloaded.record_post_engagement(
+        'https://www.instagram.com/p/b/', 20, 4, ['food'], posted_at='2025-02-05T21:00:00+00:00')
+    
+    again = InstagramAnalytics(data_dir=str(tmp_path), clock=clock)
+    assert len(again.data['posts']) == 2
+    assert sum(bucket['count'] for bucket in again.data['engagement_by_time'].values()) == 2
+    assert sum(bucket['count'] for bucket in again.data['engagement_by_day'].values()) == 2
+    assert again.data['hashtag_performance']['food'] == {'uses': 1, 'total_engagement': 24.0}
+
+
+def test_legacy_file_is_migrated_once(tmp_path):
+    legacy = write_legacy_history(tmp_path, 500, posts=100, end=END, seed=2)
+    original = json.loads(legacy.read_text())
+    
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert not legacy.exists()
+    assert (tmp_path / 'analytics.v1.json').exists()
+    assert json.loads(json.dumps(analytics.to_json())) == original
+    assert analytics.store.read_meta()['schema_version'] == analytics_store.SCHEMA_VERSION
+    
+    analytics.record_action('like', {'hashtag': 'travel'})
+    assert len(InstagramAnalytics(data_dir=str(tmp_path)).data['action_history']) == 501
+
+
+def test_migration_rebuilds_aggregates_from_posts(tmp_path, caplog):
+    data = SyntheticHistory(days=10, end=END, seed=3).build(10, posts=20)
+    expected = json.loads(json.dumps({key: data[key] for key in
+                                      ('engagement_by_time', 'engagement_by_day', 'hashtag_performance')}))
+    # A post saved after its aggregate update failed
+    data['engagement_by_time'][str(data['posts'][-1]['hour'])]['count'] -= 1
+    (tmp_path / 'analytics.json').write_text(json.dumps(data))
+    
+    with caplog.at_level(logging.WARNING):
+        analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert 'rebuilt from the posts' in caplog.text
+    for key, value in expected.items():
+        assert json.loads(json.dumps(analytics.data[key])) == value
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_stream_reader_matches_json_load(chunk_size):
+    document = {
+        'numbers': [0, -12.5e3, 123456789012345678, 3.25],
+        'text': 'quote " backslash \\ unicode é 😀',
+        'empty': [],
+        'nested': {'a': [1, {'b': None}], 'c': True},
+        'posts': [{'url': f'https://www.instagram.com/p/{i}/', 'hashtags': ['x', 'y']} for i in range(50)],
+        'skipped': [1, 2, 3],
+        'last': False,
+    }
+    text = json.dumps(document, indent=2)
+    
+    read = {}
+    for key, value in JsonStreamReader(io.StringIO(text), chunk_size=chunk_size).members():
+        if key == 'skipped':
+            continue
+        read[key] = list(value) if key in ('numbers', 'empty', 'posts') else value
+    
+    assert read == {key: value for key, value in document.items() if key != 'skipped'}
+
+
+def test_migration_memory_does_not_grow_with_history(tmp_path):
+    peaks = []
+    for actions in (2000, 20000):
+        legacy = write_legacy_history(tmp_path / str(actions), actions, posts=500, end=END, seed=4)
+        tracemalloc.start()
+        try:
+            migrate_legacy(legacy, AnalyticsStore(tmp_path / str(actions) / 'analytics'))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peaks.append(peak)
+    
+    assert peaks[1] < 1.5 * peaks[0]
+    # json.load() alone peaks at several times the file size
+    assert peaks[1] < legacy.stat().st_size / 4
+
+
+def test_newer_schema_is_refused(tmp_path):
+    store = AnalyticsStore(tmp_path / 'analytics')
+    store.write_meta({}, version=analytics_store.SCHEMA_VERSION + 1)
+    
+    with pytest.raises(SchemaVersionError):
+        InstagramAnalytics(data_dir=str(tmp_path))
+
+
+def test_store_migrations_run_in_order(tmp_path, monkeypatch):
+    InstagramAnalytics(data_dir=str(tmp_path)).record_action('like', {'hashtag': 'travel'})
+    current = analytics_store.SCHEMA_VERSION
+    upgraded = []
+    
+    def upgrade(store):
+        upgraded.append(store.read_meta()['schema_version'])
+        store.write_meta(store.read_meta(), version=current + 1)
+    
+    monkeypatch.setattr(analytics_store, 'SCHEMA_VERSION', current + 1)
+    monkeypatch.setitem(analytics_store.STORE_MIGRATIONS, current, upgrade)
+    
+    store = open_store(tmp_path)
+    
+    assert upgraded == [current]
+    assert store.read_meta()['schema_version'] == current + 1
+
+
+def test_interrupted_migration_runs_again(tmp_path):
+    write_legacy_history(tmp_path, 50, end=END, seed=5)
+    # Histories written, meta.json not yet
+    (tmp_path / 'analytics').mkdir()
+    (tmp_path / 'analytics' / 'actions.jsonl').write_text('{"type": "like"\n')
+    
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert len(analytics.data['action_history']) == 50
+
+
+def test_line_cut_short_by_a_crash_is_skipped(tmp_path, caplog):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    analytics.record_action('like', {'hashtag': 'travel'})
+    with open(tmp_path / 'analytics' / 'actions.jsonl', 'a') as f:
+        f.write('{"type": "comment", "timest')
+    
+    with caplog.at_level(logging.WARNING):
+        reloaded = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert len(reloaded.data['action_history']) == 1
+    assert 'unreadable line 2' in caplog.text
+    
+    reloaded.record_action('comment', {'hashtag': 'travel'})
+    assert [a['type'] for a in InstagramAnalytics(data_dir=str(tmp_path)).data['action_history']] == ['like', 'comment']
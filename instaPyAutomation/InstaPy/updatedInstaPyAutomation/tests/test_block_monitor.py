@@ -0,0 +1,150 @@
+"""
+Action block detection: EWMA and consecutive-failure triggers, backoff, pauses
+"""
+import json
+
+import pytest
+
+from core.block_monitor import ActionBlocked, ActionBlockMonitor
+from core.clock import VirtualClock
+from core.config import Config
+
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    monkeypatch.setattr(Config, 'BLOCK_EWMA_ALPHA', 0.3)
+    monkeypatch.setattr(Config, 'BLOCK_FAILURE_RATE', 0.6)
+    monkeypatch.setattr(Config, 'BLOCK_MIN_ACTIONS', 4)
+    monkeypatch.setattr(Config, 'BLOCK_CONSECUTIVE_FAILURES', 3)
+    monkeypatch.setattr(Config, 'BLOCK_BACKOFF_MINUTES', 10)
+    monkeypatch.setattr(Config, 'BLOCK_BACKOFF_MAX_HOURS', 24)
+    monkeypatch.setattr(Config, 'BLOCK_MAX_PAUSE_MINUTES', 30)
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return ActionBlockMonitor(tmp_path / 'block_state.json', clock=VirtualClock())
+
+
+def test_confirmed_actions_never_block(monitor):
+    for _ in range(20):
+        assert not monitor.record('like', True)
+    
+    assert not monitor.is_blocked()
+    assert monitor.episodes == []
+
+
+def test_failures_in_a_row_block(monitor):
+    assert not monitor.record('like', False)
+    assert not monitor.record('like', False)
+    assert monitor.record('like', False)
+    
+    assert monitor.is_blocked()
+    assert monitor.remaining() == pytest.approx(600)
+    assert monitor.episodes[-1]['reason'] == 'consecutive'
+    assert monitor.episodes[-1]['action'] == 'like'
+
+
+def test_mostly_failing_actions_block_on_failure_rate(monitor):
+    outcomes = [False, False, True, False, False]
+    started = [monitor.record('comment', verified) for verified in outcomes]
+    
+    assert started == [False, False, False, False, True]
+    assert monitor.episodes[-1]['reason'] == 'failure_rate'
+    assert monitor.episodes[-1]['failure_rate'] >= 0.6
+
+
+def test_backoff_doubles_until_actions_recover(monitor):
+    def block():
+        for _ in range(3):
+            monitor.record('like', False)
+        monitor.clock.sleep(monitor.remaining())
+    
+    block()
+    block()
+    block()
+    assert [e['backoff_minutes'] for e in monitor.episodes] == [10, 20, 40]
+    
+    for _ in range(5):
+        monitor.record('like', True)
+    block()
+    assert monitor.episodes[-1]['backoff_minutes'] == 10
+
+
+def test_backoff_is_capped(monitor, monkeypatch):
+    monkeypatch.setattr(Config, 'BLOCK_BACKOFF_MAX_HOURS', 1)
+    monitor.state['level'] = 10
+    for _ in range(3):
+        monitor.record('like', False)
+    
+    assert monitor.episodes[-1]['backoff_minutes'] == 60
+
+
+def test_first_confirmation_marks_recovery(monitor):
+    for _ in range(3):
+        monitor.record('like', False)
+    monitor.clock.sleep(monitor.remaining())
+    monitor.record('like', True)
+    
+    assert monitor.episodes[-1]['recovered_at'] == monitor.clock.utcnow().isoformat()
+
+
+def test_state_survives_restart(tmp_path):
+    clock = VirtualClock()
+    monitor = ActionBlockMonitor(tmp_path / 'block_state.json', clock=clock)
+    for _ in range(3):
+        monitor.record('like', False)
+    
+    reloaded = ActionBlockMonitor(tmp_path / 'block_state.json', clock=clock)
+    
+    assert reloaded.is_blocked()
+    assert reloaded.state['level'] == 1
+    assert len(reloaded.episodes) == 1
+
+
+def test_failed_save_keeps_an_active_block(tmp_path, monkeypatch):
+    clock = VirtualClock()
+    monitor = ActionBlockMonitor(tmp_path / 'block_state.json', clock=clock)
+    for _ in range(3):
+        monitor.record('like', False)
+    
+    def torn_dump(obj, f, **kwargs):
+        f.write('{"failure_rate": ')
+        raise OSError('disk full')
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(json, 'dump', torn_dump)
+        monitor.record('like', False)
+    
+    assert ActionBlockMonitor(tmp_path / 'block_state.json', clock=clock).is_blocked()
+
+
+def test_short_backoff_is_slept_through(monitor):
+    for _ in range(3):
+        monitor.record('like', False)
+    
+    paused = monitor.pause()
+    
+    assert paused == pytest.approx(600)
+    assert not monitor.is_blocked()
+    assert monitor.pause() == 0.0
+
+
+def test_long_backoff_stops_the_run(monitor):
+    monitor.state['level'] = 2
+    for _ in range(3):
+        monitor.record('like', False)
+    
+    with pytest.raises(ActionBlocked):
+        monitor.pause()
+    assert monitor.clock.total_slept == 0
+
+
+def test_recent_episodes_drop_old_ones(monitor):
+    for _ in range(3):
+        monitor.record('like', False)
+    monitor.clock.sleep(8 * 24 * 3600)
+    for _ in range(3):
+        monitor.record('comment', False)
+    
+    assert [e['action'] for e in monitor.recent_episodes(7)] == ['comment']
@@ -0,0 +1,60 @@
+"""
+Carousel analysis: one request per carousel, reply parsing and merging of per-frame answers
+"""
+PER_FRAME_ANALYSIS = {
+    'description': 'A road trip along the coast',
+    'mood': 'adventurous',
+    'subjects': [['Beach', 'Ocean'], ['beach', 'Palm trees'], 'Car', 'road', 'sunset', 'sky'],
+    'category': 'Road trip',
+    'appropriate': True
+}
+
+
+def test_gemini_sends_every_frame_in_one_request(ai_generator, fake_vision):
+    frames = [fake_vision.image_url(f'slide{i}') for i in range(3)]
+    
+    analysis = ai_generator.analyze_images_with_gemini(frames)
+    
+    parts = fake_vision.last_payload['contents'][0]['parts']
+    assert ai_generator.gemini_quota.usage['requests'] == 1
+    assert parts[0]['text'] == ai_generator.CAROUSEL_PROMPT.format(count=3)
+    assert len([p for p in parts if 'inline_data' in p]) == 3
+    assert analysis['category'] == 'travel'
+
+
+def test_openai_uses_the_carousel_prompt(ai_generator, fake_vision):
+    frames = [fake_vision.image_url(f'slide{i}') for i in range(2)]
+    
+    analysis = ai_generator.analyze_images_with_openai(frames)
+    
+    content = fake_vision.last_payload['messages'][0]['content']
+    assert content[0]['text'] == ai_generator.CAROUSEL_PROMPT.format(count=2)
+    assert [part['image_url']['url'] for part in content[1:]] == frames
+    assert analysis['category'] == 'travel'
+
+
+def test_per_frame_answer_is_merged(ai_generator, fake_vision, monkeypatch):
+    monkeypatch.setattr(fake_vision, 'analysis', dict(PER_FRAME_ANALYSIS))
+    
+    analysis = ai_generator.analyze_images_with_gemini([fake_vision.image_url(f'slide{i}') for i in range(2)])
+    
+    assert analysis['subjects'] == ['beach', 'ocean', 'palm trees', 'car', 'road']
+    # Unknown category: detected from the category text, description and subjects
+    assert analysis['category'] == 'travel'
+
+
+def test_known_category_is_normalized(ai_generator):
+    analysis = ai_generator._merge_carousel_analysis({'subjects': ['Pasta'], 'category': ' Food '})
+    
+    assert analysis == {'subjects': ['pasta'], 'category': 'food'}
+    assert ai_generator._merge_carousel_analysis(None) is None
+
+
+def test_reply_text_parsing(ai_generator):
+    fenced = ai_generator._parse_analysis_text('```json\n{"category": "pets", "subjects": ["dog"]}\n```')
+    prose = ai_generator._parse_analysis_text('A dog running on the beach at sunset')
+    
+    assert fenced == {'category': 'pets', 'subjects': ['dog']}
+    assert prose['subjects'] == ['sunset', 'beach']
+    assert prose['category'] == 'nature'
+    assert prose['appropriate']
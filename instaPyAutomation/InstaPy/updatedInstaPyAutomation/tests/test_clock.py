@@ -0,0 +1,173 @@
+"""
+Virtual-time checks for pacing, rate limits and scheduling
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.analytics import InstagramAnalytics
+from core.clock import VirtualClock, parse_timestamp
+from core.config import Config
+from core.deadline import Deadline
+from core.engagement_scheduler import EngagementScheduler
+from core.humanize import HumanBehavior
+from core.safety import SafetyManager
+from conftest import FakeElement
+
+
+class TypingElement(FakeElement):
+    """Records keystrokes"""
+    
+    def __init__(self):
+        super().__init__()
+        self.keys = []
+    
+    def send_keys(self, keys):
+        self.keys.append(keys)
+
+
+def _session(seed):
+    """A short pacing sequence; returns (clock, timeline of (action, elapsed))"""
+    random.seed(seed)
+    clock = VirtualClock()
+    human = HumanBehavior(driver=None, clock=clock)
+    element = TypingElement()
+    timeline = []
+    for i in range(5):
+        human.random_delay(3, 10)
+        human.human_type(element, 'Great shot!')
+        timeline.append((f'comment-{i}', round(clock.monotonic(), 6)))
+    human.session_break()
+    timeline.append(('break', round(clock.monotonic(), 6)))
+    return clock, timeline
+
+
+def test_virtual_sleep_advances_instantly():
+    clock = VirtualClock(datetime(2025, 1, 6, 23, 59))
+    
+    clock.sleep(120)
+    
+    assert clock.now() == datetime(2025, 1, 7, 0, 1)
+    assert clock.monotonic() == 120
+    assert clock.sleep_count == 1
+
+
+def test_virtual_clock_rejects_going_backwards():
+    clock = VirtualClock()
+    
+    with pytest.raises(ValueError):
+        clock.set(datetime(2020, 1, 1))
+
+
+def test_session_replays_identically():
+    clock_a, timeline_a = _session(seed=42)
+    clock_b, timeline_b = _session(seed=42)
+    
+    assert timeline_a == timeline_b
+    # Minutes of pauses, none of them real
+    assert clock_a.total_slept >= Config.MIN_SESSION_BREAK
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_LIKES_PER_DAY', 100)
+    monkeypatch.setattr(Config, 'MAX_COMMENTS_PER_DAY', 3)
+    monkeypatch.setattr(Config, 'MAX_ACTIONS_PER_HOUR', 5)
+
+
+def test_safety_daily_rollover(tmp_path, small_limits):
+    clock = VirtualClock(datetime(2025, 1, 6, 23, 50))
+    safety = SafetyManager(stats_file=tmp_path / 'statistics.json', clock=clock)
+    for _ in range(3):
+        safety.record_action('comment')
+    
+    assert not safety.can_perform_action('comment')
+    
+    clock.sleep(11 * 60)
+    assert safety.can_perform_action('comment')
+    assert safety.stats['last_reset'] == '2025-01-07'
+
+
+def test_safety_hourly_rollover(tmp_path, small_limits):
+    clock = VirtualClock(datetime(2025, 1, 6, 10, 5))
+    safety = SafetyManager(stats_file=tmp_path / 'statistics.json', clock=clock)
+    for _ in range(5):
+        safety.record_action('like')
+    
+    assert not safety.can_perform_action('like')
+    
+    clock.set(datetime(2025, 1, 6, 11, 0))
+    assert safety.can_perform_action('like')
+
+
+def test_scheduler_uses_injected_clock():
+    # Wednesday 11:05 is inside the 11:00 peak
+    clock = VirtualClock(datetime(2025, 1, 8, 11, 5))
+    
+    is_peak, day, peak = EngagementScheduler.is_peak_time_now(tolerance_minutes=30, clock=clock)
+    next_day, _, next_time = EngagementScheduler.get_next_peak_time(clock=clock)
+    
+    assert is_peak and day == 'Wednesday'
+    assert (peak['hour'], peak['minute']) == (11, 0)
+    assert next_time > clock.now()
+
+
+def test_deadline_follows_virtual_clock():
+    clock = VirtualClock()
+    deadline = Deadline(90, clock=clock)
+    
+    clock.sleep(60)
+    assert deadline.remaining() == 30
+    
+    clock.sleep(31)
+    assert deadline.expired()
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setattr(Config, 'AUDIENCE_TIMEZONE', 'America/New_York')
+
+
+def test_virtual_clock_crosses_dst(new_york):
+    clock = VirtualClock(datetime(2025, 3, 9, 1, 30))
+    start = clock.utcnow()
+    
+    clock.sleep(3600)
+    
+    assert clock.now() == datetime(2025, 3, 9, 3, 30)  # 2:30 does not exist that night
+    assert clock.utcnow() - start == timedelta(hours=1)
+
+
+def test_hourly_window_not_merged_when_clocks_go_back(tmp_path, small_limits, new_york):
+    clock = VirtualClock(datetime(2025, 11, 2, 1, 10))
+    safety = SafetyManager(stats_file=tmp_path / 'statistics.json', clock=clock)
+    for _ in range(5):
+        safety.record_action('like')
+    assert not safety.can_perform_action('like')
+    
+    clock.sleep(3600)  # 1:10 again, an hour later
+    
+    assert clock.now().hour == 1
+    assert safety.can_perform_action('like')
+
+
+def test_analytics_bucket_by_audience_time(tmp_path, new_york):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path), clock=VirtualClock())
+    
+    analytics.record_post_engagement('https://x/p/a/', 10, 1, posted_at='2025-01-06T03:00:00Z')
+    
+    post = analytics.data['posts'][0]
+    assert (post['day'], post['hour']) == ('Sunday', 22)
+    assert post['posted_at'] == '2025-01-06T03:00:00+00:00'
+    assert analytics.data['engagement_by_time']['22']['count'] == 1
+
+
+def test_peaks_and_legacy_timestamps_in_audience_time(new_york):
+    # 16:05 UTC is 11:05 in New York, inside Wednesday's 11:00 peak
+    clock = VirtualClock(datetime(2025, 1, 8, 16, 5, tzinfo=timezone.utc))
+    
+    is_peak, day, _ = EngagementScheduler.is_peak_time_now(tolerance_minutes=30, clock=clock)
+    
+    assert is_peak and day == 'Wednesday'
+    assert parse_timestamp('2025-01-06 09:00:00') == datetime(2025, 1, 6, 14, 0, tzinfo=timezone.utc)
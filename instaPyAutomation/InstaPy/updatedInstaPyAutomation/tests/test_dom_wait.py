@@ -0,0 +1,115 @@
+"""
+Event-driven DOM waits: observer script wiring, polling fallback and a browser check
+"""
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from core.clock import VirtualClock
+from core.dom_wait import DomWait, LIKED, TEXTAREA_CLEARED
+
+
+class AsyncDriver:
+    """Records async script calls and answers with a canned result"""
+    
+    def __init__(self, met=True):
+        self.met = met
+        self.calls = []
+        self.script_timeouts = []
+    
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+    
+    def execute_async_script(self, script, *args):
+        self.calls.append((script, args))
+        return {'met': self.met, 'elapsed': 120}
+
+
+class PollingDriver:
+    """No async scripts; the condition turns true on the n-th check"""
+    
+    def __init__(self, true_after):
+        self.true_after = true_after
+        self.checks = 0
+    
+    def execute_script(self, script, *args):
+        self.checks += 1
+        return self.checks >= self.true_after
+
+
+def test_observer_script_gets_condition_and_args():
+    driver = AsyncDriver()
+    
+    assert DomWait(driver).until(LIKED, 3, 'button[aria-label="Unlike"]')
+    DomWait(driver).until(LIKED, 3, 'button')
+    
+    script, args = driver.calls[0]
+    assert LIKED in script and 'MutationObserver' in script
+    assert args == (3000, 250, 'button[aria-label="Unlike"]')
+    assert driver.script_timeouts == [5, 5]
+
+
+def test_observer_timeout_reports_false():
+    assert not DomWait(AsyncDriver(met=False)).until(TEXTAREA_CLEARED, 1, 'Add a comment…')
+
+
+def test_polling_fallback_uses_clock():
+    clock = VirtualClock()
+    driver = PollingDriver(true_after=5)
+    
+    assert DomWait(driver, clock=clock).until(LIKED, 10, 'button')
+    assert clock.monotonic() == 4 * DomWait.POLL_INTERVAL
+    
+    assert not DomWait(PollingDriver(true_after=100), clock=clock).until(LIKED, 1, 'button')
+
+
+class FailingAsyncDriver(PollingDriver):
+    """Async script raises after using up some of the clock's time"""
+    
+    def __init__(self, error, clock, spent, true_after=100):
+        super().__init__(true_after)
+        self.error = error
+        self.clock = clock
+        self.spent = spent
+    
+    def set_script_timeout(self, seconds):
+        pass
+    
+    def execute_async_script(self, script, *args):
+        self.clock.sleep(self.spent)
+        raise self.error
+
+
+def test_script_timeout_is_not_met_without_polling():
+    clock = VirtualClock()
+    driver = FailingAsyncDriver(TimeoutException("script timeout"), clock, spent=5, true_after=1)
+    
+    assert not DomWait(driver, clock=clock).until(LIKED, 3, 'button')
+    assert driver.checks == 0
+
+
+def test_failed_observer_polls_only_the_time_left():
+    clock = VirtualClock()
+    driver = FailingAsyncDriver(WebDriverException('observer torn down'), clock, spent=2)
+    
+    assert not DomWait(driver, clock=clock).until(LIKED, 3, 'button')
+    assert clock.monotonic() == 3
+    
+    later = clock.monotonic()
+    driver.spent = 5
+    assert not DomWait(driver, clock=clock).until(LIKED, 3, 'button')
+    assert clock.monotonic() - later == 5
+
+
+def test_wait_ends_on_mutation(chrome_driver, fake_instagram):
+    chrome_driver.get(fake_instagram.post_url('image'))
+    chrome_driver.execute_script("""
+        setTimeout(function () {
+            var span = document.querySelector('section svg[aria-label="Like"]').closest('span');
+            span.innerHTML = '<button aria-label="Unlike"></button>';
+        }, 300);
+    """)
+    
+    started = time.monotonic()
+    assert DomWait(chrome_driver).until(LIKED, 5, 'button[aria-label="Unlike"]')
+    assert time.monotonic() - started < 2
@@ -0,0 +1,97 @@
+"""
+Engagement scheduler: weekly timeline lookups and peaks derived from analytics
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.analytics import InstagramAnalytics
+from core.clock import VirtualClock
+from core.engagement_scheduler import EngagementScheduler, WeeklyTimeline
+
+
+@pytest.fixture(autouse=True)
+def default_table():
+    EngagementScheduler.use_analytics(None)
+    yield
+    EngagementScheduler.use_analytics(None)
+
+
+def brute_force_next(now):
+    """Walk forward minute by minute until a peak of the built-in table starts"""
+    moment = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while True:
+        for peak in EngagementScheduler.PEAK_TIMES[moment.strftime('%A')]:
+            if (moment.hour, moment.minute) == (peak['hour'], peak['minute']):
+                return moment
+        moment += timedelta(minutes=1)
+
+
+def test_next_slot_matches_brute_force():
+    rng = random.Random(7)
+    start = datetime(2025, 1, 6)
+    for _ in range(200):
+        now = start + timedelta(seconds=rng.randrange(14 * 24 * 3600))
+        _, _, next_time = EngagementScheduler.get_next_peak_time(clock=VirtualClock(now))
+        assert next_time == brute_force_next(now), now
+
+
+def test_timeline_wraps_to_next_week():
+    timeline = WeeklyTimeline({'Monday': [{'hour': 9, 'minute': 30}]})
+    
+    day, _, when = timeline.next_slot(datetime(2025, 1, 6, 9, 30))  # Monday, exactly at the slot
+    
+    assert day == 'Monday' and when == datetime(2025, 1, 13, 9, 30)
+    assert WeeklyTimeline({}).next_slot(datetime(2025, 1, 6)) == (None, None, None)
+
+
+def test_nearest_slot_across_midnight():
+    timeline = WeeklyTimeline({'Sunday': [{'hour': 23, 'minute': 45}]})
+    
+    assert timeline.nearest_slot(datetime(2025, 1, 6, 0, 10), 30)  # Monday 00:10
+    assert timeline.nearest_slot(datetime(2025, 1, 6, 0, 20), 30) is None
+
+
+def record(analytics, hour, engagement, posts=5, day=6):
+    for _ in range(posts):
+        analytics.record_post_engagement('https://x/p/a/', engagement, 0, posted_at=datetime(2025, 1, day, hour, 0))
+
+
+def test_peaks_follow_analytics(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    record(analytics, 8, 500)
+    record(analytics, 21, 300)
+    record(analytics, 13, 50, posts=2)  # Too few posts to count
+    
+    EngagementScheduler.use_analytics(analytics, slots_per_day=2, min_samples=5)
+    
+    assert EngagementScheduler.peak_source() == 'analytics'
+    assert [p['hour'] for p in EngagementScheduler.get_peak_times('Friday')] == [8, 21]
+    is_peak, _, peak = EngagementScheduler.is_peak_time_now(clock=VirtualClock(datetime(2025, 1, 10, 8, 20)))
+    assert is_peak and peak['reason'] == 'Your #1 engagement hour'
+
+
+def test_falls_back_without_enough_history(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    record(analytics, 8, 500, posts=2)
+    
+    EngagementScheduler.use_analytics(analytics, slots_per_day=2, min_samples=5)
+    
+    assert EngagementScheduler.peak_source() == 'default'
+    assert EngagementScheduler.get_peak_times('Monday') == EngagementScheduler.PEAK_TIMES['Monday']
+
+
+def test_timeline_refreshes_only_when_peaks_move(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    record(analytics, 8, 1000)
+    record(analytics, 21, 300)
+    EngagementScheduler.use_analytics(analytics, slots_per_day=2, min_samples=5)
+    timeline = EngagementScheduler.timeline()
+    
+    record(analytics, 8, 1000, posts=1)  # Same hours, same levels
+    assert EngagementScheduler.timeline() is timeline
+    
+    record(analytics, 17, 2000)
+    assert EngagementScheduler.timeline() is not timeline
+    assert [p['hour'] for p in EngagementScheduler.get_peak_times('Monday')] == [17, 8]
@@ -0,0 +1,84 @@
+"""
+Hashtag selection: scoring recent outcomes and sampling the cumulative table
+"""
+import random
+from collections import Counter
+
+from core.analytics import InstagramAnalytics
+from core.categories import POPULAR_CATEGORIES
+from core.hashtag_selector import HashtagSelector, all_hashtags
+
+
+class FixedRandom:
+    """Returns the given values in turn"""
+    
+    def __init__(self, *values):
+        self.values = list(values)
+    
+    def random(self):
+        return self.values.pop(0)
+
+
+def test_every_hashtag_listed_once():
+    tags = [tag for tag, _ in all_hashtags()]
+    
+    assert len(tags) == len(set(tags))
+    assert set(tags) == {tag for info in POPULAR_CATEGORIES.values() for tag in info['hashtags']}
+    assert dict(all_hashtags())['instagood'] == 'photography'
+
+
+def test_draw_bisects_cumulative_weights(tmp_path):
+    selector = HashtagSelector(InstagramAnalytics(data_dir=str(tmp_path)), rng=FixedRandom(0.0, 0.999999))
+    selector.build_table()
+    
+    assert selector.cumulative == sorted(selector.cumulative)
+    assert selector.draw() == selector.entries[0]
+    assert selector.draw() == selector.entries[-1]
+
+
+def test_select_one_hashtag_per_category(tmp_path):
+    selector = HashtagSelector(InstagramAnalytics(data_dir=str(tmp_path)), rng=random.Random(3))
+    
+    picked = selector.select(len(POPULAR_CATEGORIES) + 5)
+    
+    assert sorted(cat for cat, _ in picked) == sorted(POPULAR_CATEGORIES)
+    for category, tag in picked:
+        assert tag in POPULAR_CATEGORIES[category]['hashtags']
+
+
+def test_fast_hashtags_win_most_draws(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    selector = HashtagSelector(analytics, exploration=0, rng=random.Random(11))
+    for tag, _ in all_hashtags():
+        if tag != 'foodie':
+            selector.record(tag, searches=1, found=5, attempts=5, successes=1, seconds=600)
+    selector.record('foodie', searches=1, found=5, attempts=5, successes=5, seconds=60)
+    selector.record('foodie', searches=1, found=5, attempts=5, successes=5, seconds=60)
+    
+    counts = Counter(tag for _ in range(300) for _, tag in selector.select(1))
+    
+    assert counts.most_common(1)[0][0] == 'foodie'
+    assert counts['foodie'] > 4 * counts.most_common(2)[1][1]
+
+
+def test_rarely_tried_hashtags_get_explored(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    for _ in range(5):
+        HashtagSelector(analytics).record('travel', searches=1, found=5, attempts=5, successes=5, seconds=300)
+    
+    weights = {tag: w for tag, _, w in HashtagSelector(analytics, exploration=1.0).weights()}
+    flat = {tag: w for tag, _, w in HashtagSelector(analytics, exploration=0).weights()}
+    
+    assert weights['wanderlust'] / flat['wanderlust'] > weights['travel'] / flat['travel']
+
+
+def test_outcomes_trimmed_and_persisted(tmp_path):
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    for successes in range(4):
+        analytics.record_hashtag_outcome('gym', {'successes': successes, 'seconds': 60}, keep=3)
+    
+    reloaded = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert [o['successes'] for o in reloaded.get_hashtag_outcomes('gym')] == [1, 2, 3]
+    assert HashtagSelector(reloaded).stats('gym')['runs'] == 3
+    assert HashtagSelector(reloaded).describe('ootd') == 'untried'
@@ -0,0 +1,95 @@
+"""
+Logging: JSONL file through the queue listener, console lines, level filtering
+"""
+import json
+import logging
+
+import pytest
+
+from core.config import Config
+from core.log import ConsoleFormatter, setup_logging, stop_logging
+
+
+@pytest.fixture
+def log_setup(tmp_path):
+    root = logging.getLogger()
+    level = root.level
+    log_file = tmp_path / 'logs' / 'bot.jsonl'
+    
+    def setup(level='INFO'):
+        setup_logging(level, log_file, console=False)
+        return log_file
+    
+    yield setup
+    stop_logging()
+    root.setLevel(level)
+
+
+def read_lines(log_file):
+    stop_logging()  # Drains the queue
+    return [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+
+
+class Expensive:
+    """Counts how often it is rendered"""
+    
+    renders = 0
+    
+    def __str__(self):
+        Expensive.renders += 1
+        return 'expensive'
+
+
+def test_records_written_as_json_lines(log_setup):
+    log_file = log_setup()
+    logger = logging.getLogger('core.actions')
+    
+    logger.info("✓ Found %s posts", 9, extra={'hashtag': 'travel'})
+    try:
+        raise RuntimeError('boom')
+    except RuntimeError:
+        logger.error("✗ Failed to like post", exc_info=True)
+    
+    first, second = read_lines(log_file)
+    assert first['msg'] == '✓ Found 9 posts'
+    assert first['level'] == 'INFO' and first['logger'] == 'core.actions'
+    assert first['hashtag'] == 'travel'
+    assert second['level'] == 'ERROR'
+    assert 'RuntimeError: boom' in second['exc']
+
+
+def test_disabled_levels_are_not_formatted(log_setup):
+    log_file = log_setup('WARNING')
+    logger = logging.getLogger('core.humanize')
+    Expensive.renders = 0
+    
+    logger.debug("⏳ Waiting %s", Expensive())
+    logger.info("⏳ Waiting %s", Expensive())
+    assert Expensive.renders == 0
+    
+    logger.warning("⚠️  %s", Expensive())
+    assert [line['level'] for line in read_lines(log_file)] == ['WARNING']
+
+
+def test_log_file_rotates(log_setup, monkeypatch):
+    monkeypatch.setattr(Config, 'LOG_MAX_BYTES', 2000)
+    monkeypatch.setattr(Config, 'LOG_BACKUP_COUNT', 2)
+    log_file = log_setup()
+    
+    for i in range(100):
+        logging.getLogger('core.safety').info("🔄 Line %s", i)
+    stop_logging()
+    
+    assert sorted(p.name for p in log_file.parent.iterdir()) == ['bot.jsonl', 'bot.jsonl.1', 'bot.jsonl.2']
+
+
+def test_console_lines():
+    formatter = ConsoleFormatter()
+    
+    def line(level, msg):
+        return formatter.format(logging.LogRecord('core.dom_wait', level, '', 0, msg, (), None))
+    
+    assert line(logging.INFO, "✓ Login successful") == "✓ Login successful"
+    assert line(logging.DEBUG, "→ Polling") == "   [dom_wait] → Polling"
+    assert line(logging.WARNING, "⚠️  Limit reached") == "⚠️  Limit reached"
+    assert line(logging.WARNING, "OpenAI API error") == "WARNING: OpenAI API error"
@@ -0,0 +1,173 @@
+"""
+Run metrics: collection from run objects, exposition formats, textfile writes, HTTP endpoint
+"""
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from core.block_monitor import ActionBlockMonitor
+from core.clock import VirtualClock
+from core.config import Config
+from core.metrics import (MetricsServer, RunMetrics, TEXTFILE_NAME, to_openmetrics,
+                          write_run_metrics, write_textfile)
+from core.quota import QuotaTracker
+from core.resource_governor import ResourceGovernor
+from core.safety import SafetyManager
+from core.selector_registry import SelectorRegistry
+from core.timing import Timings
+from core.vision_backends import VisionBackendChain
+
+
+def sample(text, line_start):
+    """Value of the first sample line starting with `line_start`"""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"no sample {line_start}")
+
+
+@pytest.fixture
+def generator(tmp_path):
+    answers = []
+    
+    def analyze(url, timeout=30):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+    
+    return SimpleNamespace(
+        gemini_api_key='key',
+        gemini_quota=QuotaTracker('gemini', 100, quota_file=tmp_path / 'quota.json'),
+        analyze_image_with_gemini=analyze,
+        _extract_keywords=lambda text: [],
+        _detect_category=lambda text: 'general',
+        answers=answers,
+    )
+
+
+@pytest.fixture
+def run(tmp_path, generator):
+    """Objects of a finished run"""
+    clock = VirtualClock()
+    timings = Timings(clock=clock)
+    for seconds in (0.3, 1.5, 4):
+        with timings.span('open_post'):
+            clock.sleep(seconds)
+    
+    safety = SafetyManager(clock=clock, persist=False)
+    for _ in range(3):
+        safety.record_action('like')
+    safety.record_action('comment')
+    
+    blocks = ActionBlockMonitor(tmp_path / 'block_state.json', clock=clock)
+    blocks.record('like', True)
+    blocks.record('like', True)
+    blocks.record('comment', False)
+    
+    selectors = SelectorRegistry(tmp_path / 'selector_stats.json', clock=clock)
+    selectors.record('like.js', 'aria', True)
+    selectors.record('like.js', 'svg', False)
+    selectors.record('like.js', 'svg', False)
+    selectors.record('comment.textarea', 'css', True)
+    
+    generator.vision = VisionBackendChain(generator, order=['gemini', 'local'], budget=10)
+    generator.answers.extend([{'category': 'travel'}, RuntimeError('HTTP 500')])
+    generator.vision.analyze(['https://img/1.jpg'])
+    generator.vision.analyze(['https://img/2.jpg'])
+    
+    governor = ResourceGovernor(None, clock=clock)
+    governor.rss.observe(800)
+    governor.rss.observe(1200)
+    governor.tab_recycles = 1
+    
+    actions = SimpleNamespace(blocks=blocks, selectors=selectors, safety=safety, ai_generator=generator)
+    return dict(timings=timings, actions=actions, watchdog=SimpleNamespace(restarts=2), governor=governor)
+
+
+def test_run_objects_become_metrics(run, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_LIKES_PER_DAY', 40)
+    monkeypatch.setattr(Config, 'MAX_ACTIONS_PER_HOUR', 15)
+    
+    text = RunMetrics().collect('scheduled_automation', **run).render()
+    
+    assert sample(text, 'instagram_bot_actions_total{type="like",result="confirmed"}') == 2
+    assert sample(text, 'instagram_bot_actions_total{type="comment",result="unconfirmed"}') == 1
+    assert sample(text, 'instagram_bot_limit_headroom{limit="like_daily"}') == 37
+    assert sample(text, 'instagram_bot_limit_headroom{limit="actions_hourly"}') == 11
+    assert sample(text, 'instagram_bot_selector_miss_ratio{group="like.js"}') == pytest.approx(2 / 3, abs=1e-4)
+    assert sample(text, 'instagram_bot_selector_lookups_total{group="comment.textarea",result="hit"}') == 1
+    assert sample(text, 'instagram_bot_vision_requests_total{backend="gemini"}') == 2
+    assert sample(text, 'instagram_bot_vision_errors_total{backend="gemini"}') == 1
+    assert sample(text, 'instagram_bot_api_quota_remaining{api="gemini"}') == 100
+    assert sample(text, 'instagram_bot_browser_restarts_total') == 2
+    assert sample(text, 'instagram_bot_browser_memory_peak_bytes{kind="rss"}') == 1200 * 1024 * 1024
+    assert sample(text, 'instagram_bot_browser_recycles_total{kind="tab"}') == 1
+    assert 'instagram_bot_last_run_info{script="scheduled_automation"} 1' in text
+
+
+def test_step_histogram_is_cumulative(run):
+    text = RunMetrics().collect(timings=run['timings']).render()
+    
+    assert '# TYPE instagram_bot_step_seconds histogram' in text
+    assert sample(text, 'instagram_bot_step_seconds_bucket{step="open_post",le="0.5"}') == 1
+    assert sample(text, 'instagram_bot_step_seconds_bucket{step="open_post",le="2.5"}') == 2
+    assert sample(text, 'instagram_bot_step_seconds_bucket{step="open_post",le="+Inf"}') == 3
+    assert sample(text, 'instagram_bot_step_seconds_count{step="open_post"}') == 3
+    assert sample(text, 'instagram_bot_step_seconds_sum{step="open_post"}') == pytest.approx(5.8)
+
+
+def test_label_values_are_escaped():
+    metrics = RunMetrics()
+    metrics.family('things', 'gauge', 'Things').add(1, name='say "hi"\\\n')
+    
+    assert 'instagram_bot_things{name="say \\"hi\\"\\\\\\n"} 1' in metrics.render()
+
+
+def test_openmetrics_names_counters_without_total():
+    metrics = RunMetrics()
+    metrics.family('actions', 'counter', 'Actions').add(3, type='like', result='confirmed')
+    
+    prometheus = metrics.render()
+    openmetrics = metrics.render(openmetrics=True)
+    
+    assert '# TYPE instagram_bot_actions_total counter' in prometheus
+    assert '# TYPE instagram_bot_actions counter' in openmetrics
+    assert 'instagram_bot_actions_total{type="like",result="confirmed"} 3' in openmetrics
+    assert openmetrics.endswith('# EOF\n')
+    assert to_openmetrics('') == '# EOF\n'
+
+
+def test_textfile_is_replaced_atomically(tmp_path):
+    write_textfile('old 1\n', tmp_path)
+    path = write_textfile('new 2\n', tmp_path)
+    
+    assert path == tmp_path / TEXTFILE_NAME
+    assert path.read_text() == 'new 2\n'
+    assert [p.name for p in tmp_path.iterdir()] == [TEXTFILE_NAME]
+
+
+def test_run_metrics_can_be_switched_off(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', False)
+    assert write_run_metrics('main', tmp_path) is None
+    
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', True)
+    assert write_run_metrics('main', tmp_path).exists()
+
+
+def test_endpoint_negotiates_format():
+    server = MetricsServer(lambda: RunMetrics().collect('main').render(), host='127.0.0.1', port=0)
+    port = server.start()
+    try:
+        url = f'http://127.0.0.1:{port}/metrics'
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert 'instagram_bot_last_run_info{script="main"} 1' in response.read().decode()
+        
+        request = urllib.request.Request(url, headers={'Accept': 'application/openmetrics-text; version=1.0.0'})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+            assert response.read().decode().endswith('# EOF\n')
+    finally:
+        server.stop()
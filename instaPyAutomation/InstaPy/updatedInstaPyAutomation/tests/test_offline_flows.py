@@ -0,0 +1,115 @@
+"""
+End-to-end flows against the fake Instagram server
+The page checks run anywhere; the browser flows need a local Chrome
+    
+    pytest tests/test_offline_flows.py
+    CHROME_BINARY=/opt/chrome/chrome pytest tests/test_offline_flows.py
+"""
+import re
+import urllib.parse
+import urllib.request
+
+import pytest
+from selenium.webdriver.common.by import By
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.geturl(), response.read().decode('utf-8')
+
+
+# ---------------------------------------------------------------- fixture pages
+
+def test_login_page_has_form_fields(fake_instagram):
+    _, html = _get(f"{fake_instagram.url}/accounts/login/")
+    
+    assert 'name="username"' in html
+    assert 'name="password"' in html
+    assert 'type="submit"' in html
+
+
+def test_login_submit_redirects_home(fake_instagram):
+    data = urllib.parse.urlencode({'username': 'fixture_user', 'password': 'hunter22'}).encode()
+    with urllib.request.urlopen(f"{fake_instagram.url}/accounts/login/ajax/", data, timeout=5) as response:
+        final_url = response.geturl()
+    
+    assert 'login' not in final_url
+    assert fake_instagram.logins == ['fixture_user']
+
+
+def test_hashtag_grid_has_every_variant(fake_instagram):
+    _, html = _get(f"{fake_instagram.url}/explore/tags/travel/")
+    
+    codes = re.findall(r'href="/p/(\w+)/"', html)
+    assert codes == [post[0] for post in fake_instagram.posts]
+    for variant in ('image', 'carousel', 'video'):
+        assert f'data-variant="{variant}"' in html
+
+
+def test_post_page_variants(fake_instagram):
+    _, carousel = _get(fake_instagram.post_url('carousel'))
+    _, video = _get(fake_instagram.post_url('video'))
+    
+    # Three slides and one earlier comment
+    assert carousel.count('<li') == 4 and 'aria-label="Next"' in carousel
+    assert '<video' in video and 'poster="/scontent/' in video
+
+
+# ---------------------------------------------------------------- browser flows
+
+def test_login_flow(offline_actions, fake_instagram):
+    assert offline_actions.login('fixture_user', 'hunter22', max_retries=1)
+    
+    assert fake_instagram.logins == ['fixture_user']
+    dialogs = offline_actions.driver.find_elements(By.CSS_SELECTOR, 'div[role="dialog"]')
+    assert dialogs and not any(dialog.is_displayed() for dialog in dialogs)
+
+
+def test_hashtag_grid_posts(offline_actions):
+    offline_actions.search_hashtag('travel')
+    
+    posts = offline_actions.get_posts_from_page(max_posts=9)
+    
+    assert len(posts) == 9
+
+
+def test_post_queue_skips_handled_posts(offline_actions, fake_instagram):
+    offline_actions.search_hashtag('travel')
+    queue = offline_actions.get_post_queue(max_posts=9)
+    
+    assert len(queue) == 9 and all(url.startswith(fake_instagram.url + '/p/') for url in queue)
+    assert offline_actions.open_post(queue[0])
+    offline_actions.close_post_modal()
+    # Opened but not handled (its like failed, say): still queued
+    assert offline_actions.get_post_queue(max_posts=9) == queue
+    
+    offline_actions.mark_post_handled(queue[0])
+    assert offline_actions.get_post_queue(max_posts=9) == queue[1:]
+
+
+def test_comment_then_like_image_post(offline_actions, fake_instagram):
+    offline_actions.search_hashtag('travel')
+    post = offline_actions.get_posts_from_page(max_posts=1)[0]
+    code = fake_instagram.find_post('image')[0]
+    
+    assert offline_actions.comment_on_post('Great shot!', post_element=post)
+    assert offline_actions.like_post()
+    
+    assert fake_instagram.comments == [(code, 'Great shot!')]
+    assert fake_instagram.likes == [code]
+
+
+@pytest.mark.parametrize('variant', ['image', 'carousel', 'video'])
+def test_detect_post_type(chrome_driver, fake_instagram, ai_generator, variant):
+    chrome_driver.get(fake_instagram.post_url(variant))
+    
+    assert ai_generator.detect_post_type(chrome_driver) == variant
+
+
+def test_carousel_frames_from_dom(chrome_driver, fake_instagram, ai_generator):
+    chrome_driver.get(fake_instagram.post_url('carousel'))
+    
+    urls = ai_generator.get_carousel_image_urls_from_dom(chrome_driver)
+    
+    assert len(urls) == 3
+    assert all('/scontent/' in url and '_avatar' not in url for url in urls)
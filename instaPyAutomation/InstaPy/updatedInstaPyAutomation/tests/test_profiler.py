@@ -0,0 +1,126 @@
+"""
+Per-span profiling: cProfile attribution, allocation sites, thread markers, output files
+"""
+import json
+import pstats
+import threading
+
+import pytest
+
+from core.config import Config
+from core.profiler import OUTSIDE_SPANS, RunProfiler, start_profiler
+from core.timing import Timings
+
+
+def spin(n=20000):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def allocate():
+    return [str(i) * 10 for i in range(20000)]
+
+
+@pytest.fixture
+def profiler():
+    profiler = RunProfiler(top_n=10)
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+def functions(profiler, span):
+    return [row['function'] for row in profiler.to_dict()['spans'][span]['top_functions']]
+
+
+def test_time_counts_against_innermost_span(profiler):
+    timings = Timings(profiler=profiler)
+    with timings.span('outer'):
+        spin()
+        with timings.span('inner'):
+            allocate()
+    
+    assert any('allocate' in f for f in functions(profiler, 'inner'))
+    assert not any('allocate' in f for f in functions(profiler, 'outer'))
+    assert any('spin' in f for f in functions(profiler, 'outer'))
+
+
+def test_allocation_sites_per_span(profiler):
+    timings = Timings(profiler=profiler)
+    kept = []
+    with timings.span('build'):
+        kept.append(allocate())
+    
+    memory = profiler.to_dict()['spans']['build']['memory']
+    assert memory['count'] == 1
+    assert memory['net_kb'] > 500
+    assert memory['peak_kb'] >= memory['net_kb']
+    assert 'test_profiler.py' in memory['top_allocations'][0]['line']
+
+
+def test_thread_is_named_after_open_span(profiler):
+    name = threading.current_thread().name
+    timings = Timings(profiler=profiler)
+    with timings.span('login'):
+        with timings.span('like.verify'):
+            assert threading.current_thread().name == f"{name} [like.verify]"
+        assert threading.current_thread().name == f"{name} [login]"
+    
+    assert threading.current_thread().name == name
+
+
+def test_spans_of_other_threads_are_ignored(profiler):
+    timings = Timings(profiler=profiler)
+    
+    def work():
+        with timings.span('background'):
+            spin()
+    
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    
+    assert 'background' in timings.spans
+    assert 'background' not in profiler.to_dict()['spans']
+
+
+def test_run_profile_saved_next_to_timings(profiler, tmp_path):
+    timings = Timings(profiler=profiler)
+    with timings.span('search_hashtag'):
+        spin()
+    spin()
+    
+    timings.save(tmp_path)
+    
+    stamp = timings.started_at.strftime('%Y%m%d_%H%M%S')
+    summary = json.loads((tmp_path / f"profile_{stamp}.json").read_text())
+    assert {'search_hashtag', OUTSIDE_SPANS} <= set(summary['spans'])
+    stats = pstats.Stats(str(tmp_path / f"profile_{stamp}.prof"))
+    assert any(key[2] == 'spin' for key in stats.stats)
+    assert (tmp_path / f"run_{stamp}.json").exists()
+
+
+def test_summary_lists_hot_paths(profiler, capsys):
+    timings = Timings(profiler=profiler)
+    with timings.span('comment'):
+        spin(200000)
+    
+    profiler.print_summary()
+    
+    out = capsys.readouterr().out
+    assert 'Hot paths' in out and 'spin' in out
+    assert 'comment' in out
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.setattr(Config, 'PROFILE', False)
+    assert start_profiler() is None
+    
+    monkeypatch.setattr(Config, 'PROFILE', True)
+    profiler = start_profiler()
+    try:
+        assert profiler.running
+    finally:
+        profiler.stop()
@@ -0,0 +1,62 @@
+"""
+API quota tracker: every sent request counted, thread-safe atomic saves
+"""
+import json
+import threading
+
+from core.quota import QuotaTracker
+
+
+def test_failed_requests_use_quota(ai_generator, fake_vision):
+    fake_vision.error_rate = 1.0
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url()) is None
+    
+    fake_vision.error_rate = 0.0
+    fake_vision.latency = 1.0
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url(), timeout=0.2) is None
+    
+    assert ai_generator.gemini_quota.usage['requests'] == 2
+
+
+def test_successful_request_counts_once_with_tokens(ai_generator, fake_vision):
+    assert ai_generator.analyze_image_with_gemini(fake_vision.image_url())['category'] == 'travel'
+    
+    usage = ai_generator.gemini_quota.usage
+    assert usage['requests'] == 1
+    assert usage['tokens'] > 0
+
+
+def test_concurrent_requests_are_all_saved(tmp_path, virtual_clock):
+    quota_file = tmp_path / 'api_quota.json'
+    tracker = QuotaTracker('gemini', 1000, quota_file=quota_file, clock=virtual_clock)
+    
+    def work():
+        for _ in range(50):
+            tracker.record_request(tokens=2)
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    saved = json.loads(quota_file.read_text())['services']['gemini']
+    assert saved['requests'] == 400 and saved['tokens'] == 800
+    assert QuotaTracker('gemini', 1000, quota_file=quota_file, clock=virtual_clock).remaining() == 600
+    assert [p.name for p in tmp_path.iterdir()] == ['api_quota.json']
+
+
+def test_failed_save_keeps_previous_counters(tmp_path, virtual_clock, monkeypatch):
+    quota_file = tmp_path / 'api_quota.json'
+    tracker = QuotaTracker('gemini', 100, quota_file=quota_file, clock=virtual_clock)
+    tracker.record_request()
+    
+    def torn_dump(obj, f, **kwargs):
+        f.write('{"date": ')
+        raise OSError('disk full')
+    
+    monkeypatch.setattr(json, 'dump', torn_dump)
+    tracker.record_request()
+    monkeypatch.undo()
+    
+    assert QuotaTracker('gemini', 100, quota_file=quota_file, clock=virtual_clock).remaining() == 99
@@ -0,0 +1,103 @@
+"""
+Resource governor: memory sampling, recycling decisions and per-run log
+"""
+import json
+import os
+from types import SimpleNamespace
+
+from core.resource_governor import MB, ResourceGovernor, memory_profile_flags
+
+
+class TabDriver:
+    """Reports a JS heap size and records tab operations"""
+    
+    def __init__(self, heap_mb, pid=None):
+        self.heap_mb = heap_mb
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=pid))
+        self.window_handles = ['tab-1', 'tab-2']
+        self.current_window_handle = None
+        self.closed = []
+        self.visited = []
+        self.switch_to = SimpleNamespace(new_window=self._new_window, window=self._window)
+    
+    def _new_window(self, kind):
+        self.current_window_handle = 'fresh'
+    
+    def _window(self, handle):
+        self.current_window_handle = handle
+    
+    def close(self):
+        self.closed.append(self.current_window_handle)
+    
+    def get(self, url):
+        self.visited.append(url)
+    
+    def execute_script(self, script, *args):
+        return self.heap_mb * MB
+
+
+class RecordingWatchdog:
+    def __init__(self):
+        self.restarts = []
+    
+    def restart(self, planned=False):
+        self.restarts.append(planned)
+
+
+def _governor(heap_mb=50, pid=None, watchdog=None, **limits):
+    browser = SimpleNamespace(driver=TabDriver(heap_mb, pid))
+    return ResourceGovernor(browser, watchdog, **limits), browser.driver
+
+
+def test_memory_profiles():
+    assert '--renderer-process-limit=2' in memory_profile_flags('small-vm')
+    assert memory_profile_flags('standard') == []
+    assert memory_profile_flags('no-such-profile') == []
+
+
+def test_samples_process_tree_rss():
+    # This test process stands in for Chrome
+    governor, _ = _governor(pid=os.getpid())
+    
+    rss, heap = governor.sample()
+    
+    assert rss > 1 and heap == 50
+    assert governor.rss.count == 1
+
+
+def test_within_limits_does_nothing():
+    governor, driver = _governor(heap_mb=100, pid=os.getpid(), browser_limit_mb=10 ** 6, tab_limit_mb=200)
+    
+    assert governor.check() is None
+    assert driver.closed == []
+
+
+def test_heap_over_limit_recycles_tab():
+    governor, driver = _governor(heap_mb=500, tab_limit_mb=200)
+    
+    assert governor.check() == 'tab'
+    assert driver.closed == ['tab-1', 'tab-2']
+    assert driver.current_window_handle == 'fresh'
+    assert governor.tab_recycles == 1
+
+
+def test_rss_over_limit_recycles_browser():
+    watchdog = RecordingWatchdog()
+    governor, _ = _governor(pid=os.getpid(), watchdog=watchdog, browser_limit_mb=1)
+    
+    assert governor.check() == 'browser'
+    assert watchdog.restarts == [True]
+
+
+def test_peak_and_average_logged(tmp_path):
+    governor, driver = _governor(heap_mb=100, tab_limit_mb=10 ** 6)
+    governor.check()
+    driver.heap_mb = 300
+    governor.check()
+    
+    governor.save(tmp_path / 'resource_usage.jsonl')
+    governor.save(tmp_path / 'resource_usage.jsonl')
+    
+    lines = (tmp_path / 'resource_usage.jsonl').read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])['js_heap'] == {'samples': 2, 'peak_mb': 300.0, 'avg_mb': 200.0}
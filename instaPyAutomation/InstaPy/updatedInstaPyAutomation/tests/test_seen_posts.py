@@ -0,0 +1,81 @@
+"""
+Seen-post index: shortcode parsing, persistence and bounded memory
+"""
+import json
+
+import pytest
+
+from core.config import Config
+from core.seen_posts import BloomFilter, SeenPostIndex, post_url, shortcode_from_href
+
+
+@pytest.mark.parametrize('href, shortcode', [
+    ('/p/C1a2B3c4D5e/', 'C1a2B3c4D5e'),
+    ('https://www.instagram.com/p/Xy_z-9/?img_index=2', 'Xy_z-9'),
+    ('/reel/Reel123/', 'Reel123'),
+    ('/explore/tags/travel/', None),
+    (None, None),
+])
+def test_shortcode_from_href(href, shortcode):
+    assert shortcode_from_href(href) == shortcode
+
+
+def test_post_url_is_canonical():
+    assert post_url('abc') == f"{Config.BASE_URL}/p/abc/"
+
+
+def test_index_persists(tmp_path):
+    index = SeenPostIndex(tmp_path / 'seen.json', capacity=100)
+    index.add('first')
+    index.add('second')
+    
+    reloaded = SeenPostIndex(tmp_path / 'seen.json', capacity=100)
+    
+    assert 'first' in reloaded and 'second' in reloaded
+    assert 'third' not in reloaded
+
+
+def test_generations_rotate_and_stay_bounded(tmp_path):
+    index = SeenPostIndex(tmp_path / 'seen.json', capacity=50)
+    index.RECENT_SIZE = 10
+    for i in range(120):
+        index.add(f'post{i}', save=False)
+    
+    # Two generations back are forgotten, the last one to two are kept
+    assert 'post119' in index and 'post60' in index
+    assert len(index.recent) == 10
+    assert len(index) <= 2 * 50
+    assert sum(f'post{i}' in index for i in range(50)) < 5
+
+
+def test_bloom_false_positive_rate():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f'seen{i}')
+    
+    assert all(f'seen{i}' in bloom for i in range(2000))
+    false_positives = sum(f'new{i}' in bloom for i in range(5000))
+    assert false_positives < 5000 * 0.03
+
+
+def test_resizing_keeps_recent_posts(tmp_path):
+    SeenPostIndex(tmp_path / 'seen.json', capacity=100).add('kept')
+    
+    resized = SeenPostIndex(tmp_path / 'seen.json', capacity=500)
+    
+    assert 'kept' in resized
+
+
+def test_failed_save_keeps_previous_index(tmp_path, monkeypatch):
+    index = SeenPostIndex(tmp_path / 'seen.json', capacity=100)
+    index.add('first')
+    
+    def torn_dump(obj, f, **kwargs):
+        f.write('{"generations": [')
+        raise OSError('disk full')
+    
+    monkeypatch.setattr(json, 'dump', torn_dump)
+    index.add('second')
+    monkeypatch.undo()
+    
+    assert 'first' in SeenPostIndex(tmp_path / 'seen.json', capacity=100)
@@ -0,0 +1,93 @@
+"""
+Selector catalog loading, validation and hot reload
+"""
+import json
+import os
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from core.clock import VirtualClock
+from core.config import Config
+from core.selector_catalog import SelectorCatalog
+
+
+def _write(path, version, textarea='//textarea', mtime=None):
+    path.write_text(json.dumps({
+        'version': version,
+        'texts': {'comment.post_button': 'Post'},
+        'groups': {
+            'comment.textarea': [{'by': 'xpath', 'value': textarea}],
+            'like.js': [{'name': 'first-span', 'by': 'js', 'value': ['(function() {', 'return null;', '})()']}],
+            'like.selenium': [
+                {'by': 'xpath', 'value': '//article//button'},
+                {'by': 'css', 'value': 'article button'},
+            ],
+        },
+    }), encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_shipped_catalog_compiles():
+    catalog = SelectorCatalog(Config.SELECTOR_CATALOG)
+    
+    assert catalog.version >= 1
+    for group in ('login.button', 'like.js', 'like.selenium', 'comment.textarea', 'post.image'):
+        assert catalog.strategies(group)
+    # No brittle absolute paths
+    for group in catalog.groups.values():
+        assert not any(s.value.startswith('/html') for s in group)
+    assert catalog.union('post.video').count(' | ') == len(catalog.strategies('post.video')) - 1
+
+
+def test_locators_are_precompiled(tmp_path):
+    path = tmp_path / 'catalog.json'
+    _write(path, 1)
+    
+    catalog = SelectorCatalog(path)
+    js, = catalog.strategies('like.js')
+    xpath, css = catalog.strategies('like.selenium')
+    
+    assert js.key == 'first-span' and js.value.count('\n') == 2
+    assert xpath.locator == (By.XPATH, '//article//button') and xpath.key == '//article//button'
+    assert css.by == By.CSS_SELECTOR
+    assert 'like.selenium' not in catalog.unions  # mixed XPath/CSS group
+    assert catalog.text('comment.post_button') == 'Post'
+
+
+def test_hot_reload_on_change(tmp_path):
+    path = tmp_path / 'catalog.json'
+    _write(path, 1, mtime=1_000_000)
+    clock = VirtualClock()
+    catalog = SelectorCatalog(path, clock=clock)
+    
+    _write(path, 2, textarea='//form//textarea', mtime=1_000_100)
+    assert not catalog.reload_if_changed()   # checked moments ago
+    
+    clock.sleep(SelectorCatalog.CHECK_INTERVAL)
+    assert catalog.reload_if_changed()
+    assert catalog.version == 2
+    assert catalog.strategies('comment.textarea')[0].value == '//form//textarea'
+    assert not catalog.reload_if_changed(force=True)  # unchanged since
+
+
+def test_broken_edit_keeps_loaded_catalog(tmp_path):
+    path = tmp_path / 'catalog.json'
+    _write(path, 1, mtime=1_000_000)
+    catalog = SelectorCatalog(path)
+    
+    path.write_text('{"version": 2, "groups": {', encoding='utf-8')
+    os.utime(path, (1_000_100, 1_000_100))
+    
+    assert not catalog.reload_if_changed(force=True)
+    assert catalog.version == 1
+    assert catalog.strategies('comment.textarea')
+
+
+def test_invalid_catalog_rejected(tmp_path):
+    path = tmp_path / 'catalog.json'
+    path.write_text(json.dumps({'version': 1, 'groups': {'x': [{'by': 'id', 'value': 'a'}]}}))
+    
+    with pytest.raises(ValueError):
+        SelectorCatalog(path)
@@ -0,0 +1,65 @@
+"""
+Adaptive ordering and demotion of locator strategies
+"""
+from core.clock import VirtualClock
+from core.selector_registry import SelectorRegistry
+
+
+STRATEGIES = ['//old/absolute/path', "//article//section[1]//span[1]", "//button[@aria-label='Like']"]
+
+
+def _registry(tmp_path):
+    return SelectorRegistry(tmp_path / 'selector_stats.json', clock=VirtualClock())
+
+
+def test_untried_strategies_keep_default_order(tmp_path):
+    assert _registry(tmp_path).order('like.selenium', STRATEGIES) == STRATEGIES
+
+
+def test_working_strategy_moves_first(tmp_path):
+    registry = _registry(tmp_path)
+    registry.record('like.selenium', STRATEGIES[0], hit=False, latency=5.0)
+    registry.record('like.selenium', STRATEGIES[1], hit=True, latency=0.2)
+    
+    assert registry.order('like.selenium', STRATEGIES)[0] == STRATEGIES[1]
+
+
+def test_stale_strategy_is_demoted_until_it_hits(tmp_path):
+    registry = _registry(tmp_path)
+    for _ in range(SelectorRegistry.STALE_MISSES):
+        registry.record('like.selenium', STRATEGIES[0], hit=False, latency=5.0)
+    
+    assert registry.order('like.selenium', STRATEGIES)[-1] == STRATEGIES[0]
+    assert registry.timeout('like.selenium', STRATEGIES[0], 5) == SelectorRegistry.STALE_TIMEOUT
+    assert registry.timeout('like.selenium', STRATEGIES[1], 5) == 5
+    
+    registry.record('like.selenium', STRATEGIES[0], hit=True, latency=0.1)
+    assert not registry.is_stale('like.selenium', STRATEGIES[0])
+
+
+def test_stats_persist(tmp_path):
+    registry = _registry(tmp_path)
+    registry.record('comment.textarea', '//textarea', hit=True, latency=0.3)
+    registry.record('comment.textarea', '//textarea', hit=False, latency=0.5)
+    assert not (tmp_path / 'selector_stats.json').exists()
+    registry.flush()
+    
+    reloaded = _registry(tmp_path)
+    row = reloaded.summary()[0]
+    
+    assert (row['group'], row['hits'], row['misses']) == ('comment.textarea', 1, 1)
+    assert row['hit_rate'] == 0.5
+    assert row['avg_latency'] == 0.4
+
+
+def test_flush_writes_only_after_new_attempts(tmp_path, monkeypatch):
+    registry = _registry(tmp_path)
+    registry.record('like.js', 'aria', hit=True)
+    registry.flush()
+    saves = []
+    monkeypatch.setattr(registry, 'save_stats', lambda: saves.append(1))
+    
+    registry.flush()
+    
+    assert saves == []
+    assert [p.name for p in tmp_path.iterdir()] == ['selector_stats.json']
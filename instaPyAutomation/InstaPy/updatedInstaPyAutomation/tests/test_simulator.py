@@ -0,0 +1,85 @@
+"""
+Session simulator: virtual-time runs against the real safety limits and schedule
+"""
+import time
+from datetime import datetime
+
+import pytest
+
+from core.config import Config
+from core.engagement_scheduler import EngagementScheduler
+from core.simulator import PageModel, SessionSimulator, override_config
+
+
+@pytest.fixture(autouse=True)
+def default_table():
+    EngagementScheduler.use_analytics(None)
+    yield
+
+
+def test_seeded_runs_are_reproducible():
+    first = SessionSimulator(seed=5).run(20).summary()
+    second = SessionSimulator(seed=5).run(20).summary()
+    
+    first.pop('simulated_days_per_second')
+    second.pop('simulated_days_per_second')
+    assert first == second
+
+
+def test_runs_follow_the_schedule():
+    report = SessionSimulator(seed=1).run(7)
+    
+    expected = [f"{day} {p['hour']:02d}:{p['minute']:02d}"
+                for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+                for p in sorted(EngagementScheduler.get_peak_times(day), key=lambda p: (p['hour'], p['minute']))]
+    assert [run['slot'] for run in report.runs] == expected
+    assert not any(run['late'] for run in report.runs)
+
+
+def test_daily_limit_refuses_actions_and_resets():
+    page = PageModel(open_failure=0, comment_failure=0, like_failure=0, posts_found=(5, 5))
+    report = SessionSimulator(seed=2, page_model=page).run(10, MAX_LIKES_PER_DAY=6)
+    summary = report.summary()
+    
+    assert summary['limit_hits']['days'] == 10
+    assert summary['limit_hits']['blocked_actions']['daily_like'] == 10 * (20 - 6)  # 2 runs x 10 posts a day
+    assert sum(run['likes'] for run in report.runs) == 10 * 6
+
+
+def test_hourly_limit_caps_each_run():
+    summary = SessionSimulator(seed=3).run(14, MAX_ACTIONS_PER_HOUR=8).summary()
+    
+    assert summary['actions_per_run']['p95'] <= 8
+    assert summary['limit_hits']['blocked_actions']['hourly'] > 0
+    assert 'daily_like' not in summary['limit_hits']['blocked_actions']
+
+
+def test_idle_and_run_time_add_up():
+    def simulate(session_breaks):
+        simulator = SessionSimulator(categories=3, posts_per_category=10, session_breaks=session_breaks, seed=4)
+        return simulator.run(30, MIN_SESSION_BREAK=600, MAX_SESSION_BREAK=600).summary()
+    
+    summary = simulate(session_breaks=True)
+    
+    busy_hours = summary['runs'] * summary['run_minutes']['mean'] / 60
+    assert busy_hours + summary['idle_hours_per_day'] * 30 == pytest.approx(30 * 24)
+    assert summary['run_minutes']['max'] - simulate(session_breaks=False)['run_minutes']['max'] >= 9
+
+
+def test_overrides_are_restored():
+    limit = Config.MAX_ACTIONS_PER_HOUR
+    
+    SessionSimulator(seed=1).run(1, MAX_ACTIONS_PER_HOUR='5')
+    
+    assert Config.MAX_ACTIONS_PER_HOUR == limit
+    with pytest.raises(ValueError):
+        with override_config(NOT_A_SETTING=1):
+            pass
+
+
+def test_simulates_a_year_quickly():
+    started = time.perf_counter()
+    report = SessionSimulator(seed=6, start=datetime(2025, 3, 1)).run(365)
+    
+    assert len(report.runs) == 2 * 365
+    assert time.perf_counter() - started < 5
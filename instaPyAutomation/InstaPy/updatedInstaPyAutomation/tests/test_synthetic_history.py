@@ -0,0 +1,83 @@
+"""
+Synthetic analytics histories and the analytics benchmark harness
+"""
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmark_analytics import benchmark_size, compare, parse_size, save_baseline, load_baseline
+from core.analytics import InstagramAnalytics
+from core.clock import parse_timestamp
+from core.synthetic_history import SyntheticHistory, write_history
+
+END = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_history_matches_what_analytics_would_record():
+    data = SyntheticHistory(days=30, end=END, seed=3).build(2000, posts=500)
+    
+    assert len(data['action_history']) == 2000
+    assert len(data['posts']) == 500
+    assert sum(b['count'] for b in data['engagement_by_time'].values()) == 500
+    assert sum(b['likes'] for b in data['engagement_by_day'].values()) == sum(p['likes'] for p in data['posts'])
+    uses = Counter(tag for post in data['posts'] for tag in post['hashtags'])
+    assert {tag: stats['uses'] for tag, stats in data['hashtag_performance'].items()} == dict(uses)
+
+
+def test_history_is_chronological_and_before_end():
+    data = SyntheticHistory(days=30, end=END, seed=3).build(1000)
+    
+    stamps = [parse_timestamp(a['timestamp']) for a in data['action_history']]
+    assert stamps == sorted(stamps)
+    assert stamps[-1] < END
+    assert (END - stamps[0]).days <= 31
+
+
+def test_peaks_and_popular_hashtags_dominate():
+    data = SyntheticHistory(days=60, end=END, seed=5).build(5000)
+    
+    hours = Counter(post['hour'] for post in data['posts'])
+    assert hours[11] > 5 * hours[3]
+    uses = Counter(tag for post in data['posts'] for tag in post['hashtags'])
+    top, _ = uses.most_common(1)[0]
+    assert uses[top] > 20 * min(uses.values())
+
+
+def test_seeded_histories_repeat():
+    first = SyntheticHistory(days=10, end=END, seed=9).build(300)
+    second = SyntheticHistory(days=10, end=END, seed=9).build(300)
+    
+    assert first == second
+
+
+def test_written_history_loads(tmp_path):
+    write_history(tmp_path, 200, end=END, seed=1)
+    
+    analytics = InstagramAnalytics(data_dir=str(tmp_path))
+    
+    assert len(analytics.data['posts']) == 200
+    assert analytics.get_best_hashtags(min_uses=1)
+
+
+def test_parse_size():
+    assert parse_size('10k') == 10_000
+    assert parse_size('1M') == 1_000_000
+    assert parse_size('2.5k') == 2_500
+    assert parse_size('750') == 750
+
+
+def test_benchmark_runs_and_compares_with_baseline(tmp_path):
+    result = benchmark_size(300, str(tmp_path / 'work'), repeat=1, record_calls=1, seed=1)
+    
+    assert set(result['steps']) == {
+        'migrate', 'load', 'get_activity_summary', 'get_best_hashtags', 'get_follower_growth',
+        'html_report', 'json_report', 'record_action'
+    }
+    assert result['steps']['load']['peak_mb'] > 0
+    
+    save_baseline(result, str(tmp_path))
+    baseline = load_baseline(300, str(tmp_path))
+    slower = dict(result, steps={step: dict(stats, seconds=stats['seconds'] * 2)
+                                 for step, stats in result['steps'].items()})
+    
+    assert not any(row[-1] for row in compare(result, baseline))
+    assert all(row[-1] for row in compare(slower, baseline) if row[1] == 'seconds')
@@ -0,0 +1,94 @@
+"""
+Timing spans, delay accounting and per-run persistence
+"""
+from datetime import datetime, timedelta
+
+from core.analytics import InstagramAnalytics
+from core.clock import VirtualClock
+from core.humanize import HumanBehavior
+from core.timing import Histogram, Timings, load_recent_timings, timed
+from generate_daily_report import generate_html_report
+
+
+def test_span_excludes_deliberate_delays():
+    clock = VirtualClock()
+    timings = Timings(clock=clock)
+    human = HumanBehavior(driver=None, clock=clock, timings=timings)
+    
+    with timings.span('comment'):
+        clock.sleep(2)                  # waiting on the page
+        human.random_delay(5, 5)        # deliberate pause
+        with timings.span('comment.submit'):
+            clock.sleep(1)
+    
+    assert timings.spans['comment'].total == 3
+    assert timings.spans['comment.submit'].total == 1
+    assert timings.delays['comment'].total == 5
+
+
+def test_delay_outside_spans():
+    clock = VirtualClock()
+    timings = Timings(clock=clock)
+    
+    HumanBehavior(driver=None, clock=clock, timings=timings).random_delay(3, 3)
+    
+    assert timings.delays['between steps'].count == 1
+
+
+def test_timed_decorator():
+    clock = VirtualClock()
+    
+    class Step:
+        def __init__(self, timings):
+            self.timings = timings
+        
+        @timed('step')
+        def run(self):
+            clock.sleep(0.2)
+            return 'done'
+    
+    timings = Timings(clock=clock)
+    
+    assert Step(timings).run() == 'done'
+    assert Step(None).run() == 'done'
+    assert timings.spans['step'].count == 1
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for seconds in [0.02] * 90 + [4.0] * 10:
+        histogram.observe(seconds)
+    
+    assert histogram.percentile(50) == 0.025
+    assert histogram.percentile(95) == 4.0
+    assert histogram.max == 4.0
+
+
+def test_runs_persist_and_merge(tmp_path):
+    for day in range(3):
+        clock = VirtualClock(datetime(2025, 1, 6 + day, 11, 0))
+        timings = Timings(clock=clock)
+        with timings.span('like'):
+            clock.sleep(1.5)
+        timings.save(tmp_path)
+    
+    merged, runs = load_recent_timings(days=7, timings_dir=tmp_path, now=datetime(2025, 1, 9))
+    recent, recent_runs = load_recent_timings(days=1, timings_dir=tmp_path, now=datetime(2025, 1, 9))
+    
+    assert runs == 3 and merged.spans['like'].count == 3
+    assert recent_runs == 1
+
+
+def test_daily_report_renders_timings(tmp_path):
+    clock = VirtualClock(datetime.now() - timedelta(hours=1))
+    timings = Timings(clock=clock)
+    with timings.span('search_hashtag'):
+        clock.sleep(2)
+    timings.save(tmp_path / 'timings')
+    output = tmp_path / 'report.html'
+    
+    generate_html_report(InstagramAnalytics(data_dir=str(tmp_path)), str(tmp_path / 'logs'), str(output))
+    
+    html = output.read_text(encoding='utf-8')
+    assert 'Where the Time Goes (1 runs' in html
+    assert 'search_hashtag' in html
@@ -0,0 +1,96 @@
+"""
+Vision backend chain: fallback order, latency estimates and the per-post budget, in virtual time
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from core.clock import VirtualClock
+from core.vision_backends import VISION_BACKENDS, VisionBackend, VisionBackendChain
+
+
+class StubBackend(VisionBackend):
+    """Remote backend that answers from `answer` after `seconds` of virtual time"""
+    
+    expected_latency = 1.0
+    
+    def __init__(self, generator):
+        super().__init__(generator)
+        self.seconds = 1.0
+        self.answer = {'category': 'travel'}
+        self.calls = 0
+    
+    def analyze(self, image_urls, context=None, timeout=30):
+        self.calls += 1
+        self.generator.clock.advance(self.seconds)
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return dict(self.answer) if self.answer else None
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    """Chain over two stub remotes, 'first' then 'second', with a 5 s budget"""
+    for name in ('first', 'second'):
+        monkeypatch.setitem(VISION_BACKENDS, name, type(f'{name}Backend', (StubBackend,), {'name': name}))
+    generator = SimpleNamespace(
+        clock=VirtualClock(),
+        _extract_keywords=lambda text: ['beach'],
+        _detect_category=lambda text: 'travel',
+    )
+    return VisionBackendChain(generator, order=['first', 'second'], budget=5)
+
+
+def backend(chain, name):
+    return next(b for b in chain.backends if b.name == name)
+
+
+def test_local_backend_is_always_last(chain):
+    assert [b.name for b in chain.plan(5)] == ['first', 'second', 'local']
+
+
+def test_failing_backends_fall_through_in_order(chain):
+    backend(chain, 'first').answer = RuntimeError('HTTP 500')
+    backend(chain, 'second').answer = None
+    
+    analysis = chain.analyze(['https://img/1.jpg'], {'alt_texts': ['May be an image of beach']})
+    
+    assert analysis['backend'] == 'local'
+    assert [backend(chain, name).failures for name in ('first', 'second')] == [1, 1]
+    
+    backend(chain, 'second').answer = {'category': 'food'}
+    assert chain.analyze(['https://img/1.jpg']) == {'category': 'food', 'backend': 'second'}
+
+
+def test_latency_is_measured_with_the_generator_clock(chain):
+    first = backend(chain, 'first')
+    first.seconds = 2.0
+    
+    chain.analyze(['https://img/1.jpg'])
+    
+    assert first.latency_ewma == pytest.approx(0.7 * 1.0 + 0.3 * 2.0)
+    assert first.latency.count == 1 and first.latency.total == pytest.approx(2.0)
+
+
+def test_slow_backend_is_skipped_then_probed_again(chain):
+    first = backend(chain, 'first')
+    first.seconds = 20.0
+    first.latency_ewma = 20.0
+    
+    assert [b.name for b in chain.plan(5)] == ['second', 'local']
+    # Every skip moves the estimate back toward the 1 s prior
+    plans = 0
+    while first not in chain.plan(5):
+        plans += 1
+    assert 1 < plans < 10
+
+
+def test_budget_spent_by_one_backend_leaves_the_local_answer(chain):
+    first = backend(chain, 'first')
+    first.seconds = 6.0
+    first.answer = None
+    
+    analysis = chain.analyze(['https://img/1.jpg'], {'alt_texts': ['May be an image of beach']})
+    
+    assert analysis['backend'] == 'local'
+    assert backend(chain, 'second').calls == 0
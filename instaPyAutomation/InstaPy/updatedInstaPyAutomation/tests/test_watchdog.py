@@ -0,0 +1,256 @@
+"""
+Browser watchdog restarts and checkpointed run resume
+"""
+from datetime import datetime
+
+import pytest
+
+from core.analytics import InstagramAnalytics
+from core.block_monitor import ActionBlocked
+from core.checkpoint import RunCheckpoint
+from core.clock import VirtualClock
+from core.hashtag_selector import HashtagSelector
+from core.humanize import HumanBehavior
+from core.watchdog import BrowserDied, BrowserWatchdog, is_dead_session_error
+from scheduled_automation import process_category
+
+
+class FlakyDriver:
+    """Driver whose session can be killed"""
+    
+    def __init__(self, logged_in=True):
+        self.alive = True
+        self.logged_in = logged_in
+        self.current_url = ''
+    
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError('invalid session id: session deleted because of page crash')
+        return 'complete'
+    
+    def get(self, url):
+        self.current_url = url if self.logged_in else url + '/accounts/login/'
+    
+    def find_elements(self, by, value):
+        return [] if self.logged_in else ['username field']
+    
+    def quit(self):
+        self.alive = False
+
+
+class FakeBrowserManager:
+    def __init__(self, cookies_valid=True):
+        self.cookies_valid = cookies_valid
+        self.driver = FlakyDriver()
+        self.setups = 0
+        self.cookies_saved = 0
+    
+    def setup_browser(self):
+        self.setups += 1
+        self.driver = FlakyDriver(logged_in=self.cookies_valid)
+        return self.driver
+    
+    def load_cookies(self):
+        return True
+    
+    def save_cookies(self):
+        self.cookies_saved += 1
+
+
+class NoBlocks:
+    """Action block monitor that never sees a block"""
+    
+    def pause(self):
+        return 0.0
+
+
+class BlockedAfter:
+    """Action block monitor that sees a long block before post number `posts` + 1"""
+    
+    def __init__(self, posts):
+        self.posts = posts
+    
+    def pause(self):
+        if self.posts == 0:
+            raise ActionBlocked('blocked for 24h')
+        self.posts -= 1
+        return 0.0
+
+
+class FakeActions:
+    """Records what was done to which post; can crash the browser on a like"""
+    
+    def __init__(self, browser_manager, queue=(), crash_on_like=None):
+        self.browser_manager = browser_manager
+        self.queue = list(queue)
+        self.crash_on_like = crash_on_like
+        self.human = HumanBehavior(None, clock=VirtualClock())
+        self.blocks = NoBlocks()
+        self.current = None
+        self.logins = 0
+        self.attached = []
+        self.comments = []
+        self.likes = []
+        self.handled = []
+    
+    def attach_driver(self, driver):
+        self.attached.append(driver)
+    
+    def login(self, username, password):
+        self.logins += 1
+        return True
+    
+    def search_hashtag(self, hashtag):
+        return True
+    
+    def get_post_queue(self, max_posts):
+        return self.queue[:max_posts]
+    
+    def open_post(self, url):
+        self.current = url
+        return self.browser_manager.driver.alive
+    
+    def comment_on_post(self, comment_text=None, deadline=None):
+        self.comments.append(self.current)
+        return True
+    
+    def like_post(self, deadline=None):
+        if self.current == self.crash_on_like:
+            self.crash_on_like = None
+            self.browser_manager.driver.alive = False
+            return False
+        self.likes.append(self.current)
+        return True
+    
+    def mark_post_handled(self, url):
+        self.handled.append(url)
+    
+    def close_post_modal(self):
+        pass
+
+
+def test_dead_session_errors():
+    assert is_dead_session_error(Exception('Message: invalid session id'))
+    assert is_dead_session_error(Exception('unknown error: session deleted because of page crash\nfrom tab crashed'))
+    assert not is_dead_session_error(Exception('no such element: Unable to locate element'))
+
+
+def test_restart_reuses_saved_session():
+    browser = FakeBrowserManager()
+    actions = FakeActions(browser)
+    watchdog = BrowserWatchdog(browser, actions, 'user', 'pass', max_restarts=2)
+    
+    assert not watchdog.ensure_alive()
+    browser.driver.alive = False
+    assert watchdog.ensure_alive()
+    
+    assert browser.setups == 1
+    assert actions.attached == [browser.driver]
+    assert actions.logins == 0
+
+
+def test_restart_logs_in_when_cookies_expired():
+    browser = FakeBrowserManager(cookies_valid=False)
+    actions = FakeActions(browser)
+    browser.driver.alive = False
+    
+    BrowserWatchdog(browser, actions, 'user', 'pass').ensure_alive()
+    
+    assert actions.logins == 1 and browser.cookies_saved == 1
+
+
+def test_gives_up_after_max_restarts():
+    browser = FakeBrowserManager()
+    watchdog = BrowserWatchdog(browser, FakeActions(browser), 'user', 'pass', max_restarts=1)
+    browser.driver.alive = False
+    watchdog.ensure_alive()
+    browser.driver.alive = False
+    
+    with pytest.raises(BrowserDied):
+        watchdog.ensure_alive()
+
+
+def test_crash_mid_post_resumes_without_redoing(tmp_path):
+    queue = ['https://x/p/one/', 'https://x/p/two/', 'https://x/p/three/']
+    browser = FakeBrowserManager()
+    actions = FakeActions(browser, queue, crash_on_like=queue[1])
+    watchdog = BrowserWatchdog(browser, actions, 'user', 'pass')
+    checkpoint = RunCheckpoint(tmp_path / 'checkpoint.json')
+    checkpoint.start(['travel'], posts_per_category=3)
+    
+    process_category(actions, watchdog, checkpoint, 'travel', 3)
+    
+    assert browser.setups == 1
+    assert actions.comments == queue          # the crashed post is not commented twice
+    assert actions.likes == queue             # its like is retried
+    assert actions.handled == queue           # only once finished
+    assert checkpoint.totals == {'processed': 3, 'commented': 3, 'liked': 3, 'engaged': 3}
+    assert checkpoint.state['restarts'] == 1
+
+
+def test_category_outcome_recorded_for_its_hashtag(tmp_path):
+    queue = ['https://x/p/one/', 'https://x/p/two/']
+    browser = FakeBrowserManager()
+    actions = FakeActions(browser, queue)
+    selector = HashtagSelector(InstagramAnalytics(data_dir=str(tmp_path)))
+    checkpoint = RunCheckpoint(tmp_path / 'checkpoint.json')
+    checkpoint.start(['food'], posts_per_category=5, hashtags=['foodie'])
+    
+    process_category(actions, BrowserWatchdog(browser, actions, 'user', 'pass'), checkpoint, 'food', 5, selector=selector)
+    
+    stats = selector.stats('foodie')
+    assert (stats['runs'], stats['searches'], stats['found'], stats['attempts'], stats['successes']) == (1, 1, 2, 2, 2)
+    assert selector.stats('food')['runs'] == 0
+
+
+def test_interrupted_category_keeps_its_outcome(tmp_path):
+    queue = ['https://x/p/one/', 'https://x/p/two/', 'https://x/p/three/']
+    browser = FakeBrowserManager()
+    actions = FakeActions(browser, queue)
+    actions.blocks = BlockedAfter(2)
+    selector = HashtagSelector(InstagramAnalytics(data_dir=str(tmp_path)))
+    checkpoint = RunCheckpoint(tmp_path / 'checkpoint.json')
+    checkpoint.start(['food'], posts_per_category=3, hashtags=['foodie'])
+    watchdog = BrowserWatchdog(browser, actions, 'user', 'pass')
+    
+    with pytest.raises(ActionBlocked):
+        process_category(actions, watchdog, checkpoint, 'food', 3, selector=selector)
+    assert [selector.stats('foodie')[key] for key in ('runs', 'searches', 'attempts')] == [1, 1, 2]
+    
+    # Resumed: the rest of the same run
+    actions.blocks = NoBlocks()
+    process_category(actions, watchdog, checkpoint, 'food', 3, selector=selector)
+    stats = selector.stats('foodie')
+    assert (stats['runs'], stats['searches'], stats['found'], stats['attempts'], stats['successes']) == (1, 1, 3, 3, 3)
+
+
+def test_checkpoint_resumes_unfinished_run(tmp_path):
+    clock = VirtualClock(datetime(2025, 1, 6, 9, 0))
+    path = tmp_path / 'checkpoint.json'
+    first = RunCheckpoint(path, clock=clock)
+    first.start(['travel', 'food'], posts_per_category=2)
+    first.set_queue(['a', 'b'])
+    first.complete_post('a', commented=True, liked=True)
+    first.mark_step('b', 'comment')
+    
+    clock.sleep(3600)
+    second = RunCheckpoint(path, clock=clock)
+    
+    assert second.resume()
+    assert second.current_category() == 'travel'
+    assert second.pending_posts() == ['b']
+    assert second.steps_done('b') == ['comment']
+    
+    second.next_category()
+    second.finish()
+    assert not RunCheckpoint(path, clock=clock).resume()
+
+
+def test_stale_checkpoint_is_ignored(tmp_path):
+    clock = VirtualClock()
+    path = tmp_path / 'checkpoint.json'
+    RunCheckpoint(path, clock=clock).start(['travel'], posts_per_category=2)
+    
+    clock.sleep(2 * 24 * 3600)
+    
+    assert not RunCheckpoint(path, clock=clock).resume(max_age_hours=12)